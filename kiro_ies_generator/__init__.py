@@ -226,6 +226,12 @@ class KiroIESProperties(PropertyGroup):
         maxlen=128,
     )
     
+    overwrite: BoolProperty(
+        name="覆盖已有文件",
+        description="输出路径已有 IES、元数据或测量存档时覆盖（默认不覆盖，生成前报告冲突）",
+        default=False,
+    )
+    
     # 预设模式
     preset_mode: EnumProperty(
         name="预设模式",
@@ -293,15 +299,55 @@ class KIRO_OT_GenerateIES(Operator):
                 self.report({'ERROR'}, f"缺失依赖: {dep}")
             return {'CANCELLED'}
         
-        # 验证场景
-        self.report({'INFO'}, "开始场景验证...")
+        from . import api
+        from .data_structures import SamplingConfig
+        from .output_manager import get_archive_path, get_metadata_path
         
-        # TODO: 调用 scene_validator.validate_scene()
-        # 这将在后续任务中实现
+        # 采样前检查输出冲突，避免渲染完成后才因文件已存在而失败
+        output_path = bpy.path.abspath(props.output_path)
+        if not props.overwrite:
+            existing = [
+                path for path in (output_path, get_metadata_path(output_path), get_archive_path(output_path))
+                if os.path.exists(path)
+            ]
+            if existing:
+                props.status_message = "输出文件已存在"
+                for path in existing:
+                    self.report({'ERROR'}, f"文件已存在：{path}")
+                self.report({'ERROR'}, "请更换输出路径，或勾选“覆盖已有文件”后重试")
+                return {'CANCELLED'}
         
-        # 临时占位符逻辑
-        self.report({'WARNING'}, "核心功能尚未实现，这是占位符执行")
-        props.status_message = "等待核心模块实现"
+        config = SamplingConfig(
+            angular_interval=props.angular_interval,
+            distance=props.distance,
+            samples=props.samples,
+        )
+        
+        def progress_callback(current, total):
+            props.progress = 100.0 * current / total if total else 0.0
+            props.status_message = f"采样中 {current}/{total}"
+        
+        props.is_running = True
+        props.progress = 0.0
+        try:
+            result = api.generate(
+                config,
+                props.lumens,
+                output_path,
+                props.fixture_name,
+                overwrite=props.overwrite,
+                progress_callback=progress_callback,
+            )
+        except Exception as e:
+            props.status_message = f"生成失败：{e}"
+            self.report({'ERROR'}, f"IES 生成失败：{e}")
+            return {'CANCELLED'}
+        finally:
+            props.is_running = False
+        
+        props.progress = 100.0
+        props.status_message = f"已生成 {os.path.basename(result['ies_path'])}"
+        self.report({'INFO'}, f"IES 已保存到 {result['ies_path']}")
         
         return {'FINISHED'}
     
@@ -475,6 +521,7 @@ class KIRO_PT_IESGenerator(Panel):
         box.label(text="输出设置", icon='FILE')
         box.prop(props, "fixture_name")
         box.prop(props, "output_path")
+        box.prop(props, "overwrite")
         
         # 生成按钮
         layout.separator()
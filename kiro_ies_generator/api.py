@@ -0,0 +1,424 @@
+"""
+公共 API 模块 (API)
+
+供资产管线等服务嵌入 IES 生成的 Python 接口，与 UI 操作符和命令行使用同一套流程模块。
+
+同步接口（在 Blender 进程内对当前场景运行，会阻塞直到完成）：
+    generate(config, total_lumens, output_path, ...)  完整生成任务，返回任务结果字典
+    measure(config, ...)                               只做球面采样，返回 SamplingResult
+    export(source, total_lumens, output_path, ...)     由采样结果或测量存档校准导出（不需要 Blender）
+
+任务服务器接口（在任意 Python 进程中提交到 job_server，不需要 Blender）：
+    submit(spool, blend, output_dir, **options)        提交任务，立即返回 JobFuture
+    generate_async / measure_async / export_async      对应的 async 版本，不阻塞事件循环
+
+bpy 不是线程安全的，同一个 Blender 进程不能并发测量，因此并发只能通过任务服务器：
+启动多个常驻服务器共用一个任务目录，再用 asyncio.gather 同时等待多个 generate_async。
+
+示例：
+    futures = [api.submit("/jobs", path, "out", preset="production") for path in blend_files]
+    for future in futures:
+        for event in future.events():
+            print(event)
+        print(future.result(timeout=3600).outputs)
+    
+    responses = await asyncio.gather(*(api.generate_async("/jobs", path, "out") for path in blend_files))
+"""
+
+from typing import AsyncIterator, Callable, Dict, List, Optional, Sequence, Union
+import asyncio
+import json
+import os
+import time
+
+from .data_structures import SamplingConfig, SamplingResult, PhotometricData, SceneValidationError
+from .ies_generator import DEFAULT_FIXTURE_NAME, calibrate_to_candela
+from .exporters import DEFAULT_EXPORT_FORMATS, write_photometric_exports
+from .measurement_archive import ArchiveError, load_sampling_result
+from .denoising import denoise_sampling_result
+from .job_server import (
+    DEFAULT_POLL_INTERVAL,
+    JOB_STATUS_FAILED,
+    SPOOL_EVENTS,
+    JobResponse,
+    SpoolDirectory,
+)
+
+
+class ApiError(Exception):
+    """API 错误"""
+    pass
+
+
+class JobFailedError(ApiError):
+    """
+    任务服务器返回失败响应
+    
+    属性:
+        response: 失败的 JobResponse
+    """
+    
+    def __init__(self, response: JobResponse):
+        super().__init__(f"任务 {response.job_id} 失败：{response.error}")
+        self.response = response
+
+
+# ============================================================================
+# 同步接口（Blender 进程内）
+# ============================================================================
+
+def generate(config: Optional[SamplingConfig] = None,
+             total_lumens: Optional[float] = None,
+             output_path: str = "",
+             fixture_name: str = DEFAULT_FIXTURE_NAME,
+             overwrite: bool = False,
+             progress_callback: Optional[Callable[[int, int], None]] = None,
+             **pipeline_options) -> Dict:
+    """
+    对当前场景执行完整的 IES 生成任务（需要在 Blender 中运行）
+    
+    参数:
+        config: 采样配置（None 时使用预览配置）
+        total_lumens: 目标总流明（None 时按场景中有效光源的功率计算）
+        output_path: IES 输出路径
+        fixture_name: 灯具名称
+        overwrite: 是否覆盖已存在的文件
+        progress_callback: 进度回调函数 callback(current, total)
+        pipeline_options: 传给 pipeline.run_generation_job 的其余参数
+            （denoise、sensor_denoise、measurement_profile、export_formats 等）
+    
+    返回:
+        dict: 任务结果（格式同 pipeline.run_generation_job 的返回值）
+    
+    异常:
+        ApiError: 没有指定输出路径
+        其余同 pipeline.run_generation_job
+    """
+    from .pipeline import run_generation_job
+    
+    if not output_path:
+        raise ApiError("没有指定 IES 输出路径")
+    
+    if config is None:
+        config = SamplingConfig.preview()
+    if total_lumens is None:
+        total_lumens = _get_scene_lumens()
+    
+    return run_generation_job(
+        config, total_lumens, output_path, fixture_name, overwrite, progress_callback,
+        **pipeline_options
+    )
+
+
+def measure(config: Optional[SamplingConfig] = None,
+            progress_callback: Optional[Callable[[int, int], None]] = None,
+            **sampler_options) -> SamplingResult:
+    """
+    对当前场景做球面采样，不校准也不写文件（需要在 Blender 中运行）
+    
+    参数:
+        config: 采样配置（None 时使用预览配置）
+        progress_callback: 进度回调函数 callback(current, total)
+        sampler_options: 传给 sampler.collect_spherical_data 的其余参数
+            （denoise、profile、lod、aggregation）
+    
+    返回:
+        SamplingResult: 原始采样结果，之后可用 export 校准导出
+    
+    异常:
+        ValueError: 采样配置无效
+        SceneValidationError: 场景验证失败
+        SamplingError: 采样失败
+    """
+    from .sampler import collect_spherical_data
+    from .scene_validator import calculate_photometric_center, validate_scene
+    
+    if config is None:
+        config = SamplingConfig.preview()
+    if not config.validate():
+        raise ValueError(f"采样配置无效：{config!r}")
+    
+    validation = validate_scene()
+    if not validation.is_valid:
+        raise SceneValidationError("场景验证失败", errors=validation.errors)
+    
+    return collect_spherical_data(
+        calculate_photometric_center(validation.light_objects),
+        config.angular_interval,
+        config.distance,
+        config.samples,
+        progress_callback,
+        **sampler_options
+    )
+
+
+def export(source: Union[SamplingResult, str],
+           total_lumens: float,
+           output_path: Optional[str] = None,
+           fixture_name: str = DEFAULT_FIXTURE_NAME,
+           overwrite: bool = False,
+           denoise: bool = False,
+           export_formats: Sequence[str] = DEFAULT_EXPORT_FORMATS) -> PhotometricData:
+    """
+    校准采样结果并导出 IES（不需要 Blender）
+    
+    参数:
+        source: 采样结果，或测量存档路径（.kma）
+        total_lumens: 目标总流明
+        output_path: IES 输出路径（可选，None 时只返回光度学数据）
+        fixture_name: 灯具名称
+        overwrite: 是否覆盖已存在的文件
+        denoise: 是否在校准前对亮度网格做球面降噪
+        export_formats: 导出格式（见 exporters.write_photometric_exports），
+            IES LM-63-2002 写入 output_path，其余格式写在旁边
+    
+    返回:
+        PhotometricData: 校准后的光度学数据
+    
+    异常:
+        ApiError: 采样结果缺少测量距离
+        ArchiveError / DenoisingError / CalibrationError / OutputError / ExportError: 读取、降噪、校准或写入失败
+    """
+    sampling_result = load_sampling_result(source) if isinstance(source, str) else source
+    
+    distance = sampling_result.render_settings.get('distance')
+    if distance is None:
+        raise ApiError("采样结果缺少测量距离（render_settings.distance）")
+    
+    if denoise:
+        sampling_result, _ = denoise_sampling_result(sampling_result)
+    
+    photometric_data = calibrate_to_candela(sampling_result, total_lumens, distance, fixture_name)
+    
+    if output_path is not None:
+        write_photometric_exports(photometric_data, output_path, export_formats, overwrite)
+    
+    return photometric_data
+
+
+def _get_scene_lumens() -> float:
+    """
+    按场景中有效光源的功率计算总流明
+    """
+    from .scene_validator import get_light_sources, get_total_lumens, validate_light_source
+    
+    return get_total_lumens([light for light in get_light_sources() if validate_light_source(light)])
+
+
+# ============================================================================
+# 任务服务器接口
+# ============================================================================
+
+class JobFuture:
+    """
+    已提交到任务服务器的任务
+    
+    可以同步等待（result）、在协程中等待（await future）或逐条读取进度事件（events / stream）。
+    
+    属性:
+        spool: 任务目录
+        job_id: 任务 ID
+    """
+    
+    def __init__(self, spool: SpoolDirectory, job_id: str):
+        self.spool = spool
+        self.job_id = job_id
+        self._event_offset = 0
+        self._response = None
+    
+    def done(self) -> bool:
+        """任务是否已完成（成功或失败）"""
+        return self._read_response() is not None
+    
+    def events(self) -> List[dict]:
+        """
+        读取上次调用之后新写入的进度事件（不阻塞）
+        
+        返回:
+            List[dict]: JSON Lines 事件（格式同 cli），任务尚未开始时为空列表
+        """
+        path = self.spool.path(SPOOL_EVENTS, self.job_id, '.jsonl')
+        if not os.path.exists(path):
+            return []
+        
+        events = []
+        with open(path, 'r', encoding='utf-8') as f:
+            f.seek(self._event_offset)
+            for line in iter(f.readline, ''):
+                # 服务器正在写的半行留到下次读取
+                if not line.endswith('\n'):
+                    break
+                events.append(json.loads(line))
+                self._event_offset = f.tell()
+        return events
+    
+    def result(self, timeout: Optional[float] = None,
+               poll_interval: float = DEFAULT_POLL_INTERVAL) -> JobResponse:
+        """
+        阻塞等待任务完成
+        
+        参数:
+            timeout: 超时（秒，None 表示一直等待）
+            poll_interval: 轮询间隔（秒）
+        
+        返回:
+            JobResponse: 成功的响应
+        
+        异常:
+            JobFailedError: 任务失败
+            JobServerError: 超时
+        """
+        response = self.spool.wait_for_response(self.job_id, timeout, poll_interval)
+        return self._check(response)
+    
+    async def result_async(self, timeout: Optional[float] = None,
+                           poll_interval: float = DEFAULT_POLL_INTERVAL) -> JobResponse:
+        """
+        在协程中等待任务完成（轮询期间让出事件循环）
+        
+        参数和异常同 result
+        """
+        async for _ in self.stream(timeout, poll_interval):
+            pass
+        return self._check(self._read_response())
+    
+    async def stream(self, timeout: Optional[float] = None,
+                     poll_interval: float = DEFAULT_POLL_INTERVAL) -> AsyncIterator[dict]:
+        """
+        逐条产出进度事件，任务完成后结束
+        
+        参数:
+            timeout: 超时（秒，None 表示一直等待）
+            poll_interval: 轮询间隔（秒）
+        
+        异常:
+            ApiError: 超时
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            finished = self._read_response() is not None
+            for event in self.events():
+                yield event
+            if finished:
+                return
+            if deadline is not None and time.monotonic() >= deadline:
+                raise ApiError(f"等待任务 {self.job_id} 超时（{timeout} 秒）")
+            await asyncio.sleep(poll_interval)
+    
+    def __await__(self):
+        return self.result_async().__await__()
+    
+    def _read_response(self) -> Optional[JobResponse]:
+        """读取并缓存响应"""
+        if self._response is None:
+            self._response = self.spool.read_response(self.job_id)
+        return self._response
+    
+    def _check(self, response: JobResponse) -> JobResponse:
+        """失败响应转换为异常"""
+        if response.status == JOB_STATUS_FAILED:
+            raise JobFailedError(response)
+        return response
+
+
+def submit(spool: Union[SpoolDirectory, str],
+           blend: Optional[str],
+           output_dir: str,
+           job_id: Optional[str] = None,
+           **options) -> JobFuture:
+    """
+    提交任务到任务服务器，立即返回
+    
+    参数:
+        spool: 任务目录或其路径（见 job_server）
+        blend: .blend 路径（None 表示服务器当前打开的文件）
+        output_dir: 输出目录
+        job_id: 任务 ID（可选，默认随机生成）
+        options: cli 参数（如 preset='production', lumens=1200, sensor_denoise=True）
+    
+    返回:
+        JobFuture
+    
+    异常:
+        JobSchemaError: 参数无效
+        JobServerError: 任务 ID 已存在
+    """
+    if not isinstance(spool, SpoolDirectory):
+        spool = SpoolDirectory(spool)
+    return JobFuture(spool, spool.submit(blend, output_dir, options, job_id))
+
+
+async def generate_async(spool: Union[SpoolDirectory, str],
+                         blend: Optional[str],
+                         output_dir: str,
+                         event_callback: Optional[Callable[[dict], None]] = None,
+                         timeout: Optional[float] = None,
+                         poll_interval: float = DEFAULT_POLL_INTERVAL,
+                         **options) -> JobResponse:
+    """
+    通过任务服务器生成 IES（async 版本的 generate）
+    
+    参数:
+        spool, blend, output_dir, options: 同 submit
+        event_callback: 进度事件回调 callback(event)（可选）
+        timeout: 超时（秒，None 表示一直等待）
+        poll_interval: 轮询间隔（秒）
+    
+    返回:
+        JobResponse: 成功的响应，outputs 为输出文件路径
+    
+    异常:
+        JobFailedError: 任务失败
+        ApiError: 超时
+    """
+    future = submit(spool, blend, output_dir, **options)
+    async for event in future.stream(timeout, poll_interval):
+        if event_callback is not None:
+            event_callback(event)
+    return await future.result_async()
+
+
+async def measure_async(spool: Union[SpoolDirectory, str],
+                        blend: Optional[str],
+                        output_dir: str,
+                        event_callback: Optional[Callable[[dict], None]] = None,
+                        timeout: Optional[float] = None,
+                        poll_interval: float = DEFAULT_POLL_INTERVAL,
+                        **options) -> SamplingResult:
+    """
+    通过任务服务器采样并读取测量存档（async 版本的 measure）
+    
+    参数同 generate_async（服务器仍会写出 IES，options 需能完成一次 single 模式任务）
+    
+    返回:
+        SamplingResult: 从任务输出的测量存档读取
+    
+    异常:
+        JobFailedError: 任务失败
+        ArchiveError: 输出中没有测量存档
+        ApiError: 超时
+    """
+    response = await generate_async(spool, blend, output_dir, event_callback, timeout, poll_interval, **options)
+    
+    archives = [path for path in response.outputs if path.endswith('.kma')]
+    if not archives:
+        raise ArchiveError(f"任务 {response.job_id} 的输出中没有测量存档：{response.outputs}")
+    
+    return await asyncio.to_thread(load_sampling_result, archives[0], False)
+
+
+async def export_async(source: Union[SamplingResult, str],
+                       total_lumens: float,
+                       output_path: Optional[str] = None,
+                       fixture_name: str = DEFAULT_FIXTURE_NAME,
+                       overwrite: bool = False,
+                       denoise: bool = False,
+                       export_formats: Sequence[str] = DEFAULT_EXPORT_FORMATS) -> PhotometricData:
+    """
+    在线程中校准导出（async 版本的 export，不阻塞事件循环）
+    
+    参数、返回和异常同 export
+    """
+    return await asyncio.to_thread(
+        export, source, total_lumens, output_path, fixture_name, overwrite, denoise, export_formats
+    )
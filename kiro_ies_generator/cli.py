@@ -0,0 +1,382 @@
+"""
+命令行入口模块 (CLI)
+
+在后台 Blender 中无界面运行完整的生成流程，用于渲染农场和批处理。
+
+用法（Blender 参数之后用 -- 分隔本模块的参数）：
+    blender -b --python-expr "import sys; from kiro_ies_generator import cli; sys.exit(cli.main())" -- \\
+        a.blend b.blend --output-dir out --preset production --lumens 1200 --formats IES2002 LDT
+    
+    # 不列出 .blend 时测量 Blender 已打开的文件
+    blender -b fixture.blend --python-expr "..." -- --output-dir out
+
+一次调用可处理多个 .blend，分摊 Blender 启动开销；每个 .blend 依次打开并运行：
+- single: 整个场景作为一个灯具（run_generation_job），输出 <输出目录>/<文件名>.ies
+- fixtures: 每个标记的灯具集合（run_fixture_batch_job），输出到 <输出目录>/<文件名>/
+- frames: 逐帧测量（run_frame_batch_job），输出 <输出目录>/<文件名>_f<帧号>.ies
+
+进度以 JSON Lines 输出（每行一个事件对象，默认写到标准输出，可用 --events 写入文件）：
+    {"event": "start", "jobs": 2, "config": {...}}
+    {"event": "job_start", "job": 0, "blend": "a.blend", "mode": "single"}
+    {"event": "progress", "job": 0, "current": 10, "total": 684}
+    {"event": "job_done", "job": 0, "outputs": [...]}
+    {"event": "job_failed", "job": 1, "error": "..."}
+    {"event": "finish", "succeeded": 1, "failed": 1}
+
+本模块的参数解析和事件输出不依赖 bpy，可单独测试；流程模块在运行时才导入。
+"""
+
+from typing import Callable, List, Optional, TextIO
+from dataclasses import asdict, dataclass
+import argparse
+import json
+import os
+import sys
+import time
+
+from .data_structures import SamplingConfig
+from .exporters import DEFAULT_EXPORT_FORMATS, EXPORT_FILE_SUFFIXES
+
+
+# ============================================================================
+# 常量定义
+# ============================================================================
+
+# 采样预设（与界面的预览/生产模式一致）
+SAMPLING_PRESETS = {
+    'preview': SamplingConfig.preview,
+    'production': SamplingConfig.production,
+}
+
+# 运行模式
+CLI_MODE_SINGLE = 'single'
+CLI_MODE_FIXTURES = 'fixtures'
+CLI_MODE_FRAMES = 'frames'
+CLI_MODES = (CLI_MODE_SINGLE, CLI_MODE_FIXTURES, CLI_MODE_FRAMES)
+
+
+class CliError(Exception):
+    """命令行参数错误"""
+    pass
+
+
+@dataclass
+class CliJob:
+    """
+    命令行任务（一个 .blend 文件）
+    
+    属性:
+        index: 任务序号
+        blend_path: .blend 路径（None 表示 Blender 已打开的文件）
+        output_path: single/frames 模式为 IES 路径，fixtures 模式为输出目录
+    """
+    
+    index: int
+    blend_path: Optional[str]
+    output_path: str
+
+
+class JsonEventWriter:
+    """
+    JSON Lines 事件输出
+    
+    每个事件一行 JSON 对象，写入后立即刷新，供调度程序逐行解析。
+    """
+    
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+    
+    def emit(self, event: str, **fields):
+        """
+        输出一个事件
+        
+        参数:
+            event: 事件名称
+            fields: 事件字段（需可 JSON 序列化）
+        """
+        self.stream.write(json.dumps({'event': event, **fields}, ensure_ascii=False) + "\n")
+        self.stream.flush()
+    
+    def progress_callback(self, job: int) -> Callable[[int, int], None]:
+        """
+        创建任务的进度回调（签名同流程模块的 progress_callback）
+        
+        参数:
+            job: 任务序号
+        
+        返回:
+            callback(current, total)
+        """
+        def callback(current: int, total: int):
+            self.emit('progress', job=job, current=current, total=total)
+        return callback
+
+
+def split_blender_argv(argv: List[str]) -> List[str]:
+    """
+    取出 Blender 命令行中 -- 之后的参数
+    
+    参数:
+        argv: 完整的命令行参数（如 sys.argv）
+    
+    返回:
+        List[str]: -- 之后的参数，没有 -- 时为空列表
+    """
+    if '--' not in argv:
+        return []
+    return argv[argv.index('--') + 1:]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    创建命令行参数解析器
+    """
+    parser = argparse.ArgumentParser(
+        prog="kiro_ies_generator.cli",
+        description="在后台 Blender 中从 .blend 生成 IES 文件"
+    )
+    parser.add_argument('blend_files', nargs='*', help=".blend 文件（省略时使用 Blender 已打开的文件）")
+    parser.add_argument('--output-dir', required=True, help="输出目录")
+    parser.add_argument('--mode', choices=CLI_MODES, default=CLI_MODE_SINGLE, help="运行模式")
+    parser.add_argument('--preset', choices=list(SAMPLING_PRESETS), default='preview', help="采样预设")
+    parser.add_argument('--interval', type=float, help="角度间隔（度），覆盖预设")
+    parser.add_argument('--distance', type=float, help="测量距离（米），覆盖预设")
+    parser.add_argument('--samples', type=int, help="Cycles 采样数，覆盖预设")
+    parser.add_argument('--lumens', type=float,
+                        help="目标总流明（省略时按光源功率计算；fixtures 模式使用集合属性或光源功率）")
+    parser.add_argument('--fixture-name', help="灯具名称（single/frames 模式，省略时使用文件名）")
+    parser.add_argument('--profile', default='standard', help="测量配置（见 measurement_profiles）")
+    parser.add_argument('--frames', type=int, nargs='+', metavar='FRAME',
+                        help="frames 模式的帧范围：起始帧 结束帧 [步长]")
+    parser.add_argument('--sensor-denoise', action='store_true', help="传感器渲染启用 OpenImageDenoise")
+    parser.add_argument('--denoise', action='store_true', help="校准前对亮度网格做球面降噪")
+    parser.add_argument('--formats', nargs='+', choices=list(EXPORT_FILE_SUFFIXES),
+                        default=list(DEFAULT_EXPORT_FORMATS),
+                        help="导出格式（IES LM-63-2002 始终输出，其余格式写在旁边）")
+    parser.add_argument('--overwrite', action='store_true', help="覆盖已存在的文件")
+    parser.add_argument('--stop-on-error', action='store_true', help="某个任务失败时中止")
+    parser.add_argument('--events', help="事件输出文件（默认标准输出）")
+    return parser
+
+
+def parse_arguments(argv: List[str]) -> argparse.Namespace:
+    """
+    解析并校验命令行参数
+    
+    参数:
+        argv: -- 之后的参数（见 split_blender_argv）
+    
+    返回:
+        argparse.Namespace
+    
+    异常:
+        CliError: 参数组合无效或采样配置超出范围
+    """
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        raise CliError(f"命令行参数无效：{' '.join(argv)}") from e
+    
+    if args.mode == CLI_MODE_FRAMES:
+        if args.frames is None or len(args.frames) not in (2, 3):
+            raise CliError("frames 模式需要 --frames 起始帧 结束帧 [步长]")
+    elif args.frames is not None:
+        raise CliError("--frames 只能用于 frames 模式")
+    
+    if args.mode == CLI_MODE_FIXTURES and args.fixture_name:
+        raise CliError("fixtures 模式的灯具名称取自集合，不能使用 --fixture-name")
+    
+    config = build_sampling_config(args)
+    if not config.validate():
+        raise CliError(f"采样配置超出范围：{config!r}")
+    
+    return args
+
+
+def build_sampling_config(args: argparse.Namespace) -> SamplingConfig:
+    """
+    由预设和覆盖参数建立采样配置
+    
+    参数:
+        args: parse_arguments 的返回值
+    
+    返回:
+        SamplingConfig
+    """
+    config = SAMPLING_PRESETS[args.preset]()
+    if args.interval is not None:
+        config.angular_interval = args.interval
+    if args.distance is not None:
+        config.distance = args.distance
+    if args.samples is not None:
+        config.samples = args.samples
+    return config
+
+
+def plan_jobs(args: argparse.Namespace) -> List[CliJob]:
+    """
+    为每个 .blend 分配输出路径
+    
+    参数:
+        args: parse_arguments 的返回值
+    
+    返回:
+        List[CliJob]: 没有列出 .blend 时只有一个任务（blend_path 为 None，
+            输出文件名取 --fixture-name，没有时为 'fixture'）
+    
+    异常:
+        CliError: 多个 .blend 的文件名相同（输出会互相覆盖）
+    """
+    blend_files = args.blend_files or [None]
+    jobs = []
+    used = set()
+    for index, blend_path in enumerate(blend_files):
+        if blend_path is None:
+            stem = args.fixture_name or 'fixture'
+        else:
+            stem = os.path.splitext(os.path.basename(blend_path))[0]
+        if stem in used:
+            raise CliError(f"多个 .blend 的文件名相同：{stem}")
+        used.add(stem)
+        
+        if args.mode == CLI_MODE_FIXTURES:
+            output_path = os.path.join(args.output_dir, stem)
+        else:
+            output_path = os.path.join(args.output_dir, f"{stem}.ies")
+        jobs.append(CliJob(index=index, blend_path=blend_path, output_path=output_path))
+    return jobs
+
+
+def run_jobs(args: argparse.Namespace, writer: JsonEventWriter) -> int:
+    """
+    依次打开每个 .blend 并运行流程（需要在 Blender 中运行）
+    
+    参数:
+        args: parse_arguments 的返回值
+        writer: 事件输出
+    
+    返回:
+        int: 失败的任务数
+    """
+    import bpy
+    
+    jobs = plan_jobs(args)
+    writer.emit('start', jobs=len(jobs), config=asdict(build_sampling_config(args)))
+    
+    succeeded = 0
+    failed = 0
+    for job in jobs:
+        start_time = time.time()
+        writer.emit('job_start', job=job.index, blend=job.blend_path, mode=args.mode)
+        try:
+            if job.blend_path is not None:
+                bpy.ops.wm.open_mainfile(filepath=os.path.abspath(job.blend_path))
+            
+            outputs = run_pipeline_job(args, job, writer.progress_callback(job.index))
+            
+            succeeded += 1
+            writer.emit('job_done', job=job.index, outputs=outputs, elapsed_time=time.time() - start_time)
+        
+        except Exception as e:
+            failed += 1
+            writer.emit('job_failed', job=job.index, error=str(e), elapsed_time=time.time() - start_time)
+            if args.stop_on_error:
+                break
+    
+    writer.emit('finish', succeeded=succeeded, failed=failed)
+    return failed
+
+
+def run_pipeline_job(args: argparse.Namespace,
+                     job: CliJob,
+                     progress_callback: Optional[Callable[[int, int], None]] = None) -> List[str]:
+    """
+    在已打开的 .blend 上运行一个任务（需要在 Blender 中运行）
+    
+    参数:
+        args: parse_arguments 的返回值
+        job: plan_jobs 规划的任务
+        progress_callback: 进度回调 callback(current, total)
+    
+    返回:
+        List[str]: 输出文件路径
+    
+    异常:
+        流程模块的各类异常；fixtures 模式有灯具失败时抛出 RuntimeError
+    """
+    from .pipeline import run_fixture_batch_job, run_frame_batch_job, run_generation_job
+    from .scene_validator import get_light_sources, get_total_lumens, validate_light_source
+    
+    config = build_sampling_config(args)
+    fixture_name = args.fixture_name or os.path.splitext(os.path.basename(job.output_path))[0]
+    
+    if args.mode == CLI_MODE_FIXTURES:
+        report = run_fixture_batch_job(
+            config, job.output_path, args.overwrite, progress_callback,
+            stop_on_error=args.stop_on_error,
+            denoise=args.denoise,
+            sensor_denoise=args.sensor_denoise,
+            measurement_profile=args.profile,
+            export_formats=args.formats
+        )
+        if report.failed:
+            raise RuntimeError(f"灯具测量失败：{report.failed}")
+        return [result.ies_path for result in report.fixtures]
+    
+    if args.mode == CLI_MODE_FRAMES:
+        report = run_frame_batch_job(
+            config, job.output_path, *args.frames,
+            total_lumens=args.lumens,
+            fixture_name=fixture_name,
+            overwrite=args.overwrite,
+            progress_callback=progress_callback,
+            denoise=args.denoise,
+            sensor_denoise=args.sensor_denoise,
+            measurement_profile=args.profile,
+            export_formats=args.formats
+        )
+        return [result.ies_path for result in report.frames]
+    
+    total_lumens = args.lumens
+    if total_lumens is None:
+        total_lumens = get_total_lumens(
+            [light for light in get_light_sources() if validate_light_source(light)]
+        )
+    result = run_generation_job(
+        config, total_lumens, job.output_path, fixture_name, args.overwrite, progress_callback,
+        denoise=args.denoise,
+        sensor_denoise=args.sensor_denoise,
+        measurement_profile=args.profile,
+        export_formats=args.formats
+    )
+    return list(result['export_paths'].values()) + [result['metadata_path'], result['archive_path']]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    命令行入口
+    
+    参数:
+        argv: 本模块的参数（None 时取 sys.argv 中 -- 之后的部分）
+    
+    返回:
+        int: 退出码，0 表示全部成功，1 表示有任务失败，2 表示参数错误
+    """
+    if argv is None:
+        argv = split_blender_argv(sys.argv)
+    
+    try:
+        args = parse_arguments(argv)
+        plan_jobs(args)
+    except CliError as e:
+        JsonEventWriter(sys.stdout).emit('error', error=str(e))
+        return 2
+    
+    if args.events:
+        with open(args.events, 'w', encoding='utf-8') as stream:
+            failed = run_jobs(args, JsonEventWriter(stream))
+    else:
+        failed = run_jobs(args, JsonEventWriter(sys.stdout))
+    
+    return 1 if failed else 0
@@ -4,8 +4,8 @@
 定义插件使用的核心数据类和错误类。
 """
 
-from dataclasses import dataclass
-from typing import List, Tuple
+from dataclasses import dataclass, field
+from typing import List, Tuple, Dict, Optional
 import numpy as np
 
 
@@ -369,6 +369,8 @@ class SamplingResult:
         light_position: 光源位置 (x, y, z)，世界坐标系
         total_samples: 总采样点数
         elapsed_time: 耗时（秒）
+        variance: 每个方向测量值的方差 (N_theta, N_phi)（可选）
+        render_settings: 采样时的渲染设置（角度间隔、距离、采样数等）
     
     使用示例:
         result = SamplingResult(
@@ -388,6 +390,8 @@ class SamplingResult:
     light_position: Tuple[float, float, float]
     total_samples: int
     elapsed_time: float              # 耗时（秒）
+    variance: Optional[np.ndarray] = None  # 测量方差 (N_theta, N_phi)
+    render_settings: Dict = field(default_factory=dict)  # 渲染设置
     
     def to_dict(self) -> dict:
         """
@@ -401,7 +405,9 @@ class SamplingResult:
                     'luminance_data': np.ndarray,
                     'light_position': tuple,
                     'total_samples': int,
-                    'elapsed_time': float
+                    'elapsed_time': float,
+                    'variance': np.ndarray 或 None,
+                    'render_settings': dict
                 }
         """
         return {
@@ -410,7 +416,9 @@ class SamplingResult:
             'luminance_data': self.luminance_data,
             'light_position': self.light_position,
             'total_samples': self.total_samples,
-            'elapsed_time': self.elapsed_time
+            'elapsed_time': self.elapsed_time,
+            'variance': self.variance,
+            'render_settings': dict(self.render_settings)
         }
     
     def get_data_shape(self) -> Tuple[int, int]:
@@ -575,6 +583,8 @@ class PhotometricData:
         lumens: 总光通量（流明）
         distance: 测量距离（米）
         fixture_name: 灯具名称
+        keywords: IES 关键字（如 {'MANUFAC': 'Kiro'}），导入 IES 文件时填充
+        tilt: TILT 数据（None 表示 TILT=NONE），导入 IES 文件时填充
     
     使用示例:
         data = PhotometricData(
@@ -594,20 +604,19 @@ class PhotometricData:
     lumens: float                    # 总光通量（流明）
     distance: float                  # 测量距离（米）
     fixture_name: str                # 灯具名称
+    keywords: Dict[str, str] = field(default_factory=dict)  # IES 关键字
+    tilt: Optional[Dict] = None      # TILT 数据
     
     def to_ies(self) -> str:
         """
         转换为 IES 文件格式
         
         返回:
-            str: IES 文件内容字符串
-        
-        注意:
-            此方法将在 IES 生成器模块实现后完成
-            当前抛出 NotImplementedError
+            str: IES 文件内容字符串（IESNA LM-63-2002）
         """
-        # TODO: 在后续任务中实现
-        raise NotImplementedError("IES 生成功能将在后续任务中实现")
+        # 延迟导入，避免与 ies_generator 循环依赖
+        from .ies_generator import generate_ies_file
+        return generate_ies_file(self)
     
     def get_data_shape(self) -> Tuple[int, int]:
         """
@@ -685,16 +694,20 @@ class PhotometricData:
                     'mean': float,
                     'std': float,
                     'median': float,
-                    'total_flux_estimate': float  # 估算的总光通量
+                    'total_flux_estimate': float  # 立体角加权积分得到的总光通量
                 }
         """
+        # 延迟导入，保持数据结构模块的导入开销最小
+        from .photometry import integrate_flux
         return {
             'min': float(np.min(self.candela_values)),
             'max': float(np.max(self.candela_values)),
             'mean': float(np.mean(self.candela_values)),
             'std': float(np.std(self.candela_values)),
             'median': float(np.median(self.candela_values)),
-            'total_flux_estimate': float(np.sum(self.candela_values))
+            'total_flux_estimate': integrate_flux(
+                self.vertical_angles, self.horizontal_angles, self.candela_values
+            )
         }
     
     def to_dict(self) -> dict:
@@ -710,7 +723,9 @@ class PhotometricData:
             'candela_values': self.candela_values,
             'lumens': self.lumens,
             'distance': self.distance,
-            'fixture_name': self.fixture_name
+            'fixture_name': self.fixture_name,
+            'keywords': dict(self.keywords),
+            'tilt': self.tilt
         }
     
     def __str__(self) -> str:
@@ -0,0 +1,367 @@
+"""
+球面降噪模块 (Denoising)
+
+对采样得到的亮度网格做保边平滑，使任务可以用更低的 Cycles 采样数运行。
+在采样之后、calibrate_to_candela 之前调用。
+
+方法：
+- 球面双边滤波：空间权重按两个方向之间的大圆距离计算（高斯核，3σ 截断），
+  值域权重按亮度差计算，亮度突变（如截光边缘）两侧不会互相模糊
+- 水平方向首尾环绕；对称数据先展开到完整圆周再滤波，结果仍保持对称
+- 极点拓扑：邻域按三维方向之间的大圆距离确定，极点附近的邻域自然包含
+  对侧 C-Plane（φ + 180°）；滤波后极点行取各平面的平均值，使极点为单值
+- 滤波后整体缩放，使立体角加权的总光通量与滤波前相同
+- 全部为 NumPy 向量化运算：邻域限制在核的截断半径内，
+  每个行偏移内所有 (方向, 列偏移) 组合分批一次性计算
+"""
+
+from typing import Optional, Tuple
+from dataclasses import dataclass, replace
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .data_structures import SamplingResult
+from .photometry import ANGLE_TOLERANCE, integrate_flux
+from .resampling import ResamplingError, expand_horizontal_symmetry
+
+
+# ============================================================================
+# 常量定义
+# ============================================================================
+
+# 默认空间标准差（度）
+DEFAULT_SPATIAL_SIGMA = 5.0
+
+# 默认值域标准差（相对于当前方向亮度的比例）
+DEFAULT_RANGE_SIGMA = 0.1
+
+# 有方差数据时，值域标准差 = 系数 × 测量标准差
+VARIANCE_RANGE_SCALE = 2.0
+
+# 空间核截断半径（σ 的倍数）
+KERNEL_CUTOFF = 3.0
+
+# 每批计算的邻居权重个数上限（控制临时数组的内存）
+KERNEL_BATCH_SIZE = 1 << 16
+
+# 相对变化超过此比例的方向计为"已修改"
+CHANGE_THRESHOLD = 0.01
+
+
+class DenoisingError(Exception):
+    """降噪错误"""
+    pass
+
+
+@dataclass
+class DenoiseReport:
+    """
+    降噪报告
+    
+    属性:
+        spatial_sigma: 空间标准差（度）
+        range_sigma: 值域标准差（相对比例；使用方差数据时为 None）
+        flux_correction: 为保持总光通量施加的缩放系数
+        mean_relative_change: 立体角加权的平均相对变化 Σw|Δ| / Σw|L|
+        max_relative_change: 最大变化相对于最大亮度的比例
+        changed_fraction: 相对变化超过 CHANGE_THRESHOLD 的方向比例
+    """
+    
+    spatial_sigma: float
+    range_sigma: Optional[float]
+    flux_correction: float
+    mean_relative_change: float
+    max_relative_change: float
+    changed_fraction: float
+    
+    def to_dict(self) -> dict:
+        """
+        转换为字典格式（可写入元数据 JSON）
+        
+        返回:
+            dict: 所有报告字段
+        """
+        return {
+            'spatial_sigma': self.spatial_sigma,
+            'range_sigma': self.range_sigma,
+            'flux_correction': self.flux_correction,
+            'mean_relative_change': self.mean_relative_change,
+            'max_relative_change': self.max_relative_change,
+            'changed_fraction': self.changed_fraction
+        }
+    
+    def __str__(self) -> str:
+        """
+        格式化报告为可读字符串
+        
+        返回:
+            str: 格式化的报告信息
+        """
+        return (f"DenoiseReport(\n"
+                f"  空间标准差: {self.spatial_sigma}°\n"
+                f"  平均相对变化: {self.mean_relative_change:.2%}\n"
+                f"  最大相对变化: {self.max_relative_change:.2%}\n"
+                f"  修改方向比例: {self.changed_fraction:.1%}\n"
+                f"  光通量校正: {self.flux_correction:.4f}\n"
+                f")")
+
+
+# ============================================================================
+# 主接口
+# ============================================================================
+
+def denoise_sampling_result(sampling_result: SamplingResult,
+                            spatial_sigma: float = DEFAULT_SPATIAL_SIGMA,
+                            range_sigma: Optional[float] = DEFAULT_RANGE_SIGMA) -> Tuple[SamplingResult, DenoiseReport]:
+    """
+    对采样结果的亮度网格降噪
+    
+    参数:
+        sampling_result: 采样结果（未校准）
+        spatial_sigma: 空间标准差（度）
+        range_sigma: 值域标准差（相对于当前方向亮度的比例）；
+            采样结果带有方差数据时改用 VARIANCE_RANGE_SCALE × 测量标准差；
+            None 表示不使用值域权重（普通高斯平滑）
+    
+    返回:
+        (denoised, report)
+            - denoised: 亮度网格已降噪的新 SamplingResult（其余字段不变）
+            - report: 降噪报告
+    
+    异常:
+        DenoisingError: 参数无效或亮度网格无法滤波
+    """
+    luminance = np.asarray(sampling_result.luminance_data, dtype=float)
+    vertical_angles = np.asarray(sampling_result.vertical_angles, dtype=float)
+    horizontal_angles = np.asarray(sampling_result.horizontal_angles, dtype=float)
+    
+    range_scale = None
+    used_range_sigma = range_sigma
+    if sampling_result.variance is not None:
+        range_scale = VARIANCE_RANGE_SCALE * np.sqrt(np.clip(sampling_result.variance, 0.0, None))
+        used_range_sigma = None
+    elif range_sigma is not None:
+        if range_sigma <= 0:
+            raise DenoisingError(f"值域标准差必须大于 0：{range_sigma}")
+        range_scale = range_sigma * np.abs(luminance)
+    
+    filtered = filter_spherical_grid(luminance, vertical_angles, horizontal_angles,
+                                     spatial_sigma, range_scale)
+    
+    # 保持立体角加权的总光通量
+    try:
+        flux_before = integrate_flux(vertical_angles, horizontal_angles, luminance)
+        flux_after = integrate_flux(vertical_angles, horizontal_angles, filtered)
+    except ValueError as e:
+        raise DenoisingError(f"无法计算立体角权重：{str(e)}")
+    
+    flux_correction = flux_before / flux_after if flux_after > 0 else 1.0
+    filtered *= flux_correction
+    
+    report = _build_report(luminance, filtered, vertical_angles, horizontal_angles,
+                           spatial_sigma, used_range_sigma, flux_correction)
+    
+    return replace(sampling_result, luminance_data=filtered), report
+
+
+def filter_spherical_grid(values: np.ndarray,
+                          vertical_angles: np.ndarray,
+                          horizontal_angles: np.ndarray,
+                          spatial_sigma: float,
+                          range_scale: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    球面双边滤波
+    
+    参数:
+        values: 网格数据 (N_theta, N_phi)
+        vertical_angles: 垂直角度（度），严格递增
+        horizontal_angles: 水平角度（度），可为对称子集
+        spatial_sigma: 空间标准差（度）
+        range_scale: 每个方向的值域标准差 (N_theta, N_phi)（可选，None 时为高斯平滑）
+    
+    返回:
+        np.ndarray: 滤波后的网格（不做光通量校正）
+    
+    异常:
+        DenoisingError: 参数无效
+    """
+    if spatial_sigma <= 0:
+        raise DenoisingError(f"空间标准差必须大于 0：{spatial_sigma}")
+    if len(vertical_angles) < 2 or np.any(np.diff(vertical_angles) <= 0):
+        raise DenoisingError("垂直角度至少需要 2 个，且必须严格递增")
+    
+    # 对称数据展开到完整圆周（去掉闭合的 360° 平面）
+    try:
+        full_angles, full_values = expand_horizontal_symmetry(horizontal_angles, values)
+    except ResamplingError as e:
+        raise DenoisingError(str(e))
+    full_angles, full_values = full_angles[:-1], full_values[:, :-1]
+    
+    full_scale = None
+    if range_scale is not None:
+        _, full_scale = expand_horizontal_symmetry(horizontal_angles, range_scale)
+        full_scale = full_scale[:, :-1]
+    
+    filtered = _bilateral_filter(full_values, vertical_angles, full_angles, spatial_sigma, full_scale)
+    
+    # 取回原始水平角度对应的列
+    columns = np.searchsorted(full_angles, np.mod(horizontal_angles, 360.0) - ANGLE_TOLERANCE)
+    return filtered[:, np.clip(columns, 0, len(full_angles) - 1)]
+
+
+# ============================================================================
+# 辅助函数
+# ============================================================================
+
+def _bilateral_filter(values: np.ndarray,
+                      vertical_angles: np.ndarray,
+                      horizontal_angles: np.ndarray,
+                      spatial_sigma: float,
+                      range_scale: Optional[np.ndarray]) -> np.ndarray:
+    """
+    完整圆周网格上的双边滤波
+    
+    对每个行偏移 di，先按截断半径筛出可能有邻居落入核内的 (行, 列偏移) 组合，
+    再把这些组合分批一次性计算邻居索引、大圆距离和权重。
+    """
+    num_rows, num_planes = values.shape
+    theta = np.radians(vertical_angles)
+    phi = np.radians(horizontal_angles)
+    sigma = np.radians(spatial_sigma)
+    cutoff = KERNEL_CUTOFF * sigma
+    
+    sin_theta = np.sin(theta)
+    cos_theta = np.cos(theta)
+    
+    north_pole = abs(vertical_angles[0]) < ANGLE_TOLERANCE
+    south_pole = abs(vertical_angles[-1] - 180.0) < ANGLE_TOLERANCE
+    
+    # 行偏移覆盖截断半径；列偏移覆盖整个圆周，
+    # 因此越过极点的邻居（对侧平面）也在枚举范围内，由大圆距离决定权重
+    row_radius = int(np.ceil(cutoff / float(np.min(np.diff(theta)))))
+    plane_offsets = np.arange(-(num_planes // 2), num_planes - num_planes // 2)
+    
+    # 每个列偏移的方位角余弦，形状 (N_offsets, N_phi)
+    planes = np.arange(num_planes)
+    offset_columns = np.mod(plane_offsets, num_planes)
+    azimuth_differences = phi[np.mod(planes[None, :] + plane_offsets[:, None], num_planes)] - phi[None, :]
+    azimuth_cosines = np.cos(azimuth_differences)
+    if np.allclose(azimuth_cosines, azimuth_cosines[:, :1]):
+        # 等间距平面：同一列偏移的方位角差处处相同，空间权重只需按 (行, 列偏移) 计算一次
+        azimuth_cosines = azimuth_cosines[:, :1]
+    
+    # 每个列偏移的最小方位角差（弧度），用于跳过不可能落入截断半径的组合：
+    # 大圆距离满足 sin(d/2) ≥ √(sinθ sinθ') sin(|Δφ|/2)
+    azimuth_gaps = np.min(np.abs(np.mod(azimuth_differences + np.pi, 2 * np.pi) - np.pi), axis=1)
+    gap_sines = np.sin(azimuth_gaps / 2)
+    
+    # 首尾拼接后的滑动窗口：windows[行, 列偏移 mod N] 即整行平移后的邻居值（视图，不复制）
+    windows = sliding_window_view(np.concatenate([values, values], axis=1), num_planes, axis=1)
+    
+    # 值域权重 exp(-0.5 (Δ/s)²) 写成 exp(-(Δ · √0.5/s)²)，与空间权重合并为一次 exp
+    if range_scale is not None:
+        zero_scale = range_scale <= 0
+        inverse_scale = np.sqrt(0.5) / np.where(zero_scale, 1.0, range_scale)
+    
+    pairs_per_batch = max(1, KERNEL_BATCH_SIZE // num_planes)
+    
+    weight_sum = np.zeros_like(values)
+    value_sum = np.zeros_like(values)
+    rows = np.arange(num_rows)
+    
+    for di in range(-row_radius, row_radius + 1):
+        neighbor_rows = rows + di
+        valid_rows = (neighbor_rows >= 0) & (neighbor_rows < num_rows)
+        if not valid_rows.any():
+            continue
+        neighbor_rows = np.clip(neighbor_rows, 0, num_rows - 1)
+        ring_scale = np.sqrt(np.clip(sin_theta * sin_theta[neighbor_rows], 0.0, None))
+        
+        # 组合按行排序（np.nonzero 按行优先返回）
+        active = valid_rows[:, None] & (ring_scale[:, None] * gap_sines[None, :] <= np.sin(cutoff / 2) + 1e-9)
+        active_rows, active_offsets = np.nonzero(active)
+        
+        for start in range(0, len(active_rows), pairs_per_batch):
+            pair_rows = active_rows[start:start + pairs_per_batch]
+            pair_offsets = active_offsets[start:start + pairs_per_batch]
+            pair_neighbors = neighbor_rows[pair_rows]
+            
+            # 球面余弦定理：cos d = cosθ cosθ' + sinθ sinθ' cos(Δφ)
+            cosine = (cos_theta[pair_rows] * cos_theta[pair_neighbors])[:, None] + \
+                (sin_theta[pair_rows] * sin_theta[pair_neighbors])[:, None] * azimuth_cosines[pair_offsets]
+            distance = np.arccos(np.clip(cosine, -1.0, 1.0))
+            within = distance <= cutoff + 1e-9
+            
+            # 去掉所有邻居都在截断半径外的组合
+            inside = np.any(within, axis=1)
+            if not inside.any():
+                continue
+            pair_rows, pair_neighbors = pair_rows[inside], pair_neighbors[inside]
+            log_weights = np.where(within[inside], -0.5 * (distance[inside] / sigma) ** 2, -np.inf)
+            
+            neighbor_values = windows[pair_neighbors, offset_columns[pair_offsets[inside]]]
+            if range_scale is None:
+                weights = np.exp(log_weights)
+            else:
+                weights = neighbor_values - values[pair_rows]
+                weights *= inverse_scale[pair_rows]
+                np.square(weights, out=weights)
+                np.subtract(log_weights, weights, out=weights)
+                np.exp(weights, out=weights)
+                # 值域标准差为 0 的方向只接受完全相同的邻居
+                pair_zero_scale = zero_scale[pair_rows]
+                if pair_zero_scale.any():
+                    exact = neighbor_values == values[pair_rows]
+                    weights[pair_zero_scale & ~exact] = 0.0
+            
+            # 同一行的组合相邻，按行分段求和（连续切片求和比 np.add.reduceat 快得多）
+            neighbor_values *= weights
+            boundaries = np.flatnonzero(pair_rows[1:] != pair_rows[:-1]) + 1
+            for segment_start, segment_end in zip(np.r_[0, boundaries], np.r_[boundaries, len(pair_rows)]):
+                row = pair_rows[segment_start]
+                weight_sum[row] += weights[segment_start:segment_end].sum(axis=0)
+                value_sum[row] += neighbor_values[segment_start:segment_end].sum(axis=0)
+    
+    # 中心点自身权重为 1，weight_sum 不会为 0
+    filtered = value_sum / weight_sum
+    
+    # 极点在所有平面上是同一方向
+    for row, is_pole in ((0, north_pole), (num_rows - 1, south_pole)):
+        if is_pole:
+            filtered[row, :] = filtered[row, :].mean()
+    
+    return filtered
+
+
+def _build_report(before: np.ndarray,
+                  after: np.ndarray,
+                  vertical_angles: np.ndarray,
+                  horizontal_angles: np.ndarray,
+                  spatial_sigma: float,
+                  range_sigma: Optional[float],
+                  flux_correction: float) -> DenoiseReport:
+    """
+    统计降噪前后的变化
+    """
+    change = np.abs(after - before)
+    magnitude = np.abs(before)
+    
+    weighted_magnitude = integrate_flux(vertical_angles, horizontal_angles, magnitude)
+    mean_relative_change = (integrate_flux(vertical_angles, horizontal_angles, change) / weighted_magnitude
+                            if weighted_magnitude > 0 else 0.0)
+    
+    peak = magnitude.max()
+    max_relative_change = float(change.max() / peak) if peak > 0 else 0.0
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        relative = np.where(magnitude > 0, change / magnitude, change > 0)
+    changed_fraction = float(np.mean(relative > CHANGE_THRESHOLD))
+    
+    return DenoiseReport(
+        spatial_sigma=float(spatial_sigma),
+        range_sigma=range_sigma,
+        flux_correction=float(flux_correction),
+        mean_relative_change=float(mean_relative_change),
+        max_relative_change=max_relative_change,
+        changed_fraction=changed_fraction
+    )
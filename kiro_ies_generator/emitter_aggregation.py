@@ -0,0 +1,395 @@
+"""
+发光体聚合模块 (Emitter Aggregation)
+
+将线形灯、面板灯中成百上千个小光源聚合为少量等光通量的代理光源，
+用于远场测量，不依赖 bpy，可单独测试。
+
+聚合规则：
+- 面光源：法线方向相近（normal_tolerance）且共面（plane_tolerance）的光源，
+  在平面内按 cluster_size 网格分组，每组替换为一个矩形面光源
+- 点光源：按三维 cluster_size 网格分组，每组替换为一个点光源
+- 代理光源的功率为组内功率之和（光通量相等），颜色为功率加权平均
+  （亮度对颜色线性，聚合前后的亮度光通量完全相同），位置为功率加权中心
+
+误差验证：
+- 面光源为朗伯发光 I = P/π × max(cos γ, 0)，点光源为各向同性 I = P/(4π)
+- 在测量距离上按平方反比叠加各光源的贡献，比较聚合前后的等效光强分布
+- 误差超过 max_error 时不聚合（聚合报告中 applied=False）
+"""
+
+from typing import List, Optional, Sequence, Tuple
+from dataclasses import dataclass, field
+import math
+import numpy as np
+
+from .photometry import integrate_flux
+from .sensor_geometry import LUMINANCE_WEIGHTS
+
+
+# ============================================================================
+# 常量定义
+# ============================================================================
+
+# 光源类型
+EMITTER_POINT = 'POINT'
+EMITTER_AREA = 'AREA'
+
+# 误差验证的角度间隔（度）
+VALIDATION_ANGULAR_INTERVAL = 5.0
+
+
+class AggregationError(Exception):
+    """发光体聚合错误"""
+    pass
+
+
+@dataclass
+class AggregationSettings:
+    """
+    聚合参数
+    
+    属性:
+        cluster_size: 分组网格尺寸（米）
+        normal_tolerance: 面光源法线夹角容差（度）
+        plane_tolerance: 共面距离容差（米）
+        min_emitters: 光源数量少于该值时不聚合
+        max_error: 允许的等效光强相对均方根误差
+    """
+    
+    cluster_size: float = 0.05
+    normal_tolerance: float = 5.0
+    plane_tolerance: float = 0.005
+    min_emitters: int = 16
+    max_error: float = 0.02
+    
+    def validate(self):
+        """
+        验证参数
+        
+        异常:
+            AggregationError: 参数不是正数
+        """
+        if min(self.cluster_size, self.normal_tolerance, self.plane_tolerance, self.max_error) <= 0:
+            raise AggregationError(f"聚合参数必须为正数：{self!r}")
+
+
+@dataclass
+class Emitter:
+    """
+    光源（聚合前后共用）
+    
+    属性:
+        name: 名称
+        kind: EMITTER_POINT 或 EMITTER_AREA
+        position: 世界坐标位置 (3,)
+        power: 功率（瓦）
+        color: 线性 RGB 颜色 (3,)
+        normal: 发光方向（面光源，单位向量）
+        size: 面光源尺寸 (size_x, size_y)（米）或点光源半径 (radius, radius)
+        axis_x: 面光源局部 X 轴的世界方向（可选）
+        members: 聚合代理包含的原光源名称
+    """
+    
+    name: str
+    kind: str
+    position: np.ndarray
+    power: float
+    color: np.ndarray = field(default_factory=lambda: np.ones(3))
+    normal: Optional[np.ndarray] = None
+    size: Tuple[float, float] = (0.0, 0.0)
+    axis_x: Optional[np.ndarray] = None
+    members: List[str] = field(default_factory=list)
+    
+    @property
+    def luminous_power(self) -> float:
+        """亮度加权功率（功率 × 颜色亮度）"""
+        return float(self.power * (np.asarray(self.color, dtype=float) @ LUMINANCE_WEIGHTS))
+
+
+@dataclass
+class AggregationReport:
+    """
+    聚合报告
+    
+    属性:
+        original_emitters: 原光源数量
+        proxy_emitters: 代理光源数量
+        rms_error: 等效光强相对均方根误差
+        max_error: 最大误差 / 峰值
+        applied: 是否应用了聚合（光源过少或误差超限时为 False）
+    """
+    
+    original_emitters: int
+    proxy_emitters: int
+    rms_error: float = 0.0
+    max_error: float = 0.0
+    applied: bool = False
+    
+    def to_dict(self) -> dict:
+        """
+        转换为字典格式（写入 render_settings）
+        """
+        return {
+            'original_emitters': self.original_emitters,
+            'proxy_emitters': self.proxy_emitters,
+            'rms_error': self.rms_error,
+            'max_error': self.max_error,
+            'applied': self.applied
+        }
+    
+    def __str__(self) -> str:
+        """
+        格式化报告为可读字符串
+        """
+        status = "已应用" if self.applied else "未应用"
+        return (f"AggregationReport({self.original_emitters} → {self.proxy_emitters} 个光源，"
+                f"RMS {self.rms_error:.2%}，最大 {self.max_error:.2%}，{status})")
+
+
+# ============================================================================
+# 聚类
+# ============================================================================
+
+def aggregate_emitters(emitters: Sequence[Emitter],
+                       settings: AggregationSettings) -> List[Emitter]:
+    """
+    将光源聚合为代理光源
+    
+    参数:
+        emitters: 原光源
+        settings: 聚合参数
+    
+    返回:
+        List[Emitter]: 代理光源（单独成组的光源原样保留）
+    
+    异常:
+        AggregationError: 参数无效或光源类型不支持
+    """
+    settings.validate()
+    
+    groups = []
+    points = [emitter for emitter in emitters if emitter.kind == EMITTER_POINT]
+    areas = [emitter for emitter in emitters if emitter.kind == EMITTER_AREA]
+    unsupported = [emitter.name for emitter in emitters if emitter.kind not in (EMITTER_POINT, EMITTER_AREA)]
+    if unsupported:
+        raise AggregationError(f"不支持聚合的光源类型：{unsupported}")
+    
+    if points:
+        positions = np.array([emitter.position for emitter in points], dtype=float)
+        keys = np.floor(positions / settings.cluster_size).astype(np.int64)
+        groups.extend(_split_by_keys(points, keys))
+    
+    for normal_group in _group_by_normal(areas, settings.normal_tolerance):
+        normal = _mean_normal(normal_group)
+        axis_u, axis_v = _plane_axes(normal, normal_group[0].axis_x)
+        positions = np.array([emitter.position for emitter in normal_group], dtype=float)
+        keys = np.column_stack([
+            np.floor(positions @ normal / settings.plane_tolerance),
+            np.floor(positions @ axis_u / settings.cluster_size),
+            np.floor(positions @ axis_v / settings.cluster_size),
+        ]).astype(np.int64)
+        groups.extend(_split_by_keys(normal_group, keys))
+    
+    return [group[0] if len(group) == 1 else _merge_group(group, index)
+            for index, group in enumerate(groups)]
+
+
+def _split_by_keys(emitters: List[Emitter], keys: np.ndarray) -> List[List[Emitter]]:
+    """
+    按整数网格键分组，保持光源的原始顺序
+    """
+    _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    order = np.argsort(first)
+    return [[emitters[i] for i in np.flatnonzero(inverse == group)] for group in order]
+
+
+def _group_by_normal(emitters: List[Emitter], tolerance: float) -> List[List[Emitter]]:
+    """
+    按法线方向分组（与组内第一个光源的夹角不超过容差）
+    """
+    cos_tolerance = math.cos(math.radians(tolerance))
+    groups = []
+    for emitter in emitters:
+        normal = _unit(emitter.normal)
+        for group in groups:
+            if normal @ _unit(group[0].normal) >= cos_tolerance:
+                group.append(emitter)
+                break
+        else:
+            groups.append([emitter])
+    return groups
+
+
+def _merge_group(group: List[Emitter], index: int) -> Emitter:
+    """
+    将一组光源合并为一个等光通量的代理光源
+    """
+    powers = np.array([emitter.power for emitter in group], dtype=float)
+    total_power = float(powers.sum())
+    weights = powers / total_power if total_power > 0 else np.full(len(group), 1.0 / len(group))
+    positions = np.array([emitter.position for emitter in group], dtype=float)
+    position = weights @ positions
+    color = weights @ np.array([emitter.color for emitter in group], dtype=float)
+    members = [name for emitter in group for name in (emitter.members or [emitter.name])]
+    
+    if group[0].kind == EMITTER_POINT:
+        radius = max(emitter.size[0] for emitter in group)
+        return Emitter(name=f"KiroProxy.{index:03d}", kind=EMITTER_POINT, position=position,
+                       power=total_power, color=color, size=(radius, radius), members=members)
+    
+    normal = _mean_normal(group)
+    axis_u, axis_v = _plane_axes(normal, group[0].axis_x)
+    
+    # 矩形覆盖所有成员的范围（成员尺寸按其包围圆半径计入）
+    half_extent = np.array([0.5 * math.hypot(*emitter.size) for emitter in group])
+    offsets = positions - position
+    extent_u = np.max(np.abs(offsets @ axis_u) + half_extent)
+    extent_v = np.max(np.abs(offsets @ axis_v) + half_extent)
+    
+    return Emitter(name=f"KiroProxy.{index:03d}", kind=EMITTER_AREA, position=position,
+                   power=total_power, color=color, normal=normal,
+                   size=(2.0 * float(extent_u), 2.0 * float(extent_v)), axis_x=axis_u,
+                   members=members)
+
+
+def _unit(vector) -> np.ndarray:
+    """单位向量"""
+    vector = np.asarray(vector, dtype=float)
+    return vector / np.linalg.norm(vector)
+
+
+def _mean_normal(group: List[Emitter]) -> np.ndarray:
+    """功率加权平均法线"""
+    powers = np.array([max(emitter.power, 0.0) for emitter in group], dtype=float) + 1e-12
+    return _unit(powers @ np.array([_unit(emitter.normal) for emitter in group]))
+
+
+def _plane_axes(normal: np.ndarray, axis_x: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    平面内的正交轴 (u, v)，满足 u × v = -normal（与 Blender 面光源局部坐标一致：
+    局部 -Z 为发光方向）
+    """
+    if axis_x is not None:
+        axis_u = np.asarray(axis_x, dtype=float) - (np.asarray(axis_x, dtype=float) @ normal) * normal
+    else:
+        axis_u = np.zeros(3)
+    if np.linalg.norm(axis_u) < 1e-9:
+        helper = np.array([1.0, 0.0, 0.0]) if abs(normal[0]) < 0.9 else np.array([0.0, 1.0, 0.0])
+        axis_u = helper - (helper @ normal) * normal
+    axis_u = _unit(axis_u)
+    axis_v = np.cross(-normal, axis_u)
+    return axis_u, axis_v
+
+
+# ============================================================================
+# 误差验证
+# ============================================================================
+
+def evaluate_emitter_intensity(emitters: Sequence[Emitter],
+                               vertical_angles: np.ndarray,
+                               horizontal_angles: np.ndarray,
+                               distance: Optional[float] = None,
+                               center: Tuple[float, float, float] = (0.0, 0.0, 0.0)) -> np.ndarray:
+    """
+    解析计算光源组的等效光强分布
+    
+    参数:
+        emitters: 光源
+        vertical_angles: 垂直角度（度），0° = 正下方
+        horizontal_angles: 水平角度（度），0° = +X
+        distance: 测量距离（米），None 时为远场极限
+        center: 光度中心
+    
+    返回:
+        np.ndarray: 等效光强 (N_theta, N_phi)，亮度加权功率单位
+    
+    说明:
+        有限距离时，每个光源的贡献按其到测量点的实际方向和距离计算，
+        再乘以 distance² 换算为等效光强，包含位置变化带来的误差
+    """
+    theta = np.radians(np.asarray(vertical_angles, dtype=float))[:, None]
+    phi = np.radians(np.asarray(horizontal_angles, dtype=float))[None, :]
+    directions = np.stack(np.broadcast_arrays(
+        np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), -np.cos(theta)
+    ), axis=-1)
+    
+    intensity = np.zeros(directions.shape[:2])
+    for emitter in emitters:
+        if distance is None:
+            toward = directions
+            scale = 1.0
+        else:
+            offsets = directions * distance + (np.asarray(center, dtype=float) - emitter.position)
+            lengths = np.linalg.norm(offsets, axis=-1)
+            toward = offsets / lengths[..., None]
+            scale = (distance / lengths) ** 2
+        
+        if emitter.kind == EMITTER_AREA:
+            cosines = np.maximum(toward @ _unit(emitter.normal), 0.0)
+            intensity += emitter.luminous_power / math.pi * cosines * scale
+        else:
+            intensity += emitter.luminous_power / (4.0 * math.pi) * scale
+    
+    return intensity
+
+
+def compare_emitter_sets(original: Sequence[Emitter],
+                         proxies: Sequence[Emitter],
+                         distance: Optional[float] = None,
+                         center: Tuple[float, float, float] = (0.0, 0.0, 0.0),
+                         angular_interval: float = VALIDATION_ANGULAR_INTERVAL) -> Tuple[float, float]:
+    """
+    比较聚合前后的等效光强分布
+    
+    参数:
+        original: 原光源
+        proxies: 代理光源
+        distance: 测量距离（米），None 时为远场极限
+        center: 光度中心
+        angular_interval: 比较网格的角度间隔（度）
+    
+    返回:
+        (rms_error, max_error): 立体角加权相对均方根误差、最大误差 / 峰值
+    """
+    vertical_angles = np.arange(0.0, 180.0 + 1e-9, angular_interval)
+    horizontal_angles = np.arange(0.0, 360.0, angular_interval)
+    
+    expected = evaluate_emitter_intensity(original, vertical_angles, horizontal_angles, distance, center)
+    actual = evaluate_emitter_intensity(proxies, vertical_angles, horizontal_angles, distance, center)
+    difference = actual - expected
+    
+    reference = integrate_flux(vertical_angles, horizontal_angles, expected ** 2)
+    if reference <= 0:
+        return 0.0, 0.0
+    
+    rms_error = math.sqrt(integrate_flux(vertical_angles, horizontal_angles, difference ** 2) / reference)
+    max_error = float(np.abs(difference).max() / np.abs(expected).max())
+    return rms_error, max_error
+
+
+def plan_aggregation(emitters: Sequence[Emitter],
+                     settings: AggregationSettings,
+                     distance: Optional[float] = None,
+                     center: Tuple[float, float, float] = (0.0, 0.0, 0.0)) -> Tuple[List[Emitter], AggregationReport]:
+    """
+    聚合光源并验证误差
+    
+    参数:
+        emitters: 原光源
+        settings: 聚合参数
+        distance: 测量距离（米），None 时为远场极限
+        center: 光度中心
+    
+    返回:
+        (proxies, report): 误差在容差内时 proxies 为代理光源，否则为原光源
+    """
+    emitters = list(emitters)
+    if len(emitters) < settings.min_emitters:
+        return emitters, AggregationReport(len(emitters), len(emitters))
+    
+    proxies = aggregate_emitters(emitters, settings)
+    rms_error, max_error = compare_emitter_sets(emitters, proxies, distance, center)
+    report = AggregationReport(len(emitters), len(proxies), rms_error, max_error,
+                               applied=rms_error <= settings.max_error and len(proxies) < len(emitters))
+    return (proxies if report.applied else emitters), report
@@ -0,0 +1,449 @@
+"""
+光度学导出模块 (Exporters)
+
+从同一份 PhotometricData 导出多种光度学文件格式，无需重新采样或校准：
+- IES LM-63-2002（.ies）
+- IES LM-63-2019（.ies）
+- EULUMDAT（.ldt，欧洲常用格式）
+
+所有格式共用 ies_generator.build_line_format 的向量化数值格式化；
+多个 IES 版本的数据块只格式化一次，同时写入各自的文件。
+"""
+
+from typing import Dict, Iterator, List, Optional, Sequence, TextIO
+from contextlib import ExitStack
+from datetime import date
+import os
+import numpy as np
+
+from .data_structures import PhotometricData
+from .ies_generator import (
+    ANGLE_FORMAT,
+    CANDELA_FORMAT,
+    IES_PLANES_PER_CHUNK,
+    build_line_format,
+    generate_ies_header,
+    iter_ies_data_chunks,
+)
+from .output_manager import ensure_directory_exists, write_photometric_ies_file
+from .photometry import ANGLE_TOLERANCE, get_solid_angle_weights
+
+
+# ============================================================================
+# 常量定义
+# ============================================================================
+
+# 导出格式 → 文件名后缀（两个 IES 版本同时导出时需要区分文件名）
+EXPORT_FILE_SUFFIXES = {
+    "IES2002": ".ies",
+    "IES2019": "_LM-63-2019.ies",
+    "LDT": ".ldt",
+}
+
+# IES 导出格式 → LM-63 版本
+IES_EXPORT_VERSIONS = {
+    "IES2002": "LM-63-2002",
+    "IES2019": "LM-63-2019",
+}
+
+# 默认导出格式
+DEFAULT_EXPORT_FORMATS = ("IES2002",)
+
+# EULUMDAT 文本行最大长度
+LDT_MAX_TEXT_LENGTH = 78
+
+# EULUMDAT 直接比（利用系数）行数，对应室形指数 k = 0.60 … 5.00
+LDT_DIRECT_RATIO_COUNT = 10
+
+# EULUMDAT 对称标志 Isym
+LDT_SYMMETRY_NONE = 0
+LDT_SYMMETRY_VERTICAL_AXIS = 1
+LDT_SYMMETRY_C0_C180 = 2
+LDT_SYMMETRY_C90_C270 = 3
+LDT_SYMMETRY_BOTH_PLANES = 4
+
+
+class ExportError(Exception):
+    """导出错误"""
+    pass
+
+
+# ============================================================================
+# 多格式导出
+# ============================================================================
+
+def export_photometric_data(photometric_data: PhotometricData,
+                            output_base: str,
+                            formats: Sequence[str] = DEFAULT_EXPORT_FORMATS,
+                            overwrite: bool = False) -> Dict[str, str]:
+    """
+    将光度学数据一次性导出为多种格式
+    
+    参数:
+        photometric_data: 校准后的光度学数据
+        output_base: 输出路径（不含扩展名，扩展名由格式决定）
+        formats: 导出格式列表（'IES2002'、'IES2019'、'LDT'）
+        overwrite: 是否覆盖已存在的文件
+    
+    返回:
+        Dict[str, str]: 导出格式 → 文件路径
+    
+    异常:
+        ExportError: 格式不支持、数据无法以该格式表示、文件已存在或写入失败
+    
+    说明:
+        写入前先检查所有格式和目标文件，避免只写出部分文件；
+        IES 数据块只格式化一次，同时写入所有 IES 版本的文件。
+    """
+    validate_export_formats(formats)
+    
+    paths = {export_format: get_export_path(output_base, export_format) for export_format in formats}
+    
+    for path in paths.values():
+        if os.path.exists(path) and not overwrite:
+            raise ExportError(f"文件已存在：{path}，请确认是否覆盖")
+    
+    # 提前计算 EULUMDAT 布局，数据无法表示时不写出任何文件
+    ldt_layout = get_ldt_layout(photometric_data) if "LDT" in paths else None
+    
+    ensure_directory_exists(os.path.dirname(output_base))
+    
+    num_vertical_angles, num_horizontal_angles = photometric_data.get_data_shape()
+    
+    try:
+        with ExitStack() as stack:
+            ies_streams = []
+            for export_format, version in IES_EXPORT_VERSIONS.items():
+                if export_format not in paths:
+                    continue
+                stream = stack.enter_context(open(paths[export_format], 'w', encoding='utf-8'))
+                stream.write(generate_ies_header(
+                    photometric_data.lumens,
+                    num_vertical_angles,
+                    num_horizontal_angles,
+                    photometric_data.fixture_name,
+                    version
+                ))
+                ies_streams.append(stream)
+            
+            if ies_streams:
+                for chunk in iter_ies_data_chunks(photometric_data):
+                    for stream in ies_streams:
+                        stream.write(chunk)
+            
+            if ldt_layout is not None:
+                # EULUMDAT 惯例使用 Windows-1252 编码，无法表示的字符替换为 '?'
+                stream = stack.enter_context(
+                    open(paths["LDT"], 'w', encoding='cp1252', errors='replace', newline='\r\n')
+                )
+                for chunk in iter_ldt_chunks(photometric_data, layout=ldt_layout):
+                    stream.write(chunk)
+    except OSError as e:
+        raise ExportError(f"写入导出文件失败：{str(e)}")
+    
+    return paths
+
+
+def write_photometric_exports(photometric_data: PhotometricData,
+                              ies_path: str,
+                              formats: Sequence[str] = DEFAULT_EXPORT_FORMATS,
+                              overwrite: bool = False) -> Dict[str, str]:
+    """
+    写入 IES LM-63-2002 文件，并在旁边导出其余格式（生成流程和重新校准共用）
+    
+    参数:
+        photometric_data: 校准后的光度学数据
+        ies_path: IES LM-63-2002 输出路径（流程的主输出，无论 formats 是否包含 'IES2002' 都会写入）
+        formats: 导出格式列表（见 EXPORT_FILE_SUFFIXES），其余格式的文件名见 get_export_path
+        overwrite: 是否覆盖已存在的文件
+    
+    返回:
+        Dict[str, str]: 导出格式 → 文件路径（总是包含 'IES2002'）
+    
+    异常:
+        ExportError: 格式不支持、数据无法以该格式表示或文件已存在
+        OutputError: IES 写入失败
+    
+    说明:
+        所有检查都在写入前完成，检查失败时不写出任何文件。
+    """
+    validate_export_formats(formats)
+    if os.path.exists(ies_path) and not overwrite:
+        raise ExportError(f"文件已存在：{ies_path}，请确认是否覆盖")
+    
+    extra_formats = [export_format for export_format in formats if export_format != "IES2002"]
+    paths = {}
+    if extra_formats:
+        paths = export_photometric_data(photometric_data, ies_path, extra_formats, overwrite)
+    write_photometric_ies_file(photometric_data, ies_path, overwrite)
+    
+    return {"IES2002": ies_path, **paths}
+
+
+def validate_export_formats(formats: Sequence[str]) -> None:
+    """
+    检查导出格式是否都受支持
+    
+    异常:
+        ExportError: 格式不支持
+    """
+    for export_format in formats:
+        if export_format not in EXPORT_FILE_SUFFIXES:
+            raise ExportError(f"不支持的导出格式：{export_format}")
+
+
+def get_export_path(output_base: str, export_format: str) -> str:
+    """
+    根据导出格式生成文件路径
+    
+    参数:
+        output_base: 输出路径（可含 .ies/.ldt 扩展名，会被去除）
+        export_format: 导出格式
+    
+    返回:
+        导出文件路径
+    """
+    base, extension = os.path.splitext(output_base)
+    if extension.lower() not in (".ies", ".ldt"):
+        base = output_base
+    return f"{base}{EXPORT_FILE_SUFFIXES[export_format]}"
+
+
+# ============================================================================
+# EULUMDAT
+# ============================================================================
+
+def get_ldt_layout(photometric_data: PhotometricData) -> Dict:
+    """
+    计算 EULUMDAT 的 C-Plane 布局
+    
+    参数:
+        photometric_data: 光度学数据
+    
+    返回:
+        dict: 布局信息
+            {
+                'symmetry': int,              # Isym
+                'c_angles': np.ndarray,       # 0-360° 内的全部 C 角度（Mc 个）
+                'c_spacing': float,           # Dc，非等间距时为 0
+                'gamma_spacing': float,       # Dg，非等间距时为 0
+                'planes': np.ndarray          # 需要写出的 C-Plane 列索引（按写出顺序）
+            }
+    
+    异常:
+        ExportError: 水平角度无法用 EULUMDAT 的对称方式表示
+    
+    支持的水平角度集合（与 IES 对称约定一致）:
+        - 单个角度 → Isym 1（绕垂直轴旋转对称）
+        - 0-90° → Isym 4（C0-C180 和 C90-C270 双平面对称）
+        - 0-180° → Isym 2（C0-C180 平面对称）
+        - 90-270° → Isym 3（C90-C270 平面对称）
+        - 从 0° 开始的完整圆周（可含 360°，360° 平面不重复写出）→ Isym 0
+    """
+    horizontal = np.asarray(photometric_data.horizontal_angles, dtype=float)
+    count = len(horizontal)
+    
+    if count == 1:
+        symmetry = LDT_SYMMETRY_VERTICAL_AXIS
+        c_angles = np.array([0.0])
+        planes = np.arange(1)
+    else:
+        first, last = horizontal[0], horizontal[-1]
+        planes = np.arange(count)
+        
+        if _is_close(first, 0.0) and _is_close(last, 90.0):
+            symmetry = LDT_SYMMETRY_BOTH_PLANES
+            mirrored = np.concatenate((horizontal, 180.0 - horizontal,
+                                       180.0 + horizontal, 360.0 - horizontal))
+        elif _is_close(first, 0.0) and _is_close(last, 180.0):
+            symmetry = LDT_SYMMETRY_C0_C180
+            mirrored = np.concatenate((horizontal, 360.0 - horizontal))
+        elif _is_close(first, 90.0) and _is_close(last, 270.0):
+            symmetry = LDT_SYMMETRY_C90_C270
+            mirrored = np.concatenate((horizontal, 180.0 - horizontal))
+            # Isym 3 的数据从 C270 经 C0 到 C90，按 C90-C270 平面镜像即 IES 的 270° → 90°
+            planes = planes[::-1]
+        elif _is_close(first, 0.0) and last < 360.0 + ANGLE_TOLERANCE:
+            symmetry = LDT_SYMMETRY_NONE
+            if _is_close(last, 360.0):
+                planes = planes[:-1]
+            mirrored = horizontal[planes]
+        else:
+            raise ExportError(
+                f"水平角度 {first:g}-{last:g}° 无法导出为 EULUMDAT"
+                "（需要单平面、0-90°、0-180°、90-270° 或从 0° 开始的完整圆周）"
+            )
+        
+        c_angles = _unique_angles(np.mod(mirrored, 360.0))
+    
+    return {
+        'symmetry': symmetry,
+        'c_angles': c_angles,
+        'c_spacing': _uniform_spacing(c_angles),
+        'gamma_spacing': _uniform_spacing(np.asarray(photometric_data.vertical_angles, dtype=float)),
+        'planes': planes
+    }
+
+
+def iter_ldt_chunks(photometric_data: PhotometricData,
+                    planes_per_chunk: int = IES_PLANES_PER_CHUNK,
+                    layout: Optional[Dict] = None) -> Iterator[str]:
+    """
+    逐块生成 EULUMDAT 文件文本
+    
+    参数:
+        photometric_data: 校准后的光度学数据
+        planes_per_chunk: 每块包含的 C-Plane 数量
+        layout: get_ldt_layout 的结果（可选，None 时自动计算）
+    
+    生成:
+        str: 文件头（1-27 行），C 角度、γ 角度，随后为光强数据块
+    
+    异常:
+        ExportError: 数据无法以 EULUMDAT 表示或总光通量无效
+    
+    说明:
+        光强单位为 cd/klm（相对于 [26c] 的灯具光通量），每行一个数值；
+        灯具按绝对光度处理，光输出比 LORL 为 100%。
+        直接比 [27] 需要房间利用系数计算，这里写入 0 占位。
+    """
+    if layout is None:
+        layout = get_ldt_layout(photometric_data)
+    
+    if photometric_data.lumens <= 0:
+        raise ExportError("总流明值必须大于 0 才能导出 EULUMDAT")
+    
+    vertical_angles = np.asarray(photometric_data.vertical_angles, dtype=float)
+    c_angles = layout['c_angles']
+    planes = layout['planes']
+    
+    yield _format_ldt_header(photometric_data, layout)
+    
+    yield build_line_format(LDT_DIRECT_RATIO_COUNT, "%.3f", 1) % ((0.0,) * LDT_DIRECT_RATIO_COUNT)
+    yield build_line_format(len(c_angles), ANGLE_FORMAT, 1) % tuple(c_angles.tolist())
+    yield build_line_format(len(vertical_angles), ANGLE_FORMAT, 1) % tuple(vertical_angles.tolist())
+    
+    # cd → cd/klm；每个 C-Plane 即网格的一列，模板只构建一次
+    scale = 1000.0 / photometric_data.lumens
+    plane_format = build_line_format(len(vertical_angles), CANDELA_FORMAT, 1)
+    
+    for start in range(0, len(planes), planes_per_chunk):
+        chunk_planes = planes[start:start + planes_per_chunk]
+        chunk = (photometric_data.candela_values[:, chunk_planes].T * scale).ravel().tolist()
+        yield (plane_format * len(chunk_planes)) % tuple(chunk)
+
+
+def write_ldt(photometric_data: PhotometricData, stream: TextIO) -> None:
+    """
+    将 EULUMDAT 文件写入文本流
+    
+    参数:
+        photometric_data: 校准后的光度学数据
+        stream: 文本流
+    """
+    for chunk in iter_ldt_chunks(photometric_data):
+        stream.write(chunk)
+
+
+def calculate_downward_flux_fraction(photometric_data: PhotometricData) -> float:
+    """
+    计算下半球光通量比例（EULUMDAT 的 DFF）
+    
+    参数:
+        photometric_data: 光度学数据
+    
+    返回:
+        float: 下半球光通量百分比（0-100）
+    
+    说明:
+        θ < 90° 的纬度带计入下半球，θ = 90° 的纬度带上下各占一半。
+    """
+    vertical_angles = np.asarray(photometric_data.vertical_angles, dtype=float)
+    weights = get_solid_angle_weights(vertical_angles, photometric_data.horizontal_angles)
+    band_flux = np.sum(weights * photometric_data.candela_values, axis=1)
+    
+    total = band_flux.sum()
+    if total <= 0:
+        return 0.0
+    
+    downward = band_flux[vertical_angles < 90.0 - ANGLE_TOLERANCE].sum()
+    downward += 0.5 * band_flux[np.abs(vertical_angles - 90.0) <= ANGLE_TOLERANCE].sum()
+    
+    return float(100.0 * downward / total)
+
+
+# ============================================================================
+# 辅助函数
+# ============================================================================
+
+def _format_ldt_header(photometric_data: PhotometricData, layout: Dict) -> str:
+    """
+    生成 EULUMDAT 文件头（第 1-26 行，含一组灯具数据）
+    """
+    num_vertical_angles = len(photometric_data.vertical_angles)
+    name = photometric_data.fixture_name
+    
+    lines: List[str] = [
+        _ldt_text("Kiro IES Generator"),                 # 1 公司/数据库标识
+        "1",                                             # 2 Ityp：点光源
+        str(layout['symmetry']),                         # 3 Isym
+        str(len(layout['c_angles'])),                    # 4 Mc
+        f"{layout['c_spacing']:.2f}",                    # 5 Dc
+        str(num_vertical_angles),                        # 6 Ng
+        f"{layout['gamma_spacing']:.2f}",                # 7 Dg
+        _ldt_text("Blender Cycles"),                     # 8 测量报告
+        _ldt_text(name),                                 # 9 灯具名称
+        _ldt_text("Generated"),                          # 10 灯具编号
+        _ldt_text(name.replace(" ", "_") + ".ldt"),      # 11 文件名
+        date.today().isoformat(),                        # 12 日期/用户
+        "0", "0", "0",                                   # 13-15 灯具尺寸（mm）
+        "0", "0",                                        # 16-17 发光面尺寸（mm）
+        "0", "0", "0", "0",                              # 18-21 发光面高度（mm）
+        f"{calculate_downward_flux_fraction(photometric_data):.1f}",  # 22 DFF
+        "100.0",                                         # 23 LORL
+        "1.0",                                           # 24 光强换算系数
+        "0.0",                                           # 25 测量倾角
+        "1",                                             # 26 灯具组数
+        "1",                                             # 26a 光源数量
+        "LED",                                           # 26b 光源类型
+        f"{photometric_data.lumens:.1f}",                # 26c 总光通量（lm）
+        "",                                              # 26d 色温
+        "",                                              # 26e 显色指数
+        "0.0",                                           # 26f 功率（W）
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def _ldt_text(text: str) -> str:
+    """
+    EULUMDAT 文本行：去除换行并截断到最大长度
+    """
+    return " ".join(text.split())[:LDT_MAX_TEXT_LENGTH]
+
+
+def _is_close(value: float, target: float) -> bool:
+    """
+    角度比较（容差 ANGLE_TOLERANCE）
+    """
+    return abs(value - target) < ANGLE_TOLERANCE
+
+
+def _unique_angles(angles: np.ndarray) -> np.ndarray:
+    """
+    排序并合并容差范围内重复的角度
+    """
+    angles = np.sort(angles)
+    keep = np.concatenate(([True], np.diff(angles) > ANGLE_TOLERANCE))
+    return angles[keep]
+
+
+def _uniform_spacing(angles: np.ndarray) -> float:
+    """
+    等间距角度返回间距，否则返回 0（EULUMDAT 约定）
+    """
+    if len(angles) < 2:
+        return 0.0
+    steps = np.diff(angles)
+    if np.all(np.abs(steps - steps[0]) < ANGLE_TOLERANCE):
+        return float(steps[0])
+    return 0.0
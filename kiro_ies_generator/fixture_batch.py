@@ -0,0 +1,182 @@
+"""
+多灯具批量模块 (Fixture Batch)
+
+在一个 .blend 中按集合批量测量多个灯具。本模块只包含不依赖 bpy 的部分：
+集合标记约定、输出文件名和批量报告。
+
+集合标记（集合的自定义属性）：
+- kiro_fixture: 为真时该集合是一个灯具
+- kiro_fixture_name: 灯具名称（可选，默认使用集合名）
+- kiro_fixture_lumens: 目标总流明（可选，默认按集合内光源功率计算）
+"""
+
+from typing import Dict, List, Optional, Sequence
+from dataclasses import dataclass, field
+import os
+import re
+
+
+# ============================================================================
+# 常量定义
+# ============================================================================
+
+# 集合自定义属性
+FIXTURE_TAG_PROPERTY = "kiro_fixture"
+FIXTURE_NAME_PROPERTY = "kiro_fixture_name"
+FIXTURE_LUMENS_PROPERTY = "kiro_fixture_lumens"
+
+# 批量清单文件名
+FIXTURE_MANIFEST_NAME = "fixtures.json"
+
+# 文件名中不允许的字符
+_INVALID_FILENAME_CHARACTERS = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+
+
+class FixtureBatchError(Exception):
+    """多灯具批量错误"""
+    pass
+
+
+@dataclass
+class FixtureResult:
+    """
+    单个灯具的批量结果
+    
+    属性:
+        collection: 灯具集合名称
+        fixture_name: 灯具名称
+        ies_path: IES 输出路径
+        metadata_path: 元数据路径（失败时为 None）
+        total_lumens: 校准使用的总流明（失败时为 None）
+        error: 失败原因（None 表示成功）
+        elapsed_time: 耗时（秒）
+    """
+    
+    collection: str
+    fixture_name: str
+    ies_path: str
+    metadata_path: Optional[str] = None
+    total_lumens: Optional[float] = None
+    error: Optional[str] = None
+    elapsed_time: float = 0.0
+    
+    @property
+    def succeeded(self) -> bool:
+        """是否成功"""
+        return self.error is None
+    
+    def to_dict(self) -> dict:
+        """
+        转换为字典格式
+        """
+        return {
+            'collection': self.collection,
+            'fixture_name': self.fixture_name,
+            'ies_path': self.ies_path,
+            'metadata_path': self.metadata_path,
+            'total_lumens': self.total_lumens,
+            'error': self.error,
+            'elapsed_time': self.elapsed_time
+        }
+
+
+@dataclass
+class FixtureBatchReport:
+    """
+    多灯具批量报告
+    
+    属性:
+        fixtures: 各灯具结果（按集合顺序）
+        elapsed_time: 总耗时（秒）
+    """
+    
+    fixtures: List[FixtureResult] = field(default_factory=list)
+    elapsed_time: float = 0.0
+    
+    @property
+    def succeeded(self) -> List[str]:
+        """成功的灯具名称"""
+        return [result.fixture_name for result in self.fixtures if result.succeeded]
+    
+    @property
+    def failed(self) -> List[str]:
+        """失败的灯具名称"""
+        return [result.fixture_name for result in self.fixtures if not result.succeeded]
+    
+    def to_dict(self) -> dict:
+        """
+        转换为字典格式（写入批量清单 JSON）
+        """
+        return {
+            'fixtures': [result.to_dict() for result in self.fixtures],
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'elapsed_time': self.elapsed_time
+        }
+    
+    def __str__(self) -> str:
+        """
+        格式化报告为可读字符串
+        """
+        return (f"FixtureBatchReport({len(self.fixtures)} 个灯具，成功 {len(self.succeeded)} 个，"
+                f"失败 {len(self.failed)} 个，耗时 {self.elapsed_time:.1f} 秒)")
+
+
+def sanitize_fixture_filename(name: str) -> str:
+    """
+    将灯具名称转换为文件名
+    
+    参数:
+        name: 灯具名称
+    
+    返回:
+        str: 替换路径分隔符等非法字符，去掉首尾空白和句点；结果为空时返回 'fixture'
+    """
+    sanitized = _INVALID_FILENAME_CHARACTERS.sub('_', name).strip().strip('.')
+    return sanitized or 'fixture'
+
+
+def plan_fixture_outputs(fixture_names: Sequence[str], output_dir: str) -> Dict[str, str]:
+    """
+    为每个灯具分配 IES 输出路径
+    
+    参数:
+        fixture_names: 灯具名称（不可重复）
+        output_dir: 输出目录
+    
+    返回:
+        Dict[str, str]: 灯具名称 → <输出目录>/<文件名>.ies，
+            文件名转换后重名（不区分大小写）时追加序号
+    
+    异常:
+        FixtureBatchError: 灯具名称重复
+    """
+    if len(set(fixture_names)) != len(fixture_names):
+        duplicates = sorted({name for name in fixture_names if list(fixture_names).count(name) > 1})
+        raise FixtureBatchError(f"灯具名称重复：{duplicates}，请设置 {FIXTURE_NAME_PROPERTY} 区分")
+    
+    used = set()
+    paths = {}
+    for name in fixture_names:
+        base = sanitize_fixture_filename(name)
+        filename = base
+        suffix = 2
+        while filename.lower() in used:
+            filename = f"{base}_{suffix}"
+            suffix += 1
+        used.add(filename.lower())
+        paths[name] = os.path.join(output_dir, f"{filename}.ies")
+    return paths
+
+
+def get_fixture_manifest_path(output_dir: str) -> str:
+    """
+    获取批量清单（FixtureBatchReport JSON）路径
+    
+    参数:
+        output_dir: 输出目录
+    
+    返回:
+        str: <输出目录>/fixtures.json
+    """
+    return os.path.join(output_dir, FIXTURE_MANIFEST_NAME)
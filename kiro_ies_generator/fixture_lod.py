@@ -0,0 +1,199 @@
+"""
+灯具简化模块 (Fixture LOD)
+
+测量前对灯具的非光学几何做减面，不依赖 bpy，可单独测试。
+
+CAD 导入的灯具常带有数百万个三角形的螺丝和散热鳍片，它们几乎不影响远场分布，
+却主导 BVH 构建和遍历时间。简化只作用于测量场景中的临时副本（见 measurement_scene），
+原始模型不变。
+
+对象分类：
+- OPTICAL：光源、发光材质、透射材质（透镜、漫射罩）、高金属度低粗糙度材质（反射器），
+  或名称包含光学关键字的对象，保持完整细节
+- DECIMATE：三角形数超过阈值的非光学对象，按比例减面
+- KEEP：其余对象，保持不变
+"""
+
+from typing import List, Sequence
+from dataclasses import dataclass, field
+
+
+# ============================================================================
+# 常量定义
+# ============================================================================
+
+# 对象分类
+LOD_OPTICAL = 'OPTICAL'
+LOD_DECIMATE = 'DECIMATE'
+LOD_KEEP = 'KEEP'
+
+# 光学对象名称关键字（小写匹配）
+OPTICAL_NAME_KEYWORDS = (
+    'reflector', 'lens', 'optic', 'diffuser', 'emitter', 'bulb', 'glass',
+    '反射', '透镜', '光学', '扩散', '灯珠', '发光',
+)
+
+# 判定为透射材质的透射权重
+TRANSMISSION_THRESHOLD = 0.1
+
+# 判定为反射器的金属度和粗糙度
+REFLECTOR_METALLIC_THRESHOLD = 0.5
+REFLECTOR_ROUGHNESS_THRESHOLD = 0.3
+
+
+class LODError(Exception):
+    """灯具简化错误"""
+    pass
+
+
+@dataclass
+class LODSettings:
+    """
+    灯具简化参数
+    
+    属性:
+        triangle_threshold: 非光学对象超过该三角形数时减面
+        target_ratio: 减面比例（保留的三角形比例）
+        min_triangles: 减面后至少保留的三角形数
+    """
+    
+    triangle_threshold: int = 10000
+    target_ratio: float = 0.1
+    min_triangles: int = 1000
+    
+    def validate(self):
+        """
+        验证参数
+        
+        异常:
+            LODError: 参数超出范围
+        """
+        if self.triangle_threshold < 1 or self.min_triangles < 1:
+            raise LODError(f"三角形数阈值必须为正数：{self.triangle_threshold}, {self.min_triangles}")
+        if not 0 < self.target_ratio <= 1:
+            raise LODError(f"减面比例必须在 (0, 1] 范围内：{self.target_ratio}")
+
+
+@dataclass
+class MaterialTraits:
+    """
+    材质的光学特征（取自 Principled BSDF 等节点的输入值）
+    
+    属性:
+        emission: 发光强度
+        transmission: 透射权重
+        metallic: 金属度
+        roughness: 粗糙度
+    """
+    
+    emission: float = 0.0
+    transmission: float = 0.0
+    metallic: float = 0.0
+    roughness: float = 0.5
+    
+    def is_optical(self) -> bool:
+        """
+        是否为光学材质（发光、透射或镜面反射）
+        """
+        return (self.emission > 0 or
+                self.transmission >= TRANSMISSION_THRESHOLD or
+                (self.metallic >= REFLECTOR_METALLIC_THRESHOLD and
+                 self.roughness <= REFLECTOR_ROUGHNESS_THRESHOLD))
+
+
+@dataclass
+class LODReport:
+    """
+    灯具简化报告
+    
+    属性:
+        original_triangles: 简化前测量场景的三角形总数
+        measured_triangles: 简化后的三角形总数（减面对象按减面比例估算）
+        decimated_objects: 被减面的对象名称
+        optical_objects: 保持完整细节的光学对象名称
+    """
+    
+    original_triangles: int = 0
+    measured_triangles: int = 0
+    decimated_objects: List[str] = field(default_factory=list)
+    optical_objects: List[str] = field(default_factory=list)
+    
+    @property
+    def reduction(self) -> float:
+        """三角形减少比例（0-1）"""
+        if self.original_triangles == 0:
+            return 0.0
+        return 1.0 - self.measured_triangles / self.original_triangles
+    
+    def to_dict(self) -> dict:
+        """
+        转换为字典格式（写入 render_settings）
+        """
+        return {
+            'original_triangles': self.original_triangles,
+            'measured_triangles': self.measured_triangles,
+            'reduction': self.reduction,
+            'decimated_objects': list(self.decimated_objects),
+            'optical_objects': list(self.optical_objects)
+        }
+    
+    def __str__(self) -> str:
+        """
+        格式化报告为可读字符串
+        """
+        return (f"LODReport({self.original_triangles:,} → {self.measured_triangles:,} 三角形，"
+                f"减少 {self.reduction:.1%}，减面对象 {len(self.decimated_objects)} 个，"
+                f"光学对象 {len(self.optical_objects)} 个)")
+
+
+def is_optical_name(name: str) -> bool:
+    """
+    对象名称是否包含光学关键字
+    
+    参数:
+        name: 对象名称
+    
+    返回:
+        bool
+    """
+    lowered = name.lower()
+    return any(keyword in lowered for keyword in OPTICAL_NAME_KEYWORDS)
+
+
+def classify_object(name: str,
+                    materials: Sequence[MaterialTraits],
+                    triangle_count: int,
+                    settings: LODSettings) -> str:
+    """
+    对灯具对象分类
+    
+    参数:
+        name: 对象名称
+        materials: 对象各材质槽的光学特征
+        triangle_count: 三角形数
+        settings: 简化参数
+    
+    返回:
+        str: LOD_OPTICAL、LOD_DECIMATE 或 LOD_KEEP
+    """
+    if is_optical_name(name) or any(traits.is_optical() for traits in materials):
+        return LOD_OPTICAL
+    if triangle_count > settings.triangle_threshold:
+        return LOD_DECIMATE
+    return LOD_KEEP
+
+
+def calculate_decimate_ratio(triangle_count: int, settings: LODSettings) -> float:
+    """
+    计算对象的减面比例
+    
+    参数:
+        triangle_count: 三角形数
+        settings: 简化参数
+    
+    返回:
+        float: 保留的三角形比例，不低于 min_triangles / triangle_count
+    """
+    if triangle_count <= 0:
+        return 1.0
+    return min(1.0, max(settings.target_ratio, settings.min_triangles / triangle_count))
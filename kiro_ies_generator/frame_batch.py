@@ -0,0 +1,196 @@
+"""
+帧批量测量模块 (Frame Batch)
+
+对动画灯具（变焦、摇头、图案片等 DMX 状态做成关键帧）逐帧测量，每帧输出一个 IES。
+本模块只包含不依赖 bpy 的部分：帧序列、帧状态指纹、输出路径和批量报告。
+
+跳过未变化的帧：
+- 每帧记录灯具对象的变换、网格顶点（求值后）和光源参数，量化后计算指纹
+- 指纹与之前某个已测量帧相同时，直接复用该帧的光度学数据写出 IES，不再渲染
+"""
+
+from typing import List, Mapping, Optional
+from dataclasses import dataclass, field
+import hashlib
+import os
+import numpy as np
+
+
+# ============================================================================
+# 常量定义
+# ============================================================================
+
+# 指纹量化精度（小于该值的差异视为未变化，避免浮点噪声导致重复测量）
+FINGERPRINT_PRECISION = 1e-6
+
+# 帧号在输出文件名中的位数
+FRAME_NUMBER_DIGITS = 4
+
+
+class FrameBatchError(Exception):
+    """帧批量测量错误"""
+    pass
+
+
+@dataclass
+class FrameResult:
+    """
+    单帧的测量结果
+    
+    属性:
+        frame: 帧号
+        fingerprint: 帧状态指纹
+        ies_path: IES 输出路径
+        reused_from: 复用的已测量帧号（None 表示本帧实际渲染）
+        elapsed_time: 本帧耗时（秒）
+    """
+    
+    frame: int
+    fingerprint: str
+    ies_path: str
+    reused_from: Optional[int] = None
+    elapsed_time: float = 0.0
+    
+    def to_dict(self) -> dict:
+        """
+        转换为字典格式
+        """
+        return {
+            'frame': self.frame,
+            'fingerprint': self.fingerprint,
+            'ies_path': self.ies_path,
+            'reused_from': self.reused_from,
+            'elapsed_time': self.elapsed_time
+        }
+
+
+@dataclass
+class FrameBatchReport:
+    """
+    帧批量测量报告
+    
+    属性:
+        frames: 各帧结果（按帧号顺序）
+        elapsed_time: 总耗时（秒）
+    """
+    
+    frames: List[FrameResult] = field(default_factory=list)
+    elapsed_time: float = 0.0
+    
+    @property
+    def measured_frames(self) -> List[int]:
+        """实际渲染的帧号"""
+        return [result.frame for result in self.frames if result.reused_from is None]
+    
+    @property
+    def skipped_frames(self) -> List[int]:
+        """按指纹复用的帧号"""
+        return [result.frame for result in self.frames if result.reused_from is not None]
+    
+    def to_dict(self) -> dict:
+        """
+        转换为字典格式（写入批量清单 JSON）
+        """
+        return {
+            'frames': [result.to_dict() for result in self.frames],
+            'measured_frames': self.measured_frames,
+            'skipped_frames': self.skipped_frames,
+            'elapsed_time': self.elapsed_time
+        }
+    
+    def __str__(self) -> str:
+        """
+        格式化报告为可读字符串
+        """
+        return (f"FrameBatchReport({len(self.frames)} 帧，渲染 {len(self.measured_frames)} 帧，"
+                f"复用 {len(self.skipped_frames)} 帧，耗时 {self.elapsed_time:.1f} 秒)")
+
+
+def calculate_frame_numbers(frame_start: int, frame_end: int, frame_step: int = 1) -> List[int]:
+    """
+    计算要测量的帧号
+    
+    参数:
+        frame_start: 起始帧
+        frame_end: 结束帧（包含）
+        frame_step: 帧步长
+    
+    返回:
+        List[int]: 帧号列表
+    
+    异常:
+        FrameBatchError: 步长不为正或结束帧早于起始帧
+    """
+    if frame_step < 1:
+        raise FrameBatchError(f"帧步长必须为正整数：{frame_step}")
+    if frame_end < frame_start:
+        raise FrameBatchError(f"结束帧 {frame_end} 早于起始帧 {frame_start}")
+    return list(range(frame_start, frame_end + 1, frame_step))
+
+
+def fingerprint_frame_state(state: Mapping[str, object],
+                            precision: float = FINGERPRINT_PRECISION) -> str:
+    """
+    计算帧状态指纹
+    
+    参数:
+        state: 状态键（如 'Spot.matrix_world'）→ 数值（标量、序列或数组）或字符串
+        precision: 量化精度
+    
+    返回:
+        str: 十六进制 SHA-1 摘要，与键的插入顺序无关
+    """
+    digest = hashlib.sha1()
+    for key in sorted(state):
+        value = state[key]
+        digest.update(key.encode('utf-8'))
+        if isinstance(value, str):
+            digest.update(b'S' + value.encode('utf-8'))
+            continue
+        array = np.asarray(value, dtype=float)
+        quantized = np.round(array / precision).astype(np.int64)
+        digest.update(b'A' + str(array.shape).encode('ascii') + quantized.tobytes())
+    return digest.hexdigest()
+
+
+def get_frame_name(name: str, frame: int) -> str:
+    """
+    在名称后追加帧号（IES 灯具名称和输出文件名共用，保证两者一致）
+    
+    参数:
+        name: 灯具名称或不含扩展名的文件路径
+        frame: 帧号
+    
+    返回:
+        str: 如 fixture_f0012（帧号补零到 FRAME_NUMBER_DIGITS 位）
+    """
+    return f"{name}_f{frame:0{FRAME_NUMBER_DIGITS}d}"
+
+
+def get_frame_output_path(output_path: str, frame: int) -> str:
+    """
+    获取单帧的 IES 输出路径
+    
+    参数:
+        output_path: 批量任务的 IES 输出路径（如 fixture.ies）
+        frame: 帧号
+    
+    返回:
+        str: 帧号追加在文件名后（如 fixture_f0012.ies）
+    """
+    base, extension = os.path.splitext(output_path)
+    return f"{get_frame_name(base, frame)}{extension or '.ies'}"
+
+
+def get_frame_manifest_path(output_path: str) -> str:
+    """
+    获取批量清单（FrameBatchReport JSON）路径
+    
+    参数:
+        output_path: 批量任务的 IES 输出路径
+    
+    返回:
+        str: 如 fixture_frames.json
+    """
+    base_path = os.path.splitext(output_path)[0]
+    return f"{base_path}_frames.json"
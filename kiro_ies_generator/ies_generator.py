@@ -4,9 +4,41 @@ IES 生成器模块 (IES Generator)
 负责单位校准、坐标系转换和 IES 文件格式化。
 """
 
-from typing import List, Tuple, Dict
+from typing import Tuple, TextIO, Iterator, Callable
+from datetime import date
+import errno
+import io
 import numpy as np
-import math
+
+from .data_structures import SamplingResult, PhotometricData
+from .ies_parser import IESParseError, parse_ies
+from .photometry import integrate_flux
+
+
+# 默认灯具名称（与 UI 属性默认值一致）
+DEFAULT_FIXTURE_NAME = "Kiro Generated Fixture"
+
+# LM-63 规定每行不超过 256 个字符
+IES_MAX_LINE_LENGTH = 256
+
+# 数据块每行输出的数值个数（10 个 "%.2f" 数值约 100 个字符，远低于行长限制）
+IES_VALUES_PER_LINE = 10
+
+# 流式写入时每块包含的 C-Plane 数量（限制单次格式化的内存占用）
+IES_PLANES_PER_CHUNK = 16
+
+# 数值格式
+ANGLE_FORMAT = "%.1f"
+CANDELA_FORMAT = "%.2f"
+
+# 输出版本 → 格式标识行
+IES_FORMAT_VERSIONS = {
+    "LM-63-2002": "IESNA:LM-63-2002",
+    "LM-63-2019": "IES:LM-63-2019",
+}
+
+# 默认输出版本
+DEFAULT_IES_VERSION = "LM-63-2002"
 
 
 class CalibrationError(Exception):
@@ -14,48 +46,60 @@ class CalibrationError(Exception):
     pass
 
 
-def calibrate_to_candela(brightness_data: np.ndarray,
-                        total_lumens: float) -> np.ndarray:
+def calibrate_to_candela(sampling_result: SamplingResult,
+                        total_lumens: float,
+                        distance: float,
+                        fixture_name: str = DEFAULT_FIXTURE_NAME) -> PhotometricData:
     """
     将 Blender 渲染单位转换为坎德拉（cd）
     
     参数:
-        brightness_data: NumPy 数组，形状为 (n_points, 3)，每行为 [theta, phi, brightness]
+        sampling_result: 采样结果，亮度网格形状为 (N_theta, N_phi)
         total_lumens: 光源总流明值
+        distance: 测量距离（米）
+        fixture_name: 灯具名称
     
     返回:
-        校准后的数据，形状为 (n_points, 3)，每行为 [theta, phi, candela]
+        PhotometricData: 与采样结果共享角度向量的坎德拉网格
     
     校准原理：
-        1. 计算所有采样点的亮度总和
-        2. 计算校准因子：total_lumens / (brightness_sum * solid_angle_per_sample)
-        3. 将每个亮度值乘以校准因子得到坎德拉值
+        1. 按角度集合取得（缓存的）立体角求积权重 w(θ, φ)
+        2. 计算亮度的球面积分：Σ w × brightness
+        3. 计算校准因子：total_lumens / Σ w × brightness
+        4. 将每个亮度值乘以校准因子得到坎德拉值，使 Σ w × candela = total_lumens
     """
     if total_lumens <= 0:
         raise CalibrationError("总流明值必须大于 0")
     
-    if len(brightness_data) == 0:
-        raise CalibrationError("亮度数据不能为空")
+    brightness_values = sampling_result.luminance_data
     
-    # 提取亮度值
-    brightness_values = brightness_data[:, 2]
+    if brightness_values.size == 0:
+        raise CalibrationError("亮度数据不能为空")
     
-    # 计算亮度总和
-    brightness_sum = np.sum(brightness_values)
+    # 计算亮度的球面积分（权重按角度集合缓存，这里只是一次点积）
+    try:
+        brightness_flux = integrate_flux(
+            sampling_result.vertical_angles,
+            sampling_result.horizontal_angles,
+            brightness_values
+        )
+    except ValueError as e:
+        raise CalibrationError(f"无法计算立体角权重：{str(e)}")
     
-    if brightness_sum <= 0:
-        raise CalibrationError("亮度总和必须大于 0，请检查场景配置")
+    if brightness_flux <= 0:
+        raise CalibrationError("亮度积分必须大于 0，请检查场景配置")
     
     # 计算校准因子
-    # 简化版本：假设均匀分布
-    # 实际应该考虑立体角权重
-    calibration_factor = total_lumens / brightness_sum
-    
-    # 应用校准
-    calibrated_data = brightness_data.copy()
-    calibrated_data[:, 2] = brightness_values * calibration_factor
-    
-    return calibrated_data
+    calibration_factor = total_lumens / brightness_flux
+    
+    return PhotometricData(
+        vertical_angles=sampling_result.vertical_angles,
+        horizontal_angles=sampling_result.horizontal_angles,
+        candela_values=brightness_values * calibration_factor,
+        lumens=total_lumens,
+        distance=distance,
+        fixture_name=fixture_name
+    )
 
 
 def blender_to_ies_coordinates(blender_coords: Tuple[float, float, float]) -> Tuple[float, float, float]:
@@ -81,109 +125,296 @@ def blender_to_ies_coordinates(blender_coords: Tuple[float, float, float]) -> Tu
 
 def generate_ies_header(total_lumens: float,
                        num_vertical_angles: int,
-                       num_horizontal_angles: int) -> str:
+                       num_horizontal_angles: int,
+                       fixture_name: str = "Custom Fixture",
+                       version: str = DEFAULT_IES_VERSION) -> str:
     """
-    生成 IESNA LM-63-2002 文件头
+    生成 IESNA LM-63 文件头
     
     参数:
         total_lumens: 总流明值
         num_vertical_angles: 垂直角度数量
         num_horizontal_angles: 水平角度数量
+        fixture_name: 灯具名称（写入 [LUMINAIRE]）
+        version: 输出版本（'LM-63-2002' 或 'LM-63-2019'）
     
     返回:
         IES 文件头字符串
+    
+    异常:
+        ValueError: 不支持的输出版本
+    
+    说明:
+        LM-63-2019 额外要求 [TESTLAB] 和 [ISSUEDATE] 关键字，
+        生成信息写入 [FILEGENINFO]；灯具参数行与 LM-63-2002 相同。
     """
-    header = f"""IESNA:LM-63-2002
-[TEST] Kiro IES Generator
+    if version not in IES_FORMAT_VERSIONS:
+        raise ValueError(f"不支持的 IES 版本：{version}")
+    
+    if version == "LM-63-2019":
+        keywords = f"""[TEST] Kiro IES Generator
+[TESTLAB] Kiro
+[ISSUEDATE] {date.today().isoformat()}
 [MANUFAC] Kiro
 [LUMCAT] Generated
-[LUMINAIRE] Custom Fixture
+[LUMINAIRE] {fixture_name}
+[LAMP] LED
+[FILEGENINFO] Generated by Kiro IES Generator using Blender Cycles
+"""
+    else:
+        keywords = f"""[TEST] Kiro IES Generator
+[MANUFAC] Kiro
+[LUMCAT] Generated
+[LUMINAIRE] {fixture_name}
 [LAMPCAT] LED
 [LAMP] LED
 [MORE] Generated by Kiro IES Generator using Blender Cycles
-[TILT] NONE
+"""
+    
+    header = f"""{IES_FORMAT_VERSIONS[version]}
+{keywords}TILT=NONE
 1 {total_lumens:.1f} 1.0 {num_vertical_angles} {num_horizontal_angles} 1 1 1.0 1.0 0.0
 1.0 1.0 0.0
 """
     return header
 
 
-def format_ies_data(calibrated_data: np.ndarray) -> str:
+def build_line_format(count: int,
+                      value_format: str,
+                      values_per_line: int = IES_VALUES_PER_LINE) -> str:
     """
-    格式化 IES 数据部分
+    构建一次性格式化 count 个数值的模板字符串
     
     参数:
-        calibrated_data: 校准后的数据，形状为 (n_points, 3)，每行为 [theta, phi, candela]
+        count: 数值个数
+        value_format: 单个数值的 % 格式（如 "%.2f"）
+        values_per_line: 每行数值个数（LM-63 行长换行）
     
     返回:
-        格式化的 IES 数据字符串
+        str: 模板字符串，`template % tuple(values)` 即得到已换行的文本
+    
+    说明:
+        模板只需构建一次，之后每个 C-Plane 只做一次 C 层面的 % 格式化，
+        避免逐个数值的 Python 字符串拼接。
     """
-    # 提取唯一的角度值
-    theta_values = np.unique(calibrated_data[:, 0])
-    phi_values = np.unique(calibrated_data[:, 1])
+    if count <= 0:
+        return ""
     
-    # 排序（升序）
-    theta_values = np.sort(theta_values)
-    phi_values = np.sort(phi_values)
+    full_lines, remainder = divmod(count, values_per_line)
+    template = (" ".join([value_format] * values_per_line) + "\n") * full_lines
+    if remainder:
+        template += " ".join([value_format] * remainder) + "\n"
     
-    # 格式化角度列表
-    data_str = ""
+    return template
+
+
+def iter_ies_data_chunks(photometric_data: PhotometricData,
+                         planes_per_chunk: int = IES_PLANES_PER_CHUNK) -> Iterator[str]:
+    """
+    逐块生成 IES 数据部分的文本
     
-    # 垂直角度列表
-    for theta in theta_values:
-        data_str += f"{theta:.1f} "
-    data_str += "\n"
+    参数:
+        photometric_data: 光度学数据，坎德拉网格形状为 (N_theta, N_phi)
+        planes_per_chunk: 每块包含的 C-Plane 数量
     
-    # 水平角度列表
-    for phi in phi_values:
-        data_str += f"{phi:.1f} "
-    data_str += "\n"
+    生成:
+        str: 依次为垂直角度列表、水平角度列表、若干 C-Plane 坎德拉数据块
     
-    # 坎德拉值（按 C-Plane 格式组织）
-    # 对于每个水平角度，输出所有垂直角度的坎德拉值
-    for phi in phi_values:
-        for theta in theta_values:
-            # 查找对应的坎德拉值
-            mask = (calibrated_data[:, 0] == theta) & (calibrated_data[:, 1] == phi)
-            candela_values = calibrated_data[mask, 2]
-            
-            if len(candela_values) > 0:
-                candela = candela_values[0]
-            else:
-                candela = 0.0
-            
-            data_str += f"{candela:.2f} "
-        data_str += "\n"
+    说明:
+        每块只转置和格式化 planes_per_chunk 个 C-Plane，
+        内存占用与块大小成正比，而与整个网格大小无关。
+    """
+    theta_values = photometric_data.vertical_angles
+    phi_values = photometric_data.horizontal_angles
+    candela_values = photometric_data.candela_values
+    
+    yield build_line_format(len(theta_values), ANGLE_FORMAT) % tuple(theta_values.tolist())
+    yield build_line_format(len(phi_values), ANGLE_FORMAT) % tuple(phi_values.tolist())
+    
+    # 每个 C-Plane 即网格的一列；模板只构建一次
+    plane_format = build_line_format(len(theta_values), CANDELA_FORMAT)
+    num_planes = candela_values.shape[1]
+    
+    for start in range(0, num_planes, planes_per_chunk):
+        end = min(start + planes_per_chunk, num_planes)
+        # (N_theta, k) → (k, N_theta)，展平后按 C-Plane 顺序排列
+        chunk = candela_values[:, start:end].T.ravel().tolist()
+        yield (plane_format * (end - start)) % tuple(chunk)
+
+
+def iter_ies_chunks(photometric_data: PhotometricData,
+                    planes_per_chunk: int = IES_PLANES_PER_CHUNK,
+                    version: str = DEFAULT_IES_VERSION) -> Iterator[str]:
+    """
+    逐块生成完整的 IES 文件文本（文件头 + 数据）
+    
+    参数:
+        photometric_data: 校准后的光度学数据
+        planes_per_chunk: 每块包含的 C-Plane 数量
+        version: 输出版本（'LM-63-2002' 或 'LM-63-2019'）
     
-    return data_str
+    生成:
+        str: 文件头，随后为数据块
+    """
+    num_vertical_angles, num_horizontal_angles = photometric_data.get_data_shape()
+    
+    yield generate_ies_header(
+        photometric_data.lumens,
+        num_vertical_angles,
+        num_horizontal_angles,
+        photometric_data.fixture_name,
+        version
+    )
+    yield from iter_ies_data_chunks(photometric_data, planes_per_chunk)
 
 
-def generate_ies_file(calibrated_data: np.ndarray,
-                     total_lumens: float) -> str:
+def write_ies_data(photometric_data: PhotometricData, stream: TextIO) -> None:
     """
-    从校准数据生成完整的 IES 文件内容
+    将 IES 数据部分直接写入文本流
     
     参数:
-        calibrated_data: 校准后的数据，形状为 (n_points, 3)，每行为 [theta, phi, candela]
-        total_lumens: 总流明值
+        photometric_data: 光度学数据，坎德拉网格形状为 (N_theta, N_phi)
+        stream: 文本流（如 io.StringIO 或以文本模式打开的文件）
+    
+    输出顺序:
+        1. 垂直角度列表
+        2. 水平角度列表
+        3. 每个水平角度（C-Plane）一组完整的垂直角度坎德拉值
+    """
+    for chunk in iter_ies_data_chunks(photometric_data):
+        stream.write(chunk)
+
+
+def write_ies(photometric_data: PhotometricData, stream: TextIO) -> None:
+    """
+    将完整的 IES 文件（文件头 + 数据）写入文本流
+    
+    参数:
+        photometric_data: 校准后的光度学数据
+        stream: 文本流
+    """
+    for chunk in iter_ies_chunks(photometric_data):
+        stream.write(chunk)
+
+
+def stream_ies(photometric_data: PhotometricData,
+               stream,
+               encoding: str = "utf-8",
+               planes_per_chunk: int = IES_PLANES_PER_CHUNK,
+               version: str = DEFAULT_IES_VERSION) -> int:
+    """
+    将 IES 文件逐块写入任意文本流、二进制流或套接字
+    
+    参数:
+        photometric_data: 校准后的光度学数据
+        stream: 输出目标，支持：
+            - 文本流（io.TextIOBase，如 sys.stdout、文本模式文件）
+            - 二进制流（二进制模式文件、管道、gzip/zip 成员等）
+            - 套接字（具有 sendall 方法的对象）
+        encoding: 写入二进制流或套接字时使用的编码
+        planes_per_chunk: 每块包含的 C-Plane 数量
+        version: 输出版本（'LM-63-2002' 或 'LM-63-2019'）
     
     返回:
-        完整的 IES 文件内容字符串
+        int: 写入的字符数（文本流）或字节数（二进制流/套接字）
+    
+    异常:
+        TypeError: 无法识别的输出目标
+        BlockingIOError: 非阻塞的原始流（io.RawIOBase）暂时不可写
+    """
+    write = _get_stream_writer(stream, encoding)
+    
+    written = 0
+    for chunk in iter_ies_chunks(photometric_data, planes_per_chunk, version):
+        written += write(chunk)
+    
+    return written
+
+
+def _get_stream_writer(stream, encoding: str) -> Callable[[str], int]:
+    """
+    根据输出目标类型返回写入函数
+    
+    参数:
+        stream: 文本流、二进制流或套接字
+        encoding: 二进制输出使用的编码
+    
+    返回:
+        写入函数 write(text) -> 写入的字符数或字节数
+    """
+    if isinstance(stream, io.TextIOBase):
+        def write_text(text: str) -> int:
+            stream.write(text)
+            return len(text)
+        return write_text
+    
+    if hasattr(stream, "sendall"):
+        def write_socket(text: str) -> int:
+            data = text.encode(encoding)
+            stream.sendall(data)
+            return len(data)
+        return write_socket
+    
+    if isinstance(stream, io.RawIOBase):
+        # 原始流可能只写入部分字节，需要循环写完；
+        # 非阻塞流暂时不可写时 write 返回 None，不能原地重试（会空转）
+        def write_raw(text: str) -> int:
+            data = text.encode(encoding)
+            view = memoryview(data)
+            while view:
+                count = stream.write(view)
+                if count is None:
+                    raise BlockingIOError(errno.EAGAIN, "非阻塞输出流暂时不可写，请使用阻塞流或 io.BufferedWriter",
+                                          len(data) - len(view))
+                view = view[count:]
+            return len(data)
+        return write_raw
+    
+    if isinstance(stream, io.BufferedIOBase) or "b" in getattr(stream, "mode", ""):
+        def write_binary(text: str) -> int:
+            data = text.encode(encoding)
+            stream.write(data)
+            return len(data)
+        return write_binary
+    
+    if hasattr(stream, "write"):
+        # 未知类型的类文件对象：按文本流处理
+        def write_unknown(text: str) -> int:
+            stream.write(text)
+            return len(text)
+        return write_unknown
+    
+    raise TypeError(f"无法写入 IES 数据：不支持的输出目标类型 {type(stream).__name__}")
+
+
+def format_ies_data(photometric_data: PhotometricData) -> str:
     """
-    # 计算角度数量
-    num_vertical_angles = len(np.unique(calibrated_data[:, 0]))
-    num_horizontal_angles = len(np.unique(calibrated_data[:, 1]))
+    格式化 IES 数据部分
     
-    # 生成文件头
-    header = generate_ies_header(total_lumens, num_vertical_angles, num_horizontal_angles)
+    参数:
+        photometric_data: 光度学数据，坎德拉网格形状为 (N_theta, N_phi)
     
-    # 格式化数据
-    data = format_ies_data(calibrated_data)
+    返回:
+        格式化的 IES 数据字符串
+    """
+    buffer = io.StringIO()
+    write_ies_data(photometric_data, buffer)
+    return buffer.getvalue()
+
+
+def generate_ies_file(photometric_data: PhotometricData) -> str:
+    """
+    从光度学数据生成完整的 IES 文件内容
     
-    # 组合
-    ies_content = header + data
+    参数:
+        photometric_data: 校准后的光度学数据
     
-    return ies_content
+    返回:
+        完整的 IES 文件内容字符串
+    """
+    buffer = io.StringIO()
+    write_ies(photometric_data, buffer)
+    return buffer.getvalue()
 
 
 def validate_ies_compliance(ies_content: str) -> bool:
@@ -194,16 +425,33 @@ def validate_ies_compliance(ies_content: str) -> bool:
         ies_content: IES 文件内容
     
     返回:
-        True 如果符合 LM-63-2002 标准
+        True 如果符合 LM-63-2002 或 LM-63-2019 标准
+    
+    检查项:
+        1. 格式标识行和必需的关键字
+        2. 文件能被完整解析（TILT 行、灯具参数、角度和坎德拉数据数量一致）
+        3. 角度单调递增，坎德拉值非负
     """
     # 基本验证
-    if not ies_content.startswith("IESNA:LM-63"):
+    if not ies_content.startswith(("IESNA:LM-63", "IES:LM-63")):
+        return False
+    
+    try:
+        data = parse_ies(ies_content)
+    except IESParseError:
         return False
     
     # 检查必需的关键字
-    required_keywords = ["[TEST]", "[MANUFAC]", "[LUMCAT]", "[TILT]"]
+    required_keywords = ["TEST", "MANUFAC", "LUMCAT"]
     for keyword in required_keywords:
-        if keyword not in ies_content:
+        if keyword not in data.keywords:
             return False
     
+    # 检查角度顺序和坎德拉值
+    if np.any(np.diff(data.vertical_angles) <= 0) or np.any(np.diff(data.horizontal_angles) <= 0):
+        return False
+    
+    if np.any(data.candela_values < 0):
+        return False
+    
     return True
@@ -0,0 +1,329 @@
+"""
+IES 解析器模块 (IES Parser)
+
+负责读取 IESNA LM-63 光度学文件并转换为 PhotometricData。
+用于验证本插件输出的往返一致性，以及导入厂商提供的 IES 文件进行对比。
+
+支持的格式：
+- LM-63-1986（无格式标识行）
+- LM-63-1991（IESNA91）
+- LM-63-1995（IESNA:LM-63-1995）
+- LM-63-2002（IESNA:LM-63-2002）
+- LM-63-2019（IES:LM-63-2019）
+
+解析方法：
+- 关键字块逐行解析（[KEYWORD] value，[MORE] 续行）
+- TILT 行之后的数值块一次性分词，交给 NumPy 转换为浮点数组
+"""
+
+from typing import List, Dict, Tuple, Optional
+import os
+import re
+import numpy as np
+
+from .data_structures import PhotometricData
+from .photometry import integrate_flux
+
+
+# ============================================================================
+# 常量定义
+# ============================================================================
+
+# 格式标识行 → 标准版本
+FORMAT_IDENTIFIERS = {
+    "IESNA91": "LM-63-1991",
+    "IESNA:LM-63-1995": "LM-63-1995",
+    "IESNA:LM-63-2002": "LM-63-2002",
+    "IES:LM-63-2019": "LM-63-2019",
+}
+
+# 没有格式标识行的文件视为 LM-63-1986
+LEGACY_FORMAT = "LM-63-1986"
+
+# IES 文件不记录测量距离，导入时使用与预设一致的默认值（米）
+DEFAULT_DISTANCE = 5.0
+
+# 支持的光度类型（1 = C 型，2 = B 型，3 = A 型）
+PHOTOMETRIC_TYPE_C = 1
+
+# TILT 行之后、角度列表之前的数值个数（10 个灯具参数 + 3 个电气参数）
+HEADER_VALUE_COUNT = 13
+
+_KEYWORD_PATTERN = re.compile(r"^\[([^\]]+)\]\s*(.*)$")
+
+
+class IESParseError(Exception):
+    """IES 解析错误"""
+    pass
+
+
+# ============================================================================
+# 主解析函数
+# ============================================================================
+
+def parse_ies(content: str,
+              distance: float = DEFAULT_DISTANCE,
+              fixture_name: Optional[str] = None) -> PhotometricData:
+    """
+    解析 IES 文件内容
+    
+    参数:
+        content: IES 文件文本
+        distance: 测量距离（米），IES 文件本身不包含此信息
+        fixture_name: 灯具名称（可选），默认取 [LUMINAIRE] 或 [LUMCAT]
+    
+    返回:
+        PhotometricData: 坎德拉网格形状为 (N_theta, N_phi)，
+            keywords 保存关键字块，tilt 保存 TILT 数据
+    
+    异常:
+        IESParseError: 文件格式错误或数值数据不完整
+    """
+    lines = content.splitlines()
+    if not lines:
+        raise IESParseError("IES 文件内容为空")
+    
+    # 格式标识行（LM-63-1986 没有此行）
+    start = 1 if detect_ies_format(lines[0]) != LEGACY_FORMAT else 0
+    
+    keywords, tilt_value, data_start = _parse_keyword_block(lines, start)
+    
+    # 数值块一次性分词
+    try:
+        tokens = np.array(" ".join(lines[data_start:]).replace(",", " ").split(), dtype=float)
+    except ValueError as e:
+        raise IESParseError(f"数值数据格式错误：{str(e)}")
+    
+    tilt, offset = _parse_tilt(tilt_value, tokens)
+    
+    if len(tokens) < offset + HEADER_VALUE_COUNT:
+        raise IESParseError("灯具参数行不完整")
+    
+    (num_lamps, lumens_per_lamp, multiplier, num_vertical, num_horizontal,
+     photometric_type) = tokens[offset:offset + 6]
+    offset += HEADER_VALUE_COUNT
+    
+    if int(photometric_type) != PHOTOMETRIC_TYPE_C:
+        raise IESParseError(f"仅支持 C 型光度数据（当前光度类型: {int(photometric_type)}）")
+    
+    num_vertical = int(num_vertical)
+    num_horizontal = int(num_horizontal)
+    if num_vertical <= 0 or num_horizontal <= 0:
+        raise IESParseError(f"角度数量无效：{num_vertical} × {num_horizontal}")
+    
+    expected = offset + num_vertical + num_horizontal + num_vertical * num_horizontal
+    if len(tokens) < expected:
+        raise IESParseError(
+            f"数值数据不完整：需要 {expected - offset} 个数值，实际 {len(tokens) - offset} 个"
+        )
+    
+    vertical_angles = tokens[offset:offset + num_vertical].copy()
+    offset += num_vertical
+    horizontal_angles = tokens[offset:offset + num_horizontal].copy()
+    offset += num_horizontal
+    
+    # 文件按 C-Plane 排列：(N_phi, N_theta) → 网格 (N_theta, N_phi)
+    candela_values = (
+        tokens[offset:offset + num_vertical * num_horizontal]
+        .reshape(num_horizontal, num_vertical).T * multiplier
+    )
+    
+    # 绝对光度（流明为 -1）时由坎德拉分布估算总光通量
+    if lumens_per_lamp > 0:
+        lumens = float(num_lamps * lumens_per_lamp)
+    else:
+        try:
+            lumens = integrate_flux(vertical_angles, horizontal_angles, candela_values)
+        except ValueError as e:
+            raise IESParseError(f"无法估算总光通量：{str(e)}")
+    
+    if fixture_name is None:
+        fixture_name = keywords.get("LUMINAIRE") or keywords.get("LUMCAT") or "Imported Fixture"
+    
+    return PhotometricData(
+        vertical_angles=vertical_angles,
+        horizontal_angles=horizontal_angles,
+        candela_values=np.ascontiguousarray(candela_values),
+        lumens=lumens,
+        distance=distance,
+        fixture_name=fixture_name,
+        keywords=keywords,
+        tilt=tilt
+    )
+
+
+def read_ies_file(file_path: str, distance: float = DEFAULT_DISTANCE) -> PhotometricData:
+    """
+    读取并解析 IES 文件
+    
+    参数:
+        file_path: IES 文件路径
+        distance: 测量距离（米）
+    
+    返回:
+        PhotometricData: 解析结果；未提供灯具名称时使用文件名
+    
+    异常:
+        IESParseError: 文件无法读取或格式错误
+    
+    注意:
+        厂商文件常用 Windows-1252 等单字节编码，UTF-8 解码失败时回退为 latin-1
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+    except OSError as e:
+        raise IESParseError(f"读取 IES 文件失败：{str(e)}")
+    
+    try:
+        content = raw.decode('utf-8')
+    except UnicodeDecodeError:
+        content = raw.decode('latin-1')
+    
+    data = parse_ies(content, distance=distance)
+    if not (data.keywords.get("LUMINAIRE") or data.keywords.get("LUMCAT")):
+        data.fixture_name = os.path.splitext(os.path.basename(file_path))[0]
+    
+    return data
+
+
+def read_ies_files(file_paths: List[str],
+                   distance: float = DEFAULT_DISTANCE) -> Dict[str, PhotometricData]:
+    """
+    批量读取 IES 文件（如厂商光度库）
+    
+    参数:
+        file_paths: IES 文件路径列表
+        distance: 测量距离（米）
+    
+    返回:
+        Dict[str, PhotometricData]: 文件路径 → 解析结果
+    
+    异常:
+        IESParseError: 任一文件解析失败（消息中包含文件路径）
+    """
+    results = {}
+    for file_path in file_paths:
+        try:
+            results[file_path] = read_ies_file(file_path, distance)
+        except IESParseError as e:
+            raise IESParseError(f"{file_path}: {str(e)}")
+    return results
+
+
+def detect_ies_format(first_line: str) -> str:
+    """
+    根据第一行识别 LM-63 版本
+    
+    参数:
+        first_line: 文件第一行
+    
+    返回:
+        str: 标准版本（如 'LM-63-2002'），无标识行时返回 'LM-63-1986'
+    """
+    identifier = first_line.strip().upper()
+    for key, version in FORMAT_IDENTIFIERS.items():
+        if identifier.startswith(key):
+            return version
+    return LEGACY_FORMAT
+
+
+# ============================================================================
+# 辅助函数
+# ============================================================================
+
+def _parse_keyword_block(lines: List[str], start: int) -> Tuple[Dict[str, str], str, int]:
+    """
+    解析关键字块，直到 TILT 行
+    
+    参数:
+        lines: 文件行列表
+        start: 关键字块起始行索引
+    
+    返回:
+        (keywords, tilt_value, data_start)
+            - keywords: 关键字字典（[MORE] 续行合并到前一个关键字）
+            - tilt_value: TILT 值（'NONE'、'INCLUDE' 或文件名）
+            - data_start: 数值块起始行索引
+    
+    异常:
+        IESParseError: 缺少 TILT 行
+    """
+    keywords = {}
+    last_keyword = None
+    
+    for index in range(start, len(lines)):
+        line = lines[index].strip()
+        if not line:
+            continue
+        
+        if line.upper().startswith("TILT="):
+            return keywords, line[5:].strip(), index + 1
+        
+        match = _KEYWORD_PATTERN.match(line)
+        if not match:
+            # 1986 格式允许无关键字的自由文本行
+            keywords.setdefault("TEXT", "")
+            keywords["TEXT"] = (keywords["TEXT"] + "\n" + line).strip()
+            continue
+        
+        keyword, value = match.group(1).strip().upper(), match.group(2).strip()
+        
+        # 早期版本的本插件输出使用 "[TILT] NONE"，按 TILT 行处理
+        if keyword == "TILT":
+            return keywords, value, index + 1
+        
+        if keyword == "MORE" and last_keyword is not None:
+            keywords[last_keyword] = keywords[last_keyword] + "\n" + value
+            continue
+        
+        keywords[keyword] = value
+        last_keyword = keyword
+    
+    raise IESParseError("缺少 TILT 行")
+
+
+def _parse_tilt(tilt_value: str, tokens: np.ndarray) -> Tuple[Optional[Dict], int]:
+    """
+    解析 TILT 数据
+    
+    参数:
+        tilt_value: TILT= 之后的值
+        tokens: 数值块分词结果
+    
+    返回:
+        (tilt, offset)
+            - tilt: None（TILT=NONE），或字典：
+                {
+                    'type': 'INCLUDE' 或 'FILE',
+                    'filename': str,                  # 仅 FILE
+                    'lamp_to_luminaire_geometry': int, # 仅 INCLUDE
+                    'angles': np.ndarray,             # 仅 INCLUDE
+                    'factors': np.ndarray             # 仅 INCLUDE
+                }
+            - offset: 灯具参数在 tokens 中的起始位置
+    """
+    upper = tilt_value.upper()
+    
+    if upper == "NONE":
+        return None, 0
+    
+    if upper != "INCLUDE":
+        # 外部 TILT 文件：只记录文件名
+        return {'type': 'FILE', 'filename': tilt_value}, 0
+    
+    if len(tokens) < 2:
+        raise IESParseError("TILT=INCLUDE 数据不完整")
+    
+    geometry = int(tokens[0])
+    count = int(tokens[1])
+    if len(tokens) < 2 + 2 * count:
+        raise IESParseError("TILT=INCLUDE 角度或系数数据不完整")
+    
+    tilt = {
+        'type': 'INCLUDE',
+        'lamp_to_luminaire_geometry': geometry,
+        'angles': tokens[2:2 + count].copy(),
+        'factors': tokens[2 + count:2 + 2 * count].copy()
+    }
+    return tilt, 2 + 2 * count
@@ -0,0 +1,542 @@
+"""
+任务服务器模块 (Job Server)
+
+常驻的后台 Blender 进程，保持插件已加载，通过共享的任务目录（spool）接收测量任务，
+省去每个任务启动 Blender 和载入 .blend 的开销。
+
+任务目录结构：
+    <spool>/incoming/<job_id>.json   待处理的请求（客户端先写 .tmp 再改名，保证原子性）
+    <spool>/running/<job_id>.json    服务器已认领的请求（改名认领，多个服务器可共用一个目录）
+    <spool>/done/<job_id>.json       响应
+    <spool>/events/<job_id>.jsonl    进度事件（JSON Lines，格式同 cli）
+    <spool>/stop                     存在时服务器处理完当前任务后退出
+
+请求（JSON）：
+    {"job_id": "a1b2", "blend": "/path/fixture.blend", "output_dir": "/out",
+     "options": {"mode": "single", "preset": "preview", "lumens": 1200, ...}}
+    options 的键与 cli 参数对应（--sensor-denoise → "sensor_denoise"），由 cli 统一校验
+
+响应（JSON）：
+    {"job_id": "a1b2", "status": "done" | "failed", "outputs": [...], "error": null,
+     "elapsed_time": 12.3, "blend_cache_hit": true}
+
+.blend 缓存：Blender 同时只能打开一个主文件，服务器记住当前打开的文件和修改时间，
+连续处理同一文件的任务时不再重新载入，并优先认领与当前文件相同的待处理任务。
+
+启动服务器（需要在 Blender 中运行）：
+    blender -b --python-expr "import sys; from kiro_ies_generator import job_server; sys.exit(job_server.main())" \\
+        -- --spool /jobs
+
+本模块除 BlenderJobHandler 和 main 外不依赖 bpy，可以用替身处理函数测试。
+"""
+
+from typing import Callable, Dict, List, Optional
+from dataclasses import dataclass, field
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+
+from .cli import CliError, JsonEventWriter, parse_arguments, plan_jobs, split_blender_argv
+from .output_manager import write_json_atomic
+
+
+# ============================================================================
+# 常量定义
+# ============================================================================
+
+# 任务目录的子目录
+SPOOL_INCOMING = 'incoming'
+SPOOL_RUNNING = 'running'
+SPOOL_DONE = 'done'
+SPOOL_EVENTS = 'events'
+
+# 停止标记文件名
+SPOOL_STOP_FILE = 'stop'
+
+# 响应状态
+JOB_STATUS_DONE = 'done'
+JOB_STATUS_FAILED = 'failed'
+
+# 默认轮询间隔（秒）
+DEFAULT_POLL_INTERVAL = 0.5
+
+
+class JobServerError(Exception):
+    """任务服务器错误"""
+    pass
+
+
+class JobSchemaError(JobServerError):
+    """任务请求格式错误"""
+    pass
+
+
+@dataclass
+class JobRequest:
+    """
+    测量任务请求
+    
+    属性:
+        job_id: 任务 ID（文件名安全的字符串）
+        blend: .blend 路径（None 表示服务器当前打开的文件）
+        output_dir: 输出目录
+        options: cli 参数（键为参数名去掉 -- 并把 - 换成 _）
+    """
+    
+    job_id: str
+    blend: Optional[str]
+    output_dir: str
+    options: Dict = field(default_factory=dict)
+    
+    def to_dict(self) -> dict:
+        """
+        转换为字典格式（请求 JSON）
+        """
+        return {
+            'job_id': self.job_id,
+            'blend': self.blend,
+            'output_dir': self.output_dir,
+            'options': dict(self.options)
+        }
+    
+    def to_cli_arguments(self) -> List[str]:
+        """
+        转换为 cli 参数列表
+        
+        返回:
+            List[str]: 如 ['a.blend', '--output-dir', 'out', '--sensor-denoise']；
+                布尔选项为真时只写参数名，为假或 None 时省略，列表展开为多个值
+        """
+        arguments = [self.blend] if self.blend is not None else []
+        arguments += ['--output-dir', self.output_dir]
+        for key, value in self.options.items():
+            flag = '--' + key.replace('_', '-')
+            if value is None or value is False:
+                continue
+            if value is True:
+                arguments.append(flag)
+            elif isinstance(value, (list, tuple)):
+                arguments += [flag] + [str(item) for item in value]
+            else:
+                arguments += [flag, str(value)]
+        return arguments
+
+
+@dataclass
+class JobResponse:
+    """
+    测量任务响应
+    
+    属性:
+        job_id: 任务 ID
+        status: JOB_STATUS_DONE 或 JOB_STATUS_FAILED
+        outputs: 输出文件路径
+        error: 失败原因
+        elapsed_time: 耗时（秒）
+        blend_cache_hit: 是否复用了已打开的 .blend
+    """
+    
+    job_id: str
+    status: str
+    outputs: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    elapsed_time: float = 0.0
+    blend_cache_hit: bool = False
+    
+    def to_dict(self) -> dict:
+        """
+        转换为字典格式（响应 JSON）
+        """
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'outputs': list(self.outputs),
+            'error': self.error,
+            'elapsed_time': self.elapsed_time,
+            'blend_cache_hit': self.blend_cache_hit
+        }
+    
+    @staticmethod
+    def from_dict(data: dict) -> 'JobResponse':
+        """
+        从响应 JSON 创建
+        """
+        return JobResponse(
+            job_id=data['job_id'],
+            status=data['status'],
+            outputs=list(data.get('outputs', [])),
+            error=data.get('error'),
+            elapsed_time=data.get('elapsed_time', 0.0),
+            blend_cache_hit=data.get('blend_cache_hit', False)
+        )
+
+
+def parse_job_request(data: dict) -> JobRequest:
+    """
+    解析并校验请求 JSON
+    
+    参数:
+        data: 请求字典
+    
+    返回:
+        JobRequest
+    
+    异常:
+        JobSchemaError: 缺少字段、字段类型错误、任务 ID 不安全，或 options 不是合法的 cli 参数
+    """
+    if not isinstance(data, dict):
+        raise JobSchemaError("请求必须是 JSON 对象")
+    
+    job_id = data.get('job_id')
+    if not isinstance(job_id, str) or not job_id or os.path.basename(job_id) != job_id or job_id.startswith('.'):
+        raise JobSchemaError(f"job_id 必须是非空且不含路径的字符串：{job_id!r}")
+    
+    blend = data.get('blend')
+    if blend is not None and not isinstance(blend, str):
+        raise JobSchemaError(f"blend 必须是字符串或 null：{blend!r}")
+    
+    output_dir = data.get('output_dir')
+    if not isinstance(output_dir, str) or not output_dir:
+        raise JobSchemaError("缺少 output_dir")
+    
+    options = data.get('options', {})
+    if not isinstance(options, dict):
+        raise JobSchemaError("options 必须是 JSON 对象")
+    for key in ('output_dir', 'events', 'blend_files'):
+        if key in options:
+            raise JobSchemaError(f"options 不能包含 {key}")
+    
+    request = JobRequest(job_id=job_id, blend=blend, output_dir=output_dir, options=options)
+    try:
+        parse_arguments(request.to_cli_arguments())
+    except CliError as e:
+        raise JobSchemaError(str(e)) from e
+    return request
+
+
+# ============================================================================
+# 任务目录
+# ============================================================================
+
+class SpoolDirectory:
+    """
+    任务目录（客户端和服务器共用）
+    
+    参数:
+        root: 任务目录路径（不存在时创建）
+    """
+    
+    def __init__(self, root: str):
+        self.root = root
+        for name in (SPOOL_INCOMING, SPOOL_RUNNING, SPOOL_DONE, SPOOL_EVENTS):
+            os.makedirs(os.path.join(root, name), exist_ok=True)
+    
+    def path(self, folder: str, job_id: str, extension: str = '.json') -> str:
+        """
+        获取任务文件路径
+        """
+        return os.path.join(self.root, folder, f"{job_id}{extension}")
+    
+    # ------------------------------------------------------------------
+    # 客户端
+    # ------------------------------------------------------------------
+    
+    def submit(self, blend: Optional[str], output_dir: str,
+               options: Optional[Dict] = None, job_id: Optional[str] = None) -> str:
+        """
+        提交任务
+        
+        参数:
+            blend: .blend 路径（None 表示服务器当前打开的文件）
+            output_dir: 输出目录
+            options: cli 参数
+            job_id: 任务 ID（可选，默认随机生成）
+        
+        返回:
+            str: 任务 ID
+        
+        异常:
+            JobSchemaError: 请求无效（提交前校验，避免服务器收到坏请求）
+            JobServerError: 任务 ID 已存在
+        """
+        request = parse_job_request({
+            'job_id': job_id or uuid.uuid4().hex,
+            'blend': blend,
+            'output_dir': output_dir,
+            'options': options or {}
+        })
+        if any(os.path.exists(self.path(folder, request.job_id))
+               for folder in (SPOOL_INCOMING, SPOOL_RUNNING, SPOOL_DONE)):
+            raise JobServerError(f"任务 ID 已存在：{request.job_id}")
+        
+        write_json_atomic(self.path(SPOOL_INCOMING, request.job_id), request.to_dict())
+        return request.job_id
+    
+    def read_response(self, job_id: str) -> Optional[JobResponse]:
+        """
+        读取任务响应
+        
+        返回:
+            JobResponse，任务未完成时为 None
+        """
+        path = self.path(SPOOL_DONE, job_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return JobResponse.from_dict(json.load(f))
+    
+    def wait_for_response(self, job_id: str, timeout: Optional[float] = None,
+                          poll_interval: float = DEFAULT_POLL_INTERVAL) -> JobResponse:
+        """
+        等待任务完成
+        
+        参数:
+            job_id: 任务 ID
+            timeout: 超时（秒，None 表示一直等待）
+            poll_interval: 轮询间隔（秒）
+        
+        返回:
+            JobResponse
+        
+        异常:
+            JobServerError: 超时
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            response = self.read_response(job_id)
+            if response is not None:
+                return response
+            if deadline is not None and time.monotonic() >= deadline:
+                raise JobServerError(f"等待任务 {job_id} 超时（{timeout} 秒）")
+            time.sleep(poll_interval)
+    
+    def request_stop(self):
+        """
+        请求服务器在处理完当前任务后退出
+        """
+        open(os.path.join(self.root, SPOOL_STOP_FILE), 'w').close()
+    
+    # ------------------------------------------------------------------
+    # 服务器
+    # ------------------------------------------------------------------
+    
+    def stop_requested(self) -> bool:
+        """是否存在停止标记"""
+        return os.path.exists(os.path.join(self.root, SPOOL_STOP_FILE))
+    
+    def pending_jobs(self) -> List[str]:
+        """
+        待处理的任务 ID（按提交时间排序）
+        """
+        folder = os.path.join(self.root, SPOOL_INCOMING)
+        entries = []
+        for name in os.listdir(folder):
+            if not name.endswith('.json'):
+                continue
+            try:
+                entries.append((os.path.getmtime(os.path.join(folder, name)), name[:-len('.json')]))
+            except FileNotFoundError:
+                continue
+        return [job_id for _, job_id in sorted(entries)]
+    
+    def claim(self, job_id: str) -> Optional[dict]:
+        """
+        认领任务（改名到 running），已被其他服务器认领时返回 None
+        
+        返回:
+            dict: 请求 JSON
+        """
+        running_path = self.path(SPOOL_RUNNING, job_id)
+        try:
+            os.replace(self.path(SPOOL_INCOMING, job_id), running_path)
+        except FileNotFoundError:
+            return None
+        with open(running_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def complete(self, response: JobResponse):
+        """
+        写入响应并移除 running 中的请求
+        """
+        write_json_atomic(self.path(SPOOL_DONE, response.job_id), response.to_dict())
+        try:
+            os.remove(self.path(SPOOL_RUNNING, response.job_id))
+        except FileNotFoundError:
+            pass
+
+
+# ============================================================================
+# 服务器
+# ============================================================================
+
+# 任务处理函数：handler(request, progress_callback) -> (outputs, blend_cache_hit)
+JobHandler = Callable[[JobRequest, Callable[[int, int], None]], tuple]
+
+
+class JobServer:
+    """
+    任务服务器
+    
+    参数:
+        spool: 任务目录
+        handler: 任务处理函数（Blender 中使用 BlenderJobHandler，测试中使用替身）
+        poll_interval: 没有任务时的轮询间隔（秒）
+    """
+    
+    def __init__(self, spool: SpoolDirectory, handler: JobHandler,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.spool = spool
+        self.handler = handler
+        self.poll_interval = poll_interval
+    
+    def serve_once(self) -> Optional[JobResponse]:
+        """
+        认领并处理一个任务
+        
+        返回:
+            JobResponse，没有待处理任务时为 None
+        
+        说明:
+            处理函数有 current_blend 属性时，优先认领与当前打开文件相同的任务
+        """
+        pending = self.spool.pending_jobs()
+        current_blend = getattr(self.handler, 'current_blend', None)
+        if current_blend is not None:
+            pending.sort(key=lambda job_id: self._job_blend(job_id) != current_blend)
+        
+        for job_id in pending:
+            data = self.spool.claim(job_id)
+            if data is not None:
+                return self._process(job_id, data)
+        return None
+    
+    def serve_forever(self, idle_timeout: Optional[float] = None) -> int:
+        """
+        持续处理任务，直到出现停止标记或空闲超时
+        
+        参数:
+            idle_timeout: 连续没有任务的最长时间（秒，None 表示不超时）
+        
+        返回:
+            int: 处理的任务数
+        """
+        processed = 0
+        idle_since = time.monotonic()
+        while not self.spool.stop_requested():
+            if self.serve_once() is not None:
+                processed += 1
+                idle_since = time.monotonic()
+                continue
+            if idle_timeout is not None and time.monotonic() - idle_since >= idle_timeout:
+                break
+            time.sleep(self.poll_interval)
+        return processed
+    
+    def _job_blend(self, job_id: str) -> Optional[str]:
+        """
+        读取待处理任务的 .blend 路径（读取失败时为 None）
+        """
+        try:
+            with open(self.spool.path(SPOOL_INCOMING, job_id), 'r', encoding='utf-8') as f:
+                blend = json.load(f).get('blend')
+        except (OSError, ValueError):
+            return None
+        return os.path.abspath(blend) if blend else None
+    
+    def _process(self, job_id: str, data: dict) -> JobResponse:
+        """
+        处理已认领的任务
+        """
+        start_time = time.time()
+        response = JobResponse(job_id=job_id, status=JOB_STATUS_FAILED)
+        
+        with open(self.spool.path(SPOOL_EVENTS, job_id, '.jsonl'), 'w', encoding='utf-8') as stream:
+            writer = JsonEventWriter(stream)
+            writer.emit('job_start', job=job_id, blend=data.get('blend') if isinstance(data, dict) else None)
+            try:
+                request = parse_job_request(data)
+                outputs, cache_hit = self.handler(request, writer.progress_callback(job_id))
+                response.status = JOB_STATUS_DONE
+                response.outputs = list(outputs)
+                response.blend_cache_hit = bool(cache_hit)
+                writer.emit('job_done', job=job_id, outputs=response.outputs)
+            except Exception as e:
+                response.error = str(e)
+                writer.emit('job_failed', job=job_id, error=response.error)
+        
+        response.elapsed_time = time.time() - start_time
+        self.spool.complete(response)
+        return response
+
+
+class BlenderJobHandler:
+    """
+    在 Blender 中运行任务的处理函数，缓存当前打开的 .blend
+    
+    属性:
+        current_blend: 当前打开的 .blend 绝对路径（None 表示尚未由服务器打开文件）
+    """
+    
+    def __init__(self):
+        self.current_blend = None
+        self._current_mtime = None
+    
+    def __call__(self, request: JobRequest, progress_callback: Callable[[int, int], None]) -> tuple:
+        """
+        打开（或复用）.blend 并运行任务
+        
+        返回:
+            (outputs, blend_cache_hit)
+        """
+        import bpy
+        from .cli import run_pipeline_job
+        
+        args = parse_arguments(request.to_cli_arguments())
+        job = plan_jobs(args)[0]
+        
+        cache_hit = True
+        if request.blend is not None:
+            blend_path = os.path.abspath(request.blend)
+            mtime = os.path.getmtime(blend_path)
+            if blend_path != self.current_blend or mtime != self._current_mtime:
+                cache_hit = False
+                self.current_blend = None
+                bpy.ops.wm.open_mainfile(filepath=blend_path)
+                self.current_blend, self._current_mtime = blend_path, mtime
+        
+        try:
+            return run_pipeline_job(args, job, progress_callback), cache_hit
+        except Exception:
+            # 任务中途失败时场景可能未完全恢复，下个任务重新载入
+            self.current_blend = None
+            raise
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    服务器入口（需要在 Blender 中运行）
+    
+    参数:
+        argv: 本模块的参数（None 时取 sys.argv 中 -- 之后的部分）：
+            --spool 目录  --poll-interval 秒  --idle-timeout 秒
+    
+    返回:
+        int: 退出码 0
+    """
+    if argv is None:
+        argv = split_blender_argv(sys.argv)
+    
+    parser = argparse.ArgumentParser(prog="kiro_ies_generator.job_server",
+                                     description="常驻 Blender 任务服务器")
+    parser.add_argument('--spool', required=True, help="任务目录")
+    parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL, help="轮询间隔（秒）")
+    parser.add_argument('--idle-timeout', type=float, help="空闲超时后退出（秒）")
+    args = parser.parse_args(argv)
+    
+    server = JobServer(SpoolDirectory(args.spool), BlenderJobHandler(), args.poll_interval)
+    processed = server.serve_forever(args.idle_timeout)
+    JsonEventWriter(sys.stdout).emit('server_stopped', processed=processed)
+    return 0
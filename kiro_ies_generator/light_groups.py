@@ -0,0 +1,131 @@
+"""
+光源分组模块 (Light Groups)
+
+一次渲染得到每个光源（或光源组）各自的配光，不依赖 bpy，可单独测试。
+
+Cycles 光源组（Blender 3.2+）为每个组输出独立的 Combined_<组名> 通道，
+光强对各组是线性叠加的，因此一组传感器渲染即可拆出 N 个独立的测量网格，
+分别校准和导出（如上照/下照分量），无需逐个光源重复整个任务。
+"""
+
+import os
+import re
+from typing import Dict, List, Optional, Sequence
+
+
+# ============================================================================
+# 常量定义
+# ============================================================================
+
+# 光源组通道名前缀（Render Layers 节点输出 Combined_<组名>）
+LIGHT_GROUP_PASS_PREFIX = 'Combined_'
+
+# Blender 光源组名只允许 ASCII 字母、数字和下划线
+_INVALID_NAME_CHARACTERS = re.compile(r'[^0-9A-Za-z_]')
+
+
+class LightGroupError(Exception):
+    """光源分组错误"""
+    pass
+
+
+def sanitize_light_group_name(name: str) -> str:
+    """
+    将光源名称转换为合法的光源组名
+    
+    参数:
+        name: 光源名称
+    
+    返回:
+        str: 非法字符替换为下划线；结果为空或全是下划线时返回 'light'
+    """
+    sanitized = _INVALID_NAME_CHARACTERS.sub('_', name)
+    if not sanitized.strip('_'):
+        return 'light'
+    return sanitized
+
+
+def build_light_groups(light_names: Sequence[str],
+                       groups: Optional[Dict[str, Sequence[str]]] = None) -> Dict[str, List[str]]:
+    """
+    建立光源组 → 光源名称的映射
+    
+    参数:
+        light_names: 场景中的光源名称
+        groups: 自定义分组 {组名: [光源名称, ...]}（可选），
+            None 时每个光源单独成组，组名由光源名称转换（重名时追加序号）
+    
+    返回:
+        Dict[str, List[str]]: 组名 → 光源名称列表（保持输入顺序）
+    
+    异常:
+        LightGroupError: 没有光源、组名不合法、组为空、光源不存在或被分到多个组
+    
+    说明:
+        未分到任何组的光源仍参与渲染（照亮灯具），但不出现在任何组的测量中
+    """
+    if not light_names:
+        raise LightGroupError("场景中没有光源，无法分组")
+    
+    if groups is None:
+        result = {}
+        for light_name in light_names:
+            base = sanitize_light_group_name(light_name)
+            group_name = base
+            suffix = 2
+            while group_name in result:
+                group_name = f"{base}_{suffix}"
+                suffix += 1
+            result[group_name] = [light_name]
+        return result
+    
+    if not groups:
+        raise LightGroupError("自定义分组为空")
+    
+    known = set(light_names)
+    assigned = {}
+    result = {}
+    for group_name, members in groups.items():
+        if not group_name or sanitize_light_group_name(group_name) != group_name:
+            raise LightGroupError(f"光源组名只能包含字母、数字和下划线：{group_name!r}")
+        if not members:
+            raise LightGroupError(f"光源组 {group_name} 没有光源")
+        for light_name in members:
+            if light_name not in known:
+                raise LightGroupError(f"光源组 {group_name} 中的光源不存在：{light_name}")
+            if light_name in assigned:
+                raise LightGroupError(
+                    f"光源 {light_name} 同时属于 {assigned[light_name]} 和 {group_name}"
+                )
+            assigned[light_name] = group_name
+        result[group_name] = list(members)
+    
+    return result
+
+
+def get_light_group_pass_name(group_name: str) -> str:
+    """
+    获取光源组在 Render Layers 节点上的输出通道名
+    
+    参数:
+        group_name: 光源组名
+    
+    返回:
+        str: 如 'Combined_up'
+    """
+    return f"{LIGHT_GROUP_PASS_PREFIX}{group_name}"
+
+
+def get_light_group_output_path(output_path: str, group_name: str) -> str:
+    """
+    获取光源组的 IES 输出路径
+    
+    参数:
+        output_path: 任务的 IES 输出路径（如 fixture.ies）
+        group_name: 光源组名
+    
+    返回:
+        str: 组名追加在文件名后（如 fixture_up.ies）
+    """
+    base, extension = os.path.splitext(output_path)
+    return f"{base}_{group_name}{extension or '.ies'}"
@@ -0,0 +1,288 @@
+"""
+测量存档模块 (Measurement Archive)
+
+负责保存和读取原始采样结果（未校准的亮度网格、方差和渲染设置），
+使修改目标流明或输出格式时无需重新渲染。
+
+存档格式（.kma，小端序）：
+    偏移 0   8 字节   魔数 b"KIROMA01"
+    偏移 8   8 字节   uint64，JSON 头长度（含对齐填充）
+    偏移 16  N 字节   UTF-8 JSON 头（以空格填充，使数据区按 64 字节对齐）
+    数据区            各数组的原始 float64 数据（C 顺序），偏移记录在 JSON 头中
+
+数据区可以直接用 np.memmap 映射，读取大型存档时不必整体载入内存。
+"""
+
+from typing import Dict, Sequence, Tuple, Optional
+import os
+import json
+import struct
+import numpy as np
+
+from .data_structures import SamplingResult, PhotometricData
+from .ies_generator import DEFAULT_FIXTURE_NAME, calibrate_to_candela
+from .output_manager import ensure_directory_exists
+from .exporters import DEFAULT_EXPORT_FORMATS, write_photometric_exports
+
+
+# ============================================================================
+# 常量定义
+# ============================================================================
+
+# 文件魔数（含格式版本）
+ARCHIVE_MAGIC = b"KIROMA01"
+
+# 存档文件扩展名
+ARCHIVE_EXTENSION = ".kma"
+
+# 数据区对齐（字节）
+ARCHIVE_ALIGNMENT = 64
+
+# 数组数据类型（小端 float64）
+ARCHIVE_DTYPE = "<f8"
+
+_PREAMBLE = struct.Struct("<8sQ")
+
+
+class ArchiveError(Exception):
+    """存档读写错误"""
+    pass
+
+
+# ============================================================================
+# 采样结果存档
+# ============================================================================
+
+def save_sampling_result(sampling_result: SamplingResult,
+                         archive_path: str,
+                         overwrite: bool = False) -> bool:
+    """
+    保存原始采样结果到存档
+    
+    参数:
+        sampling_result: 采样结果（未校准）
+        archive_path: 存档文件路径
+        overwrite: 是否覆盖已存在的文件
+    
+    返回:
+        True 如果写入成功
+    
+    异常:
+        ArchiveError: 文件已存在或写入失败
+    """
+    arrays = {
+        'vertical_angles': sampling_result.vertical_angles,
+        'horizontal_angles': sampling_result.horizontal_angles,
+        'luminance_data': sampling_result.luminance_data,
+    }
+    if sampling_result.variance is not None:
+        arrays['variance'] = sampling_result.variance
+    
+    metadata = {
+        'type': 'SamplingResult',
+        'light_position': [float(v) for v in sampling_result.light_position],
+        'total_samples': int(sampling_result.total_samples),
+        'elapsed_time': float(sampling_result.elapsed_time),
+        'render_settings': sampling_result.render_settings,
+    }
+    
+    return write_archive(archive_path, metadata, arrays, overwrite)
+
+
+def load_sampling_result(archive_path: str, mmap: bool = True) -> SamplingResult:
+    """
+    从存档读取原始采样结果
+    
+    参数:
+        archive_path: 存档文件路径
+        mmap: 是否以只读内存映射方式读取数组（默认 True）
+    
+    返回:
+        SamplingResult: 采样结果
+    
+    异常:
+        ArchiveError: 文件不存在、格式错误或不是采样结果存档
+    """
+    metadata, arrays = read_archive(archive_path, mmap)
+    
+    if metadata.get('type') != 'SamplingResult':
+        raise ArchiveError(f"存档类型不是 SamplingResult：{metadata.get('type')}")
+    
+    try:
+        return SamplingResult(
+            vertical_angles=arrays['vertical_angles'],
+            horizontal_angles=arrays['horizontal_angles'],
+            luminance_data=arrays['luminance_data'],
+            light_position=tuple(metadata['light_position']),
+            total_samples=metadata['total_samples'],
+            elapsed_time=metadata['elapsed_time'],
+            variance=arrays.get('variance'),
+            render_settings=metadata.get('render_settings', {})
+        )
+    except KeyError as e:
+        raise ArchiveError(f"存档缺少字段：{str(e)}")
+
+
+def recalibrate_archive(archive_path: str,
+                        total_lumens: float,
+                        output_path: Optional[str] = None,
+                        fixture_name: str = DEFAULT_FIXTURE_NAME,
+                        overwrite: bool = False,
+                        export_formats: Sequence[str] = DEFAULT_EXPORT_FORMATS) -> PhotometricData:
+    """
+    从存档重新校准并导出 IES，无需重新渲染
+    
+    参数:
+        archive_path: 存档文件路径
+        total_lumens: 新的目标总流明
+        output_path: IES 输出路径（可选，None 时只返回光度学数据）
+        fixture_name: 灯具名称
+        overwrite: 是否覆盖已存在的文件
+        export_formats: 导出格式（见 exporters.write_photometric_exports），
+            IES LM-63-2002 写入 output_path，其余格式写在旁边
+    
+    返回:
+        PhotometricData: 重新校准后的光度学数据
+    
+    异常:
+        ArchiveError: 存档读取失败或缺少测量距离
+        CalibrationError: 校准失败
+        OutputError / ExportError: 写入失败
+    """
+    sampling_result = load_sampling_result(archive_path)
+    
+    distance = sampling_result.render_settings.get('distance')
+    if distance is None:
+        raise ArchiveError("存档缺少测量距离（render_settings.distance）")
+    
+    photometric_data = calibrate_to_candela(sampling_result, total_lumens, distance, fixture_name)
+    
+    if output_path is not None:
+        write_photometric_exports(photometric_data, output_path, export_formats, overwrite)
+    
+    return photometric_data
+
+
+# ============================================================================
+# 通用存档读写
+# ============================================================================
+
+def write_archive(archive_path: str,
+                  metadata: Dict,
+                  arrays: Dict[str, np.ndarray],
+                  overwrite: bool = False) -> bool:
+    """
+    写入通用存档（JSON 元数据 + 命名数组）
+    
+    参数:
+        archive_path: 存档文件路径
+        metadata: 可 JSON 序列化的元数据
+        arrays: 数组名 → 数组（以 float64 保存）
+        overwrite: 是否覆盖已存在的文件
+    
+    返回:
+        True 如果写入成功
+    
+    异常:
+        ArchiveError: 文件已存在或写入失败
+    """
+    if os.path.exists(archive_path) and not overwrite:
+        raise ArchiveError(f"文件已存在：{archive_path}，请确认是否覆盖")
+    
+    ensure_directory_exists(os.path.dirname(archive_path))
+    
+    # 计算各数组在数据区中的偏移（每个数组按对齐边界开始）
+    contiguous = {}
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        data = np.ascontiguousarray(array, dtype=ARCHIVE_DTYPE)
+        contiguous[name] = data
+        layout[name] = {'offset': offset, 'shape': list(data.shape)}
+        offset = _align(offset + data.nbytes)
+    
+    header = dict(metadata)
+    header['arrays'] = layout
+    header['dtype'] = ARCHIVE_DTYPE
+    
+    try:
+        header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    except (TypeError, ValueError) as e:
+        raise ArchiveError(f"存档元数据无法序列化：{str(e)}")
+    
+    # 填充 JSON 头，使数据区起始位置对齐
+    data_start = _align(_PREAMBLE.size + len(header_bytes))
+    header_bytes += b" " * (data_start - _PREAMBLE.size - len(header_bytes))
+    
+    try:
+        with open(archive_path, 'wb') as f:
+            f.write(_PREAMBLE.pack(ARCHIVE_MAGIC, len(header_bytes)))
+            f.write(header_bytes)
+            for name, data in contiguous.items():
+                f.seek(data_start + layout[name]['offset'])
+                f.write(data.tobytes())
+        return True
+    except OSError as e:
+        raise ArchiveError(f"写入存档失败：{str(e)}")
+
+
+def read_archive(archive_path: str, mmap: bool = True) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """
+    读取通用存档
+    
+    参数:
+        archive_path: 存档文件路径
+        mmap: 是否以只读内存映射方式读取数组
+    
+    返回:
+        (metadata, arrays)
+            - metadata: JSON 元数据（含 'arrays' 布局信息）
+            - arrays: 数组名 → 数组（mmap=True 时为只读 np.memmap）
+    
+    异常:
+        ArchiveError: 文件不存在或格式错误
+    """
+    try:
+        with open(archive_path, 'rb') as f:
+            preamble = f.read(_PREAMBLE.size)
+            if len(preamble) != _PREAMBLE.size:
+                raise ArchiveError(f"存档文件不完整：{archive_path}")
+            magic, header_length = _PREAMBLE.unpack(preamble)
+            if magic != ARCHIVE_MAGIC:
+                raise ArchiveError(f"不是有效的测量存档：{archive_path}")
+            header = json.loads(f.read(header_length).decode('utf-8'))
+            file_size = os.fstat(f.fileno()).st_size
+            
+            data_start = _PREAMBLE.size + header_length
+            dtype = np.dtype(header.get('dtype', ARCHIVE_DTYPE))
+            arrays = {}
+            for name, info in header.get('arrays', {}).items():
+                shape = tuple(info['shape'])
+                offset = data_start + info['offset']
+                count = int(np.prod(shape))
+                if offset + count * dtype.itemsize > file_size:
+                    raise ArchiveError(f"存档数组 '{name}' 数据不完整")
+                
+                if count == 0:
+                    arrays[name] = np.empty(shape, dtype=dtype)
+                elif mmap:
+                    arrays[name] = np.memmap(archive_path, dtype=dtype, mode='r',
+                                             offset=offset, shape=shape)
+                else:
+                    f.seek(offset)
+                    arrays[name] = np.frombuffer(
+                        f.read(count * dtype.itemsize), dtype=dtype
+                    ).reshape(shape).copy()
+    except OSError as e:
+        raise ArchiveError(f"读取存档失败：{str(e)}")
+    except (ValueError, KeyError) as e:
+        raise ArchiveError(f"存档格式错误：{str(e)}")
+    
+    return header, arrays
+
+
+def _align(offset: int) -> int:
+    """
+    向上对齐到 ARCHIVE_ALIGNMENT 的整数倍
+    """
+    return (offset + ARCHIVE_ALIGNMENT - 1) // ARCHIVE_ALIGNMENT * ARCHIVE_ALIGNMENT
@@ -0,0 +1,296 @@
+"""
+测量配置模块 (Measurement Profiles)
+
+传感器渲染使用的 Cycles 光路和简化设置。
+
+远场光强测量只关心从灯具射出的光，用户场景中为出图准备的设置
+（高反弹次数、焦散、运动模糊、体积步进）大多与测量无关，
+却拖慢每一次传感器渲染。测量配置在采样期间覆盖这些设置，采样结束后恢复。
+
+几何简化和纹理尺寸限制会改变反射器曲面和发光贴图，直接影响光强分布，
+所以所有配置都关闭它们（即使用户场景为出图开启了简化）。
+
+精度影响：
+- 每个配置的 accuracy_impact 说明相对 'reference' 配置丢弃了哪些光路
+- 具体灯具的误差用 sensor_validation.run_profile_validation 对照 'reference' 测量
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+
+
+# ============================================================================
+# 常量定义
+# ============================================================================
+
+# 默认测量配置
+DEFAULT_MEASUREMENT_PROFILE = 'standard'
+
+# 精度对照配置
+REFERENCE_MEASUREMENT_PROFILE = 'reference'
+
+# 发光体数量超过该值时启用光源树（光源较少时光源树的构建开销不划算）
+LIGHT_TREE_EMITTER_THRESHOLD = 8
+
+
+class MeasurementProfileError(Exception):
+    """测量配置错误"""
+    pass
+
+
+@dataclass
+class MeasurementProfile:
+    """
+    传感器渲染的测量配置
+    
+    属性:
+        name: 配置名称
+        description: 适用的灯具类别
+        accuracy_impact: 相对 reference 配置的精度影响
+        settings: 场景属性路径 → 值（如 'cycles.max_bounces': 8），
+            当前 Blender 版本没有的属性会被跳过
+    """
+    
+    name: str
+    description: str
+    accuracy_impact: str
+    settings: Dict[str, Any] = field(default_factory=dict)
+    
+    def to_dict(self) -> dict:
+        """
+        转换为字典格式（写入 render_settings）
+        """
+        return {
+            'name': self.name,
+            'description': self.description,
+            'accuracy_impact': self.accuracy_impact,
+            'settings': dict(self.settings)
+        }
+
+
+# 所有配置共用的设置：关闭与远场测量无关的功能，
+# 并关闭会改变灯具几何和发光贴图的简化（细分级别、纹理尺寸都影响光强分布）
+_COMMON_SETTINGS = {
+    'render.use_motion_blur': False,
+    'render.use_simplify': False,
+    'cycles.volume_step_rate': 4.0,
+    'cycles.volume_max_steps': 256,
+    'cycles.texture_limit_render': 'OFF',
+}
+
+
+MEASUREMENT_PROFILES: Dict[str, MeasurementProfile] = {
+    'reference': MeasurementProfile(
+        name='reference',
+        description="精度对照：高反弹次数、保留焦散、不限制纹理",
+        accuracy_impact="对照基准",
+        settings={
+            'render.use_motion_blur': False,
+            'render.use_simplify': False,
+            'cycles.texture_limit_render': 'OFF',
+            'cycles.max_bounces': 32,
+            'cycles.diffuse_bounces': 16,
+            'cycles.glossy_bounces': 32,
+            'cycles.transmission_bounces': 32,
+            'cycles.transparent_max_bounces': 32,
+            'cycles.volume_bounces': 4,
+            'cycles.caustics_reflective': True,
+            'cycles.caustics_refractive': True,
+            'cycles.blur_glossy': 0.0,
+            'cycles.use_light_tree': True,
+        }
+    ),
+    'standard': MeasurementProfile(
+        name='standard',
+        description="通用灯具：反射器、透镜和漫射罩都有",
+        accuracy_impact="丢弃 12 次以上的反弹；保留焦散，适用于透镜后有漫射面的灯具",
+        settings={
+            **_COMMON_SETTINGS,
+            'cycles.max_bounces': 12,
+            'cycles.diffuse_bounces': 4,
+            'cycles.glossy_bounces': 8,
+            'cycles.transmission_bounces': 12,
+            'cycles.transparent_max_bounces': 8,
+            'cycles.volume_bounces': 0,
+            'cycles.caustics_reflective': True,
+            'cycles.caustics_refractive': True,
+            'cycles.blur_glossy': 0.0,
+        }
+    ),
+    'reflector': MeasurementProfile(
+        name='reflector',
+        description="反射器灯具（筒灯、射灯）：光主要经镜面反射射出",
+        accuracy_impact="丢弃焦散和 2 次以上的漫反射；灯具内漫射面被反射器照亮的部分会偏暗",
+        settings={
+            **_COMMON_SETTINGS,
+            'cycles.max_bounces': 8,
+            'cycles.diffuse_bounces': 2,
+            'cycles.glossy_bounces': 8,
+            'cycles.transmission_bounces': 4,
+            'cycles.transparent_max_bounces': 4,
+            'cycles.volume_bounces': 0,
+            'cycles.caustics_reflective': False,
+            'cycles.caustics_refractive': False,
+            'cycles.blur_glossy': 0.0,
+        }
+    ),
+    'diffuser': MeasurementProfile(
+        name='diffuser',
+        description="漫射罩灯具（吸顶灯、吊灯）：光经乳白罩透射",
+        accuracy_impact="丢弃焦散和 2 次以上的镜面反射；镜面反射器在罩内形成的亮斑会被平滑",
+        settings={
+            **_COMMON_SETTINGS,
+            'cycles.max_bounces': 8,
+            'cycles.diffuse_bounces': 4,
+            'cycles.glossy_bounces': 2,
+            'cycles.transmission_bounces': 8,
+            'cycles.transparent_max_bounces': 4,
+            'cycles.volume_bounces': 0,
+            'cycles.caustics_reflective': False,
+            'cycles.caustics_refractive': False,
+            'cycles.blur_glossy': 1.0,
+        }
+    ),
+    'bare_emitter': MeasurementProfile(
+        name='bare_emitter',
+        description="裸光源和多发光体灯具（LED 阵列、灯带）：几乎没有光学元件",
+        accuracy_impact="只保留 2 次反弹；灯体内多次反射的杂散光会丢失，发光体较多时启用光源树",
+        settings={
+            **_COMMON_SETTINGS,
+            'cycles.max_bounces': 2,
+            'cycles.diffuse_bounces': 1,
+            'cycles.glossy_bounces': 2,
+            'cycles.transmission_bounces': 2,
+            'cycles.transparent_max_bounces': 2,
+            'cycles.volume_bounces': 0,
+            'cycles.caustics_reflective': False,
+            'cycles.caustics_refractive': False,
+            'cycles.blur_glossy': 1.0,
+        }
+    ),
+}
+
+
+def get_measurement_profile(name: str) -> MeasurementProfile:
+    """
+    按名称获取测量配置
+    
+    参数:
+        name: 配置名称
+    
+    返回:
+        MeasurementProfile
+    
+    异常:
+        MeasurementProfileError: 配置不存在
+    """
+    if name not in MEASUREMENT_PROFILES:
+        raise MeasurementProfileError(
+            f"未知的测量配置：{name}，可用配置：{list(MEASUREMENT_PROFILES)}"
+        )
+    return MEASUREMENT_PROFILES[name]
+
+
+def list_measurement_profiles() -> List[str]:
+    """
+    获取所有测量配置名称
+    
+    返回:
+        List[str]: 配置名称列表
+    """
+    return list(MEASUREMENT_PROFILES)
+
+
+def resolve_profile_settings(profile: MeasurementProfile,
+                             emitter_count: int = 1) -> Dict[str, Any]:
+    """
+    计算实际应用的设置
+    
+    参数:
+        profile: 测量配置
+        emitter_count: 灯具的发光体数量
+    
+    返回:
+        Dict[str, Any]: 属性路径 → 值；配置未指定光源树时按发光体数量决定
+    """
+    settings = dict(profile.settings)
+    settings.setdefault('cycles.use_light_tree', emitter_count > LIGHT_TREE_EMITTER_THRESHOLD)
+    return settings
+
+
+def apply_measurement_profile(scene: Any,
+                              profile: MeasurementProfile,
+                              emitter_count: int = 1) -> Dict[str, Any]:
+    """
+    将测量配置应用到场景
+    
+    参数:
+        scene: Blender 场景
+        profile: 测量配置
+        emitter_count: 灯具的发光体数量
+    
+    返回:
+        Dict[str, Any]: 被覆盖属性的原值，交给 restore_scene_settings 恢复
+    
+    说明:
+        当前 Blender 版本没有的属性（如 3.5 之前的 use_light_tree）会被跳过
+    """
+    previous = {}
+    for path, value in resolve_profile_settings(profile, emitter_count).items():
+        target, attribute = _resolve_attribute(scene, path)
+        if target is None:
+            continue
+        previous[path] = getattr(target, attribute)
+        setattr(target, attribute, value)
+    return previous
+
+
+def capture_scene_settings(scene: Any, paths: Tuple[str, ...]) -> Dict[str, Any]:
+    """
+    记录场景属性的当前值
+    
+    参数:
+        scene: Blender 场景
+        paths: 属性路径（如 'render.resolution_x'），当前 Blender 版本没有的属性会被跳过
+    
+    返回:
+        Dict[str, Any]: 属性路径 → 当前值，交给 restore_scene_settings 恢复
+    """
+    previous = {}
+    for path in paths:
+        target, attribute = _resolve_attribute(scene, path)
+        if target is not None:
+            previous[path] = getattr(target, attribute)
+    return previous
+
+
+def restore_scene_settings(scene: Any, previous: Dict[str, Any]):
+    """
+    恢复 apply_measurement_profile 覆盖或 capture_scene_settings 记录的设置
+    
+    参数:
+        scene: Blender 场景
+        previous: apply_measurement_profile 或 capture_scene_settings 返回的原值
+    """
+    for path, value in previous.items():
+        target, attribute = _resolve_attribute(scene, path)
+        if target is not None:
+            setattr(target, attribute, value)
+
+
+def _resolve_attribute(scene: Any, path: str) -> Tuple[Optional[Any], str]:
+    """
+    解析属性路径
+    
+    返回:
+        (owner, attribute): 属性不存在时 owner 为 None
+    """
+    *owners, attribute = path.split('.')
+    target = scene
+    for name in owners:
+        target = getattr(target, name, None)
+        if target is None:
+            return None, attribute
+    if not hasattr(target, attribute):
+        return None, attribute
+    return target, attribute
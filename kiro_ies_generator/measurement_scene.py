@@ -0,0 +1,587 @@
+"""
+测量场景模块 (Measurement Scene)
+
+为传感器渲染建立只包含灯具的临时场景。
+
+在布景完整的场景中运行生成器时，每次传感器渲染都要为成千上万个无关对象
+构建 BVH 和追踪光线。测量场景只链接（不复制）灯具所在的集合和光源，
+不使用世界光照，采样结束后删除，原场景保持不变。
+
+灯具集合的确定：
+- 优先使用选中网格对象所在的集合（与 get_fixture_origin 一致）
+- 没有选中网格时使用光源所在的集合
+- 位于场景根集合中的对象无法整体链接，逐个链接选中的网格和光源
+
+灯具简化（可选，见 fixture_lod）：
+- 测量场景改为逐个链接对象，非光学的高面数对象替换为带减面修改器的临时副本
+- 副本与原对象共享网格数据，修改器只加在副本上，删除测量场景时一并删除
+
+发光体聚合（可选，见 emitter_aggregation）：
+- 同样需要逐个链接对象，聚合后的光源从测量场景取消链接，代之以新建的代理光源
+
+光源组（可选，见 light_groups）：
+- 测量场景的视图层为每个组建立 Cycles 光源组，光源的 lightgroup 属性在采样后恢复
+
+帧状态（见 frame_batch）：
+- 记录灯具对象在当前帧的变换、求值后的网格顶点、光源参数和动画材质的节点输入，用于计算帧指纹
+"""
+
+from typing import Dict, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+import math
+import bpy
+import numpy as np
+
+from .fixture_lod import (
+    LOD_DECIMATE,
+    LOD_OPTICAL,
+    LODReport,
+    LODSettings,
+    MaterialTraits,
+    calculate_decimate_ratio,
+    classify_object,
+)
+from .emitter_aggregation import (
+    EMITTER_AREA,
+    EMITTER_POINT,
+    AggregationReport,
+    AggregationSettings,
+    Emitter,
+    plan_aggregation,
+)
+
+
+# 临时测量场景名称
+MEASUREMENT_SCENE_NAME = "KiroMeasurement"
+
+# 从原场景复制到测量场景的设置（渲染设备和线程，与原场景使用相同的硬件）
+COPIED_SCENE_SETTINGS = (
+    ('cycles', 'device'),
+    ('cycles', 'feature_set'),
+    ('render', 'threads_mode'),
+    ('render', 'threads'),
+)
+
+# 测量代理对象（简化副本、聚合光源）的标记属性，删除测量场景时一并删除
+PROXY_PROPERTY = "kiro_measurement_proxy"
+
+# 帧状态记录的光源参数（当前光源类型没有的属性跳过）
+LIGHT_STATE_ATTRIBUTES = (
+    'type', 'energy', 'color', 'shadow_soft_size', 'spot_size', 'spot_blend',
+    'shape', 'size', 'size_y', 'spread',
+)
+
+
+def get_fixture_objects(light_objects: List[bpy.types.Object]) -> List[bpy.types.Object]:
+    """
+    获取组成灯具的对象：选中的网格对象，没有选中时为光源
+    
+    参数:
+        light_objects: 光源对象列表
+    
+    返回:
+        List[bpy.types.Object]
+    """
+    selected_meshes = [obj for obj in bpy.context.selected_objects if obj.type == 'MESH']
+    return selected_meshes if selected_meshes else list(light_objects)
+
+
+def get_fixture_collections(source_scene: bpy.types.Scene,
+                            fixture_objects: List[bpy.types.Object]) -> List[bpy.types.Collection]:
+    """
+    获取灯具对象所在的集合（不含场景根集合）
+    
+    参数:
+        source_scene: 原场景
+        fixture_objects: 组成灯具的对象
+    
+    返回:
+        List[bpy.types.Collection]: 去重后的集合列表，保持首次出现的顺序
+    """
+    collections = []
+    for obj in fixture_objects:
+        for collection in obj.users_collection:
+            if collection != source_scene.collection and collection not in collections:
+                collections.append(collection)
+    
+    # 父集合已包含的子集合不重复链接
+    return [collection for collection in collections
+            if not any(collection in other.children_recursive for other in collections if other != collection)]
+
+
+def build_measurement_scene(source_scene: bpy.types.Scene,
+                            light_objects: List[bpy.types.Object],
+                            fixture_objects: Optional[List[bpy.types.Object]] = None,
+                            link_objects: bool = False) -> bpy.types.Scene:
+    """
+    建立只包含灯具和光源的临时测量场景
+    
+    参数:
+        source_scene: 原场景
+        light_objects: 光源对象列表（scene_validator.get_light_sources 的返回值）
+        fixture_objects: 组成灯具的对象（None 时由 get_fixture_objects 确定）
+        link_objects: 是否逐个链接灯具集合中参与渲染的对象（而不是整个集合），
+            灯具简化和发光体聚合需要替换单个对象时使用
+    
+    返回:
+        bpy.types.Scene: 临时场景，使用后需调用 remove_measurement_scene 删除
+    
+    说明:
+        集合和对象都是链接，不复制数据；测量场景没有世界，
+        Cycles 背景为黑色，灯具只被自身光源照亮
+    """
+    if fixture_objects is None:
+        fixture_objects = get_fixture_objects(light_objects)
+    
+    scene = bpy.data.scenes.new(MEASUREMENT_SCENE_NAME)
+    scene.world = None
+    scene.frame_current = source_scene.frame_current
+    scene.render.engine = 'CYCLES'
+    
+    for owner_name, attribute in COPIED_SCENE_SETTINGS:
+        source = getattr(source_scene, owner_name, None)
+        target = getattr(scene, owner_name, None)
+        if source is not None and target is not None and hasattr(source, attribute):
+            setattr(target, attribute, getattr(source, attribute))
+    
+    try:
+        for collection in get_fixture_collections(source_scene, fixture_objects):
+            if not link_objects:
+                scene.collection.children.link(collection)
+                continue
+            for obj in collection.all_objects:
+                if not obj.hide_render and obj.name not in scene.objects:
+                    scene.collection.objects.link(obj)
+        
+        # 不在已链接集合中的灯具对象和光源逐个链接
+        for obj in list(fixture_objects) + list(light_objects):
+            if obj.name not in scene.objects:
+                scene.collection.objects.link(obj)
+    except Exception:
+        remove_measurement_scene(scene)
+        raise
+    
+    return scene
+
+
+def remove_measurement_scene(scene: bpy.types.Scene):
+    """
+    删除临时测量场景（链接的集合和对象保留在原场景中）
+    
+    参数:
+        scene: build_measurement_scene 创建的场景
+    """
+    if scene is None or scene.name not in bpy.data.scenes:
+        return
+    
+    proxies = [obj for obj in scene.objects if obj.get(PROXY_PROPERTY)]
+    bpy.data.scenes.remove(scene, do_unlink=True)
+    for proxy in proxies:
+        # 简化副本共享原网格，只删除对象；聚合光源的数据块是新建的，一并删除
+        light_data = proxy.data if proxy.type == 'LIGHT' else None
+        bpy.data.objects.remove(proxy, do_unlink=True)
+        if light_data is not None and light_data.users == 0:
+            bpy.data.lights.remove(light_data)
+
+
+@contextmanager
+def measurement_scene(source_scene: bpy.types.Scene,
+                      light_objects: List[bpy.types.Object],
+                      fixture_objects: Optional[List[bpy.types.Object]] = None,
+                      link_objects: bool = False) -> Iterator[bpy.types.Scene]:
+    """
+    临时测量场景的上下文管理器
+    
+    参数:
+        source_scene: 原场景
+        light_objects: 光源对象列表
+        fixture_objects: 组成灯具的对象（可选）
+        link_objects: 是否逐个链接对象（灯具简化和发光体聚合时使用）
+    
+    用法:
+        with measurement_scene(bpy.context.scene, get_light_sources()) as scene:
+            ...  # 在 scene 中渲染
+    """
+    scene = build_measurement_scene(source_scene, light_objects, fixture_objects, link_objects)
+    try:
+        yield scene
+    finally:
+        remove_measurement_scene(scene)
+
+
+# ============================================================================
+# 灯具简化
+# ============================================================================
+
+def read_material_traits(material: Optional[bpy.types.Material]) -> MaterialTraits:
+    """
+    读取材质的光学特征
+    
+    参数:
+        material: 材质（可为 None）
+    
+    返回:
+        MaterialTraits
+    
+    说明:
+        - 读取 Principled BSDF 的发光、透射、金属度和粗糙度（兼容 3.x 和 4.x 的输入名称）
+        - 自发光、玻璃、折射和光泽节点分别视为发光、透射和镜面反射
+        - 输入连接了纹理时无法确定数值，按光学材质处理，避免误减光学部件
+    """
+    traits = MaterialTraits()
+    if material is None or not material.use_nodes or material.node_tree is None:
+        return traits
+    
+    def value(node, *names, default=0.0, linked=1.0):
+        for name in names:
+            socket = node.inputs.get(name)
+            if socket is None:
+                continue
+            if socket.is_linked:
+                return linked
+            current = socket.default_value
+            try:
+                return float(max(current[:3]))
+            except TypeError:
+                return float(current)
+        return default
+    
+    for node in material.node_tree.nodes:
+        if node.type == 'BSDF_PRINCIPLED':
+            strength = value(node, 'Emission Strength', default=1.0)
+            color = value(node, 'Emission Color', 'Emission')
+            traits.emission = max(traits.emission, strength * color)
+            traits.transmission = max(traits.transmission, value(node, 'Transmission Weight', 'Transmission'))
+            metallic = value(node, 'Metallic')
+            if metallic >= traits.metallic:
+                traits.metallic = metallic
+                traits.roughness = value(node, 'Roughness', default=0.5, linked=0.0)
+        elif node.type == 'EMISSION':
+            traits.emission = max(traits.emission, value(node, 'Strength') * value(node, 'Color'))
+        elif node.type in ('BSDF_GLASS', 'BSDF_REFRACTION', 'BSDF_TRANSLUCENT'):
+            traits.transmission = 1.0
+        elif node.type in ('BSDF_GLOSSY', 'BSDF_ANISOTROPIC'):
+            traits.metallic = 1.0
+            traits.roughness = min(traits.roughness, value(node, 'Roughness', linked=0.0))
+    
+    return traits
+
+
+def count_triangles(obj: bpy.types.Object) -> int:
+    """
+    统计网格对象的三角形数（基础网格，不含修改器）
+    
+    参数:
+        obj: 对象
+    
+    返回:
+        int: 三角形数，非网格对象为 0
+    """
+    if obj.type != 'MESH' or obj.data is None:
+        return 0
+    
+    polygons = obj.data.polygons
+    loop_totals = np.empty(len(polygons), dtype=np.int32)
+    polygons.foreach_get('loop_total', loop_totals)
+    return int(np.sum(loop_totals - 2, dtype=np.int64))
+
+
+def simplify_measurement_scene(scene: bpy.types.Scene, settings: LODSettings) -> LODReport:
+    """
+    将测量场景中非光学的高面数对象替换为减面副本
+    
+    参数:
+        scene: 用 link_objects=True 建立的测量场景
+        settings: 简化参数
+    
+    返回:
+        LODReport: 三角形数变化和各类对象
+    
+    异常:
+        LODError: 简化参数无效
+    
+    说明:
+        只处理直接链接到测量场景根集合的对象；原对象从测量场景取消链接，
+        原场景中的对象、网格和修改器都不变
+    """
+    settings.validate()
+    report = LODReport()
+    
+    for obj in list(scene.collection.objects):
+        if obj.type != 'MESH' or obj.get(PROXY_PROPERTY):
+            continue
+        
+        triangles = count_triangles(obj)
+        report.original_triangles += triangles
+        
+        materials = [read_material_traits(slot.material) for slot in obj.material_slots]
+        category = classify_object(obj.name, materials, triangles, settings)
+        
+        if category == LOD_OPTICAL:
+            report.optical_objects.append(obj.name)
+        
+        if category != LOD_DECIMATE:
+            report.measured_triangles += triangles
+            continue
+        
+        ratio = calculate_decimate_ratio(triangles, settings)
+        proxy = obj.copy()
+        proxy[PROXY_PROPERTY] = True
+        modifier = proxy.modifiers.new("KiroLOD", 'DECIMATE')
+        modifier.decimate_type = 'COLLAPSE'
+        modifier.ratio = ratio
+        
+        scene.collection.objects.unlink(obj)
+        scene.collection.objects.link(proxy)
+        
+        report.decimated_objects.append(obj.name)
+        report.measured_triangles += int(round(triangles * ratio))
+    
+    return report
+
+
+# ============================================================================
+# 发光体聚合
+# ============================================================================
+
+def read_light_emitter(obj: bpy.types.Object) -> Optional[Emitter]:
+    """
+    读取光源对象为 Emitter
+    
+    参数:
+        obj: 光源对象
+    
+    返回:
+        Emitter，不能聚合的光源（聚光灯、日光、非朗伯扩散角的面光源）返回 None
+    """
+    light = obj.data
+    matrix = np.array(obj.matrix_world)
+    position = matrix[:3, 3].copy()
+    color = np.array(light.color, dtype=float)
+    
+    if light.type == 'POINT':
+        radius = float(getattr(light, 'shadow_soft_size', 0.0))
+        return Emitter(name=obj.name, kind=EMITTER_POINT, position=position,
+                       power=float(light.energy), color=color, size=(radius, radius))
+    
+    if light.type != 'AREA' or getattr(light, 'spread', math.pi) < math.pi - 1e-6:
+        return None
+    
+    axes = matrix[:3, :3]
+    scale_x, scale_y = np.linalg.norm(axes[:, 0]), np.linalg.norm(axes[:, 1])
+    size_y = light.size_y if light.shape in ('RECTANGLE', 'ELLIPSE') else light.size
+    return Emitter(name=obj.name, kind=EMITTER_AREA, position=position,
+                   power=float(light.energy), color=color,
+                   normal=-axes[:, 2] / np.linalg.norm(axes[:, 2]),
+                   size=(float(light.size * scale_x), float(size_y * scale_y)),
+                   axis_x=axes[:, 0] / scale_x)
+
+
+def create_proxy_light(scene: bpy.types.Scene, emitter: Emitter) -> bpy.types.Object:
+    """
+    在测量场景中创建代理光源
+    
+    参数:
+        scene: 测量场景
+        emitter: 代理光源参数
+    
+    返回:
+        光源对象
+    """
+    import mathutils
+    
+    light = bpy.data.lights.new(emitter.name, emitter.kind)
+    light.energy = emitter.power
+    light.color = tuple(emitter.color)
+    
+    obj = bpy.data.objects.new(emitter.name, light)
+    obj[PROXY_PROPERTY] = True
+    
+    if emitter.kind == EMITTER_POINT:
+        light.shadow_soft_size = emitter.size[0]
+        obj.matrix_world = mathutils.Matrix.Translation(emitter.position)
+    else:
+        light.shape = 'RECTANGLE'
+        light.size, light.size_y = emitter.size
+        # 局部 X 为 axis_x，局部 -Z 为发光方向
+        axis_z = -np.asarray(emitter.normal, dtype=float)
+        axis_x = np.asarray(emitter.axis_x, dtype=float)
+        axis_y = np.cross(axis_z, axis_x)
+        matrix = np.identity(4)
+        matrix[:3, 0], matrix[:3, 1], matrix[:3, 2] = axis_x, axis_y, axis_z
+        matrix[:3, 3] = emitter.position
+        obj.matrix_world = mathutils.Matrix(matrix.tolist())
+    
+    scene.collection.objects.link(obj)
+    return obj
+
+
+def aggregate_measurement_lights(scene: bpy.types.Scene,
+                                 settings: AggregationSettings,
+                                 distance: Optional[float] = None,
+                                 center: Tuple[float, float, float] = (0.0, 0.0, 0.0)) -> AggregationReport:
+    """
+    将测量场景中的小光源聚合为代理光源
+    
+    参数:
+        scene: 用 link_objects=True 建立的测量场景
+        settings: 聚合参数
+        distance: 测量距离（米），用于误差验证
+        center: 光度中心
+    
+    返回:
+        AggregationReport: 误差超限或光源过少时不修改场景（applied=False）
+    
+    异常:
+        AggregationError: 聚合参数无效
+    """
+    settings.validate()
+    
+    objects = {}
+    emitters = []
+    for obj in list(scene.collection.objects):
+        if obj.type != 'LIGHT' or obj.hide_render or obj.get(PROXY_PROPERTY):
+            continue
+        emitter = read_light_emitter(obj)
+        if emitter is not None:
+            objects[obj.name] = obj
+            emitters.append(emitter)
+    
+    proxies, report = plan_aggregation(emitters, settings, distance, center)
+    if not report.applied:
+        return report
+    
+    for proxy in proxies:
+        if not proxy.members:
+            continue
+        for name in proxy.members:
+            scene.collection.objects.unlink(objects[name])
+        create_proxy_light(scene, proxy)
+    
+    return report
+
+
+# ============================================================================
+# 光源组
+# ============================================================================
+
+def get_emissive_objects(scene: bpy.types.Scene) -> List[bpy.types.Object]:
+    """
+    获取场景中参与渲染的自发光对象（非光源对象，材质有发光）
+    
+    参数:
+        scene: 场景
+    
+    返回:
+        List[bpy.types.Object]: 自发光对象（发光输入连接了纹理时也算在内）
+    """
+    return [
+        obj for obj in scene.objects
+        if obj.type != 'LIGHT' and not obj.hide_render
+        and any(read_material_traits(slot.material).emission > 0 for slot in obj.material_slots)
+    ]
+
+
+def assign_light_groups(scene: bpy.types.Scene,
+                        light_groups: Dict[str, List[str]]) -> Dict[str, str]:
+    """
+    为测量场景建立 Cycles 光源组并分配光源
+    
+    参数:
+        scene: 测量场景
+        light_groups: 组名 → 光源名称列表（light_groups.build_light_groups 的返回值）
+    
+    返回:
+        Dict[str, str]: 光源名称 → 原 lightgroup 值，交给 restore_light_groups 恢复
+    
+    说明:
+        光源组建在测量场景的视图层上，随测量场景删除；
+        lightgroup 是对象属性，测量场景链接的是原对象，因此需要恢复
+    """
+    view_layer = scene.view_layers[0]
+    previous = {}
+    for group_name, light_names in light_groups.items():
+        if group_name not in view_layer.lightgroups:
+            view_layer.lightgroups.add(name=group_name)
+        for light_name in light_names:
+            obj = bpy.data.objects[light_name]
+            previous[light_name] = obj.lightgroup
+            obj.lightgroup = group_name
+    return previous
+
+
+def restore_light_groups(previous: Dict[str, str]):
+    """
+    恢复 assign_light_groups 修改的 lightgroup 属性
+    
+    参数:
+        previous: assign_light_groups 返回的原值
+    """
+    for light_name, group_name in previous.items():
+        obj = bpy.data.objects.get(light_name)
+        if obj is not None:
+            obj.lightgroup = group_name
+
+
+# ============================================================================
+# 帧状态
+# ============================================================================
+
+def capture_frame_state(objects: List[bpy.types.Object],
+                        depsgraph: bpy.types.Depsgraph) -> Dict[str, object]:
+    """
+    记录灯具对象在当前帧的状态（用于 frame_batch.fingerprint_frame_state）
+    
+    参数:
+        objects: 灯具对象和光源
+        depsgraph: 已求值到当前帧的依赖图
+    
+    返回:
+        Dict[str, object]: 状态键 → 数值或字符串
+    
+    说明:
+        网格记录求值后（修改器、形态键、驱动器之后）的顶点坐标；
+        材质只记录带动画的节点树中未连接输入的值（如图案片切换）
+    """
+    state = {}
+    animated_trees = set()
+    for obj in objects:
+        state[f"{obj.name}.matrix_world"] = [tuple(row) for row in obj.matrix_world]
+        state[f"{obj.name}.hide_render"] = float(obj.hide_render)
+        
+        if obj.type == 'LIGHT':
+            for attribute in LIGHT_STATE_ATTRIBUTES:
+                if hasattr(obj.data, attribute):
+                    value = getattr(obj.data, attribute)
+                    state[f"{obj.name}.{attribute}"] = value if isinstance(value, (str, float, int)) else tuple(value)
+            if obj.data.node_tree is not None and obj.data.node_tree.animation_data is not None:
+                animated_trees.add(obj.data.node_tree)
+        
+        elif obj.type == 'MESH':
+            evaluated = obj.evaluated_get(depsgraph)
+            mesh = evaluated.to_mesh()
+            try:
+                coordinates = np.empty(len(mesh.vertices) * 3)
+                mesh.vertices.foreach_get('co', coordinates)
+            finally:
+                evaluated.to_mesh_clear()
+            state[f"{obj.name}.vertices"] = coordinates
+            
+            materials = [slot.material for slot in obj.material_slots]
+            state[f"{obj.name}.materials"] = ",".join(material.name if material else "" for material in materials)
+            for material in materials:
+                if (material is not None and material.node_tree is not None and
+                        material.node_tree.animation_data is not None):
+                    animated_trees.add(material.node_tree)
+    
+    for tree in animated_trees:
+        for node in tree.nodes:
+            for socket in node.inputs:
+                value = getattr(socket, 'default_value', None)
+                if socket.is_linked or value is None or isinstance(value, str):
+                    continue
+                state[f"{tree.name}.{node.name}.{socket.identifier}"] = (
+                    value if isinstance(value, (float, int)) else tuple(value)
+                )
+    
+    return state
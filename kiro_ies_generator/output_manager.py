@@ -7,8 +7,12 @@
 from typing import Dict, List, Tuple, Optional
 import os
 import json
+import uuid
 from datetime import datetime
 
+from .data_structures import PhotometricData
+from .ies_generator import stream_ies
+
 
 class OutputError(Exception):
     """输出错误"""
@@ -45,6 +49,41 @@ def write_ies_file(ies_content: str, output_path: str, overwrite: bool = False)
         raise OutputError(f"写入 IES 文件失败：{str(e)}")
 
 
+def write_photometric_ies_file(photometric_data: PhotometricData,
+                               output_path: str,
+                               overwrite: bool = False) -> bool:
+    """
+    将光度学数据以流式方式写入 IES 文件
+    
+    与 write_ies_file 不同，文件头和 C-Plane 数据逐块写入磁盘，
+    不会在内存中生成完整的文件字符串，适合高分辨率数据。
+    
+    参数:
+        photometric_data: 校准后的光度学数据
+        output_path: 输出文件路径
+        overwrite: 是否覆盖已存在的文件
+    
+    返回:
+        True 如果写入成功
+    
+    异常:
+        OutputError: 文件写入失败
+    """
+    # 确保目录存在
+    ensure_directory_exists(os.path.dirname(output_path))
+    
+    # 检查文件是否存在
+    if os.path.exists(output_path) and not overwrite:
+        raise OutputError(f"文件已存在：{output_path}，请确认是否覆盖")
+    
+    try:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            stream_ies(photometric_data, f)
+        return True
+    except Exception as e:
+        raise OutputError(f"写入 IES 文件失败：{str(e)}")
+
+
 def write_metadata_file(metadata: Dict, output_path: str, overwrite: bool = False) -> bool:
     """
     写入 JSON 元数据文件到磁盘
@@ -75,6 +114,24 @@ def write_metadata_file(metadata: Dict, output_path: str, overwrite: bool = Fals
         raise OutputError(f"写入元数据文件失败：{str(e)}")
 
 
+def write_json_atomic(path: str, data: Dict):
+    """
+    原子地写入 JSON 文件（先写临时文件再改名）
+    
+    参数:
+        path: 输出文件路径（所在目录必须已存在）
+        data: 可 JSON 序列化的字典
+    
+    说明:
+        读取方不会看到写了一半的 JSON；临时文件名带随机后缀，
+        多个进程同时写同一路径时不会互相覆盖临时文件，最后一次改名的内容生效
+    """
+    temporary_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(temporary_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(temporary_path, path)
+
+
 def ensure_directory_exists(directory: str):
     """
     创建必要的目录
@@ -93,7 +150,8 @@ def generate_metadata(fixture_name: str,
                      photometric_center_world: Tuple[float, float, float],
                      photometric_center_relative: Tuple[float, float, float],
                      light_sources: List[Dict],
-                     total_lumens: float) -> Dict:
+                     total_lumens: float,
+                     spherical_harmonics: Optional[Dict] = None) -> Dict:
     """
     生成完整的元数据字典
     
@@ -103,6 +161,8 @@ def generate_metadata(fixture_name: str,
         photometric_center_relative: 光度中心相对坐标 (x, y, z)
         light_sources: 光源信息列表
         total_lumens: 总流明值
+        spherical_harmonics: 球谐拟合结果（可选，SphericalHarmonicFit.to_dict()），
+            包含阶数、约定、系数和相对残差
     
     返回:
         元数据字典
@@ -134,6 +194,9 @@ def generate_metadata(fixture_name: str,
         }
     }
     
+    if spherical_harmonics is not None:
+        metadata["spherical_harmonics"] = spherical_harmonics
+    
     return metadata
 
 
@@ -203,3 +266,31 @@ def get_metadata_path(ies_path: str) -> str:
     """
     base_path = os.path.splitext(ies_path)[0]
     return f"{base_path}_metadata.json"
+
+
+def get_archive_path(ies_path: str) -> str:
+    """
+    根据 IES 文件路径生成原始测量存档路径
+    
+    参数:
+        ies_path: IES 文件路径
+    
+    返回:
+        测量存档文件路径（.kma）
+    """
+    base_path = os.path.splitext(ies_path)[0]
+    return f"{base_path}_measurement.kma"
+
+
+def get_basis_path(ies_path: str) -> str:
+    """
+    根据 IES 文件路径生成光源组基网格存档路径
+    
+    参数:
+        ies_path: IES 文件路径
+    
+    返回:
+        基网格存档文件路径（.kma，见 superposition）
+    """
+    base_path = os.path.splitext(ies_path)[0]
+    return f"{base_path}_basis.kma"
@@ -0,0 +1,203 @@
+"""
+光度学数值模块 (Photometry)
+
+提供球面积分所需的立体角求积权重，用于校准和光通量计算。
+
+角度约定（与 IES C-Plane 一致）：
+- 垂直角度 theta：0° = 正下方，180° = 正上方
+- 水平角度 phi：0° 到 360°
+
+求积方法：
+- 每个采样点代表一个球面单元，单元边界取相邻角度的中点
+- 垂直方向：单元立体角按 cos(θ_下边界) - cos(θ_上边界) 精确计算，
+  因此极点附近的密集采样点不会被高估
+- 水平方向：单元宽度取相邻角度中点之间的弧度，首尾环绕 360°
+- 权重网格只与角度集合有关，按角度集合缓存，重复校准只需一次点积
+"""
+
+from typing import Tuple
+from functools import lru_cache
+import numpy as np
+
+
+# 权重缓存容量（按不同角度集合计）
+WEIGHT_CACHE_SIZE = 64
+
+# 角度比较容差（度）
+ANGLE_TOLERANCE = 1e-6
+
+# IES 水平对称跨度（度）：0-90 为四象限对称，0-180 或 90-270 为双侧对称
+SYMMETRIC_SPANS = (90.0, 180.0)
+
+
+def get_solid_angle_weights(vertical_angles: np.ndarray,
+                            horizontal_angles: np.ndarray) -> np.ndarray:
+    """
+    获取角度网格的立体角求积权重
+    
+    参数:
+        vertical_angles: 垂直角度（度），严格递增，范围 0-180
+        horizontal_angles: 水平角度（度），严格递增
+    
+    返回:
+        np.ndarray: 只读权重网格 (N_theta, N_phi)，单位为球面度（sr），
+            Σ weights × I 即为总光通量
+    
+    异常:
+        ValueError: 角度不足或不是严格递增
+    
+    支持的角度集合:
+        - 全球面 0-180°，或只覆盖半球的 0-90° / 90-180°（范围外视为无光）
+        - 非均匀间隔
+        - 水平方向：单个角度（旋转对称）、0-90°（四象限对称）、
+          0-180° 或 90-270°（双侧对称）、完整圆周（可含或不含 360°）
+    """
+    vertical_key = np.ascontiguousarray(vertical_angles, dtype=float).tobytes()
+    horizontal_key = np.ascontiguousarray(horizontal_angles, dtype=float).tobytes()
+    return _cached_solid_angle_weights(vertical_key, horizontal_key)
+
+
+def integrate_flux(vertical_angles: np.ndarray,
+                   horizontal_angles: np.ndarray,
+                   intensity: np.ndarray) -> float:
+    """
+    对光强网格做球面积分
+    
+    参数:
+        vertical_angles: 垂直角度（度）
+        horizontal_angles: 水平角度（度）
+        intensity: 光强网格 (N_theta, N_phi)，单位 cd 时结果为流明
+    
+    返回:
+        float: Σ weights × intensity
+    """
+    weights = get_solid_angle_weights(vertical_angles, horizontal_angles)
+    return float(np.vdot(weights, intensity))
+
+
+def get_solid_angle_factors(vertical_angles: np.ndarray,
+                            horizontal_angles: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    获取权重网格的可分离因子
+    
+    参数:
+        vertical_angles: 垂直角度（度）
+        horizontal_angles: 水平角度（度）
+    
+    返回:
+        (band_solid_angles, plane_widths)
+            - band_solid_angles: 每个纬度带的 ∫ sinθ dθ，形状 (N_theta,)
+            - plane_widths: 每个 C-Plane 的方位角宽度（弧度），形状 (N_phi,)
+        权重网格即两者的外积；需要按 θ、φ 分别求和的算法（如球谐拟合）直接使用因子
+    
+    异常:
+        ValueError: 角度不足或不是严格递增
+    """
+    vertical_angles = np.asarray(vertical_angles, dtype=float)
+    horizontal_angles = np.asarray(horizontal_angles, dtype=float)
+    return _vertical_band_weights(vertical_angles), _horizontal_plane_widths(horizontal_angles)
+
+
+def clear_weight_cache():
+    """清空权重缓存"""
+    _cached_solid_angle_weights.cache_clear()
+
+
+# ============================================================================
+# 辅助函数
+# ============================================================================
+
+@lru_cache(maxsize=WEIGHT_CACHE_SIZE)
+def _cached_solid_angle_weights(vertical_key: bytes, horizontal_key: bytes) -> np.ndarray:
+    """
+    计算并缓存权重网格（以角度数组的字节内容为键）
+    """
+    vertical_angles = np.frombuffer(vertical_key, dtype=float)
+    horizontal_angles = np.frombuffer(horizontal_key, dtype=float)
+    
+    band_solid_angles, plane_widths = get_solid_angle_factors(vertical_angles, horizontal_angles)
+    
+    weights = np.outer(band_solid_angles, plane_widths)
+    weights.flags.writeable = False
+    return weights
+
+
+def _vertical_band_weights(vertical_angles: np.ndarray) -> np.ndarray:
+    """
+    计算每个垂直角度所在纬度带的 ∫ sinθ dθ
+    
+    参数:
+        vertical_angles: 垂直角度（度）
+    
+    返回:
+        np.ndarray: 每个纬度带的 cos(θ_下) - cos(θ_上)，形状 (N_theta,)
+    
+    说明:
+        单元边界取相邻角度的中点；首尾单元止于首尾角度本身，
+        因此 0-90° 的列表只积分下半球。
+    """
+    if len(vertical_angles) < 2:
+        raise ValueError("垂直角度至少需要 2 个才能进行球面积分")
+    if np.any(np.diff(vertical_angles) <= 0):
+        raise ValueError("垂直角度必须严格递增")
+    
+    theta = np.radians(np.clip(vertical_angles, 0.0, 180.0))
+    midpoints = (theta[1:] + theta[:-1]) / 2
+    lower = np.concatenate(([theta[0]], midpoints))
+    upper = np.concatenate((midpoints, [theta[-1]]))
+    
+    return np.cos(lower) - np.cos(upper)
+
+
+def _horizontal_plane_widths(horizontal_angles: np.ndarray) -> np.ndarray:
+    """
+    计算每个水平角度（C-Plane）代表的方位角宽度（弧度）
+    
+    参数:
+        horizontal_angles: 水平角度（度）
+    
+    返回:
+        np.ndarray: 每个 C-Plane 的宽度，总和为 2π，形状 (N_phi,)
+    """
+    count = len(horizontal_angles)
+    
+    # 单个水平角度：旋转对称
+    if count == 1:
+        return np.array([2 * np.pi])
+    
+    if np.any(np.diff(horizontal_angles) <= 0):
+        raise ValueError("水平角度必须严格递增")
+    
+    span = horizontal_angles[-1] - horizontal_angles[0]
+    
+    # 对称数据：首尾单元止于首尾角度，再按对称性放大到整个圆周
+    if any(abs(span - symmetric) < ANGLE_TOLERANCE for symmetric in SYMMETRIC_SPANS):
+        widths = _interval_widths(horizontal_angles)
+        return np.radians(widths * (360.0 / span))
+    
+    # 含 360° 的闭合圆周：360° 与 0° 是同一个平面，不重复计入
+    if abs(span - 360.0) < ANGLE_TOLERANCE:
+        widths = _wrapped_widths(horizontal_angles[:-1])
+        return np.radians(np.append(widths, 0.0))
+    
+    return np.radians(_wrapped_widths(horizontal_angles))
+
+
+def _interval_widths(angles: np.ndarray) -> np.ndarray:
+    """
+    区间内的单元宽度（度），首尾单元止于端点
+    """
+    midpoints = (angles[1:] + angles[:-1]) / 2
+    lower = np.concatenate(([angles[0]], midpoints))
+    upper = np.concatenate((midpoints, [angles[-1]]))
+    return upper - lower
+
+
+def _wrapped_widths(angles: np.ndarray) -> np.ndarray:
+    """
+    完整圆周上的单元宽度（度），首尾相邻单元跨越 360° 环绕
+    """
+    if len(angles) == 1:
+        return np.array([360.0])
+    extended = np.concatenate(([angles[-1] - 360.0], angles, [angles[0] + 360.0]))
+    return (extended[2:] - extended[:-2]) / 2
@@ -0,0 +1,546 @@
+"""
+生成流程模块 (Pipeline)
+
+串联场景验证、球面采样、校准和输出，完成一次完整的 IES 生成任务。
+每个任务除 IES 和元数据外，还会在 IES 旁保存原始测量存档（.kma），
+之后可通过 measurement_archive.recalibrate_archive 重新校准导出，无需重新渲染。
+
+run_light_group_job 用 Cycles 光源组一次采样得到每个光源组各自的 IES（如上照/下照分量）。
+run_frame_batch_job 对动画灯具逐帧测量，每帧输出一个 IES，状态未变化的帧按指纹复用。
+run_fixture_batch_job 对 .blend 中每个标记为灯具的集合分别测量，每个灯具输出一个 IES。
+"""
+
+from typing import Dict, Callable, List, Optional, Sequence, Tuple
+from dataclasses import replace
+import os
+import time
+import bpy
+
+from .data_structures import SamplingConfig, SamplingResult, SceneValidationError
+from .scene_validator import (
+    validate_scene,
+    calculate_photometric_center,
+    calculate_relative_photometric_center,
+    get_fixture_origin,
+    get_light_properties,
+    get_tagged_fixture_collections,
+    get_total_lumens,
+)
+from .sampler import collect_light_group_data, collect_spherical_data
+from .ies_generator import DEFAULT_FIXTURE_NAME
+from .output_manager import write_metadata_file, get_basis_path
+from .exporters import DEFAULT_EXPORT_FORMATS, write_photometric_exports
+from .result_export import export_sampling_result
+from .measurement_profiles import DEFAULT_MEASUREMENT_PROFILE
+from .fixture_lod import LODSettings
+from .emitter_aggregation import AggregationSettings
+from .light_groups import build_light_groups, get_light_group_output_path
+from .superposition import build_light_basis, save_light_basis
+from .measurement_scene import capture_frame_state, measurement_scene
+from .fixture_batch import (
+    FIXTURE_LUMENS_PROPERTY,
+    FIXTURE_NAME_PROPERTY,
+    FixtureBatchError,
+    FixtureBatchReport,
+    FixtureResult,
+    get_fixture_manifest_path,
+    plan_fixture_outputs,
+)
+from .frame_batch import (
+    FrameBatchReport,
+    FrameResult,
+    calculate_frame_numbers,
+    fingerprint_frame_state,
+    get_frame_manifest_path,
+    get_frame_name,
+    get_frame_output_path,
+)
+
+
+def run_generation_job(config: SamplingConfig,
+                       total_lumens: float,
+                       output_path: str,
+                       fixture_name: str = DEFAULT_FIXTURE_NAME,
+                       overwrite: bool = False,
+                       progress_callback: Optional[Callable[[int, int], None]] = None,
+                       spherical_harmonics_band: Optional[int] = None,
+                       denoise: bool = False,
+                       sensor_denoise: bool = False,
+                       measurement_profile: str = DEFAULT_MEASUREMENT_PROFILE,
+                       fixture_lod: Optional[LODSettings] = None,
+                       emitter_aggregation: Optional[AggregationSettings] = None,
+                       export_formats: Sequence[str] = DEFAULT_EXPORT_FORMATS) -> Dict:
+    """
+    对当前场景执行完整的 IES 生成任务
+    
+    参数:
+        config: 采样配置
+        total_lumens: 目标总流明
+        output_path: IES 输出路径
+        fixture_name: 灯具名称
+        overwrite: 是否覆盖已存在的文件
+        progress_callback: 进度回调函数 callback(current, total)
+        spherical_harmonics_band: 球谐拟合阶数（可选，None 时不拟合），
+            系数和残差写入元数据
+        denoise: 是否在校准前对亮度网格做球面降噪（允许使用更低的采样数），
+            降噪报告写入元数据
+        sensor_denoise: 是否对每帧传感器渲染启用 OpenImageDenoise
+            （采样数应先用 sensor_validation 验证）
+        measurement_profile: 传感器渲染的测量配置名称（见 measurement_profiles）
+        fixture_lod: 测量前的灯具简化参数（可选，见 fixture_lod），
+            简化报告写入元数据
+        emitter_aggregation: 测量前的发光体聚合参数（可选，见 emitter_aggregation），
+            聚合报告写入元数据
+        export_formats: 导出格式（'IES2002'、'IES2019'、'LDT'，见 exporters），
+            IES LM-63-2002 始终写入 output_path，其余格式写在旁边
+    
+    返回:
+        dict: 任务结果
+            {
+                'ies_path': str,
+                'metadata_path': str,
+                'archive_path': str,  # 原始测量存档
+                'export_paths': Dict[str, str],  # 导出格式 → 文件路径
+                'sampling_result': SamplingResult,  # 原始（未降噪）采样结果
+                'photometric_data': PhotometricData,
+                'denoise_report': DenoiseReport 或 None
+            }
+    
+    异常:
+        ValueError: 采样配置无效
+        SceneValidationError: 场景验证失败
+        CalibrationError / OutputError / ArchiveError / ExportError: 校准或写入失败
+        SphericalHarmonicsError / DenoisingError: 球谐拟合或降噪失败
+    
+    流程:
+        1. 验证场景并计算光度中心
+        2. 球面采样
+        3. 保存原始测量存档（先于降噪和校准，之后仍可重新处理）
+        4. 降噪（可选），校准为坎德拉并流式写入 IES 及其他导出格式
+        5. 球谐拟合（可选）并写入元数据
+    """
+    sampling_result, light_objects, center_world, center_relative = measure_scene(
+        config,
+        progress_callback,
+        sensor_denoise,
+        measurement_profile,
+        fixture_lod,
+        emitter_aggregation
+    )
+    
+    return export_sampling_result(
+        sampling_result,
+        config,
+        total_lumens,
+        output_path,
+        fixture_name,
+        overwrite,
+        [get_light_properties(light) for light in light_objects],
+        center_world,
+        center_relative,
+        spherical_harmonics_band,
+        denoise,
+        export_formats=export_formats
+    )
+
+
+def measure_scene(config: SamplingConfig,
+                  progress_callback: Optional[Callable[[int, int], None]] = None,
+                  sensor_denoise: bool = False,
+                  measurement_profile: str = DEFAULT_MEASUREMENT_PROFILE,
+                  fixture_lod: Optional[LODSettings] = None,
+                  emitter_aggregation: Optional[AggregationSettings] = None,
+                  theta_indices: Optional[List[int]] = None) -> Tuple[SamplingResult, List, Tuple, Tuple]:
+    """
+    验证当前场景、计算光度中心并做球面采样（run_generation_job 的流程 1-2）
+    
+    参数:
+        theta_indices: 只测量这些垂直角度索引（可选，见 sampler.collect_spherical_data），
+            分片工作进程用它测量一部分行
+        其余参数同 run_generation_job
+    
+    返回:
+        Tuple: (采样结果, 有效光源对象列表, 光度中心世界坐标, 光度中心相对灯具原点的坐标)
+    
+    异常:
+        ValueError: 采样配置无效
+        SceneValidationError: 场景验证失败
+        SamplingError: 采样失败
+    """
+    if not config.validate():
+        raise ValueError(f"采样配置无效：{config!r}")
+    
+    validation = validate_scene()
+    if not validation.is_valid:
+        raise SceneValidationError("场景验证失败", errors=validation.errors)
+    
+    light_objects = validation.light_objects
+    center_world = calculate_photometric_center(light_objects)
+    center_relative = calculate_relative_photometric_center(light_objects, get_fixture_origin())
+    
+    sampling_result = collect_spherical_data(
+        center_world,
+        config.angular_interval,
+        config.distance,
+        config.samples,
+        progress_callback,
+        denoise=sensor_denoise,
+        profile=measurement_profile,
+        lod=fixture_lod,
+        aggregation=emitter_aggregation,
+        theta_indices=theta_indices
+    )
+    
+    return sampling_result, light_objects, center_world, center_relative
+
+
+def run_light_group_job(config: SamplingConfig,
+                        output_path: str,
+                        fixture_name: str = DEFAULT_FIXTURE_NAME,
+                        light_groups: Optional[Dict[str, List[str]]] = None,
+                        overwrite: bool = False,
+                        progress_callback: Optional[Callable[[int, int], None]] = None,
+                        spherical_harmonics_band: Optional[int] = None,
+                        denoise: bool = False,
+                        measurement_profile: str = DEFAULT_MEASUREMENT_PROFILE,
+                        fixture_lod: Optional[LODSettings] = None,
+                        export_formats: Sequence[str] = DEFAULT_EXPORT_FORMATS) -> Dict[str, Dict]:
+    """
+    一次采样为每个光源组分别生成 IES
+    
+    参数:
+        config: 采样配置
+        output_path: IES 输出路径，每个组写入 <文件名>_<组名>.ies
+        fixture_name: 灯具名称，每个组的 IES 使用 <灯具名称>_<组名>
+        light_groups: 组名 → 光源名称列表（可选，见 light_groups.build_light_groups），
+            None 时每个光源单独成组
+        其余参数同 run_generation_job（没有 sensor_denoise：OpenImageDenoise 只作用于
+            Combined 通道，光源组通道读回的是未降噪数据；可用 denoise 在校准前做球面降噪）
+    
+    返回:
+        Dict[str, Dict]: 组名 → 该组的任务结果（格式同 run_generation_job 的返回值，
+            另有 'basis_path'：所有组共用的基网格存档，见 superposition）
+    
+    异常:
+        同 run_generation_job，另有 LightGroupError（分组无效）；
+        灯具含自发光网格时抛出 SamplingError（其发光不属于任何光源组，见 collect_light_group_data）
+    
+    说明:
+        所有组按共同因子（Σ标称流明 / Σ测量光通量，见 superposition.build_light_basis）
+        校准，并共用灯具的光度中心，导出的 IES 在同一位置叠加即为完整灯具的配光；
+        各组 IES 与基存档使用同一组校准流明，元数据的 'group_lumens' 记录该组的标称流明和校准流明。
+        基网格存档保存在 <文件名>_basis.kma，之后可用 superposition.export_preset
+        导出任意调光组合，无需重新渲染
+    """
+    if not config.validate():
+        raise ValueError(f"采样配置无效：{config!r}")
+    
+    validation = validate_scene()
+    if not validation.is_valid:
+        raise SceneValidationError("场景验证失败", errors=validation.errors)
+    
+    light_objects = validation.light_objects
+    center_world = calculate_photometric_center(light_objects)
+    center_relative = calculate_relative_photometric_center(light_objects, get_fixture_origin())
+    
+    light_groups = build_light_groups([light.name for light in light_objects], light_groups)
+    
+    group_results = collect_light_group_data(
+        center_world,
+        config.angular_interval,
+        config.distance,
+        config.samples,
+        progress_callback,
+        light_groups=light_groups,
+        profile=measurement_profile,
+        lod=fixture_lod
+    )
+    
+    lights_by_name = {light.name: light for light in light_objects}
+    group_lumens = {
+        group_name: get_total_lumens([lights_by_name[name] for name in light_names])
+        for group_name, light_names in light_groups.items()
+    }
+    
+    basis_path = get_basis_path(output_path)
+    basis = build_light_basis(group_results, group_lumens)
+    save_light_basis(basis, basis_path, overwrite)
+    # 各组 IES 与基存档使用同一组校准流明
+    calibrated_lumens = dict(zip(basis.group_names, basis.lumens.tolist()))
+    
+    results = {}
+    for group_name, light_names in light_groups.items():
+        group_lights = [lights_by_name[name] for name in light_names]
+        results[group_name] = export_sampling_result(
+            group_results[group_name],
+            config,
+            calibrated_lumens[group_name],
+            get_light_group_output_path(output_path, group_name),
+            f"{fixture_name}_{group_name}",
+            overwrite,
+            [get_light_properties(light) for light in group_lights],
+            center_world,
+            center_relative,
+            spherical_harmonics_band,
+            denoise,
+            {'group_lumens': {'nominal': group_lumens[group_name],
+                              'calibrated': calibrated_lumens[group_name]}},
+            export_formats
+        )
+        results[group_name]['basis_path'] = basis_path
+    
+    return results
+
+
+def run_frame_batch_job(config: SamplingConfig,
+                        output_path: str,
+                        frame_start: int,
+                        frame_end: int,
+                        frame_step: int = 1,
+                        total_lumens: Optional[float] = None,
+                        fixture_name: str = DEFAULT_FIXTURE_NAME,
+                        overwrite: bool = False,
+                        progress_callback: Optional[Callable[[int, int], None]] = None,
+                        frame_callback: Optional[Callable[[int, int], None]] = None,
+                        skip_unchanged: bool = True,
+                        denoise: bool = False,
+                        sensor_denoise: bool = False,
+                        measurement_profile: str = DEFAULT_MEASUREMENT_PROFILE,
+                        export_formats: Sequence[str] = DEFAULT_EXPORT_FORMATS) -> FrameBatchReport:
+    """
+    逐帧测量动画灯具，每帧输出一个 IES
+    
+    参数:
+        config: 采样配置
+        output_path: IES 输出路径，每帧写入 <文件名>_f<帧号>.ies
+        frame_start: 起始帧
+        frame_end: 结束帧（包含）
+        frame_step: 帧步长
+        total_lumens: 目标总流明（可选，None 时每帧按光源功率计算，适用于调光动画）
+        fixture_name: 灯具名称，每帧的 IES 使用 <灯具名称>_f<帧号>
+        overwrite: 是否覆盖已存在的文件
+        progress_callback: 单帧采样的进度回调 callback(current, total)
+        frame_callback: 帧进度回调 callback(completed_frames, total_frames)
+        skip_unchanged: 是否按帧状态指纹复用已测量帧
+        denoise / sensor_denoise / measurement_profile / export_formats: 同 run_generation_job
+    
+    返回:
+        FrameBatchReport: 各帧结果，同时写入 <文件名>_frames.json
+    
+    异常:
+        FrameBatchError: 帧范围无效
+        其余同 run_generation_job
+    
+    说明:
+        所有帧在同一个测量场景中渲染并启用 Cycles 持久数据，
+        帧间只更新变化的对象，不重建场景和 BVH；结束后恢复原场景的当前帧。
+        每帧重新计算光度中心（摇头灯的光源会随帧移动）。
+        状态指纹见 measurement_scene.capture_frame_state。
+    """
+    if not config.validate():
+        raise ValueError(f"采样配置无效：{config!r}")
+    
+    frames = calculate_frame_numbers(frame_start, frame_end, frame_step)
+    
+    source_scene = bpy.context.scene
+    original_frame = source_scene.frame_current
+    start_time = time.time()
+    report = FrameBatchReport()
+    
+    # 指纹 → (已测量帧号, 光度学数据)
+    measured = {}
+    
+    try:
+        source_scene.frame_set(frames[0])
+        validation = validate_scene()
+        if not validation.is_valid:
+            raise SceneValidationError("场景验证失败", errors=validation.errors)
+        light_objects = validation.light_objects
+        
+        with measurement_scene(source_scene, light_objects) as scene:
+            # Cycles 持久数据：帧间保留已构建的场景数据和 BVH
+            scene.render.use_persistent_data = True
+            fixture_objects = list(scene.objects)
+            
+            for index, frame in enumerate(frames):
+                frame_start_time = time.time()
+                source_scene.frame_set(frame)
+                scene.frame_set(frame)
+                
+                state = capture_frame_state(fixture_objects, bpy.context.evaluated_depsgraph_get())
+                fingerprint = fingerprint_frame_state(state)
+                ies_path = get_frame_output_path(output_path, frame)
+                frame_name = get_frame_name(fixture_name, frame)
+                
+                if skip_unchanged and fingerprint in measured:
+                    reused_from, photometric_data = measured[fingerprint]
+                    write_photometric_exports(
+                        replace(photometric_data, fixture_name=frame_name), ies_path, export_formats, overwrite
+                    )
+                else:
+                    reused_from = None
+                    center_world = calculate_photometric_center(light_objects)
+                    center_relative = calculate_relative_photometric_center(light_objects, get_fixture_origin())
+                    
+                    sampling_result = collect_spherical_data(
+                        center_world,
+                        config.angular_interval,
+                        config.distance,
+                        config.samples,
+                        progress_callback,
+                        denoise=sensor_denoise,
+                        profile=measurement_profile,
+                        scene=scene
+                    )
+                    sampling_result.render_settings['frame'] = frame
+                    
+                    result = export_sampling_result(
+                        sampling_result,
+                        config,
+                        total_lumens if total_lumens is not None else get_total_lumens(light_objects),
+                        ies_path,
+                        frame_name,
+                        overwrite,
+                        [get_light_properties(light) for light in light_objects],
+                        center_world,
+                        center_relative,
+                        None,
+                        denoise,
+                        export_formats=export_formats
+                    )
+                    measured[fingerprint] = (frame, result['photometric_data'])
+                
+                report.frames.append(FrameResult(
+                    frame=frame,
+                    fingerprint=fingerprint,
+                    ies_path=ies_path,
+                    reused_from=reused_from,
+                    elapsed_time=time.time() - frame_start_time
+                ))
+                
+                if frame_callback:
+                    frame_callback(index + 1, len(frames))
+    finally:
+        source_scene.frame_set(original_frame)
+    
+    report.elapsed_time = time.time() - start_time
+    write_metadata_file(report.to_dict(), get_frame_manifest_path(output_path), overwrite)
+    
+    return report
+
+
+def run_fixture_batch_job(config: SamplingConfig,
+                          output_dir: str,
+                          overwrite: bool = False,
+                          progress_callback: Optional[Callable[[int, int], None]] = None,
+                          fixture_callback: Optional[Callable[[int, int], None]] = None,
+                          stop_on_error: bool = False,
+                          spherical_harmonics_band: Optional[int] = None,
+                          denoise: bool = False,
+                          sensor_denoise: bool = False,
+                          measurement_profile: str = DEFAULT_MEASUREMENT_PROFILE,
+                          export_formats: Sequence[str] = DEFAULT_EXPORT_FORMATS) -> FixtureBatchReport:
+    """
+    分别测量当前场景中每个标记为灯具的集合
+    
+    参数:
+        config: 采样配置
+        output_dir: 输出目录，每个灯具写入 <灯具名称>.ies 和元数据，
+            批量清单写入 fixtures.json
+        overwrite: 是否覆盖已存在的文件
+        progress_callback: 单个灯具采样的进度回调 callback(current, total)
+        fixture_callback: 灯具进度回调 callback(completed_fixtures, total_fixtures)
+        stop_on_error: 某个灯具失败时是否中止（默认记录错误并继续下一个）
+        spherical_harmonics_band / denoise / sensor_denoise / measurement_profile / export_formats:
+            同 run_generation_job
+    
+    返回:
+        FixtureBatchReport: 各灯具结果
+    
+    异常:
+        FixtureBatchError: 没有标记的集合或灯具名称重复
+        stop_on_error=True 时，同 run_generation_job
+    
+    说明:
+        集合标记见 fixture_batch。每个灯具在只包含该集合的测量场景中渲染，
+        光源、光度中心和灯具原点都只取自该集合，与选择状态无关。
+        整个批量在当前会话中完成，.blend 只载入一次。
+    """
+    if not config.validate():
+        raise ValueError(f"采样配置无效：{config!r}")
+    
+    source_scene = bpy.context.scene
+    collections = get_tagged_fixture_collections(source_scene)
+    if not collections:
+        raise FixtureBatchError("场景中没有标记为灯具的集合（自定义属性 kiro_fixture）")
+    
+    fixture_names = [collection.get(FIXTURE_NAME_PROPERTY) or collection.name for collection in collections]
+    output_paths = plan_fixture_outputs(fixture_names, output_dir)
+    
+    start_time = time.time()
+    report = FixtureBatchReport()
+    
+    for index, (collection, fixture_name) in enumerate(zip(collections, fixture_names)):
+        fixture_start_time = time.time()
+        result = FixtureResult(
+            collection=collection.name,
+            fixture_name=fixture_name,
+            ies_path=output_paths[fixture_name]
+        )
+        
+        try:
+            validation = validate_scene(collection)
+            if not validation.is_valid:
+                raise SceneValidationError(f"灯具 {fixture_name} 验证失败", errors=validation.errors)
+            
+            light_objects = validation.light_objects
+            fixture_objects = [obj for obj in collection.all_objects if obj.type == 'MESH'] or light_objects
+            center_world = calculate_photometric_center(light_objects)
+            center_relative = calculate_relative_photometric_center(
+                light_objects, get_fixture_origin(collection)
+            )
+            total_lumens = collection.get(FIXTURE_LUMENS_PROPERTY) or get_total_lumens(light_objects)
+            
+            with measurement_scene(source_scene, light_objects, fixture_objects) as scene:
+                sampling_result = collect_spherical_data(
+                    center_world,
+                    config.angular_interval,
+                    config.distance,
+                    config.samples,
+                    progress_callback,
+                    denoise=sensor_denoise,
+                    profile=measurement_profile,
+                    scene=scene
+                )
+            
+            job = export_sampling_result(
+                sampling_result,
+                config,
+                float(total_lumens),
+                result.ies_path,
+                fixture_name,
+                overwrite,
+                [get_light_properties(light) for light in light_objects],
+                center_world,
+                center_relative,
+                spherical_harmonics_band,
+                denoise,
+                export_formats=export_formats
+            )
+            result.metadata_path = job['metadata_path']
+            result.total_lumens = float(total_lumens)
+        except Exception as e:
+            if stop_on_error:
+                raise
+            result.error = str(e)
+        
+        result.elapsed_time = time.time() - fixture_start_time
+        report.fixtures.append(result)
+        
+        if fixture_callback:
+            fixture_callback(index + 1, len(collections))
+    
+    report.elapsed_time = time.time() - start_time
+    write_metadata_file(report.to_dict(), get_fixture_manifest_path(output_dir), overwrite)
+    
+    return report
@@ -0,0 +1,398 @@
+"""
+光度学重采样模块 (Resampling)
+
+将 PhotometricData 重采样到任意垂直/水平角度集合，并对任意方向数组查询光强。
+用于在客户指定的角度网格之间转换，以及为下游工具提供数据，无需重新渲染。
+
+插值方法：
+- bilinear：在 (θ, φ) 上做双线性插值
+- spherical：水平方向按弧度线性插值，垂直方向按 cosθ（等面积坐标）插值，
+  与 photometry 模块立体角求积使用的坐标一致，极点附近不会高估光强
+
+对称与极点处理：
+- 水平角度按 IES 对称约定（单平面、0-90°、0-180°、90-270°）展开到完整圆周，
+  并闭合 360°，水平插值首尾环绕
+- 0° / 180° 极点在所有 C-Plane 上是同一方向，极点值取各平面的平均值
+- 垂直角度范围之外（如只测量了下半球）视为无光，光强为 0
+
+全部计算均为 NumPy 向量化运算。
+"""
+
+from typing import Tuple
+import numpy as np
+
+from .data_structures import PhotometricData
+from .photometry import ANGLE_TOLERANCE, SYMMETRIC_SPANS
+
+
+# ============================================================================
+# 常量定义
+# ============================================================================
+
+# 支持的插值方法
+INTERPOLATION_METHODS = ("bilinear", "spherical")
+
+# 默认插值方法
+DEFAULT_INTERPOLATION_METHOD = "bilinear"
+
+
+class ResamplingError(Exception):
+    """重采样错误"""
+    pass
+
+
+# ============================================================================
+# 查询接口
+# ============================================================================
+
+class IntensityInterpolator:
+    """
+    光强插值器
+    
+    预先展开对称性、闭合水平圆周并处理极点，之后每次查询只做向量化的
+    索引查找和加权，适合对同一份数据反复查询。
+    
+    属性:
+        vertical_angles: 垂直角度（度）
+        horizontal_angles: 展开并闭合到 360° 的水平角度（度）
+        candela_values: 对应的坎德拉网格 (N_theta, N_phi_closed)
+        method: 插值方法
+    """
+    
+    def __init__(self, photometric_data: PhotometricData,
+                 method: str = DEFAULT_INTERPOLATION_METHOD):
+        """
+        参数:
+            photometric_data: 光度学数据
+            method: 插值方法（'bilinear' 或 'spherical'）
+        
+        异常:
+            ResamplingError: 插值方法不支持或角度数据无效
+        """
+        if method not in INTERPOLATION_METHODS:
+            raise ResamplingError(f"不支持的插值方法：{method}（可选：{', '.join(INTERPOLATION_METHODS)}）")
+        
+        vertical_angles = np.asarray(photometric_data.vertical_angles, dtype=float)
+        if len(vertical_angles) < 2 or np.any(np.diff(vertical_angles) <= 0):
+            raise ResamplingError("垂直角度至少需要 2 个，且必须严格递增")
+        
+        horizontal_angles, candela_values = expand_horizontal_symmetry(
+            photometric_data.horizontal_angles,
+            photometric_data.candela_values
+        )
+        
+        self.vertical_angles = vertical_angles
+        self.horizontal_angles = horizontal_angles
+        self.candela_values = _collapse_poles(vertical_angles, candela_values)
+        self.method = method
+        
+        # 垂直插值坐标：spherical 方法使用 -cosθ（随 θ 单调递增）
+        self._vertical_coordinates = self._to_vertical_coordinate(vertical_angles)
+    
+    def __call__(self, vertical_angles, horizontal_angles) -> np.ndarray:
+        """
+        查询任意方向的光强
+        
+        参数:
+            vertical_angles: 垂直角度数组（度），0° = 正下方
+            horizontal_angles: 水平角度数组（度），可超出 0-360°（按圆周取模）
+        
+        返回:
+            np.ndarray: 光强（cd），形状为两个输入广播后的形状
+        """
+        theta, phi = np.broadcast_arrays(
+            np.asarray(vertical_angles, dtype=float),
+            np.asarray(horizontal_angles, dtype=float)
+        )
+        
+        t0, t1, tw, inside = self._vertical_weights(theta.ravel())
+        p0, p1, pw = self._horizontal_weights(phi.ravel())
+        
+        grid = self.candela_values
+        values = ((1 - tw) * ((1 - pw) * grid[t0, p0] + pw * grid[t0, p1]) +
+                  tw * ((1 - pw) * grid[t1, p0] + pw * grid[t1, p1]))
+        values[~inside] = 0.0
+        
+        return values.reshape(theta.shape)
+    
+    def resample(self, vertical_angles, horizontal_angles) -> np.ndarray:
+        """
+        在规则网格上重采样（可分离插值，先水平后垂直）
+        
+        参数:
+            vertical_angles: 目标垂直角度（度）
+            horizontal_angles: 目标水平角度（度）
+        
+        返回:
+            np.ndarray: 坎德拉网格 (N_theta_target, N_phi_target)
+        """
+        theta = np.asarray(vertical_angles, dtype=float).ravel()
+        phi = np.asarray(horizontal_angles, dtype=float).ravel()
+        
+        p0, p1, pw = self._horizontal_weights(phi)
+        planes = self.candela_values[:, p0] * (1 - pw) + self.candela_values[:, p1] * pw
+        
+        t0, t1, tw, inside = self._vertical_weights(theta)
+        grid = planes[t0] * (1 - tw)[:, None] + planes[t1] * tw[:, None]
+        grid[~inside] = 0.0
+        
+        return grid
+    
+    def _to_vertical_coordinate(self, theta: np.ndarray) -> np.ndarray:
+        """
+        垂直插值坐标（bilinear 为角度本身，spherical 为 -cosθ）
+        """
+        if self.method == "spherical":
+            return -np.cos(np.radians(theta))
+        return theta
+    
+    def _vertical_weights(self, theta: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        垂直方向的插值索引和权重
+        
+        返回:
+            (i0, i1, weight, inside)，inside 标记落在测量范围内的查询
+        """
+        grid = self.vertical_angles
+        inside = ((theta >= grid[0] - ANGLE_TOLERANCE) &
+                  (theta <= grid[-1] + ANGLE_TOLERANCE))
+        
+        clipped = np.clip(theta, grid[0], grid[-1])
+        i1 = np.clip(np.searchsorted(grid, clipped, side='right'), 1, len(grid) - 1)
+        i0 = i1 - 1
+        
+        coordinates = self._vertical_coordinates
+        query = self._to_vertical_coordinate(clipped)
+        weight = (query - coordinates[i0]) / (coordinates[i1] - coordinates[i0])
+        
+        return i0, i1, np.clip(weight, 0.0, 1.0), inside
+    
+    def _horizontal_weights(self, phi: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        水平方向的插值索引和权重（圆周环绕）
+        
+        返回:
+            (i0, i1, weight)
+        """
+        grid = self.horizontal_angles
+        
+        if len(grid) == 1:
+            zeros = np.zeros(len(phi), dtype=int)
+            return zeros, zeros, np.zeros(len(phi))
+        
+        wrapped = grid[0] + np.mod(phi - grid[0], 360.0)
+        i1 = np.clip(np.searchsorted(grid, wrapped, side='right'), 1, len(grid) - 1)
+        i0 = i1 - 1
+        weight = (wrapped - grid[i0]) / (grid[i1] - grid[i0])
+        
+        return i0, i1, np.clip(weight, 0.0, 1.0)
+
+
+def evaluate_intensity(photometric_data: PhotometricData,
+                       vertical_angles,
+                       horizontal_angles,
+                       method: str = DEFAULT_INTERPOLATION_METHOD) -> np.ndarray:
+    """
+    查询任意方向（角度）的光强
+    
+    参数:
+        photometric_data: 光度学数据
+        vertical_angles: 垂直角度数组（度），0° = 正下方
+        horizontal_angles: 水平角度数组（度）
+        method: 插值方法（'bilinear' 或 'spherical'）
+    
+    返回:
+        np.ndarray: 光强（cd），形状为两个输入广播后的形状
+    
+    注意:
+        对同一份数据反复查询时，直接使用 IntensityInterpolator 避免重复预处理
+    """
+    return IntensityInterpolator(photometric_data, method)(vertical_angles, horizontal_angles)
+
+
+def evaluate_directions(photometric_data: PhotometricData,
+                        directions,
+                        method: str = DEFAULT_INTERPOLATION_METHOD) -> np.ndarray:
+    """
+    查询任意方向（向量）的光强
+    
+    参数:
+        photometric_data: 光度学数据
+        directions: 方向向量数组 (..., 3)，Blender Z-up 坐标，无需归一化
+        method: 插值方法
+    
+    返回:
+        np.ndarray: 光强（cd），形状为 directions.shape[:-1]
+    """
+    vertical_angles, horizontal_angles = directions_to_angles(directions)
+    return evaluate_intensity(photometric_data, vertical_angles, horizontal_angles, method)
+
+
+def directions_to_angles(directions) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    方向向量转 IES 角度（与 sampler.spherical_to_cartesian 互逆）
+    
+    参数:
+        directions: 方向向量数组 (..., 3)，Blender Z-up 坐标
+    
+    返回:
+        (vertical_angles, horizontal_angles)
+            - vertical_angles: 0° = -Z（正下方），180° = +Z（正上方）
+            - horizontal_angles: 0° = +X 轴，范围 0-360°
+    
+    异常:
+        ResamplingError: 形状不是 (..., 3) 或包含零向量
+    """
+    directions = np.asarray(directions, dtype=float)
+    if directions.shape[-1:] != (3,):
+        raise ResamplingError(f"方向数组的最后一维必须为 3，实际形状 {directions.shape}")
+    
+    length = np.linalg.norm(directions, axis=-1)
+    if np.any(length == 0):
+        raise ResamplingError("方向向量不能为零向量")
+    
+    x, y, z = directions[..., 0], directions[..., 1], directions[..., 2]
+    vertical_angles = np.degrees(np.arccos(np.clip(-z / length, -1.0, 1.0)))
+    horizontal_angles = np.mod(np.degrees(np.arctan2(y, x)), 360.0)
+    
+    return vertical_angles, horizontal_angles
+
+
+# ============================================================================
+# 网格重采样
+# ============================================================================
+
+def resample_photometric_data(photometric_data: PhotometricData,
+                              vertical_angles,
+                              horizontal_angles,
+                              method: str = DEFAULT_INTERPOLATION_METHOD) -> PhotometricData:
+    """
+    将光度学数据重采样到新的角度网格
+    
+    参数:
+        photometric_data: 光度学数据
+        vertical_angles: 目标垂直角度（度），严格递增
+        horizontal_angles: 目标水平角度（度），严格递增
+        method: 插值方法（'bilinear' 或 'spherical'）
+    
+    返回:
+        PhotometricData: 新网格上的光度学数据（流明、距离、名称和关键字不变）
+    
+    异常:
+        ResamplingError: 目标角度无效或插值方法不支持
+    
+    说明:
+        目标水平角度可以是对称子集（如 0-90°），
+        此时由调用方保证源数据确实具有相应的对称性。
+    """
+    target_vertical = np.asarray(vertical_angles, dtype=float).ravel()
+    target_horizontal = np.asarray(horizontal_angles, dtype=float).ravel()
+    
+    if len(target_vertical) == 0 or len(target_horizontal) == 0:
+        raise ResamplingError("目标角度不能为空")
+    if np.any(np.diff(target_vertical) <= 0) or np.any(np.diff(target_horizontal) <= 0):
+        raise ResamplingError("目标角度必须严格递增")
+    if target_vertical[0] < 0 or target_vertical[-1] > 180:
+        raise ResamplingError("目标垂直角度必须在 0-180° 范围内")
+    
+    interpolator = IntensityInterpolator(photometric_data, method)
+    
+    return PhotometricData(
+        vertical_angles=target_vertical,
+        horizontal_angles=target_horizontal,
+        candela_values=interpolator.resample(target_vertical, target_horizontal),
+        lumens=photometric_data.lumens,
+        distance=photometric_data.distance,
+        fixture_name=photometric_data.fixture_name,
+        keywords=dict(photometric_data.keywords),
+        tilt=photometric_data.tilt
+    )
+
+
+def expand_horizontal_symmetry(horizontal_angles,
+                               candela_values) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    将对称的水平角度数据展开到完整圆周，并闭合 360°
+    
+    参数:
+        horizontal_angles: 水平角度（度），严格递增
+        candela_values: 坎德拉网格 (N_theta, N_phi)
+    
+    返回:
+        (horizontal_angles, candela_values)
+            - 水平角度覆盖 [φ0, φ0 + 360°]，最后一个平面与第一个平面相同
+            - 对应的坎德拉网格 (N_theta, N_phi_closed)
+    
+    异常:
+        ResamplingError: 水平角度不是严格递增或与网格形状不符
+    
+    对称约定（与 LM-63 一致）:
+        - 单个角度：绕垂直轴旋转对称
+        - 0-90°：C0-C180 和 C90-C270 双平面对称
+        - 0-180°：C0-C180 平面对称
+        - 90-270°：C90-C270 平面对称
+        - 其他：视为完整圆周，首尾环绕
+    """
+    angles = np.asarray(horizontal_angles, dtype=float).ravel()
+    values = np.asarray(candela_values, dtype=float)
+    
+    if values.ndim != 2 or values.shape[1] != len(angles):
+        raise ResamplingError(f"坎德拉网格形状 {values.shape} 与水平角度数量 {len(angles)} 不符")
+    
+    if len(angles) == 1:
+        return np.array([0.0, 360.0]), np.repeat(values, 2, axis=1)
+    
+    if np.any(np.diff(angles) <= 0):
+        raise ResamplingError("水平角度必须严格递增")
+    
+    first, last = angles[0], angles[-1]
+    span = last - first
+    columns = np.arange(len(angles))
+    
+    if any(abs(span - symmetric) < ANGLE_TOLERANCE for symmetric in SYMMETRIC_SPANS):
+        if abs(first) < ANGLE_TOLERANCE and abs(span - 90.0) < ANGLE_TOLERANCE:
+            mirrored = [angles, 180.0 - angles, 180.0 + angles, 360.0 - angles]
+        elif abs(first) < ANGLE_TOLERANCE:
+            mirrored = [angles, 360.0 - angles]
+        elif abs(first - 90.0) < ANGLE_TOLERANCE:
+            mirrored = [angles, 180.0 - angles]
+        else:
+            mirrored = None
+        
+        if mirrored is not None:
+            expanded = np.mod(np.concatenate(mirrored), 360.0)
+            sources = np.tile(columns, len(mirrored))
+            order = np.argsort(expanded, kind='stable')
+            expanded, sources = expanded[order], sources[order]
+            keep = np.concatenate(([True], np.diff(expanded) > ANGLE_TOLERANCE))
+            angles, columns = expanded[keep], sources[keep]
+            span = angles[-1] - angles[0]
+    
+    # 含 360° 的闭合圆周已经闭合；否则追加 φ0 + 360° 平面
+    if abs(span - 360.0) >= ANGLE_TOLERANCE:
+        angles = np.append(angles, angles[0] + 360.0)
+        columns = np.append(columns, columns[0])
+    
+    return angles, values[:, columns]
+
+
+# ============================================================================
+# 辅助函数
+# ============================================================================
+
+def _collapse_poles(vertical_angles: np.ndarray, candela_values: np.ndarray) -> np.ndarray:
+    """
+    将 0° / 180° 极点行替换为各平面的平均值（极点在所有 C-Plane 上是同一方向）
+    
+    参数:
+        vertical_angles: 垂直角度（度）
+        candela_values: 展开并闭合后的坎德拉网格（最后一列与第一列相同）
+    
+    返回:
+        np.ndarray: 处理后的网格副本
+    """
+    values = candela_values.copy()
+    for row in (0, len(vertical_angles) - 1):
+        if min(abs(vertical_angles[row]), abs(vertical_angles[row] - 180.0)) < ANGLE_TOLERANCE:
+            values[row, :] = values[row, :-1].mean()
+    return values
@@ -0,0 +1,128 @@
+"""
+结果导出模块 (Result Export)
+
+把一次采样结果导出为任务输出：原始测量存档、IES（及其他光度学格式，见 exporters）和元数据。不依赖 bpy，
+光源信息以 scene_validator.get_light_properties 的字典传入，
+因此 Blender 内的生成流程和不运行 Blender 的分片协调器共用同一套导出步骤。
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+import os
+
+from .data_structures import SamplingConfig, SamplingResult
+from .ies_generator import calibrate_to_candela
+from .output_manager import (
+    generate_metadata,
+    get_archive_path,
+    get_metadata_path,
+    write_metadata_file,
+)
+from .exporters import DEFAULT_EXPORT_FORMATS, validate_export_formats, write_photometric_exports
+from .measurement_archive import save_sampling_result
+from .spherical_harmonics import fit_spherical_harmonics
+from .denoising import denoise_sampling_result
+
+
+# ============================================================================
+# 常量定义
+# ============================================================================
+
+# 从 render_settings 复制到元数据的键（存在且不为 None 时）
+METADATA_RENDER_SETTINGS_KEYS = ('light_group', 'frame', 'fixture_lod', 'emitter_aggregation', 'shards')
+
+
+# ============================================================================
+# 导出
+# ============================================================================
+
+def export_sampling_result(sampling_result: SamplingResult,
+                           config: SamplingConfig,
+                           total_lumens: float,
+                           output_path: str,
+                           fixture_name: str,
+                           overwrite: bool,
+                           light_sources: List[Dict],
+                           center_world: Tuple[float, float, float],
+                           center_relative: Tuple[float, float, float],
+                           spherical_harmonics_band: Optional[int] = None,
+                           denoise: bool = False,
+                           extra_metadata: Optional[Dict] = None,
+                           export_formats: Sequence[str] = DEFAULT_EXPORT_FORMATS) -> Dict:
+    """
+    保存存档、校准并写入 IES 和元数据（pipeline.run_generation_job 的流程 3-5）
+    
+    参数:
+        sampling_result: 采样结果
+        config: 采样配置（使用其中的测量距离）
+        total_lumens: 目标总流明
+        output_path: IES 输出路径，存档和元数据写在旁边
+        fixture_name: 灯具名称
+        overwrite: 是否覆盖已存在的文件
+        light_sources: 光源属性列表（见 scene_validator.get_light_properties）
+        center_world: 光度中心世界坐标
+        center_relative: 光度中心相对灯具原点的坐标
+        spherical_harmonics_band: 球谐拟合阶数（可选，None 时不拟合）
+        denoise: 是否在校准前对亮度网格做球面降噪
+        extra_metadata: 追加到元数据的键值（可选）
+        export_formats: 导出格式（见 exporters.write_photometric_exports），
+            IES LM-63-2002 始终写入 output_path，其余格式写在旁边并记入元数据的 'exports'
+    
+    返回:
+        dict: 任务结果（格式同 pipeline.run_generation_job 的返回值）
+    
+    异常:
+        CalibrationError / OutputError / ArchiveError / ExportError: 校准或写入失败
+        SphericalHarmonicsError / DenoisingError: 球谐拟合或降噪失败
+    """
+    # 在写出存档前检查格式，格式无效时不留下任何文件
+    validate_export_formats(export_formats)
+    
+    archive_path = get_archive_path(output_path)
+    save_sampling_result(sampling_result, archive_path, overwrite)
+    
+    calibration_input = sampling_result
+    denoise_report = None
+    if denoise:
+        calibration_input, denoise_report = denoise_sampling_result(sampling_result)
+    
+    photometric_data = calibrate_to_candela(
+        calibration_input, total_lumens, config.distance, fixture_name
+    )
+    export_paths = write_photometric_exports(photometric_data, output_path, export_formats, overwrite)
+    
+    spherical_harmonics = None
+    if spherical_harmonics_band is not None:
+        spherical_harmonics = fit_spherical_harmonics(photometric_data, spherical_harmonics_band).to_dict()
+    
+    metadata = generate_metadata(
+        fixture_name,
+        center_world,
+        center_relative,
+        light_sources,
+        total_lumens,
+        spherical_harmonics
+    )
+    metadata['measurement_archive'] = os.path.basename(archive_path)
+    if len(export_paths) > 1:
+        metadata['exports'] = {
+            export_format: os.path.basename(path) for export_format, path in export_paths.items()
+        }
+    if denoise_report is not None:
+        metadata['denoising'] = denoise_report.to_dict()
+    for key in METADATA_RENDER_SETTINGS_KEYS:
+        if sampling_result.render_settings.get(key) is not None:
+            metadata[key] = sampling_result.render_settings[key]
+    if extra_metadata:
+        metadata.update(extra_metadata)
+    metadata_path = get_metadata_path(output_path)
+    write_metadata_file(metadata, metadata_path, overwrite)
+    
+    return {
+        'ies_path': output_path,
+        'metadata_path': metadata_path,
+        'archive_path': archive_path,
+        'export_paths': export_paths,
+        'sampling_result': sampling_result,
+        'photometric_data': photometric_data,
+        'denoise_report': denoise_report
+    }
@@ -4,17 +4,111 @@
 负责球面采样、虚拟传感器创建和光强测量。
 """
 
-from typing import List, Dict, Tuple, Callable, Optional
+from typing import List, Dict, Tuple, Callable, Optional, Sequence
 import bpy
+import os
 import math
+import time
+import tempfile
+from contextlib import nullcontext
 import numpy as np
 
+from .data_structures import SamplingResult
+from .scene_validator import get_light_sources
+from .measurement_scene import (
+    aggregate_measurement_lights,
+    assign_light_groups,
+    get_emissive_objects,
+    measurement_scene,
+    restore_light_groups,
+    simplify_measurement_scene,
+)
+from .fixture_lod import LODSettings
+from .emitter_aggregation import AggregationSettings
+from .light_groups import build_light_groups, get_light_group_pass_name
+from .measurement_profiles import (
+    DEFAULT_MEASUREMENT_PROFILE,
+    apply_measurement_profile,
+    capture_scene_settings,
+    get_measurement_profile,
+    restore_scene_settings,
+)
+from .sensor_geometry import (
+    LUMINANCE_WEIGHTS,
+    SensorFrame,
+    calculate_bounding_radius,
+    calculate_center_border,
+    calculate_render_border,
+    calculate_sensor_distance,
+    calculate_sensor_frame,
+    estimate_intensity_variance,
+    integrate_pixel_intensity,
+    project_points_to_sensor,
+)
+
+
+# 传感器渲染分辨率（像素，小尺寸以提高速度；正交传感器按灯具尺寸自动选择）
+SENSOR_RESOLUTION = 64
+
+# 传感器模式：
+# - ORTHOGRAPHIC: 正交相机覆盖灯具包围球，整幅画面积分得到光强
+# - CENTER_PIXEL: 透视相机，取中心像素亮度
+SENSOR_MODE_ORTHOGRAPHIC = 'ORTHOGRAPHIC'
+SENSOR_MODE_CENTER_PIXEL = 'CENTER_PIXEL'
+SENSOR_MODES = (SENSOR_MODE_ORTHOGRAPHIC, SENSOR_MODE_CENTER_PIXEL)
+DEFAULT_SENSOR_MODE = SENSOR_MODE_ORTHOGRAPHIC
+
+# prepare_sensor_render 修改的场景设置，采样结束后恢复
+SENSOR_RENDER_SETTINGS = (
+    'camera',
+    'render.engine',
+    'cycles.samples',
+    'render.resolution_x',
+    'render.resolution_y',
+    'render.resolution_percentage',
+    'render.pixel_aspect_x',
+    'render.pixel_aspect_y',
+    'render.film_transparent',
+    'render.use_border',
+    'render.use_crop_to_border',
+    'render.border_min_x',
+    'render.border_max_x',
+    'render.border_min_y',
+    'render.border_max_y',
+    'cycles.use_denoising',
+    'cycles.denoiser',
+    'cycles.denoising_input_passes',
+    'cycles.denoising_prefilter',
+    'cycles.denoising_use_gpu',
+)
+
 
 class SamplingError(Exception):
     """采样错误"""
     pass
 
 
+def calculate_sampling_angles(angular_interval: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    计算球面采样的角度向量
+    
+    参数:
+        angular_interval: 角度间隔（度）
+    
+    返回:
+        (vertical_angles, horizontal_angles)
+            - vertical_angles: 垂直角度（度），0° (正下方) 到 180° (正上方)
+            - horizontal_angles: 水平角度（度），0° 到 360°（不含 360°）
+    """
+    # 垂直角度：0° (正下方) 到 180° (正上方)
+    theta_values = np.arange(0, 181, angular_interval, dtype=float)
+    
+    # 水平角度：0° 到 360°
+    phi_values = np.arange(0, 360, angular_interval, dtype=float)
+    
+    return theta_values, phi_values
+
+
 def calculate_sampling_points(angular_interval: float, 
                              distance: float,
                              light_position: Tuple[float, float, float]) -> List[Dict]:
@@ -30,27 +124,27 @@ def calculate_sampling_points(angular_interval: float,
         采样点列表，每个元素为:
         {
             'position': (x, y, z),
-            'theta': float,  # 垂直角度（度）
-            'phi': float     # 水平角度（度）
+            'theta': float,     # 垂直角度（度）
+            'phi': float,       # 水平角度（度）
+            'theta_index': int, # 在垂直角度向量中的索引
+            'phi_index': int    # 在水平角度向量中的索引
         }
     """
     sampling_points = []
     
-    # 垂直角度：0° (正下方) 到 180° (正上方)
-    theta_values = np.arange(0, 181, angular_interval)
-    
-    # 水平角度：0° 到 360°
-    phi_values = np.arange(0, 360, angular_interval)
+    theta_values, phi_values = calculate_sampling_angles(angular_interval)
     
-    for theta in theta_values:
-        for phi in phi_values:
+    for theta_index, theta in enumerate(theta_values):
+        for phi_index, phi in enumerate(phi_values):
             # 球面坐标转笛卡尔坐标
             position = spherical_to_cartesian(theta, phi, distance, light_position)
             
             sampling_points.append({
                 'position': position,
                 'theta': float(theta),
-                'phi': float(phi)
+                'phi': float(phi),
+                'theta_index': theta_index,
+                'phi_index': phi_index
             })
     
     return sampling_points
@@ -93,7 +187,8 @@ def spherical_to_cartesian(theta: float, phi: float, r: float,
 
 def create_virtual_sensor(position: Tuple[float, float, float],
                          target: Tuple[float, float, float],
-                         name: str = "VirtualSensor") -> bpy.types.Object:
+                         name: str = "VirtualSensor",
+                         scene: Optional[bpy.types.Scene] = None) -> bpy.types.Object:
     """
     创建虚拟传感器（相机）
     
@@ -101,78 +196,475 @@ def create_virtual_sensor(position: Tuple[float, float, float],
         position: 传感器位置 (x, y, z)
         target: 传感器朝向目标 (x, y, z)
         name: 传感器对象名称
+        scene: 相机所在场景（None 时为当前场景）
     
     返回:
         相机对象
     """
-    # 创建相机
-    bpy.ops.object.camera_add(location=position)
-    camera = bpy.context.object
-    camera.name = name
+    if scene is None:
+        scene = bpy.context.scene
     
-    # 计算朝向
-    direction = (
-        target[0] - position[0],
-        target[1] - position[1],
-        target[2] - position[2]
-    )
+    # 创建相机（不经过 bpy.ops，测量场景不必是当前场景）
+    camera = bpy.data.objects.new(name, bpy.data.cameras.new(name))
+    camera.location = position
+    scene.collection.objects.link(camera)
     
-    # 使用 Track To 约束或手动设置旋转
-    # 这里使用简单的方法：让相机朝向目标
+    orient_sensor(camera, target)
+    
+    return camera
+
+
+def orient_sensor(camera: bpy.types.Object, target: Tuple[float, float, float]):
+    """
+    让传感器从当前位置朝向目标
+    
+    参数:
+        camera: 相机对象（location 已设置）
+        target: 传感器朝向目标 (x, y, z)
+    
+    说明:
+        相机 -Z 轴指向目标，以 Y 轴为上方向；
+        两极的观察方向（±Z）与 Y 轴不平行，旋转不会退化
+    """
+    import mathutils
+    
+    direction = mathutils.Vector(target) - camera.location
     camera.rotation_mode = 'QUATERNION'
+    camera.rotation_quaternion = direction.normalized().to_track_quat('-Z', 'Y')
+
+
+def get_fixture_bounds_points(scene: Optional[bpy.types.Scene] = None) -> List[Tuple[float, float, float]]:
+    """
+    获取灯具几何的世界坐标特征点，用于计算包围球
     
-    # 计算旋转（简化版本，实际可能需要更复杂的计算）
+    参数:
+        scene: 测量场景（None 时为当前场景）
+    
+    返回:
+        点列表：参与渲染的网格对象包围盒角点，以及光源位置
+            （面光源取四个角点，点光源取软阴影半径的六个端点）
+    """
     import mathutils
-    direction_vec = mathutils.Vector(direction).normalized()
-    camera.rotation_quaternion = direction_vec.to_track_quat('-Z', 'Y')
     
-    return camera
+    if scene is None:
+        scene = bpy.context.scene
+    
+    points = []
+    for obj in scene.objects:
+        if obj.hide_render:
+            continue
+        
+        if obj.type == 'MESH':
+            for corner in obj.bound_box:
+                points.append(tuple(obj.matrix_world @ mathutils.Vector(corner)))
+        elif obj.type == 'LIGHT':
+            light = obj.data
+            if light.type == 'AREA':
+                half_x = light.size / 2.0
+                half_y = (light.size_y if light.shape in ('RECTANGLE', 'ELLIPSE') else light.size) / 2.0
+                offsets = [(sx * half_x, sy * half_y, 0.0) for sx in (-1, 1) for sy in (-1, 1)]
+            else:
+                radius = getattr(light, 'shadow_soft_size', 0.0)
+                offsets = [(0.0, 0.0, 0.0)] + [
+                    tuple(radius * sign if axis == i else 0.0 for i in range(3))
+                    for axis in range(3) for sign in (-1, 1)
+                ]
+            for offset in offsets:
+                points.append(tuple(obj.matrix_world @ mathutils.Vector(offset)))
+    
+    return points
+
+
+def configure_orthographic_sensor(camera: bpy.types.Object, frame: SensorFrame, distance: float):
+    """
+    将相机设置为覆盖灯具包围球的正交传感器
+    
+    参数:
+        camera: 相机对象
+        frame: 取景参数
+        distance: 传感器到光度中心的距离（米）
+    """
+    camera.data.type = 'ORTHO'
+    camera.data.ortho_scale = frame.ortho_scale
+    camera.data.sensor_fit = 'AUTO'
+    camera.data.shift_x = 0.0
+    camera.data.shift_y = 0.0
+    camera.data.clip_start = max(distance - frame.radius * 1.5, 0.001)
+    camera.data.clip_end = distance + frame.radius * 1.5
+
+
+def configure_render_border(scene: bpy.types.Scene,
+                            border: Optional[Tuple[float, float, float, float]]):
+    """
+    设置渲染区域并裁剪输出
+    
+    参数:
+        scene: 场景
+        border: 归一化渲染区域 (min_x, max_x, min_y, max_y)，None 时渲染整幅画面
+    """
+    scene.render.use_border = border is not None
+    scene.render.use_crop_to_border = border is not None
+    if border is None:
+        return
+    
+    (scene.render.border_min_x, scene.render.border_max_x,
+     scene.render.border_min_y, scene.render.border_max_y) = border
+
+
+def configure_sensor_denoising(scene: bpy.types.Scene, enabled: bool):
+    """
+    配置传感器渲染的降噪
+    
+    参数:
+        scene: 场景
+        enabled: 是否启用 OpenImageDenoise（CPU），使用反照率和法线辅助通道
+    
+    说明:
+        辅助通道让降噪器区分纹理/几何边缘和噪声，低采样数下仍能保留灯具轮廓；
+        固定使用 CPU 降噪，结果不随显卡型号变化。
+    """
+    scene.cycles.use_denoising = enabled
+    if not enabled:
+        return
+    
+    scene.cycles.denoiser = 'OPENIMAGEDENOISE'
+    scene.cycles.denoising_input_passes = 'RGB_ALBEDO_NORMAL'
+    scene.cycles.denoising_prefilter = 'ACCURATE'
+    
+    # Blender 4.1+ 才有 GPU 降噪选项
+    if hasattr(scene.cycles, 'denoising_use_gpu'):
+        scene.cycles.denoising_use_gpu = False
+
+
+def read_render_pixels(scene: bpy.types.Scene) -> np.ndarray:
+    """
+    渲染当前相机并读取线性 RGBA 像素
+    
+    参数:
+        scene: 场景（已设置相机和渲染参数）
+    
+    返回:
+        np.ndarray: 像素数组 (height, width, 4)，场景线性值
+    
+    异常:
+        SamplingError: 渲染或读取失败
+    
+    说明:
+        'Render Result' 图像在脚本中无法直接读取像素，
+        因此渲染为临时 32 位 OpenEXR（不经过视图变换），再载入读取。
+    """
+    image_settings = scene.render.image_settings
+    previous = (scene.render.filepath, image_settings.file_format, image_settings.color_depth)
+    
+    with tempfile.TemporaryDirectory(prefix="kiro_sensor_") as directory:
+        path = os.path.join(directory, "sensor.exr")
+        try:
+            scene.render.filepath = path
+            image_settings.file_format = 'OPEN_EXR'
+            image_settings.color_depth = '32'
+            bpy.ops.render.render(write_still=True, scene=scene.name)
+            return load_exr_pixels(path)
+        except RuntimeError as e:
+            raise SamplingError(f"传感器渲染失败：{str(e)}")
+        finally:
+            scene.render.filepath, image_settings.file_format, image_settings.color_depth = previous
+
+
+def read_light_group_pixels(scene: bpy.types.Scene,
+                            group_names: List[str]) -> Dict[str, np.ndarray]:
+    """
+    渲染当前相机并读取每个光源组通道的线性 RGBA 像素
+    
+    参数:
+        scene: 场景（已建立光源组并设置相机和渲染参数，见 measurement_scene.assign_light_groups）
+        group_names: 光源组名列表
+    
+    返回:
+        Dict[str, np.ndarray]: 组名 → 像素数组 (height, width, 4)
+    
+    异常:
+        SamplingError: 光源组通道不存在、渲染或读取失败
+    
+    说明:
+        光源组通道只能经合成器取出：临时添加 Render Layers 和 File Output 节点，
+        每个组写一个 32 位 OpenEXR，渲染后删除节点并恢复合成设置。
+    """
+    previous = (scene.use_nodes, scene.render.use_compositing)
+    scene.use_nodes = True
+    scene.render.use_compositing = True
+    tree = scene.node_tree
+    render_layers = tree.nodes.new('CompositorNodeRLayers')
+    render_layers.scene = scene
+    file_output = tree.nodes.new('CompositorNodeOutputFile')
+    
+    with tempfile.TemporaryDirectory(prefix="kiro_lightgroups_") as directory:
+        try:
+            file_output.base_path = directory
+            file_output.format.file_format = 'OPEN_EXR'
+            file_output.format.color_depth = '32'
+            file_output.file_slots.clear()
+            for group_name in group_names:
+                pass_name = get_light_group_pass_name(group_name)
+                if pass_name not in render_layers.outputs:
+                    raise SamplingError(f"渲染层没有光源组通道：{pass_name}")
+                file_output.file_slots.new(group_name)
+                tree.links.new(render_layers.outputs[pass_name], file_output.inputs[group_name])
+            
+            bpy.ops.render.render(write_still=False, scene=scene.name)
+            
+            # File Output 节点在文件名后追加 4 位帧号
+            return {
+                group_name: load_exr_pixels(
+                    os.path.join(directory, f"{group_name}{scene.frame_current:04d}.exr")
+                )
+                for group_name in group_names
+            }
+        except RuntimeError as e:
+            raise SamplingError(f"光源组渲染失败：{str(e)}")
+        finally:
+            tree.nodes.remove(file_output)
+            tree.nodes.remove(render_layers)
+            scene.use_nodes, scene.render.use_compositing = previous
+
+
+def load_exr_pixels(path: str) -> np.ndarray:
+    """
+    载入 OpenEXR 文件的像素
+    
+    参数:
+        path: 文件路径
+    
+    返回:
+        np.ndarray: 像素数组 (height, width, 4)
+    
+    异常:
+        RuntimeError: 文件无法载入
+    """
+    image = bpy.data.images.load(path)
+    try:
+        width, height = image.size
+        pixels = np.empty(width * height * 4, dtype=np.float32)
+        image.pixels.foreach_get(pixels)
+    finally:
+        bpy.data.images.remove(image)
+    
+    return pixels.reshape(height, width, 4)
+
+
+def pixel_luminance(pixels: np.ndarray) -> np.ndarray:
+    """
+    RGBA 像素转亮度
+    
+    参数:
+        pixels: 像素数组 (height, width, 4)
+    
+    返回:
+        np.ndarray: 亮度 (height, width)
+    """
+    return pixels[..., :3] @ LUMINANCE_WEIGHTS
 
 
 def render_at_sensor(camera: bpy.types.Object,
-                    samples: int = 64) -> float:
+                    samples: int = 64,
+                    denoise: bool = False,
+                    frame: Optional[SensorFrame] = None,
+                    bounds_points: Optional[np.ndarray] = None,
+                    scene: Optional[bpy.types.Scene] = None) -> float:
     """
-    在传感器位置执行 Cycles 渲染并提取亮度值
+    在传感器位置执行 Cycles 渲染并提取测量值
     
     参数:
         camera: 相机对象
         samples: Cycles 采样数
+        denoise: 是否对传感器画面做 OpenImageDenoise 降噪（可使用更低的采样数）
+        frame: 正交传感器取景参数（None 时为中心像素模式）
+        bounds_points: 灯具特征点的世界坐标 (N, 3)（可选），
+            正交传感器只渲染这些点投影覆盖的像素区域
+        scene: 渲染场景（None 时为当前场景）
+    
+    返回:
+        正交传感器：整幅画面的 Σ 亮度 × 像素面积（远场光强）
+        中心像素模式：中心像素的亮度值（偶数分辨率时为中心 2×2 像素的平均值）
+    
+    说明:
+        只追踪对测量有贡献的像素：正交传感器裁剪到灯具投影区域，
+        中心像素模式裁剪到中心像素（降噪需要邻域像素，此时不裁剪）
+    """
+    if scene is None:
+        scene = bpy.context.scene
+    
+    return _measure_at_sensor(camera, None, samples, denoise, frame, bounds_points, scene)[None][0]
+
+
+def render_light_groups_at_sensor(camera: bpy.types.Object,
+                                  group_names: List[str],
+                                  samples: int = 64,
+                                  denoise: bool = False,
+                                  frame: Optional[SensorFrame] = None,
+                                  bounds_points: Optional[np.ndarray] = None,
+                                  scene: Optional[bpy.types.Scene] = None) -> Dict[str, float]:
+    """
+    在传感器位置执行一次渲染，分别测量每个光源组
+    
+    参数:
+        camera: 相机对象
+        group_names: 光源组名列表
+        其余参数同 render_at_sensor
     
     返回:
-        中心像素的亮度值
+        Dict[str, float]: 组名 → 测量值（含义同 render_at_sensor 的返回值）
+    """
+    if scene is None:
+        scene = bpy.context.scene
+    
+    measurements = _measure_at_sensor(camera, group_names, samples, denoise, frame, bounds_points, scene)
+    return {group_name: value for group_name, (value, _) in measurements.items()}
+
+
+def _measure_at_sensor(camera: bpy.types.Object,
+                       group_names: Optional[List[str]],
+                       samples: int,
+                       denoise: bool,
+                       frame: Optional[SensorFrame],
+                       bounds_points: Optional[np.ndarray],
+                       scene: bpy.types.Scene) -> Dict[Optional[str], Tuple[float, Optional[float]]]:
+    """
+    渲染一次并返回每个通道的测量值和方差
+    
+    返回:
+        Dict: 键为 None（Combined）或组名 → (测量值, 方差)，
+            方差见 measure_sensor_variance，中心像素模式为 None
+    """
+    border = prepare_sensor_render(camera, samples, denoise, frame, bounds_points, scene)
+    
+    # 执行渲染并读取像素（裁剪后只包含渲染区域）
+    if group_names is None:
+        channels = {None: read_render_pixels(scene)}
+    else:
+        channels = read_light_group_pixels(scene, group_names)
+    
+    measurements = {}
+    for key, pixels in channels.items():
+        luminance = pixel_luminance(pixels)
+        measurements[key] = (measure_sensor_luminance(luminance, frame, border),
+                             measure_sensor_variance(luminance, frame))
+    return measurements
+
+
+def prepare_sensor_render(camera: bpy.types.Object,
+                          samples: int,
+                          denoise: bool,
+                          frame: Optional[SensorFrame],
+                          bounds_points: Optional[np.ndarray],
+                          scene: bpy.types.Scene) -> Optional[Tuple[float, float, float, float]]:
+    """
+    为传感器渲染设置相机、Cycles 参数、分辨率和渲染区域
+    
+    参数:
+        同 render_at_sensor
+    
+    返回:
+        渲染区域（见 configure_render_border），不裁剪时为 None
+    
+    说明:
+        修改的设置列在 SENSOR_RENDER_SETTINGS 中，不在这里恢复；
+        _collect_sensor_measurements 在采样前记录、采样后统一恢复
     """
     # 设置当前相机
-    bpy.context.scene.camera = camera
+    scene.camera = camera
     
     # 配置 Cycles 渲染参数
-    scene = bpy.context.scene
     scene.render.engine = 'CYCLES'
     scene.cycles.samples = samples
+    configure_sensor_denoising(scene, denoise)
     
-    # 设置渲染分辨率（小尺寸以提高速度）
-    scene.render.resolution_x = 64
-    scene.render.resolution_y = 64
+    # 设置渲染分辨率
+    resolution = frame.resolution if frame is not None else SENSOR_RESOLUTION
+    scene.render.resolution_x = resolution
+    scene.render.resolution_y = resolution
     scene.render.resolution_percentage = 100
+    scene.render.pixel_aspect_x = 1.0
+    scene.render.pixel_aspect_y = 1.0
+    
+    # 背景像素不计入积分（世界光照仍照亮灯具）
+    scene.render.film_transparent = frame is not None
+    
+    # 渲染区域
+    border = None
+    if frame is not None and bounds_points is not None:
+        rotation = np.array(camera.rotation_quaternion.to_matrix())
+        projected = project_points_to_sensor(bounds_points, tuple(camera.location), rotation)
+        border = calculate_render_border(projected, frame)
+    elif frame is None and not denoise:
+        border = calculate_center_border(resolution)
+    configure_render_border(scene, border)
+    
+    return border
+
+
+def measure_sensor_luminance(luminance: np.ndarray,
+                             frame: Optional[SensorFrame],
+                             border: Optional[Tuple[float, float, float, float]]) -> float:
+    """
+    从传感器画面的亮度计算测量值
     
-    # 执行渲染
-    bpy.ops.render.render(write_still=False)
+    参数:
+        luminance: 亮度 (height, width)，裁剪后只包含渲染区域
+        frame: 正交传感器取景参数（None 时为中心像素模式）
+        border: prepare_sensor_render 返回的渲染区域
     
-    # 提取中心像素亮度值
-    # 注意：这里需要访问渲染结果，实际实现可能需要更复杂的方法
-    # 暂时返回占位值
-    brightness = 0.0
+    返回:
+        float: 含义同 render_at_sensor 的返回值
+    """
+    if frame is not None:
+        return integrate_pixel_intensity(luminance, frame.pixel_area)
     
-    # TODO: 实现从渲染结果中提取亮度值的逻辑
-    # 可能需要使用 bpy.data.images['Render Result'] 访问渲染结果
+    if border is not None:
+        return float(luminance.mean())
+    
+    # 提取中心像素亮度值
+    height, width = luminance.shape
+    rows = slice((height - 1) // 2, height // 2 + 1)
+    columns = slice((width - 1) // 2, width // 2 + 1)
+    brightness = float(luminance[rows, columns].mean())
     
     return brightness
 
 
+def measure_sensor_variance(luminance: np.ndarray,
+                            frame: Optional[SensorFrame]) -> Optional[float]:
+    """
+    从传感器画面估计测量值的方差
+    
+    参数:
+        luminance: 亮度 (height, width)，裁剪后只包含渲染区域
+        frame: 正交传感器取景参数（None 时为中心像素模式）
+    
+    返回:
+        float: 正交传感器测量值的方差（见 sensor_geometry.estimate_intensity_variance）；
+            中心像素模式只读取 1-4 个像素，无法由像素离散度估计，返回 None
+    
+    说明:
+        启用 OpenImageDenoise 时估计的是降噪后画面的残余噪声
+    """
+    if frame is None:
+        return None
+    return estimate_intensity_variance(luminance, frame.pixel_area)
+
+
 def collect_spherical_data(light_position: Tuple[float, float, float],
                           angular_interval: float,
                           distance: float,
                           samples: int,
-                          progress_callback: Optional[Callable[[int, int], None]] = None) -> np.ndarray:
+                          progress_callback: Optional[Callable[[int, int], None]] = None,
+                          denoise: bool = False,
+                          sensor_mode: str = DEFAULT_SENSOR_MODE,
+                          profile: str = DEFAULT_MEASUREMENT_PROFILE,
+                          isolate: bool = True,
+                          lod: Optional[LODSettings] = None,
+                          aggregation: Optional[AggregationSettings] = None,
+                          scene: Optional[bpy.types.Scene] = None,
+                          theta_indices: Optional[Sequence[int]] = None) -> SamplingResult:
     """
     完整的球面采样流程
     
@@ -182,50 +674,273 @@ def collect_spherical_data(light_position: Tuple[float, float, float],
         distance: 测量距离（米）
         samples: Cycles 采样数
         progress_callback: 进度回调函数 callback(current, total)
+        denoise: 是否对每个传感器画面做 OpenImageDenoise 降噪
+        sensor_mode: 传感器模式（SENSOR_MODES 之一）
+        profile: 测量配置名称（见 measurement_profiles），采样期间覆盖光路和简化设置
+        isolate: 是否在只包含灯具和光源的临时测量场景中渲染（见 measurement_scene），
+            False 时直接渲染当前场景
+        lod: 灯具简化参数（可选，见 fixture_lod），只作用于测量场景中的临时副本，
+            需要 isolate=True；简化报告写入 render_settings['fixture_lod']
+        aggregation: 发光体聚合参数（可选，见 emitter_aggregation），需要 isolate=True；
+            聚合报告写入 render_settings['emitter_aggregation']
+        scene: 已建立的测量场景（可选），传入时直接在其中渲染，忽略 isolate；
+            连续测量多帧时复用同一场景，配合 Cycles 持久数据保留 BVH
+        theta_indices: 只测量这些垂直角度索引的行（可选，见 sharding），
+            其余行保持为 0，索引写入 render_settings['theta_indices']
     
     返回:
-        NumPy 数组，形状为 (n_points, 3)，每行为 [theta, phi, brightness]
+        SamplingResult: 角度向量、测量网格 (N_theta, N_phi) 和每个方向的测量方差
+            （正交传感器由画面像素离散度估计，见 measure_sensor_variance；中心像素模式为 None）
+    
+    异常:
+        SamplingError: 传感器模式无效、未隔离场景或传入已有场景时请求简化或聚合，或渲染失败
+        MeasurementProfileError: 测量配置不存在
+        LODError / AggregationError: 简化或聚合参数无效
+    
+    说明:
+        正交传感器的取景范围和分辨率由灯具包围球自动决定，
+        测量距离至少为包围球直径；每个方向只渲染灯具投影覆盖的像素
     """
-    # 计算采样点
-    sampling_points = calculate_sampling_points(angular_interval, distance, light_position)
-    total_points = len(sampling_points)
+    theta_values, phi_values, grids, variances, render_settings, elapsed_time = _collect_sensor_measurements(
+        light_position, angular_interval, distance, samples, progress_callback,
+        denoise, sensor_mode, profile, isolate, lod, aggregation, existing_scene=scene,
+        theta_indices=theta_indices
+    )
     
-    # 初始化数据数组
-    data = np.zeros((total_points, 3))
+    total_samples = grids[None].size
+    if theta_indices is not None:
+        total_samples = len(render_settings['theta_indices']) * len(phi_values)
+    
+    return SamplingResult(
+        vertical_angles=theta_values,
+        horizontal_angles=phi_values,
+        luminance_data=grids[None],
+        light_position=tuple(light_position),
+        total_samples=total_samples,
+        elapsed_time=elapsed_time,
+        render_settings=render_settings,
+        variance=variances[None] if variances is not None else None
+    )
+
+
+def collect_light_group_data(light_position: Tuple[float, float, float],
+                             angular_interval: float,
+                             distance: float,
+                             samples: int,
+                             progress_callback: Optional[Callable[[int, int], None]] = None,
+                             light_groups: Optional[Dict[str, List[str]]] = None,
+                             sensor_mode: str = DEFAULT_SENSOR_MODE,
+                             profile: str = DEFAULT_MEASUREMENT_PROFILE,
+                             lod: Optional[LODSettings] = None) -> Dict[str, SamplingResult]:
+    """
+    一次球面采样得到每个光源组各自的测量结果
     
-    # 创建虚拟传感器（复用）
-    camera = None
+    参数:
+        light_groups: 组名 → 光源名称列表（可选，见 light_groups.build_light_groups），
+            None 时每个光源单独成组
+        其余参数同 collect_spherical_data（没有 denoise：Cycles 的 OpenImageDenoise
+            只作用于 Combined 通道，光源组通道不会被降噪，启用只会白白增加渲染时间；
+            需要降噪时在校准前对各组网格使用 denoising.denoise_sampling_result）
     
-    try:
-        for i, point in enumerate(sampling_points):
-            # 创建或更新虚拟传感器
-            if camera is None:
-                camera = create_virtual_sensor(
-                    point['position'],
-                    light_position,
-                    "VirtualSensor"
+    返回:
+        Dict[str, SamplingResult]: 组名 → 该组光源单独点亮时的测量结果，
+            render_settings 中记录 light_group 和 light_group_lights
+    
+    异常:
+        SamplingError: 传感器模式无效、灯具含自发光网格或渲染失败
+        LightGroupError: 分组无效
+        MeasurementProfileError / LODError: 测量配置不存在或简化参数无效
+    
+    说明:
+        总是在测量场景中渲染（光源组建在测量场景的视图层上）；
+        发光体聚合会替换光源对象，不能与光源组同时使用。
+        各组的测量值之和等于所有分组光源同时点亮时的测量值。
+        光源组只分配光源对象，自发光网格的贡献不会出现在任何组的通道中，
+        因此测量场景含自发光网格（measurement_scene.get_emissive_objects）时拒绝测量，
+        这类灯具请用 collect_spherical_data 整体测量。
+    """
+    light_groups = build_light_groups(
+        [light.name for light in get_light_sources()], light_groups
+    )
+    
+    theta_values, phi_values, grids, variances, render_settings, elapsed_time = _collect_sensor_measurements(
+        light_position, angular_interval, distance, samples, progress_callback,
+        False, sensor_mode, profile, True, lod, None, light_groups
+    )
+    
+    return {
+        group_name: SamplingResult(
+            vertical_angles=theta_values,
+            horizontal_angles=phi_values,
+            luminance_data=grids[group_name],
+            light_position=tuple(light_position),
+            total_samples=grids[group_name].size,
+            elapsed_time=elapsed_time,
+            render_settings={
+                **render_settings,
+                'light_group': group_name,
+                'light_group_lights': list(light_names)
+            },
+            variance=variances[group_name] if variances is not None else None
+        )
+        for group_name, light_names in light_groups.items()
+    }
+
+
+def _collect_sensor_measurements(light_position: Tuple[float, float, float],
+                                 angular_interval: float,
+                                 distance: float,
+                                 samples: int,
+                                 progress_callback: Optional[Callable[[int, int], None]],
+                                 denoise: bool,
+                                 sensor_mode: str,
+                                 profile: str,
+                                 isolate: bool,
+                                 lod: Optional[LODSettings],
+                                 aggregation: Optional[AggregationSettings],
+                                 light_groups: Optional[Dict[str, List[str]]] = None,
+                                 existing_scene: Optional[bpy.types.Scene] = None,
+                                 theta_indices: Optional[Sequence[int]] = None):
+    """
+    球面采样的共用流程
+    
+    返回:
+        (theta_values, phi_values, grids, variances, render_settings, elapsed_time)
+            - grids: 测量网格字典，不分组时键为 None，分组时键为组名
+            - variances: 与 grids 同键的测量方差网格字典，中心像素模式为 None
+    """
+    if sensor_mode not in SENSOR_MODES:
+        raise SamplingError(f"不支持的传感器模式：{sensor_mode}，可用模式：{SENSOR_MODES}")
+    if (lod is not None or aggregation is not None) and not isolate:
+        raise SamplingError("灯具简化和发光体聚合只能在测量场景中进行（isolate=True）")
+    if light_groups is not None and (aggregation is not None or not isolate):
+        raise SamplingError("光源组只能在未聚合发光体的测量场景中使用")
+    if existing_scene is not None and (lod is not None or aggregation is not None):
+        raise SamplingError("灯具简化和发光体聚合会修改场景，不能用于传入的已有场景")
+    
+    measurement_profile = get_measurement_profile(profile)
+    
+    start_time = time.time()
+    
+    source_scene = bpy.context.scene
+    if existing_scene is not None:
+        scene_context = nullcontext(existing_scene)
+    elif isolate:
+        link_objects = lod is not None or aggregation is not None
+        scene_context = measurement_scene(source_scene, get_light_sources(), link_objects=link_objects)
+    else:
+        scene_context = nullcontext(source_scene)
+    
+    with scene_context as scene:
+        # 光源组只分配光源对象，自发光网格的发光不会进入任何组的通道
+        if light_groups is not None:
+            emissive_objects = get_emissive_objects(scene)
+            if emissive_objects:
+                raise SamplingError(
+                    f"光源组通道不包含自发光网格的发光：{[obj.name for obj in emissive_objects]}，"
+                    "请整体测量该灯具，或将发光部件改为光源"
                 )
-            else:
-                # 更新位置和朝向
-                camera.location = point['position']
-                # TODO: 更新朝向
-            
-            # 渲染并测量
-            brightness = render_at_sensor(camera, samples)
-            
-            # 存储数据
-            data[i] = [point['theta'], point['phi'], brightness]
-            
-            # 进度回调
-            if progress_callback:
-                progress_callback(i + 1, total_points)
         
-        return data
-    
-    finally:
-        # 清理虚拟传感器
-        if camera:
-            bpy.data.objects.remove(camera, do_unlink=True)
+        lod_report = simplify_measurement_scene(scene, lod) if lod is not None else None
+        aggregation_report = None
+        if aggregation is not None:
+            aggregation_report = aggregate_measurement_lights(scene, aggregation, distance, light_position)
+        
+        # 正交传感器：按灯具包围球确定取景范围
+        frame = None
+        bounds_points = None
+        sensor_distance = distance
+        if sensor_mode == SENSOR_MODE_ORTHOGRAPHIC:
+            bounds_points = np.array(get_fixture_bounds_points(scene), dtype=float).reshape(-1, 3)
+            radius = calculate_bounding_radius(bounds_points, light_position)
+            frame = calculate_sensor_frame(radius)
+            sensor_distance = calculate_sensor_distance(distance, radius)
+        
+        # 计算采样点
+        theta_values, phi_values = calculate_sampling_angles(angular_interval)
+        sampling_points = calculate_sampling_points(angular_interval, sensor_distance, light_position)
+        if theta_indices is not None:
+            if not set(theta_indices) <= set(range(len(theta_values))):
+                raise SamplingError(f"垂直角度索引超出范围 0-{len(theta_values) - 1}：{sorted(theta_indices)}")
+            selected = set(theta_indices)
+            sampling_points = [point for point in sampling_points if point['theta_index'] in selected]
+        total_points = len(sampling_points)
+        
+        # 初始化亮度网格（直接按 (theta, phi) 索引写入，无需后续重排）
+        group_names = list(light_groups) if light_groups is not None else None
+        grids = {
+            key: np.zeros((len(theta_values), len(phi_values)))
+            for key in (group_names if group_names is not None else [None])
+        }
+        # 每个方向的测量方差（中心像素模式无法估计）
+        variances = {key: np.zeros_like(grid) for key, grid in grids.items()} if frame is not None else None
+        
+        # 创建虚拟传感器（复用）
+        camera = None
+        
+        # 应用测量配置（采样结束后恢复用户设置，包括传感器渲染修改的相机、分辨率等）
+        previous_render_settings = capture_scene_settings(scene, SENSOR_RENDER_SETTINGS)
+        emitter_count = sum(1 for obj in scene.objects if obj.type == 'LIGHT' and not obj.hide_render)
+        previous_settings = apply_measurement_profile(scene, measurement_profile, emitter_count)
+        previous_groups = assign_light_groups(scene, light_groups) if light_groups is not None else {}
+        
+        try:
+            for i, point in enumerate(sampling_points):
+                # 创建或更新虚拟传感器
+                if camera is None:
+                    camera = create_virtual_sensor(
+                        point['position'],
+                        light_position,
+                        "VirtualSensor",
+                        scene
+                    )
+                    if frame is not None:
+                        configure_orthographic_sensor(camera, frame, sensor_distance)
+                else:
+                    # 更新位置和朝向
+                    camera.location = point['position']
+                    orient_sensor(camera, light_position)
+                
+                # 渲染并测量
+                measurements = _measure_at_sensor(
+                    camera, group_names, samples, denoise, frame, bounds_points, scene
+                )
+                
+                # 存储数据
+                for key, (brightness, variance) in measurements.items():
+                    grids[key][point['theta_index'], point['phi_index']] = brightness
+                    if variances is not None:
+                        variances[key][point['theta_index'], point['phi_index']] = variance
+                
+                # 进度回调
+                if progress_callback:
+                    progress_callback(i + 1, total_points)
+        
+        finally:
+            # 清理虚拟传感器
+            cleanup_virtual_sensor(camera)
+            restore_scene_settings(scene, previous_settings)
+            restore_scene_settings(scene, previous_render_settings)
+            restore_light_groups(previous_groups)
+    
+    render_settings = {
+        'angular_interval': angular_interval,
+        'distance': distance,
+        'samples': samples,
+        'render_engine': 'CYCLES',
+        'resolution': frame.resolution if frame is not None else SENSOR_RESOLUTION,
+        'denoise': denoise,
+        'sensor_mode': sensor_mode,
+        'sensor_frame': frame.to_dict() if frame is not None else None,
+        'measurement_profile': measurement_profile.name,
+        'isolated_scene': isolate or existing_scene is not None,
+        'fixture_lod': lod_report.to_dict() if lod_report is not None else None,
+        'emitter_aggregation': aggregation_report.to_dict() if aggregation_report is not None else None
+    }
+    if theta_indices is not None:
+        render_settings['theta_indices'] = sorted(int(index) for index in selected)
+    
+    return theta_values, phi_values, grids, variances, render_settings, time.time() - start_time
 
 
 def cleanup_virtual_sensor(camera: bpy.types.Object):
@@ -236,4 +951,7 @@ def cleanup_virtual_sensor(camera: bpy.types.Object):
         camera: 要删除的相机对象
     """
     if camera and camera.name in bpy.data.objects:
+        camera_data = camera.data
         bpy.data.objects.remove(camera, do_unlink=True)
+        if camera_data is not None and camera_data.users == 0:
+            bpy.data.cameras.remove(camera_data)
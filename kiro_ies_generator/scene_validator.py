@@ -15,6 +15,7 @@ import bpy
 
 # 导入数据结构
 from .data_structures import SceneValidation, SceneValidationError
+from .fixture_batch import FIXTURE_TAG_PROPERTY
 
 
 # ============================================================================
@@ -35,10 +36,13 @@ RECOMMENDED_RENDER_ENGINE = 'CYCLES'
 # 主验证函数
 # ============================================================================
 
-def validate_scene() -> SceneValidation:
+def validate_scene(collection: Optional[bpy.types.Collection] = None) -> SceneValidation:
     """
     验证当前 Blender 场景配置
     
+    参数:
+        collection: 灯具集合（可选，多灯具批量时使用），只检查集合内的光源
+    
     检查项：
     1. 渲染引擎是否为 Cycles
     2. 场景中是否有光源
@@ -72,7 +76,7 @@ def validate_scene() -> SceneValidation:
         )
     
     # 获取光源
-    light_objects = get_light_sources()
+    light_objects = get_light_sources(collection)
     
     if not light_objects:
         errors.append(
@@ -138,10 +142,13 @@ def validate_scene() -> SceneValidation:
 # 光源相关函数
 # ============================================================================
 
-def get_light_sources() -> List[bpy.types.Object]:
+def get_light_sources(collection: Optional[bpy.types.Collection] = None) -> List[bpy.types.Object]:
     """
     获取场景中所有光源对象
     
+    参数:
+        collection: 灯具集合（可选），只返回集合（含子集合）中的光源
+    
     返回:
         List[bpy.types.Object]: 光源对象列表（包括所有类型的光源）
     
@@ -150,8 +157,9 @@ def get_light_sources() -> List[bpy.types.Object]:
         使用 validate_light_source() 检查是否支持
     """
     light_objects = []
+    objects = collection.all_objects if collection is not None else bpy.context.scene.objects
     
-    for obj in bpy.context.scene.objects:
+    for obj in objects:
         if obj.type == 'LIGHT':
             light_objects.append(obj)
     
@@ -327,10 +335,13 @@ def calculate_relative_photometric_center(
     )
 
 
-def get_fixture_origin() -> Tuple[float, float, float]:
+def get_fixture_origin(collection: Optional[bpy.types.Collection] = None) -> Tuple[float, float, float]:
     """
     获取灯具模型的原点位置
     
+    参数:
+        collection: 灯具集合（可选），给定时使用集合中按名称排序的第一个网格对象，不看选择
+    
     返回:
         Tuple[float, float, float]: (x, y, z) 灯具原点位置（世界坐标）
     
@@ -341,6 +352,12 @@ def get_fixture_origin() -> Tuple[float, float, float]:
     注意:
         用户应该在运行插件前选择灯具模型
     """
+    if collection is not None:
+        collection_meshes = sorted(
+            (obj for obj in collection.all_objects if obj.type == 'MESH'), key=lambda obj: obj.name
+        )
+        return tuple(collection_meshes[0].location) if collection_meshes else (0.0, 0.0, 0.0)
+    
     # 查找选中的网格对象
     selected_meshes = [obj for obj in bpy.context.selected_objects if obj.type == 'MESH']
     
@@ -352,6 +369,34 @@ def get_fixture_origin() -> Tuple[float, float, float]:
     return (0.0, 0.0, 0.0)
 
 
+def get_tagged_fixture_collections(scene: Optional[bpy.types.Scene] = None) -> List[bpy.types.Collection]:
+    """
+    获取场景中标记为灯具的集合（见 fixture_batch）
+    
+    参数:
+        scene: 场景（None 时为当前场景）
+    
+    返回:
+        List[bpy.types.Collection]: 自定义属性 kiro_fixture 为真的集合，按层级顺序；
+            标记集合内部的子集合即使也带标记，仍作为外层灯具的一部分，不单独返回
+    """
+    if scene is None:
+        scene = bpy.context.scene
+    
+    fixtures = []
+    
+    def visit(collection):
+        for child in collection.children:
+            if child.get(FIXTURE_TAG_PROPERTY):
+                if child not in fixtures:
+                    fixtures.append(child)
+            else:
+                visit(child)
+    
+    visit(scene.collection)
+    return fixtures
+
+
 # ============================================================================
 # 辅助函数
 # ============================================================================
@@ -0,0 +1,264 @@
+"""
+传感器几何模块 (Sensor Geometry)
+
+计算正交传感器的取景范围、分辨率和像素积分，不依赖 bpy，可单独测试。
+
+测量原理：
+- 正交相机的每个像素对应灯具投影平面上面积相同的一小块，
+  像素值为该方向上的辐亮度 L
+- 远场光强 I = ∫ L dA ≈ Σ L_i × A_pixel，整幅画面的每个采样都参与测量，
+  而不是只取中心像素
+- 取景范围覆盖灯具的包围球（以光度中心为球心），任意方向都不会裁掉灯具
+- 测量方差由同一画面中相邻像素之差估计（路径追踪噪声在像素间独立），
+  不需要额外渲染
+"""
+
+from typing import Sequence, Tuple
+from dataclasses import dataclass
+import math
+import numpy as np
+
+
+# ============================================================================
+# 常量定义
+# ============================================================================
+
+# 目标像素尺寸（米），决定自动分辨率
+TARGET_PIXEL_SIZE = 0.005
+
+# 传感器分辨率范围（像素）
+MIN_SENSOR_RESOLUTION = 16
+MAX_SENSOR_RESOLUTION = 256
+
+# 取景余量（包围球直径的倍数），避免边缘像素被裁切
+SENSOR_FRAME_MARGIN = 1.05
+
+# 最小包围球半径（米），只有点光源时使用
+MIN_BOUNDING_RADIUS = 0.01
+
+# 像素亮度权重（Rec.709 线性 RGB → 亮度）
+LUMINANCE_WEIGHTS = np.array([0.2126, 0.7152, 0.0722])
+
+# 中位数绝对偏差 → 高斯标准差的换算系数
+MAD_TO_SIGMA = 1.4826
+
+
+class SensorGeometryError(Exception):
+    """传感器几何错误"""
+    pass
+
+
+@dataclass
+class SensorFrame:
+    """
+    正交传感器的取景参数
+    
+    属性:
+        ortho_scale: 正交相机取景宽度（米）
+        resolution: 画面分辨率（像素，正方形）
+        radius: 灯具包围球半径（米）
+    """
+    
+    ortho_scale: float
+    resolution: int
+    radius: float
+    
+    @property
+    def pixel_size(self) -> float:
+        """像素边长（米）"""
+        return self.ortho_scale / self.resolution
+    
+    @property
+    def pixel_area(self) -> float:
+        """像素面积（平方米）"""
+        return self.pixel_size ** 2
+    
+    def to_dict(self) -> dict:
+        """
+        转换为字典格式（写入 render_settings）
+        """
+        return {
+            'ortho_scale': self.ortho_scale,
+            'resolution': self.resolution,
+            'radius': self.radius
+        }
+
+
+def calculate_bounding_radius(points: Sequence[Tuple[float, float, float]],
+                              center: Tuple[float, float, float]) -> float:
+    """
+    计算以光度中心为球心、包含所有点的包围球半径
+    
+    参数:
+        points: 灯具几何的世界坐标点（如各对象包围盒角点）
+        center: 光度中心 (x, y, z)
+    
+    返回:
+        float: 包围球半径（米），不小于 MIN_BOUNDING_RADIUS
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    if len(points) == 0:
+        return MIN_BOUNDING_RADIUS
+    
+    distances = np.linalg.norm(points - np.asarray(center, dtype=float), axis=1)
+    return max(float(distances.max()), MIN_BOUNDING_RADIUS)
+
+
+def calculate_sensor_frame(radius: float,
+                           pixel_size: float = TARGET_PIXEL_SIZE) -> SensorFrame:
+    """
+    根据包围球半径计算正交传感器的取景范围和分辨率
+    
+    参数:
+        radius: 灯具包围球半径（米）
+        pixel_size: 目标像素尺寸（米）
+    
+    返回:
+        SensorFrame: 分辨率取 取景宽度 / 像素尺寸，
+            限制在 MIN_SENSOR_RESOLUTION 到 MAX_SENSOR_RESOLUTION 之间
+    
+    异常:
+        SensorGeometryError: 半径或像素尺寸不是正数
+    """
+    if radius <= 0 or pixel_size <= 0:
+        raise SensorGeometryError(f"包围球半径和像素尺寸必须大于 0：{radius}, {pixel_size}")
+    
+    ortho_scale = 2.0 * radius * SENSOR_FRAME_MARGIN
+    resolution = int(math.ceil(ortho_scale / pixel_size))
+    resolution = min(max(resolution, MIN_SENSOR_RESOLUTION), MAX_SENSOR_RESOLUTION)
+    
+    return SensorFrame(ortho_scale=ortho_scale, resolution=resolution, radius=radius)
+
+
+def calculate_sensor_distance(distance: float, radius: float) -> float:
+    """
+    计算正交传感器到光度中心的距离
+    
+    参数:
+        distance: 请求的测量距离（米）
+        radius: 灯具包围球半径（米）
+    
+    返回:
+        float: 测量距离，至少为包围球直径，保证相机位于灯具之外
+    
+    说明:
+        正交投影与距离无关，距离只影响裁剪范围
+    """
+    return max(distance, 2.0 * radius)
+
+
+def integrate_pixel_intensity(luminance: np.ndarray, pixel_area: float) -> float:
+    """
+    对正交传感器画面积分得到该方向的光强
+    
+    参数:
+        luminance: 像素亮度 (height, width)，场景线性值
+        pixel_area: 像素面积（平方米）
+    
+    返回:
+        float: Σ L × A_pixel（Blender 内部单位，校准时统一缩放）
+    """
+    return float(np.sum(luminance, dtype=np.float64) * pixel_area)
+
+
+def estimate_intensity_variance(luminance: np.ndarray, pixel_area: float) -> float:
+    """
+    估计 integrate_pixel_intensity 测量值的方差
+    
+    参数:
+        luminance: 像素亮度 (height, width)，场景线性值
+        pixel_area: 像素面积（平方米）
+    
+    返回:
+        float: Var(Σ L × A_pixel)（Blender 内部单位的平方），有效像素对不足时为 0
+    
+    说明:
+        相邻两个发光像素的信号几乎相同，差值主要是两份独立噪声：Var(ΔL) = 2σ²。
+        用差值的中位数绝对偏差估计 σ（不受灯具轮廓等少量真实边缘影响），
+        每个发光像素的噪声独立，积分的方差为 N_发光像素 × σ² × A_pixel²
+    """
+    luminance = np.asarray(luminance, dtype=float)
+    lit = luminance > 0
+    
+    differences = [
+        np.diff(luminance, axis=axis)[lit_pairs]
+        for axis, lit_pairs in ((0, lit[1:, :] & lit[:-1, :]), (1, lit[:, 1:] & lit[:, :-1]))
+    ]
+    differences = np.concatenate(differences)
+    if differences.size < 2:
+        return 0.0
+    
+    sigma = MAD_TO_SIGMA * np.median(np.abs(differences - np.median(differences))) / math.sqrt(2.0)
+    return float(np.count_nonzero(lit) * sigma ** 2 * pixel_area ** 2)
+
+
+# ============================================================================
+# 渲染区域裁剪
+# ============================================================================
+
+def project_points_to_sensor(points: np.ndarray,
+                             camera_location: Tuple[float, float, float],
+                             camera_rotation: np.ndarray) -> np.ndarray:
+    """
+    将世界坐标点正交投影到传感器平面
+    
+    参数:
+        points: 世界坐标点 (N, 3)
+        camera_location: 相机位置 (x, y, z)
+        camera_rotation: 相机旋转矩阵 (3, 3)，列向量为相机 X/Y/Z 轴的世界方向
+    
+    返回:
+        np.ndarray: 传感器平面坐标 (N, 2)（米），画面中心为原点，X 向右、Y 向上
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    local = (points - np.asarray(camera_location, dtype=float)) @ np.asarray(camera_rotation, dtype=float)
+    return local[:, :2]
+
+
+def calculate_render_border(projected: np.ndarray,
+                            frame: SensorFrame) -> Tuple[float, float, float, float]:
+    """
+    计算覆盖灯具投影的渲染区域
+    
+    参数:
+        projected: 灯具特征点的传感器平面坐标 (N, 2)（米）
+        frame: 取景参数
+    
+    返回:
+        (min_x, max_x, min_y, max_y): 归一化渲染区域（0-1），
+            边界向外对齐到整像素，至少覆盖 1 个像素
+    
+    说明:
+        区域外的像素只有背景（透明胶片下为 0），裁剪后积分结果不变，
+        但 Cycles 只追踪区域内的像素
+    """
+    resolution = frame.resolution
+    projected = np.asarray(projected, dtype=float).reshape(-1, 2)
+    if len(projected) == 0:
+        return 0.0, 1.0, 0.0, 1.0
+    
+    # 传感器平面坐标 → 像素坐标（左下角为原点）
+    pixels = (projected / frame.ortho_scale + 0.5) * resolution
+    lower = np.clip(np.floor(pixels.min(axis=0)), 0, resolution - 1).astype(int)
+    upper = np.clip(np.ceil(pixels.max(axis=0)), 1, resolution).astype(int)
+    upper = np.maximum(upper, lower + 1)
+    
+    return (lower[0] / resolution, upper[0] / resolution,
+            lower[1] / resolution, upper[1] / resolution)
+
+
+def calculate_center_border(resolution: int) -> Tuple[float, float, float, float]:
+    """
+    计算只包含中心像素的渲染区域
+    
+    参数:
+        resolution: 画面分辨率（像素）
+    
+    返回:
+        (min_x, max_x, min_y, max_y): 归一化渲染区域，
+            奇数分辨率为中心 1 个像素，偶数分辨率为中心 2×2 像素
+    """
+    lower = (resolution - 1) // 2
+    upper = resolution // 2 + 1
+    return (lower / resolution, upper / resolution,
+            lower / resolution, upper / resolution)
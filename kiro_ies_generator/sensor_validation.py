@@ -0,0 +1,372 @@
+"""
+传感器降噪验证模块 (Sensor Validation)
+
+比较低采样数（可选 OpenImageDenoise 降噪）与高采样数参考渲染得到的光强分布，
+为每类灯具选择满足误差要求的最低采样数；
+也用于对照 'reference' 测量配置，记录各测量配置的精度影响和加速比。
+
+比较方法：
+- 校准会把总光通量缩放到目标流明，因此只比较分布形状：
+  两个网格先各自除以立体角加权的总光通量，再计算误差
+- rms_error：立体角加权的相对均方根误差 √(Σw(a - b)²) / √(Σw b²)
+- max_error：最大绝对误差相对于参考峰值的比例
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass, field
+import numpy as np
+
+from .data_structures import SamplingResult
+from .photometry import integrate_flux
+
+
+# ============================================================================
+# 常量定义
+# ============================================================================
+
+# 默认参考采样数
+DEFAULT_REFERENCE_SAMPLES = 1024
+
+# 默认候选采样数
+DEFAULT_CANDIDATE_SAMPLES = (8, 16, 32, 64, 128)
+
+# 默认误差要求（相对均方根误差）
+DEFAULT_RMS_TOLERANCE = 0.02
+
+# 默认误差要求（最大误差 / 参考峰值）
+DEFAULT_MAX_TOLERANCE = 0.05
+
+
+class ValidationError(Exception):
+    """验证错误"""
+    pass
+
+
+@dataclass
+class SampleCountResult:
+    """
+    单个候选采样数的比较结果
+    
+    属性:
+        samples: Cycles 采样数
+        denoise: 是否启用传感器降噪
+        rms_error: 相对均方根误差
+        max_error: 最大误差 / 参考峰值
+        elapsed_time: 采样耗时（秒）
+    """
+    
+    samples: int
+    denoise: bool
+    rms_error: float
+    max_error: float
+    elapsed_time: float
+    
+    def passes(self, rms_tolerance: float, max_tolerance: float) -> bool:
+        """
+        是否满足误差要求
+        
+        返回:
+            bool: 两项误差都不超过要求时返回 True
+        """
+        return self.rms_error <= rms_tolerance and self.max_error <= max_tolerance
+    
+    def to_dict(self) -> dict:
+        """
+        转换为字典格式
+        """
+        return {
+            'samples': self.samples,
+            'denoise': self.denoise,
+            'rms_error': self.rms_error,
+            'max_error': self.max_error,
+            'elapsed_time': self.elapsed_time
+        }
+
+
+@dataclass
+class SensorValidationReport:
+    """
+    采样数验证报告
+    
+    属性:
+        fixture_class: 灯具类别（如 'downlight'、'pendant'）
+        reference_samples: 参考渲染采样数
+        rms_tolerance: 相对均方根误差要求
+        max_tolerance: 最大误差要求
+        results: 各候选采样数的比较结果
+        recommended_samples: 满足要求的最低采样数（没有候选满足要求时为 None）
+        recommended_denoise: 推荐采样数是否需要启用降噪
+    """
+    
+    fixture_class: str
+    reference_samples: int
+    rms_tolerance: float
+    max_tolerance: float
+    results: List[SampleCountResult] = field(default_factory=list)
+    recommended_samples: Optional[int] = None
+    recommended_denoise: Optional[bool] = None
+    
+    def to_dict(self) -> dict:
+        """
+        转换为字典格式（可写入 JSON）
+        """
+        return {
+            'fixture_class': self.fixture_class,
+            'reference_samples': self.reference_samples,
+            'rms_tolerance': self.rms_tolerance,
+            'max_tolerance': self.max_tolerance,
+            'results': [result.to_dict() for result in self.results],
+            'recommended_samples': self.recommended_samples,
+            'recommended_denoise': self.recommended_denoise
+        }
+    
+    def __str__(self) -> str:
+        """
+        格式化报告为可读字符串
+        """
+        lines = [f"SensorValidationReport({self.fixture_class}, 参考采样数 {self.reference_samples})"]
+        for result in self.results:
+            status = "✓" if result.passes(self.rms_tolerance, self.max_tolerance) else "✗"
+            mode = "降噪" if result.denoise else "无降噪"
+            lines.append(f"  {status} {result.samples:5d} 采样（{mode}）: "
+                         f"RMS {result.rms_error:.2%}，最大 {result.max_error:.2%}，"
+                         f"{result.elapsed_time:.1f} 秒")
+        if self.recommended_samples is None:
+            lines.append("  推荐: 没有候选采样数满足要求")
+        else:
+            mode = "降噪" if self.recommended_denoise else "无降噪"
+            lines.append(f"  推荐: {self.recommended_samples} 采样（{mode}）")
+        return "\n".join(lines)
+
+
+@dataclass
+class ProfileAccuracy:
+    """
+    测量配置相对 reference 配置的精度影响
+    
+    属性:
+        profile: 测量配置名称
+        rms_error: 相对均方根误差
+        max_error: 最大误差 / 参考峰值
+        elapsed_time: 采样耗时（秒）
+        speedup: reference 耗时 / 该配置耗时
+    """
+    
+    profile: str
+    rms_error: float
+    max_error: float
+    elapsed_time: float
+    speedup: float
+    
+    def to_dict(self) -> dict:
+        """
+        转换为字典格式
+        """
+        return {
+            'profile': self.profile,
+            'rms_error': self.rms_error,
+            'max_error': self.max_error,
+            'elapsed_time': self.elapsed_time,
+            'speedup': self.speedup
+        }
+
+
+# ============================================================================
+# 比较
+# ============================================================================
+
+def compare_intensity_distributions(candidate: SamplingResult,
+                                    reference: SamplingResult) -> Tuple[float, float]:
+    """
+    比较两个采样结果的光强分布形状
+    
+    参数:
+        candidate: 低采样数（或降噪）采样结果
+        reference: 高采样数参考结果
+    
+    返回:
+        (rms_error, max_error)
+    
+    异常:
+        ValidationError: 角度网格不一致或参考结果光通量为 0
+    """
+    if (candidate.get_data_shape() != reference.get_data_shape() or
+            not np.allclose(candidate.vertical_angles, reference.vertical_angles) or
+            not np.allclose(candidate.horizontal_angles, reference.horizontal_angles)):
+        raise ValidationError("候选结果与参考结果的角度网格不一致")
+    
+    vertical_angles = reference.vertical_angles
+    horizontal_angles = reference.horizontal_angles
+    
+    reference_flux = integrate_flux(vertical_angles, horizontal_angles, reference.luminance_data)
+    candidate_flux = integrate_flux(vertical_angles, horizontal_angles, candidate.luminance_data)
+    if reference_flux <= 0:
+        raise ValidationError("参考结果的光通量必须大于 0")
+    if candidate_flux <= 0:
+        return float('inf'), float('inf')
+    
+    expected = reference.luminance_data / reference_flux
+    actual = candidate.luminance_data / candidate_flux
+    difference = actual - expected
+    
+    rms_error = np.sqrt(integrate_flux(vertical_angles, horizontal_angles, difference ** 2) /
+                        integrate_flux(vertical_angles, horizontal_angles, expected ** 2))
+    max_error = np.abs(difference).max() / np.abs(expected).max()
+    
+    return float(rms_error), float(max_error)
+
+
+def select_sample_count(results: Sequence[SampleCountResult],
+                        rms_tolerance: float = DEFAULT_RMS_TOLERANCE,
+                        max_tolerance: float = DEFAULT_MAX_TOLERANCE) -> Optional[SampleCountResult]:
+    """
+    选择满足误差要求的最低采样数
+    
+    参数:
+        results: 比较结果列表
+        rms_tolerance: 相对均方根误差要求
+        max_tolerance: 最大误差要求
+    
+    返回:
+        SampleCountResult: 满足要求且采样数最低的结果（同采样数时优先耗时更短的），
+            没有结果满足要求时返回 None
+    """
+    passing = [result for result in results if result.passes(rms_tolerance, max_tolerance)]
+    if not passing:
+        return None
+    return min(passing, key=lambda result: (result.samples, result.elapsed_time))
+
+
+def build_validation_report(reference: SamplingResult,
+                            candidates: Sequence[Tuple[int, bool, SamplingResult]],
+                            fixture_class: str = "default",
+                            rms_tolerance: float = DEFAULT_RMS_TOLERANCE,
+                            max_tolerance: float = DEFAULT_MAX_TOLERANCE) -> SensorValidationReport:
+    """
+    由已有的采样结果生成验证报告
+    
+    参数:
+        reference: 参考采样结果（render_settings 中记录采样数）
+        candidates: (采样数, 是否降噪, 采样结果) 列表
+        fixture_class: 灯具类别
+        rms_tolerance: 相对均方根误差要求
+        max_tolerance: 最大误差要求
+    
+    返回:
+        SensorValidationReport
+    """
+    results = []
+    for samples, denoise, candidate in candidates:
+        rms_error, max_error = compare_intensity_distributions(candidate, reference)
+        results.append(SampleCountResult(samples, denoise, rms_error, max_error, candidate.elapsed_time))
+    
+    best = select_sample_count(results, rms_tolerance, max_tolerance)
+    
+    return SensorValidationReport(
+        fixture_class=fixture_class,
+        reference_samples=int(reference.render_settings.get('samples', 0)),
+        rms_tolerance=rms_tolerance,
+        max_tolerance=max_tolerance,
+        results=results,
+        recommended_samples=best.samples if best else None,
+        recommended_denoise=best.denoise if best else None
+    )
+
+
+def compare_profiles(reference: SamplingResult,
+                     results: Dict[str, SamplingResult]) -> List[ProfileAccuracy]:
+    """
+    比较各测量配置与 reference 配置的采样结果
+    
+    参数:
+        reference: reference 配置的采样结果
+        results: 测量配置名称 → 采样结果
+    
+    返回:
+        List[ProfileAccuracy]: 按输入顺序排列
+    """
+    accuracies = []
+    for name, result in results.items():
+        rms_error, max_error = compare_intensity_distributions(result, reference)
+        speedup = reference.elapsed_time / result.elapsed_time if result.elapsed_time > 0 else float('inf')
+        accuracies.append(ProfileAccuracy(name, rms_error, max_error, result.elapsed_time, speedup))
+    return accuracies
+
+
+# ============================================================================
+# 渲染验证（需要 Blender）
+# ============================================================================
+
+def run_sensor_validation(light_position: Tuple[float, float, float],
+                          angular_interval: float,
+                          distance: float,
+                          fixture_class: str = "default",
+                          reference_samples: int = DEFAULT_REFERENCE_SAMPLES,
+                          candidate_samples: Sequence[int] = DEFAULT_CANDIDATE_SAMPLES,
+                          denoise_modes: Sequence[bool] = (False, True),
+                          rms_tolerance: float = DEFAULT_RMS_TOLERANCE,
+                          max_tolerance: float = DEFAULT_MAX_TOLERANCE) -> SensorValidationReport:
+    """
+    对当前场景渲染参考结果和候选结果，并生成验证报告
+    
+    参数:
+        light_position: 光度中心位置 (x, y, z)
+        angular_interval: 角度间隔（度），验证时通常用较粗的网格
+        distance: 测量距离（米）
+        fixture_class: 灯具类别
+        reference_samples: 参考渲染采样数（不降噪）
+        candidate_samples: 候选采样数列表
+        denoise_modes: 对每个候选采样数测试的降噪模式
+        rms_tolerance: 相对均方根误差要求
+        max_tolerance: 最大误差要求
+    
+    返回:
+        SensorValidationReport
+    """
+    # 采样器依赖 bpy，仅在 Blender 中调用时导入
+    from .sampler import collect_spherical_data
+    
+    reference = collect_spherical_data(light_position, angular_interval, distance, reference_samples)
+    
+    candidates = []
+    for samples in candidate_samples:
+        for denoise in denoise_modes:
+            result = collect_spherical_data(light_position, angular_interval, distance,
+                                            samples, denoise=denoise)
+            candidates.append((samples, denoise, result))
+    
+    return build_validation_report(reference, candidates, fixture_class, rms_tolerance, max_tolerance)
+
+
+def run_profile_validation(light_position: Tuple[float, float, float],
+                           angular_interval: float,
+                           distance: float,
+                           samples: int,
+                           profiles: Optional[Sequence[str]] = None) -> List[ProfileAccuracy]:
+    """
+    对当前场景用各测量配置采样，测量相对 reference 配置的精度影响
+    
+    参数:
+        light_position: 光度中心位置 (x, y, z)
+        angular_interval: 角度间隔（度）
+        distance: 测量距离（米）
+        samples: Cycles 采样数（所有配置相同，只比较光路设置的影响）
+        profiles: 要测量的配置名称（None 时为除 reference 外的全部配置）
+    
+    返回:
+        List[ProfileAccuracy]
+    """
+    # 采样器依赖 bpy，仅在 Blender 中调用时导入
+    from .sampler import collect_spherical_data
+    from .measurement_profiles import REFERENCE_MEASUREMENT_PROFILE, list_measurement_profiles
+    
+    if profiles is None:
+        profiles = [name for name in list_measurement_profiles() if name != REFERENCE_MEASUREMENT_PROFILE]
+    
+    reference = collect_spherical_data(light_position, angular_interval, distance, samples,
+                                       profile=REFERENCE_MEASUREMENT_PROFILE)
+    results = {
+        name: collect_spherical_data(light_position, angular_interval, distance, samples, profile=name)
+        for name in profiles
+    }
+    return compare_profiles(reference, results)
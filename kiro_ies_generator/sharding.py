@@ -0,0 +1,937 @@
+"""
+分布式分片模块 (Sharding)
+
+多台渲染节点通过共享目录协作完成一批测量任务，不需要任何外部服务。
+
+协调器把每个任务（一个 .blend）的采样网格按垂直角度行拆成若干分片，写入共享目录的清单；
+任意节点上的 Blender 工作进程用锁文件认领分片，只渲染分片中的行并写出部分结果；
+协调器（普通 Python 进程，不需要 Blender）等待所有分片完成后合并为 SamplingResult，
+校准并写出 IES、元数据和测量存档。工作进程在渲染期间定期更新锁文件的修改时间（心跳），
+超过超时时间没有心跳的分片由协调器删除锁文件，交给其他工作进程重新认领。
+
+共享目录结构：
+    <root>/manifest.json             任务和分片清单（协调器写入，之后只读）
+    <root>/claims/<shard_id>.lock    认领锁（O_EXCL 创建，内容为工作进程 ID）
+    <root>/results/<shard_id>.kma    部分结果（测量存档，先写临时文件再改名）
+    <root>/failures/<shard_id>.json  分片失败记录（场景错误等不会因重试而消失的错误）
+    <root>/report.json               协调器的合并报告（ShardReport）
+
+分片按行交错分配（第 k 个分片测量第 k, k+n, k+2n... 行），
+使正下方/正上方等渲染较慢的方向分散到不同分片，各分片耗时接近。
+
+命令行（-- 之后的参数；plan 之后为 cli 的参数，只支持 single 模式）：
+    python -c "import sys; from kiro_ies_generator import sharding; sys.exit(sharding.main())" \\
+        plan --root /shared/run --shards 16 \\
+        a.blend b.blend --output-dir /shared/out --preset production
+    blender -b --python-expr "import sys; from kiro_ies_generator import sharding; sys.exit(sharding.main())" \\
+        -- work --root /shared/run
+    python -c "import sys; from kiro_ies_generator import sharding; sys.exit(sharding.main())" \\
+        coordinate --root /shared/run --shard-timeout 1800
+
+本模块除 ShardWorker 外不依赖 bpy。
+"""
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass, field
+import argparse
+import json
+import os
+import socket
+import sys
+import time
+import uuid
+import numpy as np
+
+from .data_structures import SamplingConfig, SamplingResult
+from .ies_generator import DEFAULT_FIXTURE_NAME
+from .exporters import DEFAULT_EXPORT_FORMATS
+from .output_manager import write_json_atomic, write_metadata_file
+from .measurement_archive import load_sampling_result, save_sampling_result
+from .measurement_profiles import DEFAULT_MEASUREMENT_PROFILE
+from .result_export import export_sampling_result
+from .cli import (
+    CLI_MODE_SINGLE,
+    CliError,
+    JsonEventWriter,
+    build_sampling_config,
+    parse_arguments,
+    plan_jobs,
+    split_blender_argv,
+)
+
+
+# ============================================================================
+# 常量定义
+# ============================================================================
+
+# 共享目录中的文件和子目录
+SHARD_MANIFEST_NAME = 'manifest.json'
+SHARD_REPORT_NAME = 'report.json'
+SHARD_CLAIMS = 'claims'
+SHARD_RESULTS = 'results'
+SHARD_FAILURES = 'failures'
+
+# 没有心跳多久后重新分配分片（秒）
+DEFAULT_SHARD_TIMEOUT = 1800.0
+
+# 共享目录轮询间隔（秒，网络文件系统上不宜过短）
+DEFAULT_SHARD_POLL_INTERVAL = 5.0
+
+# 部分结果中记录场景信息的键（合并时移除）
+SHARD_SCENE_KEY = 'shard_scene'
+
+
+class ShardingError(Exception):
+    """分布式分片错误"""
+    pass
+
+
+@dataclass
+class ShardJob:
+    """
+    一个分片测量任务（对应一个 .blend 的完整球面采样）
+    
+    属性:
+        job_id: 任务 ID（同一清单内唯一）
+        blend: .blend 路径（所有节点都能访问的共享路径）
+        output_path: IES 输出路径（协调器写入）
+        angular_interval: 角度间隔（度）
+        distance: 测量距离（米）
+        samples: Cycles 采样数
+        total_lumens: 目标总流明（None 时按场景中有效光源的功率计算）
+        fixture_name: 灯具名称
+        denoise: 是否在校准前对合并后的亮度网格做球面降噪
+        sensor_denoise: 传感器渲染是否启用 OpenImageDenoise
+        measurement_profile: 测量配置名称
+        spherical_harmonics_band: 球谐拟合阶数（可选，None 时不拟合）
+        export_formats: 导出格式（见 exporters.write_photometric_exports）
+    """
+    
+    job_id: str
+    blend: str
+    output_path: str
+    angular_interval: float
+    distance: float
+    samples: int
+    total_lumens: Optional[float] = None
+    fixture_name: str = DEFAULT_FIXTURE_NAME
+    denoise: bool = False
+    sensor_denoise: bool = False
+    measurement_profile: str = DEFAULT_MEASUREMENT_PROFILE
+    spherical_harmonics_band: Optional[int] = None
+    export_formats: Tuple[str, ...] = DEFAULT_EXPORT_FORMATS
+    
+    @property
+    def config(self) -> SamplingConfig:
+        """采样配置"""
+        return SamplingConfig(angular_interval=self.angular_interval, distance=self.distance, samples=self.samples)
+    
+    def to_dict(self) -> dict:
+        """
+        转换为字典格式（写入清单）
+        """
+        return {
+            'job_id': self.job_id,
+            'blend': self.blend,
+            'output_path': self.output_path,
+            'angular_interval': self.angular_interval,
+            'distance': self.distance,
+            'samples': self.samples,
+            'total_lumens': self.total_lumens,
+            'fixture_name': self.fixture_name,
+            'denoise': self.denoise,
+            'sensor_denoise': self.sensor_denoise,
+            'measurement_profile': self.measurement_profile,
+            'spherical_harmonics_band': self.spherical_harmonics_band,
+            'export_formats': list(self.export_formats)
+        }
+    
+    @staticmethod
+    def from_dict(data: dict) -> 'ShardJob':
+        """
+        从清单创建
+        """
+        return ShardJob(**data)
+
+
+@dataclass
+class Shard:
+    """
+    一个分片
+    
+    属性:
+        shard_id: 分片 ID（文件名安全）
+        job_id: 所属任务 ID
+        theta_indices: 要测量的垂直角度索引
+    """
+    
+    shard_id: str
+    job_id: str
+    theta_indices: List[int]
+    
+    def to_dict(self) -> dict:
+        """
+        转换为字典格式（写入清单）
+        """
+        return {'shard_id': self.shard_id, 'job_id': self.job_id, 'theta_indices': list(self.theta_indices)}
+    
+    @staticmethod
+    def from_dict(data: dict) -> 'Shard':
+        """
+        从清单创建
+        """
+        return Shard(shard_id=data['shard_id'], job_id=data['job_id'], theta_indices=list(data['theta_indices']))
+
+
+@dataclass
+class ShardedJobResult:
+    """
+    单个任务的合并结果
+    
+    属性:
+        job_id: 任务 ID
+        ies_path: IES 输出路径
+        metadata_path: 元数据路径（失败时为 None）
+        archive_path: 合并后的测量存档路径（失败时为 None）
+        total_lumens: 校准使用的总流明（失败时为 None）
+        shards: 分片数
+        reassigned: 因超时被重新分配的分片 ID
+        error: 失败原因（None 表示成功）
+    """
+    
+    job_id: str
+    ies_path: str
+    metadata_path: Optional[str] = None
+    archive_path: Optional[str] = None
+    total_lumens: Optional[float] = None
+    shards: int = 0
+    reassigned: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    
+    @property
+    def succeeded(self) -> bool:
+        """是否成功"""
+        return self.error is None
+    
+    def to_dict(self) -> dict:
+        """
+        转换为字典格式
+        """
+        return {
+            'job_id': self.job_id,
+            'ies_path': self.ies_path,
+            'metadata_path': self.metadata_path,
+            'archive_path': self.archive_path,
+            'total_lumens': self.total_lumens,
+            'shards': self.shards,
+            'reassigned': list(self.reassigned),
+            'error': self.error
+        }
+
+
+@dataclass
+class ShardReport:
+    """
+    协调器的合并报告
+    
+    属性:
+        jobs: 各任务结果（按清单顺序）
+        elapsed_time: 总耗时（秒）
+    """
+    
+    jobs: List[ShardedJobResult] = field(default_factory=list)
+    elapsed_time: float = 0.0
+    
+    @property
+    def succeeded(self) -> List[str]:
+        """成功的任务 ID"""
+        return [result.job_id for result in self.jobs if result.succeeded]
+    
+    @property
+    def failed(self) -> List[str]:
+        """失败的任务 ID"""
+        return [result.job_id for result in self.jobs if not result.succeeded]
+    
+    def to_dict(self) -> dict:
+        """
+        转换为字典格式（写入 report.json）
+        """
+        return {
+            'jobs': [result.to_dict() for result in self.jobs],
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'elapsed_time': self.elapsed_time
+        }
+    
+    def __str__(self) -> str:
+        """
+        格式化报告为可读字符串
+        """
+        return (f"ShardReport({len(self.jobs)} 个任务，成功 {len(self.succeeded)} 个，"
+                f"失败 {len(self.failed)} 个，耗时 {self.elapsed_time:.1f} 秒)")
+
+
+# ============================================================================
+# 分片规划与合并
+# ============================================================================
+
+def count_vertical_angles(angular_interval: float) -> int:
+    """
+    计算垂直角度数量（与 sampler.calculate_sampling_angles 一致）
+    
+    参数:
+        angular_interval: 角度间隔（度）
+    
+    返回:
+        int: 0° 到 180° 的垂直角度数量
+    """
+    return len(np.arange(0, 181, angular_interval, dtype=float))
+
+
+def split_theta_indices(count: int, shard_count: int) -> List[List[int]]:
+    """
+    将垂直角度行交错分配到各分片
+    
+    参数:
+        count: 垂直角度数量
+        shard_count: 分片数（超过行数时按行数计）
+    
+    返回:
+        List[List[int]]: 每个分片的行索引，第 k 个分片为 k, k+n, k+2n...
+    
+    异常:
+        ShardingError: 分片数不为正
+    """
+    if shard_count < 1:
+        raise ShardingError(f"分片数必须为正整数：{shard_count}")
+    shard_count = min(shard_count, count)
+    return [list(range(k, count, shard_count)) for k in range(shard_count)]
+
+
+def plan_shards(jobs: Sequence[ShardJob], shard_count: int) -> List[Shard]:
+    """
+    为每个任务规划分片
+    
+    参数:
+        jobs: 任务列表
+        shard_count: 每个任务的分片数
+    
+    返回:
+        List[Shard]: 分片 ID 为 <任务 ID>-<序号>
+    
+    异常:
+        ShardingError: 任务 ID 重复或不安全、采样配置无效、分片数不为正
+    """
+    job_ids = [job.job_id for job in jobs]
+    if len(set(job_ids)) != len(job_ids):
+        raise ShardingError(f"任务 ID 重复：{job_ids}")
+    
+    shards = []
+    for job in jobs:
+        if not job.job_id or os.path.basename(job.job_id) != job.job_id or job.job_id.startswith('.'):
+            raise ShardingError(f"任务 ID 必须是非空且不含路径的字符串：{job.job_id!r}")
+        if not job.config.validate():
+            raise ShardingError(f"任务 {job.job_id} 的采样配置无效：{job.config!r}")
+        
+        for index, theta_indices in enumerate(
+                split_theta_indices(count_vertical_angles(job.angular_interval), shard_count)):
+            shards.append(Shard(shard_id=f"{job.job_id}-{index:03d}", job_id=job.job_id,
+                                theta_indices=theta_indices))
+    return shards
+
+
+def merge_shard_results(shards: Sequence[Shard], results: Sequence[SamplingResult]) -> SamplingResult:
+    """
+    合并同一任务各分片的部分结果
+    
+    参数:
+        shards: 分片（与 results 一一对应）
+        results: 部分结果（sampler.collect_spherical_data 以 theta_indices 测得）
+    
+    返回:
+        SamplingResult: 完整的测量网格；total_samples 和 elapsed_time 为各分片之和，
+            render_settings 去掉分片信息，'shards' 记录分片数
+    
+    异常:
+        ShardingError: 没有分片、角度网格/测量距离/光度中心不一致，或分片没有恰好覆盖每一行一次
+    """
+    if not shards or len(shards) != len(results):
+        raise ShardingError(f"分片数 {len(shards)} 与部分结果数 {len(results)} 不符")
+    
+    first = results[0]
+    vertical_angles = np.asarray(first.vertical_angles, dtype=float)
+    horizontal_angles = np.asarray(first.horizontal_angles, dtype=float)
+    distance = first.render_settings.get('distance')
+    
+    luminance_data = np.zeros((len(vertical_angles), len(horizontal_angles)))
+    has_variance = all(result.variance is not None for result in results)
+    variance = np.zeros_like(luminance_data) if has_variance else None
+    covered = np.zeros(len(vertical_angles), dtype=int)
+    
+    for shard, result in zip(shards, results):
+        if (not np.array_equal(result.vertical_angles, vertical_angles) or
+                not np.array_equal(result.horizontal_angles, horizontal_angles)):
+            raise ShardingError(f"分片 {shard.shard_id} 的角度网格与其他分片不一致")
+        if result.render_settings.get('distance') != distance:
+            raise ShardingError(f"分片 {shard.shard_id} 的测量距离与其他分片不一致")
+        if not np.allclose(result.light_position, first.light_position):
+            raise ShardingError(f"分片 {shard.shard_id} 的光度中心与其他分片不一致，各节点的 .blend 是否相同？")
+        
+        rows = np.asarray(shard.theta_indices, dtype=int)
+        if rows.size and (rows.min() < 0 or rows.max() >= len(vertical_angles)):
+            raise ShardingError(f"分片 {shard.shard_id} 的行索引超出范围")
+        luminance_data[rows] = np.asarray(result.luminance_data, dtype=float)[rows]
+        if has_variance:
+            variance[rows] = np.asarray(result.variance, dtype=float)[rows]
+        covered[rows] += 1
+    
+    if not np.all(covered == 1):
+        missing = np.flatnonzero(covered == 0).tolist()
+        repeated = np.flatnonzero(covered > 1).tolist()
+        raise ShardingError(f"分片没有恰好覆盖每一行：缺少 {missing}，重复 {repeated}")
+    
+    render_settings = {
+        key: value for key, value in first.render_settings.items()
+        if key not in ('theta_indices', SHARD_SCENE_KEY)
+    }
+    render_settings['shards'] = len(shards)
+    
+    return SamplingResult(
+        vertical_angles=vertical_angles,
+        horizontal_angles=horizontal_angles,
+        luminance_data=luminance_data,
+        light_position=tuple(first.light_position),
+        total_samples=int(sum(result.total_samples for result in results)),
+        elapsed_time=float(sum(result.elapsed_time for result in results)),
+        render_settings=render_settings,
+        variance=variance
+    )
+
+
+# ============================================================================
+# 共享目录
+# ============================================================================
+
+class ShardDirectory:
+    """
+    分片共享目录（协调器和工作进程共用）
+    
+    参数:
+        root: 共享目录路径（不存在时创建）
+    """
+    
+    def __init__(self, root: str):
+        self.root = root
+        for name in (SHARD_CLAIMS, SHARD_RESULTS, SHARD_FAILURES):
+            os.makedirs(os.path.join(root, name), exist_ok=True)
+        self._manifest = None
+    
+    @property
+    def manifest_path(self) -> str:
+        """清单路径"""
+        return os.path.join(self.root, SHARD_MANIFEST_NAME)
+    
+    def claim_path(self, shard: Shard) -> str:
+        """认领锁路径"""
+        return os.path.join(self.root, SHARD_CLAIMS, f"{shard.shard_id}.lock")
+    
+    def result_path(self, shard: Shard) -> str:
+        """部分结果路径"""
+        return os.path.join(self.root, SHARD_RESULTS, f"{shard.shard_id}.kma")
+    
+    def failure_path(self, shard: Shard) -> str:
+        """失败记录路径"""
+        return os.path.join(self.root, SHARD_FAILURES, f"{shard.shard_id}.json")
+    
+    # ------------------------------------------------------------------
+    # 清单
+    # ------------------------------------------------------------------
+    
+    def create(self, jobs: Sequence[ShardJob], shard_count: int) -> List[Shard]:
+        """
+        规划分片并写入清单（协调器）
+        
+        参数:
+            jobs: 任务列表
+            shard_count: 每个任务的分片数
+        
+        返回:
+            List[Shard]: 规划的分片
+        
+        异常:
+            ShardingError: 清单已存在或规划失败
+        """
+        if os.path.exists(self.manifest_path):
+            raise ShardingError(f"清单已存在：{self.manifest_path}，请使用新的共享目录")
+        
+        shards = plan_shards(jobs, shard_count)
+        write_json_atomic(self.manifest_path, {
+            'jobs': [job.to_dict() for job in jobs],
+            'shards': [shard.to_dict() for shard in shards]
+        })
+        return shards
+    
+    def load(self) -> Tuple[Dict[str, ShardJob], List[Shard]]:
+        """
+        读取清单
+        
+        返回:
+            (jobs, shards): 任务 ID → 任务（按清单顺序），以及全部分片
+        
+        异常:
+            ShardingError: 清单不存在
+        """
+        if self._manifest is None:
+            if not os.path.exists(self.manifest_path):
+                raise ShardingError(f"清单不存在：{self.manifest_path}")
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            jobs = {item['job_id']: ShardJob.from_dict(item) for item in data['jobs']}
+            self._manifest = (jobs, [Shard.from_dict(item) for item in data['shards']])
+        return self._manifest
+    
+    # ------------------------------------------------------------------
+    # 分片状态
+    # ------------------------------------------------------------------
+    
+    def is_finished(self, shard: Shard) -> bool:
+        """分片是否已有结果或失败记录"""
+        return os.path.exists(self.result_path(shard)) or os.path.exists(self.failure_path(shard))
+    
+    def unfinished_shards(self) -> List[Shard]:
+        """尚未完成的分片"""
+        return [shard for shard in self.load()[1] if not self.is_finished(shard)]
+    
+    def claim(self, worker_id: str) -> Optional[Shard]:
+        """
+        认领一个未完成且未被认领的分片（工作进程）
+        
+        参数:
+            worker_id: 工作进程 ID（写入锁文件）
+        
+        返回:
+            Shard，没有可认领的分片时为 None
+        """
+        for shard in self.unfinished_shards():
+            try:
+                descriptor = os.open(self.claim_path(shard), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                continue
+            with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+                json.dump({'worker_id': worker_id, 'claimed_at': time.time()}, f)
+            # 认领期间其他工作进程刚好写完结果时放弃
+            if self.is_finished(shard):
+                self.release(shard)
+                continue
+            return shard
+        return None
+    
+    def heartbeat(self, shard: Shard):
+        """
+        更新认领锁的修改时间（工作进程渲染期间定期调用）
+        
+        说明:
+            锁已被协调器回收时忽略，分片继续渲染，先写完的结果生效
+        """
+        try:
+            os.utime(self.claim_path(shard))
+        except FileNotFoundError:
+            pass
+    
+    def release(self, shard: Shard):
+        """
+        删除认领锁
+        """
+        try:
+            os.remove(self.claim_path(shard))
+        except FileNotFoundError:
+            pass
+    
+    def write_result(self, shard: Shard, sampling_result: SamplingResult):
+        """
+        写入部分结果并释放认领锁（工作进程）
+        """
+        temporary_path = f"{self.result_path(shard)}.{uuid.uuid4().hex}.tmp"
+        save_sampling_result(sampling_result, temporary_path)
+        os.replace(temporary_path, self.result_path(shard))
+        self.release(shard)
+    
+    def write_failure(self, shard: Shard, worker_id: str, error: str):
+        """
+        写入失败记录并释放认领锁（工作进程）
+        """
+        write_json_atomic(self.failure_path(shard), {'worker_id': worker_id, 'error': error})
+        self.release(shard)
+    
+    def read_result(self, shard: Shard) -> Optional[SamplingResult]:
+        """
+        读取部分结果（不存在时为 None）
+        """
+        path = self.result_path(shard)
+        if not os.path.exists(path):
+            return None
+        return load_sampling_result(path, mmap=False)
+    
+    def read_failure(self, shard: Shard) -> Optional[str]:
+        """
+        读取失败原因（不存在时为 None）
+        """
+        path = self.failure_path(shard)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('error')
+    
+    def reclaim_stale(self, timeout: float, now: Optional[float] = None) -> List[str]:
+        """
+        回收超时没有心跳的认领锁（协调器），分片交由其他工作进程重新认领
+        
+        参数:
+            timeout: 超时（秒）
+            now: 当前时间（time.time()，测试时可指定）
+        
+        返回:
+            List[str]: 被回收的分片 ID
+        """
+        now = time.time() if now is None else now
+        reclaimed = []
+        for shard in self.unfinished_shards():
+            try:
+                last_heartbeat = os.path.getmtime(self.claim_path(shard))
+            except FileNotFoundError:
+                continue
+            if now - last_heartbeat >= timeout:
+                self.release(shard)
+                reclaimed.append(shard.shard_id)
+        return reclaimed
+
+
+# ============================================================================
+# 协调器
+# ============================================================================
+
+def run_coordinator(directory: ShardDirectory,
+                    shard_timeout: float = DEFAULT_SHARD_TIMEOUT,
+                    poll_interval: float = DEFAULT_SHARD_POLL_INTERVAL,
+                    timeout: Optional[float] = None,
+                    overwrite: bool = False,
+                    progress_callback: Optional[Callable[[int, int], None]] = None,
+                    reassign_callback: Optional[Callable[[List[str]], None]] = None) -> ShardReport:
+    """
+    等待所有分片完成，合并并导出每个任务（不需要 Blender）
+    
+    参数:
+        directory: 共享目录（清单已由 create 写入）
+        shard_timeout: 没有心跳多久后重新分配分片（秒）
+        poll_interval: 轮询间隔（秒）
+        timeout: 总超时（秒，None 表示一直等待）
+        overwrite: 是否覆盖已存在的输出文件
+        progress_callback: 进度回调函数 callback(已完成分片数, 总分片数)
+        reassign_callback: 分片被重新分配时的回调 callback(分片 ID 列表)
+    
+    返回:
+        ShardReport: 报告同时写入 <共享目录>/report.json
+    
+    异常:
+        ShardingError: 清单不存在或等待超时
+    
+    说明:
+        每个任务的分片全部完成后立即合并导出，不必等待其他任务；
+        有分片失败的任务记为失败，不影响其他任务
+    """
+    start_time = time.time()
+    jobs, shards = directory.load()
+    shards_by_job = {job_id: [shard for shard in shards if shard.job_id == job_id] for job_id in jobs}
+    reassigned = {job_id: [] for job_id in jobs}
+    results = {}
+    
+    while True:
+        stale = directory.reclaim_stale(shard_timeout)
+        if stale:
+            for shard_id in stale:
+                reassigned[next(shard.job_id for shard in shards if shard.shard_id == shard_id)].append(shard_id)
+            if reassign_callback:
+                reassign_callback(stale)
+        
+        for job_id, job_shards in shards_by_job.items():
+            if job_id not in results and all(directory.is_finished(shard) for shard in job_shards):
+                results[job_id] = _finish_job(directory, jobs[job_id], job_shards, reassigned[job_id], overwrite)
+        
+        if progress_callback:
+            progress_callback(sum(1 for shard in shards if directory.is_finished(shard)), len(shards))
+        
+        if len(results) == len(jobs):
+            break
+        if timeout is not None and time.time() - start_time >= timeout:
+            raise ShardingError(f"等待分片超时（{timeout} 秒），未完成："
+                                f"{[shard.shard_id for shard in directory.unfinished_shards()]}")
+        time.sleep(poll_interval)
+    
+    report = ShardReport(jobs=[results[job_id] for job_id in jobs], elapsed_time=time.time() - start_time)
+    write_json_atomic(os.path.join(directory.root, SHARD_REPORT_NAME), report.to_dict())
+    return report
+
+
+def _finish_job(directory: ShardDirectory,
+                job: ShardJob,
+                shards: List[Shard],
+                reassigned: List[str],
+                overwrite: bool) -> ShardedJobResult:
+    """
+    合并一个任务的部分结果，校准并写出 IES、元数据和测量存档
+    """
+    result = ShardedJobResult(job_id=job.job_id, ies_path=job.output_path, shards=len(shards),
+                              reassigned=list(reassigned))
+    
+    failures = {shard.shard_id: directory.read_failure(shard) for shard in shards}
+    failures = {shard_id: error for shard_id, error in failures.items() if error is not None}
+    if failures:
+        result.error = f"分片失败：{failures}"
+        return result
+    
+    try:
+        partials = [directory.read_result(shard) for shard in shards]
+        sampling_result = merge_shard_results(shards, partials)
+        scene = partials[0].render_settings.get(SHARD_SCENE_KEY, {})
+        
+        total_lumens = job.total_lumens if job.total_lumens is not None else scene.get('total_lumens')
+        if total_lumens is None:
+            raise ShardingError("部分结果缺少场景总流明，请在任务中指定 total_lumens")
+        
+        exported = export_sampling_result(
+            sampling_result,
+            job.config,
+            total_lumens,
+            job.output_path,
+            job.fixture_name,
+            overwrite,
+            scene.get('light_sources', []),
+            tuple(sampling_result.light_position),
+            tuple(scene.get('center_relative', (0.0, 0.0, 0.0))),
+            job.spherical_harmonics_band,
+            job.denoise,
+            export_formats=job.export_formats
+        )
+        
+        result.metadata_path = exported['metadata_path']
+        result.archive_path = exported['archive_path']
+        result.total_lumens = float(total_lumens)
+    except Exception as e:
+        result.error = str(e)
+    
+    return result
+
+
+# ============================================================================
+# 工作进程
+# ============================================================================
+
+class ShardWorker:
+    """
+    在 Blender 中认领并渲染分片的工作进程
+    
+    参数:
+        directory: 共享目录
+        worker_id: 工作进程 ID（默认为 <主机名>-<进程号>）
+    
+    属性:
+        current_blend: 当前打开的 .blend 绝对路径，连续认领同一任务的分片时不重新载入
+    """
+    
+    def __init__(self, directory: ShardDirectory, worker_id: Optional[str] = None):
+        self.directory = directory
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.current_blend = None
+    
+    def run_once(self) -> Optional[str]:
+        """
+        认领并渲染一个分片
+        
+        返回:
+            str: 完成的分片 ID，没有可认领的分片时为 None
+        
+        说明:
+            渲染失败时写入失败记录，协调器将该任务记为失败
+        """
+        shard = self.directory.claim(self.worker_id)
+        if shard is None:
+            return None
+        
+        job = self.directory.load()[0][shard.job_id]
+        try:
+            sampling_result = self._measure(job, shard)
+        except Exception as e:
+            # 场景可能未完全恢复，下个分片重新载入
+            self.current_blend = None
+            self.directory.write_failure(shard, self.worker_id, str(e))
+        else:
+            self.directory.write_result(shard, sampling_result)
+        return shard.shard_id
+    
+    def run(self, poll_interval: float = DEFAULT_SHARD_POLL_INTERVAL,
+            idle_timeout: Optional[float] = None) -> int:
+        """
+        持续认领分片，直到所有分片完成或空闲超时
+        
+        参数:
+            poll_interval: 没有可认领分片时的轮询间隔（秒），
+                其他工作进程的分片超时被回收后可以接手
+            idle_timeout: 连续没有可认领分片的最长时间（秒，None 表示等到所有分片完成）
+        
+        返回:
+            int: 本进程完成的分片数
+        """
+        processed = 0
+        idle_since = time.time()
+        while self.directory.unfinished_shards():
+            if self.run_once() is not None:
+                processed += 1
+                idle_since = time.time()
+                continue
+            if idle_timeout is not None and time.time() - idle_since >= idle_timeout:
+                break
+            time.sleep(poll_interval)
+        return processed
+    
+    def _measure(self, job: ShardJob, shard: Shard) -> SamplingResult:
+        """
+        打开（或复用）.blend 并渲染分片中的行
+        """
+        import bpy
+        from .pipeline import measure_scene
+        from .scene_validator import get_light_properties, get_total_lumens
+        
+        blend_path = os.path.abspath(job.blend)
+        if blend_path != self.current_blend:
+            self.current_blend = None
+            bpy.ops.wm.open_mainfile(filepath=blend_path)
+            self.current_blend = blend_path
+        
+        sampling_result, light_objects, _, center_relative = measure_scene(
+            job.config,
+            lambda current, total: self.directory.heartbeat(shard),
+            job.sensor_denoise,
+            job.measurement_profile,
+            theta_indices=shard.theta_indices
+        )
+        sampling_result.render_settings[SHARD_SCENE_KEY] = {
+            'worker_id': self.worker_id,
+            'center_relative': list(center_relative),
+            'light_sources': [get_light_properties(light) for light in light_objects],
+            'total_lumens': get_total_lumens(light_objects)
+        }
+        return sampling_result
+
+
+# ============================================================================
+# 命令行入口
+# ============================================================================
+
+def plan_cli_jobs(argv: List[str]) -> List[ShardJob]:
+    """
+    由 cli 参数建立分片任务（每个 .blend 一个任务）
+    
+    参数:
+        argv: cli 参数（见 cli.build_parser），只支持 single 模式，必须列出 .blend
+    
+    返回:
+        List[ShardJob]: 任务 ID 为 .blend 的文件名
+    
+    异常:
+        CliError: 参数无效、不是 single 模式或没有列出 .blend
+    """
+    args = parse_arguments(argv)
+    if args.mode != CLI_MODE_SINGLE:
+        raise CliError("分片只支持 single 模式（fixtures/frames 模式请按 .blend 拆成多个任务）")
+    if not args.blend_files:
+        raise CliError("分片任务必须列出 .blend（各节点需能访问同一路径）")
+    
+    config = build_sampling_config(args)
+    jobs = []
+    for cli_job in plan_jobs(args):
+        stem = os.path.splitext(os.path.basename(cli_job.output_path))[0]
+        jobs.append(ShardJob(
+            job_id=stem,
+            blend=os.path.abspath(cli_job.blend_path),
+            output_path=os.path.abspath(cli_job.output_path),
+            angular_interval=config.angular_interval,
+            distance=config.distance,
+            samples=config.samples,
+            total_lumens=args.lumens,
+            fixture_name=args.fixture_name or stem,
+            denoise=args.denoise,
+            sensor_denoise=args.sensor_denoise,
+            measurement_profile=args.profile,
+            export_formats=tuple(args.formats)
+        ))
+    return jobs
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    分片命令行入口
+    
+    参数:
+        argv: 参数（None 时取 sys.argv 中 -- 之后的部分，没有 -- 时取 sys.argv[1:]）：
+            plan --root 目录 --shards N <cli 参数>
+            work --root 目录 [--worker-id ID] [--poll-interval 秒] [--idle-timeout 秒]（需要在 Blender 中运行）
+            coordinate --root 目录 [--shard-timeout 秒] [--poll-interval 秒] [--timeout 秒] [--overwrite]
+    
+    返回:
+        int: 退出码（0 成功，1 有任务失败，2 参数或清单错误）
+    """
+    if argv is None:
+        argv = split_blender_argv(sys.argv) if '--' in sys.argv else sys.argv[1:]
+    
+    parser = argparse.ArgumentParser(prog="kiro_ies_generator.sharding", description="分布式分片测量")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    plan_parser = commands.add_parser('plan', help="规划分片并写入清单")
+    plan_parser.add_argument('--root', required=True, help="共享目录")
+    plan_parser.add_argument('--shards', type=int, required=True, help="每个任务的分片数")
+    
+    work_parser = commands.add_parser('work', help="认领并渲染分片（在 Blender 中运行）")
+    work_parser.add_argument('--root', required=True, help="共享目录")
+    work_parser.add_argument('--worker-id', help="工作进程 ID")
+    work_parser.add_argument('--poll-interval', type=float, default=DEFAULT_SHARD_POLL_INTERVAL, help="轮询间隔（秒）")
+    work_parser.add_argument('--idle-timeout', type=float, help="空闲超时后退出（秒）")
+    
+    coordinate_parser = commands.add_parser('coordinate', help="等待分片完成并合并导出")
+    coordinate_parser.add_argument('--root', required=True, help="共享目录")
+    coordinate_parser.add_argument('--shard-timeout', type=float, default=DEFAULT_SHARD_TIMEOUT,
+                                   help="没有心跳多久后重新分配分片（秒）")
+    coordinate_parser.add_argument('--poll-interval', type=float, default=DEFAULT_SHARD_POLL_INTERVAL,
+                                   help="轮询间隔（秒）")
+    coordinate_parser.add_argument('--timeout', type=float, help="总超时（秒）")
+    coordinate_parser.add_argument('--overwrite', action='store_true', help="覆盖已存在的文件")
+    
+    writer = JsonEventWriter(sys.stdout)
+    try:
+        args, remaining = parser.parse_known_args(argv)
+        if remaining and args.command != 'plan':
+            raise CliError(f"无法识别的参数：{' '.join(remaining)}")
+        
+        directory = ShardDirectory(args.root)
+        if args.command == 'plan':
+            shards = directory.create(plan_cli_jobs(remaining), args.shards)
+            writer.emit('planned', jobs=len(directory.load()[0]), shards=len(shards))
+            return 0
+        
+        if args.command == 'work':
+            directory.load()
+            worker = ShardWorker(directory, args.worker_id)
+            processed = worker.run(args.poll_interval, args.idle_timeout)
+            writer.emit('worker_stopped', worker_id=worker.worker_id, processed=processed)
+            return 0
+        
+        report = run_coordinator(
+            directory, args.shard_timeout, args.poll_interval, args.timeout, args.overwrite,
+            progress_callback=lambda current, total: writer.emit('progress', current=current, total=total),
+            reassign_callback=lambda shard_ids: writer.emit('reassigned', shards=shard_ids)
+        )
+        writer.emit('finish', **report.to_dict())
+        return 1 if report.failed else 0
+    
+    except (SystemExit, CliError, ShardingError) as e:
+        writer.emit('error', error=str(e))
+        return 2
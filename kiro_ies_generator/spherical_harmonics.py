@@ -0,0 +1,394 @@
+"""
+球谐函数模块 (Spherical Harmonics)
+
+将 PhotometricData 拟合为实球谐系数，用于实时预览的紧凑表示和噪声平滑。
+
+约定：
+- 球面坐标与 IES C-Plane 一致：θ 为垂直角度（0° = 正下方），φ 为水平角度
+- 实球谐函数（正交归一，无 Condon-Shortley 相位）：
+    Y_l0  = N_l0 P_l^0(cosθ)
+    Y_lm  = √2 N_lm P_l^m(cosθ) cos(mφ)      m > 0
+    Y_l-m = √2 N_lm P_l^m(cosθ) sin(mφ)      m > 0
+- 系数按 k = l² + l + m 排列，共 (L + 1)² 个
+
+拟合方法：
+- 以立体角为权重的最小二乘：min Σ w (I - Σ c_k Y_k)²
+- 权重网格可分离（纬度带 × 平面宽度），法方程矩阵按 θ、φ 分别求和后逐元素相乘，
+  内存占用与 N_theta + N_phi 成正比，而不是 N_theta × N_phi
+"""
+
+from typing import Dict, Optional, Tuple
+from dataclasses import dataclass
+import numpy as np
+
+from .data_structures import PhotometricData
+from .photometry import ANGLE_TOLERANCE, get_solid_angle_factors
+from .resampling import ResamplingError, expand_horizontal_symmetry
+
+
+# ============================================================================
+# 常量定义
+# ============================================================================
+
+# 默认拟合阶数
+DEFAULT_SH_BAND = 8
+
+# 最大拟合阶数（(L + 1)² 个系数）
+MAX_SH_BAND = 32
+
+# 球谐约定说明（写入元数据，供查看器解析）
+SH_CONVENTION = "real, orthonormal, no Condon-Shortley phase, k = l*l + l + m, theta = 0 at nadir"
+
+
+class SphericalHarmonicsError(Exception):
+    """球谐拟合错误"""
+    pass
+
+
+@dataclass
+class SphericalHarmonicFit:
+    """
+    球谐拟合结果
+    
+    属性:
+        band: 拟合阶数 L
+        coefficients: 系数数组，长度 (L + 1)²，单位 cd
+        residual: 相对残差 √(Σ w (I - Î)²) / √(Σ w I²)
+    """
+    
+    band: int
+    coefficients: np.ndarray
+    residual: float
+    
+    def get_total_flux(self) -> float:
+        """
+        由 l = 0 系数计算总光通量（∫ Y_00 dΩ = √(4π)）
+        
+        返回:
+            float: 总光通量（流明）
+        """
+        return float(self.coefficients[0] * np.sqrt(4 * np.pi))
+    
+    def to_dict(self) -> dict:
+        """
+        转换为可 JSON 序列化的字典
+        
+        返回:
+            dict: {'band', 'convention', 'coefficients', 'residual'}
+        """
+        return {
+            'band': self.band,
+            'convention': SH_CONVENTION,
+            'coefficients': [float(c) for c in self.coefficients],
+            'residual': float(self.residual)
+        }
+    
+    @staticmethod
+    def from_dict(data: Dict) -> 'SphericalHarmonicFit':
+        """
+        从字典（如元数据 JSON）恢复拟合结果
+        
+        参数:
+            data: to_dict 的结果
+        
+        返回:
+            SphericalHarmonicFit
+        
+        异常:
+            SphericalHarmonicsError: 系数数量与阶数不符
+        """
+        band = int(data['band'])
+        coefficients = np.asarray(data['coefficients'], dtype=float)
+        if len(coefficients) != (band + 1) ** 2:
+            raise SphericalHarmonicsError(
+                f"系数数量 {len(coefficients)} 与阶数 {band} 不符（应为 {(band + 1) ** 2}）"
+            )
+        return SphericalHarmonicFit(band, coefficients, float(data.get('residual', 0.0)))
+
+
+# ============================================================================
+# 拟合
+# ============================================================================
+
+def fit_spherical_harmonics(photometric_data: PhotometricData,
+                            band: int = DEFAULT_SH_BAND) -> SphericalHarmonicFit:
+    """
+    以立体角加权最小二乘拟合球谐系数
+    
+    参数:
+        photometric_data: 光度学数据（可为对称数据或只覆盖半球）
+        band: 拟合阶数 L（0 到 MAX_SH_BAND）
+    
+    返回:
+        SphericalHarmonicFit: 拟合系数和相对残差
+    
+    异常:
+        SphericalHarmonicsError: 阶数无效或采样点不足以确定系数
+    
+    说明:
+        对称的水平角度先展开到完整圆周；垂直角度未覆盖的范围补 0（视为无光），
+        使拟合在整个球面上有约束。
+    """
+    if not 0 <= band <= MAX_SH_BAND:
+        raise SphericalHarmonicsError(f"拟合阶数必须在 0-{MAX_SH_BAND} 之间：{band}")
+    
+    vertical_angles, horizontal_angles, candela_values = _prepare_grid(photometric_data)
+    
+    count = (band + 1) ** 2
+    if len(vertical_angles) <= band or len(horizontal_angles) - 1 < 2 * band + 1:
+        raise SphericalHarmonicsError(
+            f"角度网格 {len(vertical_angles)} × {len(horizontal_angles) - 1} 不足以拟合 {band} 阶球谐"
+        )
+    
+    try:
+        band_weights, plane_widths = get_solid_angle_factors(vertical_angles, horizontal_angles)
+    except ValueError as e:
+        raise SphericalHarmonicsError(f"无法计算立体角权重：{str(e)}")
+    
+    legendre = _legendre_table(np.cos(np.radians(vertical_angles)), band)   # (N_theta, K)
+    azimuth = _azimuth_table(np.radians(horizontal_angles), band)            # (N_phi, 2L+1)
+    _, orders = _band_indices(band)
+    columns = orders + band
+    
+    # 法方程 G c = r，G_kk' = Θ_kk' · Φ_m(k)m(k')
+    theta_gram = legendre.T @ (legendre * band_weights[:, None])
+    phi_gram = azimuth.T @ (azimuth * plane_widths[:, None])
+    gram = theta_gram * phi_gram[np.ix_(columns, columns)]
+    
+    weighted = candela_values * band_weights[:, None] * plane_widths[None, :]
+    projection = legendre.T @ weighted @ azimuth                            # (K, 2L+1)
+    rhs = projection[np.arange(count), columns]
+    
+    coefficients = np.linalg.lstsq(gram, rhs, rcond=None)[0]
+    
+    fitted = _evaluate_grid(coefficients, band, legendre, azimuth)
+    weights = np.outer(band_weights, plane_widths)
+    signal = np.sqrt(np.vdot(weights, candela_values ** 2))
+    error = np.sqrt(np.vdot(weights, (candela_values - fitted) ** 2))
+    residual = float(error / signal) if signal > 0 else 0.0
+    
+    return SphericalHarmonicFit(band, coefficients, residual)
+
+
+# ============================================================================
+# 求值与重建
+# ============================================================================
+
+def evaluate_spherical_harmonics(coefficients: np.ndarray,
+                                 vertical_angles,
+                                 horizontal_angles) -> np.ndarray:
+    """
+    在任意方向上求球谐展开的值
+    
+    参数:
+        coefficients: 系数数组，长度 (L + 1)²
+        vertical_angles: 垂直角度数组（度）
+        horizontal_angles: 水平角度数组（度）
+    
+    返回:
+        np.ndarray: 光强（cd），形状为两个输入广播后的形状
+    """
+    band = _band_from_count(len(coefficients))
+    theta, phi = np.broadcast_arrays(
+        np.asarray(vertical_angles, dtype=float),
+        np.asarray(horizontal_angles, dtype=float)
+    )
+    
+    legendre = _legendre_table(np.cos(np.radians(theta.ravel())), band)
+    azimuth = _azimuth_table(np.radians(phi.ravel()), band)
+    _, orders = _band_indices(band)
+    
+    values = np.einsum('nk,nk,k->n', legendre, azimuth[:, orders + band], coefficients)
+    return values.reshape(theta.shape)
+
+
+def evaluate_spherical_harmonics_grid(coefficients: np.ndarray,
+                                      vertical_angles,
+                                      horizontal_angles) -> np.ndarray:
+    """
+    在规则角度网格上求球谐展开的值（可分离求值）
+    
+    参数:
+        coefficients: 系数数组，长度 (L + 1)²
+        vertical_angles: 垂直角度（度）
+        horizontal_angles: 水平角度（度）
+    
+    返回:
+        np.ndarray: 光强网格 (N_theta, N_phi)
+    """
+    band = _band_from_count(len(coefficients))
+    legendre = _legendre_table(np.cos(np.radians(np.asarray(vertical_angles, dtype=float))), band)
+    azimuth = _azimuth_table(np.radians(np.asarray(horizontal_angles, dtype=float)), band)
+    return _evaluate_grid(np.asarray(coefficients, dtype=float), band, legendre, azimuth)
+
+
+def reconstruct_photometric_data(fit: SphericalHarmonicFit,
+                                 photometric_data: PhotometricData,
+                                 vertical_angles: Optional[np.ndarray] = None,
+                                 horizontal_angles: Optional[np.ndarray] = None,
+                                 clip_negative: bool = True) -> PhotometricData:
+    """
+    由球谐系数重建光度学数据
+    
+    参数:
+        fit: 球谐拟合结果
+        photometric_data: 原始光度学数据（提供流明、距离、名称和默认网格）
+        vertical_angles: 目标垂直角度（可选，默认使用原始网格）
+        horizontal_angles: 目标水平角度（可选，默认使用原始网格）
+        clip_negative: 是否将截断振荡产生的负值置 0
+    
+    返回:
+        PhotometricData: 重建的光度学数据
+    """
+    if vertical_angles is None:
+        vertical_angles = photometric_data.vertical_angles
+    if horizontal_angles is None:
+        horizontal_angles = photometric_data.horizontal_angles
+    
+    vertical_angles = np.asarray(vertical_angles, dtype=float)
+    horizontal_angles = np.asarray(horizontal_angles, dtype=float)
+    
+    candela_values = evaluate_spherical_harmonics_grid(fit.coefficients, vertical_angles, horizontal_angles)
+    if clip_negative:
+        np.maximum(candela_values, 0.0, out=candela_values)
+    
+    return PhotometricData(
+        vertical_angles=vertical_angles,
+        horizontal_angles=horizontal_angles,
+        candela_values=candela_values,
+        lumens=photometric_data.lumens,
+        distance=photometric_data.distance,
+        fixture_name=photometric_data.fixture_name,
+        keywords=dict(photometric_data.keywords),
+        tilt=photometric_data.tilt
+    )
+
+
+# ============================================================================
+# 辅助函数
+# ============================================================================
+
+def _prepare_grid(photometric_data: PhotometricData) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    展开水平对称性，并将垂直角度补齐到 0-180°（补充的行为 0）
+    
+    返回:
+        (vertical_angles, horizontal_angles, candela_values)，水平角度闭合到 360°
+    """
+    try:
+        horizontal_angles, candela_values = expand_horizontal_symmetry(
+            photometric_data.horizontal_angles,
+            photometric_data.candela_values
+        )
+    except ResamplingError as e:
+        raise SphericalHarmonicsError(f"水平角度无效：{str(e)}")
+    
+    vertical_angles = np.asarray(photometric_data.vertical_angles, dtype=float)
+    if len(vertical_angles) < 2 or np.any(np.diff(vertical_angles) <= 0):
+        raise SphericalHarmonicsError("垂直角度至少需要 2 个，且必须严格递增")
+    
+    step = float(np.min(np.diff(vertical_angles)))
+    below = np.arange(vertical_angles[0] - step, -ANGLE_TOLERANCE, -step)[::-1]
+    above = np.arange(vertical_angles[-1] + step, 180.0 + ANGLE_TOLERANCE, step)
+    
+    if len(below) or len(above):
+        if len(below) and below[0] > ANGLE_TOLERANCE:
+            below = np.concatenate(([0.0], below))
+        if len(above) and above[-1] < 180.0 - ANGLE_TOLERANCE:
+            above = np.append(above, 180.0)
+        vertical_angles = np.concatenate((below, vertical_angles, above))
+        candela_values = np.concatenate((
+            np.zeros((len(below), candela_values.shape[1])),
+            candela_values,
+            np.zeros((len(above), candela_values.shape[1]))
+        ))
+    
+    return vertical_angles, horizontal_angles, candela_values
+
+
+def _band_indices(band: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    每个系数的 (l, m)，按 k = l² + l + m 排列
+    """
+    degrees = np.concatenate([np.full(2 * l + 1, l) for l in range(band + 1)])
+    orders = np.concatenate([np.arange(-l, l + 1) for l in range(band + 1)])
+    return degrees, orders
+
+
+def _band_from_count(count: int) -> int:
+    """
+    由系数数量推算阶数
+    """
+    band = int(round(np.sqrt(count))) - 1
+    if (band + 1) ** 2 != count:
+        raise SphericalHarmonicsError(f"系数数量 {count} 不是完全平方数")
+    return band
+
+
+def _legendre_table(x: np.ndarray, band: int) -> np.ndarray:
+    """
+    归一化连带勒让德函数 N_lm P_l^|m|(x)，按系数索引 k 排列（±m 共用同一列值）
+    
+    参数:
+        x: cosθ 数组 (N,)
+        band: 阶数 L
+    
+    返回:
+        np.ndarray: (N, (L + 1)²)
+    
+    说明:
+        使用归一化递推，避免高阶时阶乘溢出：
+            P̄_00 = 1/√(4π)
+            P̄_mm = √((2m+1)/(2m)) sinθ P̄_(m-1)(m-1)
+            P̄_(m+1)m = √(2m+3) x P̄_mm
+            P̄_lm = a_lm (x P̄_(l-1)m - b_lm P̄_(l-2)m)
+    """
+    x = np.asarray(x, dtype=float)
+    sine = np.sqrt(np.clip(1.0 - x * x, 0.0, None))
+    table = np.empty((len(x), (band + 1) ** 2))
+    
+    diagonal = np.full(len(x), 1.0 / np.sqrt(4 * np.pi))
+    for m in range(band + 1):
+        if m > 0:
+            diagonal = np.sqrt((2 * m + 1) / (2 * m)) * sine * diagonal
+        
+        previous, current = None, diagonal
+        for l in range(m, band + 1):
+            if l == m + 1:
+                previous, current = current, np.sqrt(2 * m + 3) * x * current
+            elif l > m + 1:
+                a = np.sqrt((4 * l * l - 1) / (l * l - m * m))
+                b = np.sqrt(((l - 1) ** 2 - m * m) / (4 * (l - 1) ** 2 - 1))
+                previous, current = current, a * (x * current - b * previous)
+            
+            table[:, l * l + l + m] = current
+            table[:, l * l + l - m] = current
+    
+    return table
+
+
+def _azimuth_table(phi: np.ndarray, band: int) -> np.ndarray:
+    """
+    方位角因子，列索引为 m + L（m = -L … L）
+    
+    返回:
+        np.ndarray: (N, 2L + 1)，m < 0 为 √2 sin(|m|φ)，m = 0 为 1，m > 0 为 √2 cos(mφ)
+    """
+    orders = np.arange(-band, band + 1)
+    angles = np.outer(phi, np.abs(orders))
+    table = np.where(orders < 0, np.sqrt(2) * np.sin(angles), np.sqrt(2) * np.cos(angles))
+    table[:, band] = 1.0
+    return table
+
+
+def _evaluate_grid(coefficients: np.ndarray,
+                   band: int,
+                   legendre: np.ndarray,
+                   azimuth: np.ndarray) -> np.ndarray:
+    """
+    可分离网格求值：Σ_m (Σ_l c_lm P̄_lm(θ)) T_m(φ)
+    """
+    _, orders = _band_indices(band)
+    per_order = np.zeros((legendre.shape[0], 2 * band + 1))
+    np.add.at(per_order.T, orders + band, (legendre * coefficients).T)
+    return per_order @ azimuth.T
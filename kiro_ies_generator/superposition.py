@@ -0,0 +1,451 @@
+"""
+叠加合成模块 (Superposition)
+
+由各光源组的测量网格（基网格）合成任意调光组合的配光，无需重新渲染。
+
+光强对每个发光体的功率是线性的：第 k 组功率缩放 w_k 后，
+    I(θ, φ) = c · Σ_k w_k · B_k(θ, φ)，总流明 Φ = Σ_k w_k · Φ_k
+其中 B_k 为原始测量网格，c 为建立基网格时确定的共同校准因子
+（Σ 标称流明 / Σ 测量光通量），Φ_k = c · ∫B_k 为各组按该因子校准的流明。
+c 不随权重变化，因此任意预设都严格等于各组 IES 的加权和；
+run_light_group_job 测得的各组网格保存为一个基存档后，
+场景调光预设（如下照 100% / 上照 30%）只需一次加权求和即可导出。
+
+基存档使用 measurement_archive 的通用存档格式（.kma，type 为 'LightBasis'）：
+    grids: (K, N_theta, N_phi) 各组的原始测量网格
+    lumens: (K,) 各组满功率时按共同因子校准的流明
+    头部 calibration_factor: 共同校准因子（坎德拉 / Blender 内部单位）
+"""
+
+from typing import Dict, List, Mapping, Optional, Sequence, Union
+from dataclasses import dataclass, field
+import os
+import numpy as np
+
+from .data_structures import SamplingResult, PhotometricData
+from .ies_generator import DEFAULT_FIXTURE_NAME, CalibrationError
+from .measurement_archive import ArchiveError, read_archive, write_archive
+from .output_manager import write_photometric_ies_file
+from .photometry import integrate_flux
+
+
+# ============================================================================
+# 常量定义
+# ============================================================================
+
+# 基存档的类型标记
+BASIS_ARCHIVE_TYPE = 'LightBasis'
+
+
+class SuperpositionError(Exception):
+    """叠加合成错误"""
+    pass
+
+
+@dataclass
+class LightBasis:
+    """
+    各光源组的基网格
+    
+    属性:
+        group_names: 光源组名（与 grids、lumens 的第一维对应）
+        vertical_angles: 垂直角度数组（度）
+        horizontal_angles: 水平角度数组（度）
+        grids: 原始测量网格 (K, N_theta, N_phi)，Blender 内部单位
+        lumens: 各组满功率时按共同因子校准的流明 (K,)（见 calculate_group_lumens）
+        calibration_factor: 共同校准因子，坎德拉 = calibration_factor × 原始网格
+        distance: 测量距离（米）
+        light_position: 光度中心 (x, y, z)
+        render_settings: 采样时的渲染设置（不含分组信息）
+    """
+    
+    group_names: List[str]
+    vertical_angles: np.ndarray
+    horizontal_angles: np.ndarray
+    grids: np.ndarray
+    lumens: np.ndarray
+    calibration_factor: float
+    distance: float
+    light_position: tuple = (0.0, 0.0, 0.0)
+    render_settings: Dict = field(default_factory=dict)
+    
+    def weights(self, scalings: Union[Mapping[str, float], Sequence[float]]) -> np.ndarray:
+        """
+        将功率缩放转换为权重向量
+        
+        参数:
+            scalings: 组名 → 缩放系数（未列出的组保持 1.0），
+                或按 group_names 顺序排列的缩放系数序列
+        
+        返回:
+            np.ndarray: 权重 (K,)
+        
+        异常:
+            SuperpositionError: 组名不存在、长度不符或系数为负
+        """
+        if isinstance(scalings, Mapping):
+            unknown = [name for name in scalings if name not in self.group_names]
+            if unknown:
+                raise SuperpositionError(f"基网格中没有这些光源组：{unknown}，可用组：{self.group_names}")
+            weights = np.array([float(scalings.get(name, 1.0)) for name in self.group_names])
+        else:
+            weights = np.asarray(scalings, dtype=float)
+            if weights.shape != (len(self.group_names),):
+                raise SuperpositionError(
+                    f"缩放系数数量 {weights.size} 与光源组数量 {len(self.group_names)} 不符"
+                )
+        
+        if np.any(weights < 0) or not np.all(np.isfinite(weights)):
+            raise SuperpositionError(f"缩放系数必须为非负数：{weights.tolist()}")
+        
+        return weights
+
+
+@dataclass
+class LightingPreset:
+    """
+    场景调光预设
+    
+    属性:
+        name: 预设名称（用于输出文件名）
+        scalings: 组名 → 功率缩放系数（1.0 为满功率，未列出的组保持 1.0）
+    """
+    
+    name: str
+    scalings: Dict[str, float] = field(default_factory=dict)
+    
+    def to_dict(self) -> dict:
+        """
+        转换为字典格式
+        """
+        return {'name': self.name, 'scalings': dict(self.scalings)}
+    
+    def __str__(self) -> str:
+        """
+        格式化预设为可读字符串
+        """
+        mix = ", ".join(f"{name} {scale:.0%}" for name, scale in self.scalings.items())
+        return f"LightingPreset({self.name}: {mix or '全部 100%'})"
+
+
+def build_light_basis(results: Mapping[str, SamplingResult],
+                      lumens: Mapping[str, float]) -> LightBasis:
+    """
+    由各光源组的采样结果建立基网格
+    
+    参数:
+        results: 组名 → 采样结果（sampler.collect_light_group_data 的返回值）
+        lumens: 组名 → 该组满功率时的标称流明
+    
+    返回:
+        LightBasis: lumens 为按共同因子校准的各组流明（之和等于标称流明之和）
+    
+    异常:
+        SuperpositionError: 没有结果、缺少流明、角度网格或测量距离不一致
+        CalibrationError: 所有组的测量光通量之和不为正
+    """
+    if not results:
+        raise SuperpositionError("没有光源组采样结果")
+    
+    group_names = list(results)
+    missing = [name for name in group_names if name not in lumens]
+    if missing:
+        raise SuperpositionError(f"缺少光源组的流明：{missing}")
+    
+    first = results[group_names[0]]
+    distance = first.render_settings.get('distance')
+    if distance is None:
+        raise SuperpositionError("采样结果缺少测量距离（render_settings.distance）")
+    
+    for name in group_names[1:]:
+        result = results[name]
+        if (not np.array_equal(result.vertical_angles, first.vertical_angles) or
+                not np.array_equal(result.horizontal_angles, first.horizontal_angles)):
+            raise SuperpositionError(f"光源组 {name} 的角度网格与 {group_names[0]} 不一致")
+        if result.render_settings.get('distance') != distance:
+            raise SuperpositionError(f"光源组 {name} 的测量距离与 {group_names[0]} 不一致")
+    
+    render_settings = {
+        key: value for key, value in first.render_settings.items()
+        if key not in ('light_group', 'light_group_lights')
+    }
+    
+    calibration_factor = calculate_calibration_factor(results, lumens)
+    grids = np.stack([np.asarray(results[name].luminance_data, dtype=float) for name in group_names])
+    
+    return LightBasis(
+        group_names=group_names,
+        vertical_angles=np.asarray(first.vertical_angles, dtype=float),
+        horizontal_angles=np.asarray(first.horizontal_angles, dtype=float),
+        grids=grids,
+        lumens=_integrate_grids(first.vertical_angles, first.horizontal_angles, grids) * calibration_factor,
+        calibration_factor=calibration_factor,
+        distance=float(distance),
+        light_position=tuple(first.light_position),
+        render_settings=render_settings
+    )
+
+
+def calculate_calibration_factor(results: Mapping[str, SamplingResult],
+                                 lumens: Mapping[str, float]) -> float:
+    """
+    计算所有光源组共用的校准因子
+    
+    参数:
+        results: 组名 → 采样结果
+        lumens: 组名 → 该组满功率时的标称流明
+    
+    返回:
+        float: Σ 标称流明 / Σ 测量光通量（坎德拉 / Blender 内部单位）
+    
+    异常:
+        SuperpositionError: 缺少流明
+        CalibrationError: 所有组的测量光通量之和不为正
+    
+    说明:
+        各组单独按标称流明校准时，被遮挡较多的组会被放大，各组 IES 之和不再等于整灯配光；
+        使用共同因子后各组 IES 与任意调光预设都是同一网格的线性组合
+    """
+    missing = [name for name in results if name not in lumens]
+    if missing:
+        raise SuperpositionError(f"缺少光源组的流明：{missing}")
+    
+    total_raw_flux = sum(
+        integrate_flux(result.vertical_angles, result.horizontal_angles, result.luminance_data)
+        for result in results.values()
+    )
+    if total_raw_flux <= 0:
+        raise CalibrationError("各光源组的亮度积分之和必须大于 0，请检查场景配置")
+    
+    return float(sum(float(lumens[name]) for name in results) / total_raw_flux)
+
+
+def calculate_group_lumens(results: Mapping[str, SamplingResult],
+                           lumens: Mapping[str, float]) -> Dict[str, float]:
+    """
+    按共同校准因子分配各光源组的流明
+    
+    参数:
+        results: 组名 → 采样结果
+        lumens: 组名 → 该组满功率时的标称流明
+    
+    返回:
+        Dict[str, float]: 组名 → 共同因子 × 该组测量光通量（与 build_light_basis 的 lumens 相同）
+    
+    异常:
+        同 calculate_calibration_factor
+    """
+    calibration_factor = calculate_calibration_factor(results, lumens)
+    return {
+        name: float(integrate_flux(result.vertical_angles, result.horizontal_angles, result.luminance_data)
+                    * calibration_factor)
+        for name, result in results.items()
+    }
+
+
+def synthesize(basis: LightBasis,
+               scalings: Union[Mapping[str, float], Sequence[float]]) -> SamplingResult:
+    """
+    合成给定功率缩放下的测量网格
+    
+    参数:
+        basis: 基网格
+        scalings: 功率缩放（见 LightBasis.weights）
+    
+    返回:
+        SamplingResult: 合成的原始网格（Blender 内部单位），render_settings['superposition']
+            记录各组权重，render_settings['total_lumens'] 为合成后的总流明（Σ w · lumens），
+            render_settings['calibration_factor'] 为基网格的共同校准因子
+    
+    异常:
+        SuperpositionError: 缩放无效或合成后总流明为零
+    """
+    weights = basis.weights(scalings)
+    total_lumens = float(weights @ basis.lumens)
+    if total_lumens <= 0:
+        raise SuperpositionError("合成后的总流明为零，至少需要一个有流明的光源组")
+    
+    # 一次加权求和：(K,) · (K, N_theta, N_phi) → (N_theta, N_phi)
+    luminance_data = np.tensordot(weights, basis.grids, axes=1)
+    
+    return SamplingResult(
+        vertical_angles=basis.vertical_angles,
+        horizontal_angles=basis.horizontal_angles,
+        luminance_data=luminance_data,
+        light_position=basis.light_position,
+        total_samples=int(luminance_data.size),
+        elapsed_time=0.0,
+        render_settings={
+            **basis.render_settings,
+            'superposition': dict(zip(basis.group_names, weights.tolist())),
+            'total_lumens': total_lumens,
+            'calibration_factor': basis.calibration_factor
+        }
+    )
+
+
+def export_preset(basis: LightBasis,
+                  preset: LightingPreset,
+                  output_path: Optional[str] = None,
+                  fixture_name: str = DEFAULT_FIXTURE_NAME,
+                  overwrite: bool = False) -> PhotometricData:
+    """
+    合成调光预设，校准为坎德拉并导出 IES
+    
+    参数:
+        basis: 基网格
+        preset: 调光预设
+        output_path: IES 输出路径（可选，None 时只返回光度学数据）
+        fixture_name: 灯具名称
+        overwrite: 是否覆盖已存在的 IES 文件
+    
+    返回:
+        PhotometricData: 共同校准因子 × 合成网格（不按预设重新校准，
+            因此等于各组 IES 按功率缩放的加权和）
+    
+    异常:
+        SuperpositionError: 预设无效
+        OutputError: 写入失败
+    """
+    sampling_result = synthesize(basis, preset.scalings)
+    photometric_data = PhotometricData(
+        vertical_angles=sampling_result.vertical_angles,
+        horizontal_angles=sampling_result.horizontal_angles,
+        candela_values=sampling_result.luminance_data * basis.calibration_factor,
+        lumens=sampling_result.render_settings['total_lumens'],
+        distance=basis.distance,
+        fixture_name=fixture_name
+    )
+    
+    if output_path is not None:
+        write_photometric_ies_file(photometric_data, output_path, overwrite)
+    
+    return photometric_data
+
+
+def export_presets(basis: LightBasis,
+                   presets: Sequence[LightingPreset],
+                   output_dir: str,
+                   fixture_name: str = DEFAULT_FIXTURE_NAME,
+                   overwrite: bool = False) -> Dict[str, str]:
+    """
+    批量导出调光预设
+    
+    参数:
+        basis: 基网格
+        presets: 调光预设列表
+        output_dir: 输出目录，每个预设写入 <灯具名称>_<预设名称>.ies
+        fixture_name: 灯具名称
+        overwrite: 是否覆盖已存在的 IES 文件
+    
+    返回:
+        Dict[str, str]: 预设名称 → IES 路径
+    
+    异常:
+        SuperpositionError: 预设名称重复或预设无效
+        CalibrationError / OutputError: 校准或写入失败
+    """
+    names = [preset.name for preset in presets]
+    if len(set(names)) != len(names):
+        raise SuperpositionError(f"预设名称重复：{names}")
+    
+    paths = {}
+    for preset in presets:
+        output_path = os.path.join(output_dir, f"{fixture_name}_{preset.name}.ies")
+        export_preset(basis, preset, output_path, f"{fixture_name}_{preset.name}", overwrite)
+        paths[preset.name] = output_path
+    
+    return paths
+
+
+# ============================================================================
+# 基存档读写
+# ============================================================================
+
+def save_light_basis(basis: LightBasis, archive_path: str, overwrite: bool = False) -> bool:
+    """
+    保存基网格到存档
+    
+    参数:
+        basis: 基网格
+        archive_path: 存档文件路径（见 output_manager.get_basis_path）
+        overwrite: 是否覆盖已存在的文件
+    
+    返回:
+        True 如果写入成功
+    
+    异常:
+        ArchiveError: 文件已存在或写入失败
+    """
+    metadata = {
+        'type': BASIS_ARCHIVE_TYPE,
+        'group_names': list(basis.group_names),
+        'calibration_factor': basis.calibration_factor,
+        'distance': basis.distance,
+        'light_position': [float(v) for v in basis.light_position],
+        'render_settings': basis.render_settings,
+    }
+    arrays = {
+        'vertical_angles': basis.vertical_angles,
+        'horizontal_angles': basis.horizontal_angles,
+        'grids': basis.grids,
+        'lumens': basis.lumens,
+    }
+    return write_archive(archive_path, metadata, arrays, overwrite)
+
+
+def load_light_basis(archive_path: str, mmap: bool = True) -> LightBasis:
+    """
+    从存档读取基网格
+    
+    参数:
+        archive_path: 存档文件路径
+        mmap: 是否以只读内存映射方式读取数组
+    
+    返回:
+        LightBasis
+    
+    异常:
+        ArchiveError: 文件不存在、格式错误或不是基存档
+    """
+    metadata, arrays = read_archive(archive_path, mmap)
+    
+    if metadata.get('type') != BASIS_ARCHIVE_TYPE:
+        raise ArchiveError(f"存档类型不是 {BASIS_ARCHIVE_TYPE}：{metadata.get('type')}")
+    
+    try:
+        vertical_angles = arrays['vertical_angles']
+        horizontal_angles = arrays['horizontal_angles']
+        grids = arrays['grids']
+        lumens = arrays['lumens']
+        calibration_factor = metadata.get('calibration_factor')
+        if calibration_factor is None:
+            # 旧存档保存的是标称流明：按总量换算为共同因子和校准后的各组流明
+            raw_flux = _integrate_grids(vertical_angles, horizontal_angles, grids)
+            if raw_flux.sum() <= 0:
+                raise ArchiveError("基存档的测量光通量之和不为正")
+            calibration_factor = float(np.sum(lumens) / raw_flux.sum())
+            lumens = raw_flux * calibration_factor
+        
+        return LightBasis(
+            group_names=list(metadata['group_names']),
+            vertical_angles=vertical_angles,
+            horizontal_angles=horizontal_angles,
+            grids=grids,
+            lumens=lumens,
+            calibration_factor=float(calibration_factor),
+            distance=metadata['distance'],
+            light_position=tuple(metadata['light_position']),
+            render_settings=metadata.get('render_settings', {})
+        )
+    except KeyError as e:
+        raise ArchiveError(f"存档缺少字段：{str(e)}")
+
+
+def _integrate_grids(vertical_angles: np.ndarray,
+                     horizontal_angles: np.ndarray,
+                     grids: np.ndarray) -> np.ndarray:
+    """
+    计算每个基网格的亮度光通量 (K,)
+    """
+    return np.array([integrate_flux(vertical_angles, horizontal_angles, grid) for grid in grids])
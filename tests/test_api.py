@@ -0,0 +1,146 @@
+"""
+测试公共 API 模块
+
+验证校准导出和任务服务器接口（同步等待、进度事件、async 版本），
+任务服务器使用替身处理函数（不需要 Blender）。
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+import pytest
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from kiro_ies_generator import api
+from kiro_ies_generator.data_structures import SamplingResult
+from kiro_ies_generator.ies_generator import calibrate_to_candela
+from kiro_ies_generator.ies_parser import read_ies_file
+from kiro_ies_generator.job_server import JobServer, SpoolDirectory
+from kiro_ies_generator.measurement_archive import save_sampling_result
+
+
+def make_sampling_result(render_settings=None) -> SamplingResult:
+    """创建测试用的采样结果"""
+    rng = np.random.default_rng(0)
+    return SamplingResult(
+        vertical_angles=np.arange(0, 181, 10.0),
+        horizontal_angles=np.arange(0, 360, 10.0),
+        luminance_data=rng.uniform(0.5, 1.5, (19, 36)),
+        light_position=(0.0, 0.0, 1.0),
+        total_samples=19 * 36,
+        elapsed_time=10.0,
+        render_settings={'distance': 5.0} if render_settings is None else render_settings
+    )
+
+
+def stub_handler(request, progress_callback):
+    """替身处理函数：写出测量存档，失败任务 ID 以 fail 开头"""
+    if request.job_id.startswith("fail"):
+        raise RuntimeError("渲染失败")
+    for current in range(1, 4):
+        progress_callback(current, 3)
+    archive_path = os.path.join(request.output_dir, f"{request.job_id}_measurement.kma")
+    save_sampling_result(make_sampling_result(), archive_path)
+    return [os.path.join(request.output_dir, f"{request.job_id}.ies"), archive_path], False
+
+
+def test_export():
+    """测试由采样结果和测量存档导出"""
+    result = make_sampling_result()
+    expected = calibrate_to_candela(result, 1200.0, 5.0, "lamp")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        data = api.export(result, 1200.0, fixture_name="lamp")
+        assert np.allclose(data.candela_values, expected.candela_values)
+        
+        archive_path = os.path.join(directory, "lamp_measurement.kma")
+        save_sampling_result(result, archive_path)
+        ies_path = os.path.join(directory, "lamp.ies")
+        data = api.export(archive_path, 1200.0, ies_path, "lamp")
+        assert np.allclose(data.candela_values, expected.candela_values)
+        assert read_ies_file(ies_path).lumens == pytest.approx(1200.0)
+        
+        api.export(result, 1200.0, ies_path, "lamp", overwrite=True, export_formats=("IES2019",))
+        assert read_ies_file(os.path.join(directory, "lamp_LM-63-2019.ies")).lumens == pytest.approx(1200.0)
+        
+        denoised = api.export(result, 1200.0, denoise=True)
+        assert denoised.candela_values.shape == expected.candela_values.shape
+    
+    with pytest.raises(api.ApiError):
+        api.export(make_sampling_result({}), 1200.0)
+    print("✓ 校准导出测试通过")
+
+
+def test_submit_future():
+    """测试提交任务、读取进度事件和同步等待"""
+    with tempfile.TemporaryDirectory() as directory:
+        spool = SpoolDirectory(os.path.join(directory, "jobs"))
+        server = JobServer(spool, stub_handler, poll_interval=0.01)
+        
+        future = api.submit(spool, "lamp.blend", directory, preset='preview')
+        assert not future.done()
+        assert future.events() == []
+        
+        server.serve_once()
+        assert future.done()
+        events = [event['event'] for event in future.events()]
+        assert events == ['job_start', 'progress', 'progress', 'progress', 'job_done']
+        assert future.events() == []
+        assert future.result(timeout=1.0).outputs[0].endswith(f"{future.job_id}.ies")
+        
+        failed = api.submit(spool.root, None, directory, job_id="fail1")
+        server.serve_once()
+        with pytest.raises(api.JobFailedError) as info:
+            failed.result(timeout=1.0)
+        assert "渲染失败" in info.value.response.error
+    print("✓ 任务提交测试通过")
+
+
+def test_async_jobs():
+    """测试 async 接口并发等待多个任务"""
+    with tempfile.TemporaryDirectory() as directory:
+        spool = SpoolDirectory(os.path.join(directory, "jobs"))
+        server = JobServer(spool, stub_handler, poll_interval=0.01)
+        received = []
+        
+        async def run():
+            serving = asyncio.create_task(asyncio.to_thread(server.serve_forever, 0.3))
+            results = await asyncio.gather(
+                api.generate_async(spool, "a.blend", directory, received.append, poll_interval=0.01),
+                api.measure_async(spool, "b.blend", directory, poll_interval=0.01),
+                api.export_async(make_sampling_result(), 1200.0),
+            )
+            future = api.submit(spool, "c.blend", directory)
+            response = await future
+            await serving
+            return results, response
+        
+        (response, measured, data), awaited = asyncio.run(run())
+        
+        assert response.status == 'done'
+        assert received[0]['event'] == 'job_start' and received[-1]['event'] == 'job_done'
+        assert np.allclose(measured.luminance_data, make_sampling_result().luminance_data)
+        assert data.candela_values.shape == (19, 36)
+        assert awaited.status == 'done'
+    print("✓ async 接口测试通过")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试公共 API 模块")
+    print("=" * 60)
+    
+    test_export()
+    test_submit_future()
+    test_async_jobs()
+    
+    print("=" * 60)
+    print("所有测试通过！")
+    print("=" * 60)
@@ -0,0 +1,145 @@
+"""
+测试立体角加权校准
+
+验证 photometry 模块的求积权重（全球面、半球、非均匀、对称水平角度）
+以及 calibrate_to_candela 的校准结果。
+"""
+
+import sys
+import os
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from kiro_ies_generator.data_structures import SamplingResult
+from kiro_ies_generator.ies_generator import calibrate_to_candela
+from kiro_ies_generator.photometry import get_solid_angle_weights, integrate_flux
+
+
+def make_sampling_result(vertical_angles, horizontal_angles, luminance_data) -> SamplingResult:
+    """创建测试用的采样结果"""
+    return SamplingResult(
+        vertical_angles=np.asarray(vertical_angles, dtype=float),
+        horizontal_angles=np.asarray(horizontal_angles, dtype=float),
+        luminance_data=np.asarray(luminance_data, dtype=float),
+        light_position=(0.0, 0.0, 0.0),
+        total_samples=np.size(luminance_data),
+        elapsed_time=0.0
+    )
+
+
+def test_full_sphere_weights():
+    """测试全球面权重总和为 4π"""
+    vertical = np.arange(0, 181, 10.0)
+    horizontal = np.arange(0, 360, 10.0)
+    weights = get_solid_angle_weights(vertical, horizontal)
+    
+    assert weights.shape == (19, 36)
+    assert abs(weights.sum() - 4 * np.pi) < 1e-9
+    # 极点单元的立体角远小于赤道单元
+    assert weights[0, 0] < weights[9, 0] / 10
+    print("✓ 全球面权重测试通过")
+
+
+def test_hemisphere_and_non_uniform_weights():
+    """测试半球和非均匀角度列表"""
+    horizontal = np.arange(0, 360, 15.0)
+    
+    lower = get_solid_angle_weights(np.array([0, 5, 10, 20, 40, 65, 90.0]), horizontal)
+    assert abs(lower.sum() - 2 * np.pi) < 1e-9
+    
+    upper = get_solid_angle_weights(np.array([90, 120, 150, 175, 180.0]), horizontal)
+    assert abs(upper.sum() - 2 * np.pi) < 1e-9
+    print("✓ 半球与非均匀角度权重测试通过")
+
+
+def test_symmetric_horizontal_weights():
+    """测试水平对称数据（单平面、四象限、双侧、含 360°）"""
+    vertical = np.arange(0, 181, 5.0)
+    
+    for horizontal in ([0.0], [0, 30, 60, 90.0], [0, 45, 90, 135, 180.0],
+                       [90, 180, 270.0], np.arange(0, 361, 30.0)):
+        weights = get_solid_angle_weights(vertical, np.asarray(horizontal))
+        assert abs(weights.sum() - 4 * np.pi) < 1e-9, f"水平角度 {horizontal} 权重总和错误"
+    
+    # 含 360° 时，360° 平面与 0° 平面重合，不重复计入
+    closed = get_solid_angle_weights(vertical, np.arange(0, 361, 30.0))
+    assert np.all(closed[:, -1] == 0)
+    print("✓ 对称水平角度权重测试通过")
+
+
+def test_weight_cache():
+    """测试权重按角度集合缓存且只读"""
+    vertical = np.arange(0, 181, 10.0)
+    horizontal = np.arange(0, 360, 10.0)
+    
+    first = get_solid_angle_weights(vertical, horizontal)
+    second = get_solid_angle_weights(vertical.copy(), horizontal.copy())
+    assert first is second
+    assert not first.flags.writeable
+    print("✓ 权重缓存测试通过")
+
+
+def test_isotropic_calibration():
+    """测试各向同性光源校准为 lumens / 4π"""
+    vertical = np.arange(0, 181, 10.0)
+    horizontal = np.arange(0, 360, 10.0)
+    result = make_sampling_result(vertical, horizontal, np.full((19, 36), 0.37))
+    
+    data = calibrate_to_candela(result, 1800.0, 5.0)
+    
+    assert np.allclose(data.candela_values, 1800.0 / (4 * np.pi))
+    assert abs(integrate_flux(vertical, horizontal, data.candela_values) - 1800.0) < 1e-6
+    print("✓ 各向同性光源校准测试通过")
+
+
+def test_lambertian_downlight_calibration():
+    """
+    测试朗伯下照灯校准
+    
+    I(θ) = I0 cosθ（θ < 90°）的总光通量为 π I0。
+    简单求和会因极点附近采样点过密而偏差，加权求积应接近解析值。
+    """
+    vertical = np.arange(0, 181, 5.0)
+    horizontal = np.arange(0, 360, 5.0)
+    profile = np.clip(np.cos(np.radians(vertical)), 0, None)
+    result = make_sampling_result(vertical, horizontal, np.outer(profile, np.ones(len(horizontal))))
+    
+    data = calibrate_to_candela(result, np.pi * 1000.0, 5.0)
+    
+    assert abs(data.candela_values[0, 0] - 1000.0) / 1000.0 < 0.01
+    print(f"✓ 朗伯下照灯校准测试通过（I0 = {data.candela_values[0, 0]:.1f} cd）")
+
+
+def test_hemisphere_calibration():
+    """测试只覆盖下半球的角度列表"""
+    vertical = np.array([0, 10, 25, 45, 70, 90.0])
+    horizontal = np.array([0, 45, 90.0])
+    result = make_sampling_result(vertical, horizontal, np.ones((6, 3)))
+    
+    data = calibrate_to_candela(result, 1000.0, 5.0)
+    
+    assert np.allclose(data.candela_values, 1000.0 / (2 * np.pi))
+    print("✓ 半球角度列表校准测试通过")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试立体角加权校准")
+    print("=" * 60)
+    
+    test_full_sphere_weights()
+    test_hemisphere_and_non_uniform_weights()
+    test_symmetric_horizontal_weights()
+    test_weight_cache()
+    test_isotropic_calibration()
+    test_lambertian_downlight_calibration()
+    test_hemisphere_calibration()
+    
+    print("=" * 60)
+    print("所有测试通过！")
+    print("=" * 60)
@@ -0,0 +1,129 @@
+"""
+测试命令行入口模块
+
+验证参数解析、采样配置、任务规划和 JSON 事件输出（不需要 Blender）。
+"""
+
+import sys
+import os
+import io
+import json
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from kiro_ies_generator.cli import (
+    CliError,
+    JsonEventWriter,
+    build_sampling_config,
+    main,
+    parse_arguments,
+    plan_jobs,
+    split_blender_argv,
+)
+
+
+def test_split_blender_argv():
+    """测试取出 -- 之后的参数"""
+    argv = ["blender", "-b", "--python-expr", "...", "--", "a.blend", "--output-dir", "out"]
+    assert split_blender_argv(argv) == ["a.blend", "--output-dir", "out"]
+    assert split_blender_argv(["blender", "-b"]) == []
+    print("✓ 参数分隔测试通过")
+
+
+def test_sampling_config():
+    """测试预设和覆盖参数"""
+    config = build_sampling_config(parse_arguments(["--output-dir", "out"]))
+    assert (config.angular_interval, config.distance, config.samples) == (10.0, 5.0, 64)
+    
+    args = parse_arguments(["--output-dir", "out", "--preset", "production", "--samples", "128"])
+    config = build_sampling_config(args)
+    assert (config.angular_interval, config.distance, config.samples) == (5.0, 5.0, 128)
+    
+    with pytest.raises(CliError):
+        parse_arguments(["--output-dir", "out", "--interval", "90"])
+    print("✓ 采样配置测试通过")
+
+
+def test_argument_validation():
+    """测试参数组合校验"""
+    args = parse_arguments(["a.blend", "--output-dir", "out", "--mode", "frames", "--frames", "1", "48", "2"])
+    assert args.frames == [1, 48, 2]
+    
+    with pytest.raises(CliError):
+        parse_arguments(["--output-dir", "out", "--mode", "frames"])
+    with pytest.raises(CliError):
+        parse_arguments(["--output-dir", "out", "--frames", "1", "10"])
+    with pytest.raises(CliError):
+        parse_arguments(["--output-dir", "out", "--mode", "fixtures", "--fixture-name", "A"])
+    with pytest.raises(CliError):
+        parse_arguments(["a.blend"])
+    
+    assert parse_arguments(["--output-dir", "out"]).formats == ["IES2002"]
+    args = parse_arguments(["--output-dir", "out", "--formats", "IES2019", "LDT"])
+    assert args.formats == ["IES2019", "LDT"]
+    with pytest.raises(CliError):
+        parse_arguments(["--output-dir", "out", "--formats", "XML"])
+    print("✓ 参数校验测试通过")
+
+
+def test_plan_jobs():
+    """测试任务规划"""
+    args = parse_arguments([os.path.join("lib", "down.blend"), "spot.blend", "--output-dir", "out"])
+    jobs = plan_jobs(args)
+    assert [job.output_path for job in jobs] == [
+        os.path.join("out", "down.ies"), os.path.join("out", "spot.ies")
+    ]
+    
+    args = parse_arguments(["catalogue.blend", "--output-dir", "out", "--mode", "fixtures"])
+    assert plan_jobs(args)[0].output_path == os.path.join("out", "catalogue")
+    
+    # 使用 Blender 已打开的文件
+    jobs = plan_jobs(parse_arguments(["--output-dir", "out", "--fixture-name", "吊灯"]))
+    assert jobs[0].blend_path is None
+    assert jobs[0].output_path == os.path.join("out", "吊灯.ies")
+    
+    with pytest.raises(CliError):
+        plan_jobs(parse_arguments([os.path.join("a", "x.blend"), os.path.join("b", "x.blend"),
+                                   "--output-dir", "out"]))
+    print("✓ 任务规划测试通过")
+
+
+def test_json_events():
+    """测试 JSON 事件输出"""
+    stream = io.StringIO()
+    writer = JsonEventWriter(stream)
+    writer.emit('job_start', job=0, blend="a.blend", mode="single")
+    writer.progress_callback(0)(10, 684)
+    
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert events[0] == {'event': 'job_start', 'job': 0, 'blend': "a.blend", 'mode': "single"}
+    assert events[1] == {'event': 'progress', 'job': 0, 'current': 10, 'total': 684}
+    print("✓ JSON 事件输出测试通过")
+
+
+def test_main_argument_error(capsys):
+    """测试参数错误时的退出码和错误事件"""
+    assert main(["--output-dir", "out", "--mode", "frames"]) == 2
+    event = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert event['event'] == 'error'
+    print("✓ 参数错误退出码测试通过")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试命令行入口模块")
+    print("=" * 60)
+    
+    test_split_blender_argv()
+    test_sampling_config()
+    test_argument_validation()
+    test_plan_jobs()
+    test_json_events()
+    
+    print("=" * 60)
+    print("所有测试通过！")
+    print("=" * 60)
@@ -0,0 +1,182 @@
+"""
+测试球面降噪模块
+
+验证降噪效果、保边、光通量守恒、水平环绕、极点处理和对称数据。
+"""
+
+import sys
+import os
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from kiro_ies_generator.data_structures import SamplingResult
+from kiro_ies_generator.denoising import (
+    KERNEL_CUTOFF,
+    DenoisingError,
+    denoise_sampling_result,
+    filter_spherical_grid,
+)
+from kiro_ies_generator.photometry import integrate_flux
+
+
+def make_sampling_result(vertical_angles, horizontal_angles, function, noise=0.0, seed=0) -> SamplingResult:
+    """用解析函数创建带噪声的采样结果"""
+    vertical_angles = np.asarray(vertical_angles, dtype=float)
+    horizontal_angles = np.asarray(horizontal_angles, dtype=float)
+    theta, phi = np.meshgrid(vertical_angles, horizontal_angles, indexing='ij')
+    clean = function(theta, phi)
+    rng = np.random.default_rng(seed)
+    return SamplingResult(
+        vertical_angles=vertical_angles,
+        horizontal_angles=horizontal_angles,
+        luminance_data=clean * (1.0 + noise * rng.standard_normal(clean.shape)),
+        light_position=(0.0, 0.0, 0.0),
+        total_samples=clean.size,
+        elapsed_time=0.0
+    ), clean
+
+
+def smooth_distribution(theta, phi):
+    """平滑的下照分布"""
+    return 1.0 + 2.0 * np.clip(np.cos(np.radians(theta)), 0, None)
+
+
+def test_noise_reduction_and_flux():
+    """测试降噪效果和光通量守恒"""
+    result, clean = make_sampling_result(np.arange(0, 181, 5.0), np.arange(0, 360, 5.0),
+                                         smooth_distribution, noise=0.05)
+    
+    denoised, report = denoise_sampling_result(result, spatial_sigma=5.0, range_sigma=None)
+    
+    error_before = np.abs(result.luminance_data - clean).mean()
+    error_after = np.abs(denoised.luminance_data - clean).mean()
+    assert error_after < error_before / 2
+    
+    flux_before = integrate_flux(result.vertical_angles, result.horizontal_angles, result.luminance_data)
+    flux_after = integrate_flux(result.vertical_angles, result.horizontal_angles, denoised.luminance_data)
+    assert abs(flux_after - flux_before) / flux_before < 1e-12
+    
+    assert denoised.luminance_data is not result.luminance_data
+    assert denoised.total_samples == result.total_samples
+    assert 0.0 < report.mean_relative_change < 0.1
+    assert report.changed_fraction > 0.5
+    print(f"✓ 降噪测试通过（平均误差 {error_before:.4f} → {error_after:.4f}）")
+
+
+def test_edge_preserving():
+    """测试保边：截光边缘两侧不会互相模糊"""
+    cutoff = lambda t, p: np.where(t < 60, 10.0, 0.1)
+    result, clean = make_sampling_result(np.arange(0, 181, 5.0), np.arange(0, 360, 10.0),
+                                         cutoff, noise=0.02)
+    
+    bilateral, _ = denoise_sampling_result(result, spatial_sigma=5.0, range_sigma=0.1)
+    gaussian, _ = denoise_sampling_result(result, spatial_sigma=5.0, range_sigma=None)
+    
+    edge_rows = [11, 12]  # 55° 和 60°
+    bilateral_error = np.abs(bilateral.luminance_data[edge_rows] - clean[edge_rows]).mean()
+    gaussian_error = np.abs(gaussian.luminance_data[edge_rows] - clean[edge_rows]).mean()
+    assert bilateral_error < gaussian_error / 5
+    print("✓ 保边测试通过")
+
+
+def test_wrap_and_poles():
+    """测试水平环绕和极点单值"""
+    vertical = np.arange(0, 181, 10.0)
+    horizontal = np.arange(0, 360, 10.0)
+    values = np.ones((len(vertical), len(horizontal)))
+    values[:, 0] = 5.0      # 0° 平面的尖峰应同时扩散到 10° 和 350°
+    values[0, :] += np.arange(len(horizontal)) * 0.01
+    
+    filtered = filter_spherical_grid(values, vertical, horizontal, spatial_sigma=10.0)
+    
+    assert np.allclose(filtered[5:14, 1], filtered[5:14, -1])
+    assert np.allclose(filtered[0], filtered[0, 0])
+    assert np.allclose(filtered[-1], filtered[-1, 0])
+    print("✓ 水平环绕与极点测试通过")
+
+
+def test_symmetric_input_and_variance():
+    """测试对称数据和方差驱动的值域权重"""
+    quadrant, _ = make_sampling_result(np.arange(0, 181, 5.0), np.arange(0, 91, 15.0),
+                                       smooth_distribution, noise=0.05)
+    full_angles = np.arange(0, 360, 15.0)
+    mirrored = quadrant.luminance_data[:, np.concatenate((np.arange(7), np.arange(5, 0, -1),
+                                                          np.arange(7), np.arange(5, 0, -1)))[:24]]
+    
+    filtered_quadrant = filter_spherical_grid(quadrant.luminance_data, quadrant.vertical_angles,
+                                              quadrant.horizontal_angles, 5.0)
+    filtered_full = filter_spherical_grid(mirrored, quadrant.vertical_angles, full_angles, 5.0)
+    assert np.allclose(filtered_quadrant, filtered_full[:, :7])
+    
+    quadrant.variance = np.full(quadrant.luminance_data.shape, 1e-4)
+    _, report = denoise_sampling_result(quadrant)
+    assert report.range_sigma is None
+    
+    try:
+        denoise_sampling_result(quadrant, spatial_sigma=0.0)
+        assert False, "空间标准差为 0 应该抛出 DenoisingError"
+    except DenoisingError:
+        pass
+    print("✓ 对称数据与方差测试通过")
+
+
+def direct_bilateral_filter(values, vertical_angles, horizontal_angles, spatial_sigma, range_scale):
+    """逐方向遍历所有方向的参考实现（完整圆周、未闭合的网格）"""
+    theta, phi = np.meshgrid(np.radians(vertical_angles), np.radians(horizontal_angles), indexing='ij')
+    directions = np.stack([np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), np.cos(theta)], axis=-1)
+    directions = directions.reshape(-1, 3)
+    flat_values = values.ravel()
+    flat_scale = range_scale.ravel()
+    sigma = np.radians(spatial_sigma)
+    
+    filtered = np.empty_like(flat_values)
+    for index, direction in enumerate(directions):
+        distance = np.arccos(np.clip(directions @ direction, -1.0, 1.0))
+        weights = np.where(distance <= KERNEL_CUTOFF * sigma + 1e-9, np.exp(-0.5 * (distance / sigma) ** 2), 0.0)
+        difference = flat_values - flat_values[index]
+        if flat_scale[index] > 0:
+            weights = weights * np.exp(-0.5 * (difference / flat_scale[index]) ** 2)
+        else:
+            weights = weights * (difference == 0)
+        filtered[index] = np.sum(weights * flat_values) / np.sum(weights)
+    
+    filtered = filtered.reshape(values.shape)
+    filtered[0, :] = filtered[0, :].mean()
+    filtered[-1, :] = filtered[-1, :].mean()
+    return filtered
+
+
+def test_matches_direct_filter():
+    """测试截断邻域的批量实现与逐方向遍历一致（含不等间距平面和值域标准差为 0 的方向）"""
+    rng = np.random.default_rng(3)
+    vertical = np.arange(0, 181, 6.0)
+    for horizontal in (np.arange(0, 360, 6.0), np.array([0.0, 20.0, 45.0, 100.0, 180.0, 250.0, 330.0])):
+        values = rng.uniform(0.5, 2.0, (len(vertical), len(horizontal)))
+        values[values < 0.8] = 0.0
+        range_scale = 0.2 * values
+        
+        expected = direct_bilateral_filter(values, vertical, horizontal, 8.0, range_scale)
+        filtered = filter_spherical_grid(values, vertical, horizontal, 8.0, range_scale)
+        assert np.allclose(filtered, expected, rtol=1e-12, atol=1e-12)
+    print("✓ 与逐方向遍历一致性测试通过")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试球面降噪模块")
+    print("=" * 60)
+    
+    test_noise_reduction_and_flux()
+    test_edge_preserving()
+    test_wrap_and_poles()
+    test_symmetric_input_and_variance()
+    test_matches_direct_filter()
+    
+    print("=" * 60)
+    print("所有测试通过！")
+    print("=" * 60)
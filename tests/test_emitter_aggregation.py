@@ -0,0 +1,126 @@
+"""
+测试发光体聚合模块
+
+验证聚类、光通量守恒、代理光源几何和解析误差验证。
+"""
+
+import sys
+import os
+import json
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from kiro_ies_generator.emitter_aggregation import (
+    EMITTER_AREA,
+    EMITTER_POINT,
+    AggregationError,
+    AggregationSettings,
+    Emitter,
+    aggregate_emitters,
+    compare_emitter_sets,
+    plan_aggregation,
+)
+
+
+DOWN = np.array([0.0, 0.0, -1.0])
+UP = np.array([0.0, 0.0, 1.0])
+
+
+def make_led_strip(count=40, pitch=0.01, power=0.5, normal=DOWN, z=0.0, prefix="LED"):
+    """一排朝同一方向的小面光源"""
+    return [Emitter(name=f"{prefix}.{i:03d}", kind=EMITTER_AREA,
+                    position=np.array([(i + 0.5) * pitch, 0.0, z]), power=power,
+                    normal=normal, size=(0.004, 0.004))
+            for i in range(count)]
+
+
+def test_aggregate_coplanar_strip():
+    """测试共面光源聚合为等光通量的面光源"""
+    emitters = make_led_strip()
+    proxies = aggregate_emitters(emitters, AggregationSettings(cluster_size=0.1))
+    
+    assert len(proxies) == 4
+    assert abs(sum(proxy.power for proxy in proxies) - sum(emitter.power for emitter in emitters)) < 1e-12
+    assert sorted(name for proxy in proxies for name in proxy.members) == sorted(e.name for e in emitters)
+    for proxy in proxies:
+        assert proxy.kind == EMITTER_AREA
+        assert np.allclose(proxy.normal, DOWN)
+        # 代理矩形覆盖全部成员
+        assert proxy.size[0] >= 0.09 and proxy.size[1] >= 0.004
+    
+    # 远场完全一致（法线相同，朗伯分布叠加不变）
+    rms_error, max_error = compare_emitter_sets(emitters, proxies)
+    assert rms_error < 1e-12 and max_error < 1e-12
+    print("✓ 共面聚合测试通过")
+
+
+def test_separate_directions_and_types():
+    """测试不同朝向和类型不会被合并"""
+    emitters = make_led_strip(20) + make_led_strip(20, normal=UP, z=0.002, prefix="Up")
+    emitters += [Emitter(name=f"Point.{i}", kind=EMITTER_POINT, position=np.array([i * 0.01, 0.0, 0.05]),
+                         power=1.0, color=np.array([1.0, 0.5, 0.2]), size=(0.001, 0.001))
+                 for i in range(10)]
+    proxies = aggregate_emitters(emitters, AggregationSettings(cluster_size=0.5))
+    
+    kinds = sorted((proxy.kind, tuple(np.round(proxy.normal, 6)) if proxy.normal is not None else None)
+                   for proxy in proxies)
+    assert len(proxies) == 3
+    assert kinds[0][0] == EMITTER_AREA and kinds[2][0] == EMITTER_POINT
+    
+    # 颜色按功率加权，亮度光通量守恒
+    luminous = sum(emitter.luminous_power for emitter in emitters)
+    assert abs(sum(proxy.luminous_power for proxy in proxies) - luminous) < 1e-9
+    
+    rms_error, _ = compare_emitter_sets(emitters, proxies)
+    assert rms_error < 1e-12
+    print("✓ 朝向与类型分组测试通过")
+
+
+def test_error_validation():
+    """测试误差验证拒绝失真的聚合"""
+    # 法线差 4°（在容差内）的两组光源：远场有小误差
+    tilted = np.array([np.sin(np.radians(4.0)), 0.0, -np.cos(np.radians(4.0))])
+    emitters = make_led_strip(20) + make_led_strip(20, normal=tilted, prefix="Tilt")
+    settings = AggregationSettings(cluster_size=1.0, plane_tolerance=0.05, min_emitters=4, max_error=0.2)
+    proxies, report = plan_aggregation(emitters, settings)
+    assert report.applied and report.proxy_emitters == 1
+    assert 0 < report.rms_error < 0.2
+    
+    # 近距离测量时位置误差变大，超过容差则不聚合
+    strict = AggregationSettings(cluster_size=1.0, min_emitters=4, max_error=1e-4)
+    kept, report = plan_aggregation(make_led_strip(40, pitch=0.05), strict, distance=0.5)
+    assert not report.applied
+    assert len(kept) == 40
+    
+    # 光源过少
+    kept, report = plan_aggregation(make_led_strip(3), AggregationSettings())
+    assert not report.applied and len(kept) == 3
+    
+    data = json.loads(json.dumps(report.to_dict()))
+    assert data['original_emitters'] == 3
+    
+    try:
+        aggregate_emitters(emitters, AggregationSettings(cluster_size=0.0))
+        assert False, "无效参数应该抛出 AggregationError"
+    except AggregationError:
+        pass
+    print("✓ 误差验证测试通过")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试发光体聚合模块")
+    print("=" * 60)
+    
+    test_aggregate_coplanar_strip()
+    test_separate_directions_and_types()
+    test_error_validation()
+    
+    print("=" * 60)
+    print("所有测试通过！")
+    print("=" * 60)
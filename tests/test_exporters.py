@@ -0,0 +1,247 @@
+"""
+测试光度学导出模块
+
+验证同一份 PhotometricData 导出为 IES LM-63-2002、LM-63-2019 和 EULUMDAT。
+"""
+
+import sys
+import os
+import io
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from kiro_ies_generator.data_structures import PhotometricData
+from kiro_ies_generator.exporters import (
+    ExportError,
+    LDT_SYMMETRY_BOTH_PLANES,
+    LDT_SYMMETRY_C90_C270,
+    LDT_SYMMETRY_NONE,
+    LDT_SYMMETRY_VERTICAL_AXIS,
+    calculate_downward_flux_fraction,
+    export_photometric_data,
+    get_ldt_layout,
+    write_ldt,
+    write_photometric_exports,
+)
+from kiro_ies_generator.ies_generator import generate_ies_file, validate_ies_compliance
+from kiro_ies_generator.ies_parser import read_ies_file
+
+
+def make_photometric_data(horizontal_angles=None) -> PhotometricData:
+    """创建测试用的光度学数据（下照为主）"""
+    vertical_angles = np.arange(0, 181, 15.0)
+    if horizontal_angles is None:
+        horizontal_angles = np.arange(0, 360, 30.0)
+    horizontal_angles = np.asarray(horizontal_angles, dtype=float)
+    profile = 100.0 + 900.0 * np.clip(np.cos(np.radians(vertical_angles)), 0, None)
+    return PhotometricData(
+        vertical_angles=vertical_angles,
+        horizontal_angles=horizontal_angles,
+        candela_values=np.outer(profile, 1.0 + 0.1 * np.cos(np.radians(horizontal_angles))),
+        lumens=2000.0,
+        distance=5.0,
+        fixture_name="Test Downlight"
+    )
+
+
+def read_ldt_lines(content: str) -> dict:
+    """按 EULUMDAT 行号读取关键字段"""
+    lines = content.splitlines()
+    mc, ng = int(lines[3]), int(lines[5])
+    lamp_sets = int(lines[25])
+    angles_start = 26 + 6 * lamp_sets + 10
+    c_angles = np.array(lines[angles_start:angles_start + mc], dtype=float)
+    gamma_angles = np.array(lines[angles_start + mc:angles_start + mc + ng], dtype=float)
+    intensities = np.array(lines[angles_start + mc + ng:], dtype=float)
+    return {
+        'symmetry': int(lines[2]),
+        'mc': mc,
+        'ng': ng,
+        'dff': float(lines[21]),
+        'lumens': float(lines[28]),
+        'c_angles': c_angles,
+        'gamma_angles': gamma_angles,
+        'intensities': intensities
+    }
+
+
+def test_export_all_formats():
+    """测试一次导出三种格式"""
+    data = make_photometric_data()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        paths = export_photometric_data(
+            data, os.path.join(directory, "downlight"), ("IES2002", "IES2019", "LDT")
+        )
+        
+        assert paths["IES2002"].endswith("downlight.ies")
+        assert paths["LDT"].endswith("downlight.ldt")
+        
+        with open(paths["IES2002"], 'r', encoding='utf-8') as f:
+            ies_2002 = f.read()
+        with open(paths["IES2019"], 'r', encoding='utf-8') as f:
+            ies_2019 = f.read()
+        
+        assert ies_2002 == generate_ies_file(data)
+        assert ies_2019.startswith("IES:LM-63-2019")
+        assert "[ISSUEDATE]" in ies_2019 and "[TESTLAB]" in ies_2019
+        assert validate_ies_compliance(ies_2019)
+        
+        parsed = read_ies_file(paths["IES2019"])
+        assert np.allclose(parsed.candela_values, data.candela_values, atol=0.005)
+        
+        with open(paths["LDT"], 'rb') as f:
+            raw = f.read()
+        assert b"\r\n" in raw
+        ldt = read_ldt_lines(raw.decode('cp1252'))
+        assert ldt['symmetry'] == LDT_SYMMETRY_NONE
+        assert ldt['mc'] == 12 and ldt['ng'] == 13
+        assert ldt['lumens'] == 2000.0
+        expected = (data.candela_values.T * 1000.0 / data.lumens).ravel()
+        assert np.allclose(ldt['intensities'], expected, atol=0.005)
+    print("✓ 多格式导出测试通过")
+
+
+def test_ldt_symmetry_layouts():
+    """测试 EULUMDAT 对称布局"""
+    rotational = get_ldt_layout(make_photometric_data([0.0]))
+    assert rotational['symmetry'] == LDT_SYMMETRY_VERTICAL_AXIS
+    assert len(rotational['planes']) == 1
+    
+    quadrant = get_ldt_layout(make_photometric_data(np.arange(0, 91, 15.0)))
+    assert quadrant['symmetry'] == LDT_SYMMETRY_BOTH_PLANES
+    assert np.allclose(quadrant['c_angles'], np.arange(0, 360, 15.0))
+    assert quadrant['c_spacing'] == 15.0
+    assert len(quadrant['planes']) == 7
+    
+    # 含 360° 的完整圆周：360° 平面不重复写出
+    closed = get_ldt_layout(make_photometric_data(np.arange(0, 361, 30.0)))
+    assert closed['symmetry'] == LDT_SYMMETRY_NONE
+    assert len(closed['c_angles']) == 12 and len(closed['planes']) == 12
+    
+    try:
+        get_ldt_layout(make_photometric_data([10.0, 40.0, 70.0]))
+        assert False, "不支持的水平角度应该抛出 ExportError"
+    except ExportError:
+        pass
+    print("✓ EULUMDAT 对称布局测试通过")
+
+
+def test_ldt_stream_and_dff():
+    """测试 EULUMDAT 流式写入和下半球光通量比例"""
+    data = make_photometric_data(np.arange(0, 91, 30.0))
+    buffer = io.StringIO()
+    write_ldt(data, buffer)
+    ldt = read_ldt_lines(buffer.getvalue())
+    
+    assert ldt['symmetry'] == LDT_SYMMETRY_BOTH_PLANES
+    assert len(ldt['intensities']) == 4 * 13
+    assert 50.0 < ldt['dff'] < 100.0
+    
+    uniform = make_photometric_data()
+    uniform.candela_values = np.ones_like(uniform.candela_values)
+    assert abs(calculate_downward_flux_fraction(uniform) - 50.0) < 1e-9
+    print("✓ EULUMDAT 流式写入测试通过")
+
+
+def test_ldt_c90_c270_plane_order():
+    """测试 Isym 3 的 C-Plane 按 C270 → C0 → C90 写出"""
+    horizontal_angles = np.arange(90, 271, 45.0)
+    data = make_photometric_data(horizontal_angles)
+    # 每个水平角度一个可区分的非对称值：C90=1, C135=2, C180=3, C225=4, C270=5
+    data.candela_values = np.tile(np.arange(1.0, 6.0), (len(data.vertical_angles), 1))
+    
+    layout = get_ldt_layout(data)
+    assert layout['symmetry'] == LDT_SYMMETRY_C90_C270
+    assert list(layout['planes']) == [4, 3, 2, 1, 0]
+    
+    buffer = io.StringIO()
+    write_ldt(data, buffer)
+    ldt = read_ldt_lines(buffer.getvalue())
+    
+    assert ldt['symmetry'] == LDT_SYMMETRY_C90_C270
+    planes = ldt['intensities'].reshape(5, len(data.vertical_angles)) * data.lumens / 1000.0
+    # C270 (IES 270°), C315 (= IES 225°), C0 (= IES 180°), C45 (= IES 135°), C90 (IES 90°)
+    assert np.allclose(planes[:, 0], [5.0, 4.0, 3.0, 2.0, 1.0], atol=0.005)
+    print("✓ EULUMDAT C90-C270 平面顺序测试通过")
+
+
+def test_export_errors():
+    """测试导出错误处理（不写出部分文件）"""
+    data = make_photometric_data([10.0, 40.0, 70.0])
+    
+    with tempfile.TemporaryDirectory() as directory:
+        base = os.path.join(directory, "fixture")
+        
+        try:
+            export_photometric_data(data, base, ("IES2002", "LDT"))
+            assert False, "无法表示的 EULUMDAT 应该抛出 ExportError"
+        except ExportError:
+            pass
+        assert not os.listdir(directory)
+        
+        try:
+            export_photometric_data(data, base, ("XML",))
+            assert False, "不支持的格式应该抛出 ExportError"
+        except ExportError:
+            pass
+        
+        export_photometric_data(data, base, ("IES2002",))
+        try:
+            export_photometric_data(data, base, ("IES2002",))
+            assert False, "已存在的文件应该抛出 ExportError"
+        except ExportError:
+            pass
+    print("✓ 导出错误处理测试通过")
+
+
+def test_write_photometric_exports():
+    """测试流程使用的导出：IES LM-63-2002 写入指定路径，其余格式写在旁边"""
+    data = make_photometric_data()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        ies_path = os.path.join(directory, "fixture.ies")
+        paths = write_photometric_exports(data, ies_path, ("LDT", "IES2019"))
+        assert paths == {
+            "IES2002": ies_path,
+            "IES2019": os.path.join(directory, "fixture_LM-63-2019.ies"),
+            "LDT": os.path.join(directory, "fixture.ldt"),
+        }
+        with open(ies_path, 'r', encoding='utf-8') as f:
+            assert f.read() == generate_ies_file(data)
+        assert read_ies_file(paths["IES2019"]).lumens == data.lumens
+        
+        # IES 已存在时不写出其余格式
+        other_path = os.path.join(directory, "other.ies")
+        with open(other_path, 'w', encoding='utf-8') as f:
+            f.write("")
+        try:
+            write_photometric_exports(data, other_path, ("IES2002", "LDT"))
+            assert False, "已存在的 IES 应该抛出 ExportError"
+        except ExportError:
+            pass
+        assert not os.path.exists(os.path.join(directory, "other.ldt"))
+    print("✓ 流程导出测试通过")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试光度学导出模块")
+    print("=" * 60)
+    
+    test_export_all_formats()
+    test_ldt_symmetry_layouts()
+    test_ldt_stream_and_dff()
+    test_ldt_c90_c270_plane_order()
+    test_export_errors()
+    test_write_photometric_exports()
+    
+    print("=" * 60)
+    print("所有测试通过！")
+    print("=" * 60)
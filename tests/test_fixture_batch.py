@@ -0,0 +1,84 @@
+"""
+测试多灯具批量模块
+
+验证文件名转换、输出路径分配和批量报告。
+"""
+
+import sys
+import os
+import json
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from kiro_ies_generator.fixture_batch import (
+    FixtureBatchError,
+    FixtureBatchReport,
+    FixtureResult,
+    get_fixture_manifest_path,
+    plan_fixture_outputs,
+    sanitize_fixture_filename,
+)
+
+
+def test_sanitize_fixture_filename():
+    """测试文件名转换"""
+    assert sanitize_fixture_filename("吊灯 A-100") == "吊灯 A-100"
+    assert sanitize_fixture_filename("Spot 10/30°") == "Spot 10_30°"
+    assert sanitize_fixture_filename('a:b*c?"d"') == "a_b_c__d_"
+    assert sanitize_fixture_filename("  ..  ") == "fixture"
+    print("✓ 文件名转换测试通过")
+
+
+def test_plan_fixture_outputs():
+    """测试输出路径分配"""
+    paths = plan_fixture_outputs(["Downlight", "Spot 1/2", "Spot 1_2", "downlight "], "out")
+    
+    assert paths["Downlight"] == os.path.join("out", "Downlight.ies")
+    assert paths["Spot 1/2"] == os.path.join("out", "Spot 1_2.ies")
+    assert paths["Spot 1_2"] == os.path.join("out", "Spot 1_2_2.ies")
+    # 不区分大小写的文件系统上同样不会冲突
+    assert paths["downlight "] == os.path.join("out", "downlight_2.ies")
+    
+    with pytest.raises(FixtureBatchError):
+        plan_fixture_outputs(["Spot", "Spot"], "out")
+    
+    assert get_fixture_manifest_path("out") == os.path.join("out", "fixtures.json")
+    print("✓ 输出路径分配测试通过")
+
+
+def test_fixture_batch_report():
+    """测试批量报告"""
+    report = FixtureBatchReport(
+        fixtures=[
+            FixtureResult("Col.Downlight", "Downlight", "Downlight.ies", "Downlight.json", 1200.0),
+            FixtureResult("Col.Pendant", "Pendant", "Pendant.ies", error="场景中没有找到光源"),
+        ],
+        elapsed_time=95.0
+    )
+    
+    assert report.succeeded == ["Downlight"]
+    assert report.failed == ["Pendant"]
+    
+    data = json.loads(json.dumps(report.to_dict(), ensure_ascii=False))
+    assert data['fixtures'][0]['total_lumens'] == 1200.0
+    assert data['fixtures'][1]['error'] == "场景中没有找到光源"
+    assert "失败 1 个" in str(report)
+    print("✓ 批量报告测试通过")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试多灯具批量模块")
+    print("=" * 60)
+    
+    test_sanitize_fixture_filename()
+    test_plan_fixture_outputs()
+    test_fixture_batch_report()
+    
+    print("=" * 60)
+    print("所有测试通过！")
+    print("=" * 60)
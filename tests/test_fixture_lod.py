@@ -0,0 +1,99 @@
+"""
+测试灯具简化模块
+
+验证材质判定、对象分类、减面比例和简化报告。
+"""
+
+import sys
+import os
+import json
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from kiro_ies_generator.fixture_lod import (
+    LOD_DECIMATE,
+    LOD_KEEP,
+    LOD_OPTICAL,
+    LODError,
+    LODReport,
+    LODSettings,
+    MaterialTraits,
+    calculate_decimate_ratio,
+    classify_object,
+)
+
+
+def test_material_traits():
+    """测试光学材质判定"""
+    assert not MaterialTraits().is_optical()
+    assert MaterialTraits(emission=5.0).is_optical()
+    assert MaterialTraits(transmission=1.0).is_optical()
+    assert MaterialTraits(metallic=1.0, roughness=0.05).is_optical()
+    
+    # 粗糙金属（散热器）不是光学材质
+    assert not MaterialTraits(metallic=1.0, roughness=0.6).is_optical()
+    print("✓ 材质判定测试通过")
+
+
+def test_classify_object():
+    """测试对象分类"""
+    settings = LODSettings(triangle_threshold=10000)
+    plastic = [MaterialTraits(roughness=0.5)]
+    
+    assert classify_object("HeatSink", plastic, 500000, settings) == LOD_DECIMATE
+    assert classify_object("Screw.012", plastic, 2000, settings) == LOD_KEEP
+    assert classify_object("Reflector", plastic, 500000, settings) == LOD_OPTICAL
+    assert classify_object("透镜", [], 500000, settings) == LOD_OPTICAL
+    assert classify_object("Body", [MaterialTraits(metallic=1.0, roughness=0.1)], 500000, settings) == LOD_OPTICAL
+    assert classify_object("Body", [MaterialTraits(), MaterialTraits(emission=1.0)], 500000, settings) == LOD_OPTICAL
+    print("✓ 对象分类测试通过")
+
+
+def test_decimate_ratio():
+    """测试减面比例"""
+    settings = LODSettings(target_ratio=0.1, min_triangles=1000)
+    assert calculate_decimate_ratio(1000000, settings) == 0.1
+    assert calculate_decimate_ratio(5000, settings) == 0.2
+    assert calculate_decimate_ratio(500, settings) == 1.0
+    assert calculate_decimate_ratio(0, settings) == 1.0
+    
+    for invalid in (LODSettings(target_ratio=0.0), LODSettings(triangle_threshold=0)):
+        try:
+            invalid.validate()
+            assert False, "无效参数应该抛出 LODError"
+        except LODError:
+            pass
+    print("✓ 减面比例测试通过")
+
+
+def test_lod_report():
+    """测试简化报告"""
+    report = LODReport()
+    assert report.reduction == 0.0
+    
+    report = LODReport(original_triangles=1000000, measured_triangles=150000,
+                       decimated_objects=["HeatSink"], optical_objects=["Reflector", "Lens"])
+    assert abs(report.reduction - 0.85) < 1e-12
+    
+    data = json.loads(json.dumps(report.to_dict()))
+    assert data['decimated_objects'] == ["HeatSink"]
+    assert "85.0%" in str(report)
+    print("✓ 简化报告测试通过")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试灯具简化模块")
+    print("=" * 60)
+    
+    test_material_traits()
+    test_classify_object()
+    test_decimate_ratio()
+    test_lod_report()
+    
+    print("=" * 60)
+    print("所有测试通过！")
+    print("=" * 60)
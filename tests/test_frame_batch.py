@@ -0,0 +1,122 @@
+"""
+测试帧批量测量模块
+
+验证帧序列、帧状态指纹、输出路径和批量报告。
+"""
+
+import sys
+import os
+import json
+import pytest
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from kiro_ies_generator.frame_batch import (
+    FrameBatchError,
+    FrameBatchReport,
+    FrameResult,
+    calculate_frame_numbers,
+    fingerprint_frame_state,
+    get_frame_manifest_path,
+    get_frame_name,
+    get_frame_output_path,
+)
+
+
+def make_state() -> dict:
+    """创建测试用的帧状态"""
+    return {
+        'Spot.matrix_world': [(1.0, 0.0, 0.0, 0.0), (0.0, 1.0, 0.0, 0.0),
+                              (0.0, 0.0, 1.0, 2.0), (0.0, 0.0, 0.0, 1.0)],
+        'Spot.energy': 100.0,
+        'Spot.type': 'SPOT',
+        'Lens.vertices': np.linspace(0.0, 1.0, 30),
+    }
+
+
+def test_calculate_frame_numbers():
+    """测试帧序列"""
+    assert calculate_frame_numbers(1, 5) == [1, 2, 3, 4, 5]
+    assert calculate_frame_numbers(10, 20, 5) == [10, 15, 20]
+    assert calculate_frame_numbers(3, 3) == [3]
+    
+    with pytest.raises(FrameBatchError):
+        calculate_frame_numbers(5, 1)
+    with pytest.raises(FrameBatchError):
+        calculate_frame_numbers(1, 5, 0)
+    print("✓ 帧序列测试通过")
+
+
+def test_fingerprint_frame_state():
+    """测试帧状态指纹"""
+    state = make_state()
+    fingerprint = fingerprint_frame_state(state)
+    
+    # 与键顺序无关，低于量化精度的差异忽略
+    reordered = dict(reversed(list(state.items())))
+    assert fingerprint_frame_state(reordered) == fingerprint
+    noisy = dict(state, **{'Lens.vertices': state['Lens.vertices'] + 1e-9})
+    assert fingerprint_frame_state(noisy) == fingerprint
+    
+    # 变换、功率、类型或几何变化时指纹不同
+    moved = dict(state, **{'Spot.matrix_world': np.eye(4)})
+    dimmed = dict(state, **{'Spot.energy': 50.0})
+    retyped = dict(state, **{'Spot.type': 'POINT'})
+    zoomed = dict(state, **{'Lens.vertices': state['Lens.vertices'] * 1.01})
+    fingerprints = {fingerprint_frame_state(s) for s in (state, moved, dimmed, retyped, zoomed)}
+    assert len(fingerprints) == 5
+    
+    # 新增对象也改变指纹
+    assert fingerprint_frame_state(dict(state, **{'Gobo.energy': 0.0})) != fingerprint
+    print("✓ 帧状态指纹测试通过")
+
+
+def test_output_paths():
+    """测试输出路径"""
+    output_path = os.path.join("out", "moving_head.ies")
+    assert get_frame_output_path(output_path, 12) == os.path.join("out", "moving_head_f0012.ies")
+    assert get_frame_output_path("moving_head", 3) == "moving_head_f0003.ies"
+    # IES 灯具名称与文件名使用相同的帧号格式
+    assert get_frame_name("moving_head", 12) + ".ies" == os.path.basename(get_frame_output_path(output_path, 12))
+    assert get_frame_manifest_path(output_path) == os.path.join("out", "moving_head_frames.json")
+    print("✓ 输出路径测试通过")
+
+
+def test_frame_batch_report():
+    """测试批量报告"""
+    report = FrameBatchReport(
+        frames=[
+            FrameResult(1, "a", "f0001.ies", elapsed_time=30.0),
+            FrameResult(2, "a", "f0002.ies", reused_from=1),
+            FrameResult(3, "b", "f0003.ies", elapsed_time=31.0),
+        ],
+        elapsed_time=61.5
+    )
+    
+    assert report.measured_frames == [1, 3]
+    assert report.skipped_frames == [2]
+    
+    data = json.loads(json.dumps(report.to_dict()))
+    assert data['frames'][1]['reused_from'] == 1
+    assert "复用 1 帧" in str(report)
+    print("✓ 批量报告测试通过")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试帧批量测量模块")
+    print("=" * 60)
+    
+    test_calculate_frame_numbers()
+    test_fingerprint_frame_state()
+    test_output_paths()
+    test_frame_batch_report()
+    
+    print("=" * 60)
+    print("所有测试通过！")
+    print("=" * 60)
@@ -0,0 +1,263 @@
+"""
+测试 IES 生成器模块
+
+验证网格化的光度学数据流：SamplingResult → calibrate_to_candela →
+PhotometricData → IES 文件内容。
+"""
+
+import sys
+import os
+import io
+import gzip
+import socket
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from kiro_ies_generator.data_structures import SamplingResult, PhotometricData
+from kiro_ies_generator.ies_generator import (
+    CalibrationError,
+    IES_MAX_LINE_LENGTH,
+    calibrate_to_candela,
+    generate_ies_file,
+    iter_ies_chunks,
+    stream_ies,
+    validate_ies_compliance,
+    write_ies,
+)
+
+
+def make_sampling_result(angular_interval: float = 30.0) -> SamplingResult:
+    """创建一个测试用的采样结果（亮度随 theta 变化）"""
+    vertical_angles = np.arange(0, 180 + angular_interval / 2, angular_interval)
+    horizontal_angles = np.arange(0, 360, angular_interval)
+    luminance_data = np.outer(
+        2.0 + np.cos(np.radians(vertical_angles)),
+        np.ones(len(horizontal_angles))
+    )
+    return SamplingResult(
+        vertical_angles=vertical_angles,
+        horizontal_angles=horizontal_angles,
+        luminance_data=luminance_data,
+        light_position=(0.0, 0.0, 0.0),
+        total_samples=luminance_data.size,
+        elapsed_time=0.0
+    )
+
+
+def test_calibrate_returns_photometric_data():
+    """测试校准结果为网格化的 PhotometricData"""
+    result = make_sampling_result()
+    data = calibrate_to_candela(result, 1800.0, 5.0, "测试灯具")
+    
+    assert isinstance(data, PhotometricData)
+    assert data.get_data_shape() == result.get_data_shape()
+    assert data.vertical_angles is result.vertical_angles
+    assert data.horizontal_angles is result.horizontal_angles
+    assert data.lumens == 1800.0
+    assert data.fixture_name == "测试灯具"
+    
+    # 校准只是整体缩放，分布形状保持不变
+    ratio = data.candela_values / result.luminance_data
+    assert np.allclose(ratio, ratio[0, 0])
+    print("✓ 校准返回 PhotometricData 测试通过")
+
+
+def test_calibrate_invalid_input():
+    """测试无效输入的错误处理"""
+    result = make_sampling_result()
+    
+    try:
+        calibrate_to_candela(result, 0.0, 5.0)
+        assert False, "流明值为 0 应该抛出 CalibrationError"
+    except CalibrationError:
+        pass
+    
+    result.luminance_data = np.zeros_like(result.luminance_data)
+    try:
+        calibrate_to_candela(result, 1800.0, 5.0)
+        assert False, "全零亮度应该抛出 CalibrationError"
+    except CalibrationError:
+        pass
+    print("✓ 校准错误处理测试通过")
+
+
+def test_generate_ies_file_layout():
+    """测试 IES 文件的角度列表和 C-Plane 数据排列"""
+    result = make_sampling_result(angular_interval=45.0)
+    result.luminance_data = np.arange(result.luminance_data.size, dtype=float).reshape(
+        result.luminance_data.shape) + 1.0
+    data = calibrate_to_candela(result, 1000.0, 5.0)
+    
+    content = generate_ies_file(data)
+    assert validate_ies_compliance(content)
+    
+    tokens = content.split("TILT=NONE\n", 1)[1].split()
+    n_theta, n_phi = data.get_data_shape()
+    assert int(tokens[3]) == n_theta
+    assert int(tokens[4]) == n_phi
+    
+    numbers = np.array(tokens[13:], dtype=float)
+    assert np.allclose(numbers[:n_theta], data.vertical_angles)
+    assert np.allclose(numbers[n_theta:n_theta + n_phi], data.horizontal_angles)
+    
+    # 每个水平角度输出一组完整的垂直角度数据（网格的列）
+    candela = numbers[n_theta + n_phi:].reshape(n_phi, n_theta)
+    assert np.allclose(candela, data.candela_values.T, atol=0.01)
+    print("✓ IES 文件数据排列测试通过")
+
+
+def test_photometric_data_to_ies():
+    """测试 PhotometricData.to_ies 与 generate_ies_file 一致"""
+    data = calibrate_to_candela(make_sampling_result(), 1800.0, 5.0, "吊灯")
+    
+    content = data.to_ies()
+    assert content == generate_ies_file(data)
+    assert "[LUMINAIRE] 吊灯" in content
+    print("✓ PhotometricData.to_ies 测试通过")
+
+
+
+def test_write_ies_line_length():
+    """测试高分辨率数据按 LM-63 行长换行"""
+    data = calibrate_to_candela(make_sampling_result(angular_interval=5.0), 1e6, 5.0)
+    
+    buffer = io.StringIO()
+    write_ies(data, buffer)
+    content = buffer.getvalue()
+    
+    assert content == generate_ies_file(data)
+    assert max(len(line) for line in content.splitlines()) <= IES_MAX_LINE_LENGTH
+    print("✓ IES 行长换行测试通过")
+
+
+def test_write_ies_high_resolution_speed():
+    """测试 0.5° 分辨率文件的生成速度"""
+    data = calibrate_to_candela(make_sampling_result(angular_interval=0.5), 1800.0, 5.0)
+    assert data.get_data_shape() == (361, 720)
+    
+    start = time.perf_counter()
+    content = generate_ies_file(data)
+    elapsed = time.perf_counter() - start
+    
+    assert validate_ies_compliance(content)
+    assert elapsed < 2.0, f"0.5° 文件生成耗时 {elapsed:.3f} 秒"
+    print(f"✓ 0.5° 文件生成耗时 {elapsed * 1000:.1f} 毫秒")
+
+
+
+def test_stream_ies_text_and_binary():
+    """测试流式写入文本流和二进制流的结果一致"""
+    data = calibrate_to_candela(make_sampling_result(angular_interval=5.0), 1800.0, 5.0, "吊灯")
+    expected = generate_ies_file(data)
+    
+    text_stream = io.StringIO()
+    assert stream_ies(data, text_stream) == len(expected)
+    assert text_stream.getvalue() == expected
+    
+    binary_stream = io.BytesIO()
+    assert stream_ies(data, binary_stream) == len(expected.encode("utf-8"))
+    assert binary_stream.getvalue().decode("utf-8") == expected
+    
+    archive = io.BytesIO()
+    with gzip.GzipFile(fileobj=archive, mode="wb") as member:
+        stream_ies(data, member)
+    assert gzip.decompress(archive.getvalue()).decode("utf-8") == expected
+    print("✓ 流式写入文本流/二进制流测试通过")
+
+
+def test_stream_ies_socket():
+    """测试流式写入套接字"""
+    data = calibrate_to_candela(make_sampling_result(), 1800.0, 5.0)
+    expected = generate_ies_file(data).encode("utf-8")
+    
+    sender, receiver = socket.socketpair()
+    try:
+        with sender:
+            stream_ies(data, sender)
+        received = b""
+        while True:
+            part = receiver.recv(65536)
+            if not part:
+                break
+            received += part
+    finally:
+        receiver.close()
+    
+    assert received == expected
+    print("✓ 流式写入套接字测试通过")
+
+
+class PartialRawStream(io.RawIOBase):
+    """每次最多写入 limit 字节、可用字节写完后返回 None 的非阻塞原始流"""
+    
+    def __init__(self, limit: int, capacity: int = None):
+        self.limit = limit
+        self.capacity = capacity
+        self.data = bytearray()
+    
+    def writable(self):
+        return True
+    
+    def write(self, b):
+        if self.capacity is not None and len(self.data) >= self.capacity:
+            return None
+        count = min(len(b), self.limit)
+        self.data += bytes(b[:count])
+        return count
+
+
+def test_stream_ies_raw():
+    """测试原始流：部分写入时循环写完，非阻塞流不可写时抛出 BlockingIOError"""
+    data = calibrate_to_candela(make_sampling_result(), 1800.0, 5.0)
+    expected = generate_ies_file(data).encode("utf-8")
+    
+    stream = PartialRawStream(limit=100)
+    assert stream_ies(data, stream) == len(expected)
+    assert bytes(stream.data) == expected
+    
+    try:
+        stream_ies(data, PartialRawStream(limit=100, capacity=250))
+        assert False, "非阻塞流不可写时应该抛出 BlockingIOError"
+    except BlockingIOError:
+        pass
+    print("✓ 流式写入原始流测试通过")
+
+
+def test_iter_ies_chunks_bounded():
+    """测试数据块大小与 C-Plane 分块数量一致"""
+    data = calibrate_to_candela(make_sampling_result(angular_interval=1.0), 1800.0, 5.0)
+    
+    chunks = list(iter_ies_chunks(data, planes_per_chunk=8))
+    # 文件头 + 两行角度列表 + ceil(360 / 8) 个数据块
+    assert len(chunks) == 3 + 45
+    assert "".join(chunks) == generate_ies_file(data)
+    # 每个 C-Plane 有 181 个数值，按每行 10 个换行为 19 行
+    assert chunks[3].count("\n") == 8 * 19
+    print("✓ 分块写入测试通过")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试 IES 生成器模块")
+    print("=" * 60)
+    
+    test_calibrate_returns_photometric_data()
+    test_calibrate_invalid_input()
+    test_generate_ies_file_layout()
+    test_photometric_data_to_ies()
+    test_write_ies_line_length()
+    test_write_ies_high_resolution_speed()
+    test_stream_ies_text_and_binary()
+    test_stream_ies_socket()
+    test_stream_ies_raw()
+    test_iter_ies_chunks_bounded()
+    
+    print("=" * 60)
+    print("所有测试通过！")
+    print("=" * 60)
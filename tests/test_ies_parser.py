@@ -0,0 +1,183 @@
+"""
+测试 IES 解析器模块
+
+验证 LM-63 各版本文件的解析、TILT 数据处理，以及与 IES 生成器的往返一致性。
+"""
+
+import sys
+import os
+import time
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from kiro_ies_generator.data_structures import PhotometricData
+from kiro_ies_generator.ies_generator import generate_ies_file
+from kiro_ies_generator.ies_parser import (
+    IESParseError,
+    detect_ies_format,
+    parse_ies,
+    read_ies_file,
+    read_ies_files,
+)
+
+
+# 典型的厂商 LM-63-1995 文件：TILT=INCLUDE、[MORE] 续行、逗号分隔、坎德拉倍率
+MANUFACTURER_IES_1995 = """IESNA:LM-63-1995
+[TEST] 12345
+[MANUFAC] ACME Lighting
+[LUMINAIRE] Downlight 20W
+[MORE] Frosted lens
+TILT=INCLUDE
+1
+3
+0 45 90
+1.0, 0.95, 0.9
+1 2000 0.5 3 2 1 2 0.1 0.1 0.05
+1.0 1.0 20
+0 45 90
+0 90
+1000 600 0
+1000 500 0
+"""
+
+
+def make_photometric_data() -> PhotometricData:
+    """创建一个测试用的光度学数据"""
+    vertical_angles = np.arange(0, 181, 15.0)
+    horizontal_angles = np.arange(0, 360, 30.0)
+    candela_values = np.outer(
+        1000.0 * (1.0 + np.cos(np.radians(vertical_angles))),
+        1.0 + 0.1 * np.cos(np.radians(horizontal_angles))
+    )
+    return PhotometricData(
+        vertical_angles=vertical_angles,
+        horizontal_angles=horizontal_angles,
+        candela_values=candela_values,
+        lumens=1800.0,
+        distance=5.0,
+        fixture_name="吊灯"
+    )
+
+
+def test_round_trip():
+    """测试生成的 IES 文件能被完整解析"""
+    data = make_photometric_data()
+    parsed = parse_ies(generate_ies_file(data))
+    
+    assert np.allclose(parsed.vertical_angles, data.vertical_angles)
+    assert np.allclose(parsed.horizontal_angles, data.horizontal_angles)
+    assert parsed.get_data_shape() == data.get_data_shape()
+    assert np.allclose(parsed.candela_values, data.candela_values, atol=0.005)
+    assert parsed.lumens == 1800.0
+    assert parsed.fixture_name == "吊灯"
+    assert parsed.keywords["MANUFAC"] == "Kiro"
+    assert parsed.tilt is None
+    print("✓ IES 往返解析测试通过")
+
+
+def test_manufacturer_file_with_tilt():
+    """测试 LM-63-1995 厂商文件（TILT=INCLUDE、倍率、[MORE]）"""
+    data = parse_ies(MANUFACTURER_IES_1995)
+    
+    assert data.keywords["LUMINAIRE"] == "Downlight 20W\nFrosted lens"
+    assert data.fixture_name == "Downlight 20W\nFrosted lens"
+    assert data.tilt['type'] == 'INCLUDE'
+    assert data.tilt['lamp_to_luminaire_geometry'] == 1
+    assert np.allclose(data.tilt['angles'], [0, 45, 90])
+    assert np.allclose(data.tilt['factors'], [1.0, 0.95, 0.9])
+    
+    assert data.get_data_shape() == (3, 2)
+    assert np.allclose(data.horizontal_angles, [0, 90])
+    # 坎德拉倍率 0.5，按 C-Plane 排列
+    assert np.allclose(data.candela_values, [[500, 500], [300, 250], [0, 0]])
+    assert data.lumens == 2000.0
+    print("✓ 厂商文件（TILT=INCLUDE）解析测试通过")
+
+
+def test_absolute_photometry_flux():
+    """测试绝对光度文件（流明为 -1）由坎德拉分布估算光通量"""
+    vertical = " ".join(str(a) for a in range(0, 181, 5))
+    candela = " ".join(["100"] * 37)
+    content = (
+        "IES:LM-63-2019\n[TEST] abs\n[MANUFAC] X\n[LUMCAT] Y\nTILT=NONE\n"
+        f"1 -1 1 37 1 1 2 0 0 0\n1 1 10\n{vertical}\n0\n{candela}\n"
+    )
+    data = parse_ies(content)
+    
+    # 各向同性 100 cd 的总光通量为 4π × 100
+    assert abs(data.lumens - 4 * np.pi * 100) / (4 * np.pi * 100) < 0.01
+    print("✓ 绝对光度光通量估算测试通过")
+
+
+def test_detect_format():
+    """测试版本识别"""
+    assert detect_ies_format("IESNA:LM-63-2002") == "LM-63-2002"
+    assert detect_ies_format("IESNA:LM-63-1995") == "LM-63-1995"
+    assert detect_ies_format("IES:LM-63-2019") == "LM-63-2019"
+    assert detect_ies_format("IESNA91") == "LM-63-1991"
+    assert detect_ies_format("[TEST] legacy") == "LM-63-1986"
+    print("✓ 版本识别测试通过")
+
+
+def test_invalid_files():
+    """测试错误处理"""
+    invalid_contents = [
+        "",
+        "IESNA:LM-63-2002\n[TEST] x\n",  # 缺少 TILT 行
+        "IESNA:LM-63-2002\nTILT=NONE\n1 1000 1 3 1 1 2 0 0 0\n1 1 0\n0 90 180\n0\n1 2\n",  # 数据不完整
+        "IESNA:LM-63-2002\nTILT=NONE\n1 1000 1 1 1 2 2 0 0 0\n1 1 0\n0\n0\n1\n",  # B 型光度
+        "IESNA:LM-63-2002\nTILT=NONE\n1 1000 1 1 1 1 2 0 0 0\n1 1 0\n0\nabc\n1\n",  # 非数值
+    ]
+    for content in invalid_contents:
+        try:
+            parse_ies(content)
+            assert False, f"应该抛出 IESParseError: {content!r}"
+        except IESParseError:
+            pass
+    print("✓ 错误处理测试通过")
+
+
+def test_read_many_files():
+    """测试批量读取文件的速度"""
+    content = generate_ies_file(make_photometric_data())
+    
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for index in range(200):
+            path = os.path.join(directory, f"fixture_{index}.ies")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            paths.append(path)
+        
+        start = time.perf_counter()
+        results = read_ies_files(paths)
+        elapsed = time.perf_counter() - start
+        
+        assert len(results) == 200
+        assert read_ies_file(paths[0]).get_data_shape() == (13, 12)
+    
+    assert elapsed < 2.0, f"读取 200 个文件耗时 {elapsed:.3f} 秒"
+    print(f"✓ 批量读取 200 个文件耗时 {elapsed * 1000:.1f} 毫秒")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试 IES 解析器模块")
+    print("=" * 60)
+    
+    test_round_trip()
+    test_manufacturer_file_with_tilt()
+    test_absolute_photometry_flux()
+    test_detect_format()
+    test_invalid_files()
+    test_read_many_files()
+    
+    print("=" * 60)
+    print("所有测试通过！")
+    print("=" * 60)
@@ -23,6 +23,29 @@ def test_core_module_imports():
         'kiro_ies_generator.sampler',
         'kiro_ies_generator.ies_generator',
         'kiro_ies_generator.output_manager',
+        'kiro_ies_generator.ies_parser',
+        'kiro_ies_generator.photometry',
+        'kiro_ies_generator.measurement_archive',
+        'kiro_ies_generator.result_export',
+        'kiro_ies_generator.pipeline',
+        'kiro_ies_generator.exporters',
+        'kiro_ies_generator.resampling',
+        'kiro_ies_generator.spherical_harmonics',
+        'kiro_ies_generator.denoising',
+        'kiro_ies_generator.sensor_validation',
+        'kiro_ies_generator.sensor_geometry',
+        'kiro_ies_generator.measurement_profiles',
+        'kiro_ies_generator.measurement_scene',
+        'kiro_ies_generator.fixture_lod',
+        'kiro_ies_generator.emitter_aggregation',
+        'kiro_ies_generator.light_groups',
+        'kiro_ies_generator.superposition',
+        'kiro_ies_generator.frame_batch',
+        'kiro_ies_generator.fixture_batch',
+        'kiro_ies_generator.cli',
+        'kiro_ies_generator.job_server',
+        'kiro_ies_generator.api',
+        'kiro_ies_generator.sharding',
     ]
     
     success_count = 0
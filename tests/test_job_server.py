@@ -0,0 +1,175 @@
+"""
+测试任务服务器模块
+
+使用替身处理函数验证请求格式、任务目录协议、.blend 优先认领和失败响应（不需要 Blender）。
+"""
+
+import sys
+import os
+import json
+import tempfile
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from kiro_ies_generator.job_server import (
+    JOB_STATUS_DONE,
+    JOB_STATUS_FAILED,
+    SPOOL_EVENTS,
+    SPOOL_INCOMING,
+    JobRequest,
+    JobSchemaError,
+    JobServer,
+    JobServerError,
+    SpoolDirectory,
+    parse_job_request,
+)
+
+
+class StubHandler:
+    """记录调用顺序的替身处理函数"""
+    
+    def __init__(self, fail_on=None):
+        self.current_blend = None
+        self.calls = []
+        self.fail_on = fail_on
+    
+    def __call__(self, request, progress_callback):
+        self.calls.append(request.job_id)
+        if request.job_id == self.fail_on:
+            raise RuntimeError("渲染失败")
+        progress_callback(1, 1)
+        blend = os.path.abspath(request.blend) if request.blend else None
+        cache_hit = blend == self.current_blend
+        self.current_blend = blend
+        return [os.path.join(request.output_dir, f"{request.job_id}.ies")], cache_hit
+
+
+def test_request_to_cli_arguments():
+    """测试请求转换为 cli 参数"""
+    request = JobRequest(
+        job_id="a", blend="lamp.blend", output_dir="out",
+        options={'mode': 'frames', 'frames': [1, 10], 'sensor_denoise': True,
+                 'overwrite': False, 'lumens': None}
+    )
+    assert request.to_cli_arguments() == [
+        "lamp.blend", "--output-dir", "out", "--mode", "frames", "--frames", "1", "10", "--sensor-denoise"
+    ]
+    print("✓ 请求转换测试通过")
+
+
+def test_parse_job_request():
+    """测试请求校验"""
+    request = parse_job_request({'job_id': "a", 'blend': None, 'output_dir': "out"})
+    assert request.options == {}
+    
+    invalid = [
+        [],
+        {'blend': None, 'output_dir': "out"},
+        {'job_id': "../a", 'output_dir': "out"},
+        {'job_id': "a"},
+        {'job_id': "a", 'output_dir': "out", 'options': {'mode': 'frames'}},
+        {'job_id': "a", 'output_dir': "out", 'options': {'events': "log.jsonl"}},
+    ]
+    for data in invalid:
+        with pytest.raises(JobSchemaError):
+            parse_job_request(data)
+    print("✓ 请求校验测试通过")
+
+
+def test_submit_and_serve():
+    """测试提交、处理和读取响应"""
+    with tempfile.TemporaryDirectory() as directory:
+        spool = SpoolDirectory(directory)
+        server = JobServer(spool, StubHandler(), poll_interval=0.01)
+        
+        job_id = spool.submit("lamp.blend", "out", {'preset': 'preview'})
+        assert spool.read_response(job_id) is None
+        # 原子写入不留下临时文件
+        assert os.listdir(os.path.dirname(spool.path(SPOOL_INCOMING, job_id))) == [f"{job_id}.json"]
+        with pytest.raises(JobServerError):
+            spool.submit("lamp.blend", "out", job_id=job_id)
+        
+        response = server.serve_once()
+        assert response.job_id == job_id
+        assert response.status == JOB_STATUS_DONE
+        assert response.outputs == [os.path.join("out", f"{job_id}.ies")]
+        assert server.serve_once() is None
+        
+        assert spool.wait_for_response(job_id, timeout=1.0).to_dict() == response.to_dict()
+        with open(spool.path(SPOOL_EVENTS, job_id, '.jsonl'), encoding='utf-8') as f:
+            events = [json.loads(line)['event'] for line in f]
+        assert events == ['job_start', 'progress', 'job_done']
+        
+        with pytest.raises(JobServerError):
+            spool.wait_for_response("missing", timeout=0.05, poll_interval=0.01)
+    print("✓ 提交与处理测试通过")
+
+
+def test_failed_job():
+    """测试处理失败和坏请求都写入失败响应"""
+    with tempfile.TemporaryDirectory() as directory:
+        spool = SpoolDirectory(directory)
+        server = JobServer(spool, StubHandler(fail_on="bad"), poll_interval=0.01)
+        
+        spool.submit(None, "out", job_id="bad")
+        with open(spool.path(SPOOL_INCOMING, "broken"), 'w', encoding='utf-8') as f:
+            json.dump({'job_id': "broken"}, f)
+        
+        assert server.serve_forever(idle_timeout=0.05) == 2
+        for job_id in ("bad", "broken"):
+            response = spool.read_response(job_id)
+            assert response.status == JOB_STATUS_FAILED
+            assert response.error
+    print("✓ 失败响应测试通过")
+
+
+def test_prefer_current_blend():
+    """测试优先认领与当前打开文件相同的任务"""
+    with tempfile.TemporaryDirectory() as directory:
+        spool = SpoolDirectory(directory)
+        handler = StubHandler()
+        server = JobServer(spool, handler, poll_interval=0.01)
+        
+        for job_id, blend in (("1", "a.blend"), ("2", "b.blend"), ("3", "a.blend")):
+            spool.submit(blend, "out", job_id=job_id)
+            path = spool.path(SPOOL_INCOMING, job_id)
+            os.utime(path, (int(job_id), int(job_id)))
+        
+        responses = [server.serve_once() for _ in range(3)]
+        assert handler.calls == ["1", "3", "2"]
+        assert [response.blend_cache_hit for response in responses] == [False, True, False]
+    print("✓ .blend 优先认领测试通过")
+
+
+def test_stop_request():
+    """测试停止标记"""
+    with tempfile.TemporaryDirectory() as directory:
+        spool = SpoolDirectory(directory)
+        server = JobServer(spool, StubHandler(), poll_interval=0.01)
+        spool.submit(None, "out", job_id="a")
+        spool.request_stop()
+        
+        assert server.serve_forever() == 0
+        assert spool.read_response("a") is None
+    print("✓ 停止标记测试通过")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试任务服务器模块")
+    print("=" * 60)
+    
+    test_request_to_cli_arguments()
+    test_parse_job_request()
+    test_submit_and_serve()
+    test_failed_job()
+    test_prefer_current_blend()
+    test_stop_request()
+    
+    print("=" * 60)
+    print("所有测试通过！")
+    print("=" * 60)
@@ -0,0 +1,89 @@
+"""
+测试光源分组模块
+
+验证组名转换、分组校验和输出路径。
+"""
+
+import sys
+import os
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from kiro_ies_generator.light_groups import (
+    LightGroupError,
+    build_light_groups,
+    get_light_group_output_path,
+    get_light_group_pass_name,
+    sanitize_light_group_name,
+)
+
+
+def test_sanitize_light_group_name():
+    """测试组名转换"""
+    assert sanitize_light_group_name("Up_Light") == "Up_Light"
+    assert sanitize_light_group_name("Spot.001") == "Spot_001"
+    assert sanitize_light_group_name("下照 灯") == "light"
+    assert sanitize_light_group_name("灯A") == "_A"
+    print("✓ 组名转换测试通过")
+
+
+def test_default_groups():
+    """测试默认分组：每个光源单独成组"""
+    groups = build_light_groups(["Up", "Down", "Spot.001", "Spot_001"])
+    
+    assert list(groups) == ["Up", "Down", "Spot_001", "Spot_001_2"]
+    assert groups["Spot_001"] == ["Spot.001"]
+    assert groups["Spot_001_2"] == ["Spot_001"]
+    print("✓ 默认分组测试通过")
+
+
+def test_custom_groups():
+    """测试自定义分组"""
+    lights = ["Up1", "Up2", "Down"]
+    groups = build_light_groups(lights, {"up": ["Up1", "Up2"], "down": ["Down"]})
+    assert groups == {"up": ["Up1", "Up2"], "down": ["Down"]}
+    
+    # 部分光源不分组是允许的
+    assert build_light_groups(lights, {"down": ["Down"]}) == {"down": ["Down"]}
+    
+    with pytest.raises(LightGroupError):
+        build_light_groups([])
+    with pytest.raises(LightGroupError):
+        build_light_groups(lights, {})
+    with pytest.raises(LightGroupError):
+        build_light_groups(lights, {"up light": ["Up1"]})
+    with pytest.raises(LightGroupError):
+        build_light_groups(lights, {"up": []})
+    with pytest.raises(LightGroupError):
+        build_light_groups(lights, {"up": ["Missing"]})
+    with pytest.raises(LightGroupError):
+        build_light_groups(lights, {"up": ["Up1"], "all": ["Up1", "Down"]})
+    print("✓ 自定义分组测试通过")
+
+
+def test_pass_name_and_output_path():
+    """测试通道名和输出路径"""
+    assert get_light_group_pass_name("up") == "Combined_up"
+    assert get_light_group_output_path(os.path.join("out", "fixture.ies"), "up") == \
+        os.path.join("out", "fixture_up.ies")
+    assert get_light_group_output_path("fixture", "down") == "fixture_down.ies"
+    print("✓ 通道名和输出路径测试通过")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试光源分组模块")
+    print("=" * 60)
+    
+    test_sanitize_light_group_name()
+    test_default_groups()
+    test_custom_groups()
+    test_pass_name_and_output_path()
+    
+    print("=" * 60)
+    print("所有测试通过！")
+    print("=" * 60)
@@ -0,0 +1,159 @@
+"""
+测试测量存档模块
+
+验证原始采样结果的保存/读取（含内存映射）、存档错误处理，
+以及从存档重新校准导出 IES。
+"""
+
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from kiro_ies_generator.data_structures import SamplingResult
+from kiro_ies_generator.ies_generator import calibrate_to_candela, generate_ies_file
+from kiro_ies_generator.ies_parser import read_ies_file
+from kiro_ies_generator.measurement_archive import (
+    ArchiveError,
+    load_sampling_result,
+    recalibrate_archive,
+    save_sampling_result,
+)
+
+
+def make_sampling_result() -> SamplingResult:
+    """创建测试用的采样结果（含方差和渲染设置）"""
+    vertical_angles = np.arange(0, 181, 10.0)
+    horizontal_angles = np.arange(0, 360, 10.0)
+    rng = np.random.default_rng(0)
+    luminance_data = rng.uniform(0.5, 1.5, (19, 36))
+    return SamplingResult(
+        vertical_angles=vertical_angles,
+        horizontal_angles=horizontal_angles,
+        luminance_data=luminance_data,
+        light_position=(0.0, 0.5, 2.0),
+        total_samples=19 * 36,
+        elapsed_time=321.5,
+        variance=luminance_data * 0.01,
+        render_settings={'angular_interval': 10.0, 'distance': 5.0, 'samples': 64}
+    )
+
+
+def test_save_and_load():
+    """测试存档往返（内存映射与完整读取）"""
+    result = make_sampling_result()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "fixture_measurement.kma")
+        assert save_sampling_result(result, path)
+        
+        for mmap in (True, False):
+            loaded = load_sampling_result(path, mmap=mmap)
+            assert np.array_equal(loaded.vertical_angles, result.vertical_angles)
+            assert np.array_equal(loaded.horizontal_angles, result.horizontal_angles)
+            assert np.array_equal(loaded.luminance_data, result.luminance_data)
+            assert np.array_equal(loaded.variance, result.variance)
+            assert loaded.light_position == result.light_position
+            assert loaded.total_samples == result.total_samples
+            assert loaded.elapsed_time == result.elapsed_time
+            assert loaded.render_settings == result.render_settings
+            assert isinstance(loaded.luminance_data, np.memmap) == mmap
+            del loaded
+    print("✓ 存档保存/读取测试通过")
+
+
+def test_save_without_variance():
+    """测试没有方差数据的采样结果"""
+    result = make_sampling_result()
+    result.variance = None
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "plain.kma")
+        save_sampling_result(result, path)
+        loaded = load_sampling_result(path, mmap=False)
+        assert loaded.variance is None
+    print("✓ 无方差存档测试通过")
+
+
+def test_archive_errors():
+    """测试存档错误处理"""
+    result = make_sampling_result()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "fixture.kma")
+        save_sampling_result(result, path)
+        
+        # 不覆盖已存在的文件
+        try:
+            save_sampling_result(result, path)
+            assert False, "已存在的文件应该抛出 ArchiveError"
+        except ArchiveError:
+            pass
+        
+        # 非存档文件
+        invalid_path = os.path.join(directory, "invalid.kma")
+        with open(invalid_path, 'wb') as f:
+            f.write(b"IESNA:LM-63-2002\n")
+        try:
+            load_sampling_result(invalid_path)
+            assert False, "无效文件应该抛出 ArchiveError"
+        except ArchiveError:
+            pass
+        
+        # 截断的存档
+        truncated_path = os.path.join(directory, "truncated.kma")
+        with open(path, 'rb') as f:
+            content = f.read()
+        with open(truncated_path, 'wb') as f:
+            f.write(content[:-100])
+        try:
+            load_sampling_result(truncated_path)
+            assert False, "截断的存档应该抛出 ArchiveError"
+        except ArchiveError:
+            pass
+    print("✓ 存档错误处理测试通过")
+
+
+def test_recalibrate_archive():
+    """测试从存档重新校准导出 IES"""
+    result = make_sampling_result()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        archive_path = os.path.join(directory, "fixture_measurement.kma")
+        ies_path = os.path.join(directory, "fixture_3000lm.ies")
+        save_sampling_result(result, archive_path)
+        
+        data = recalibrate_archive(archive_path, 3000.0, ies_path, fixture_name="吊灯")
+        expected = calibrate_to_candela(result, 3000.0, 5.0, "吊灯")
+        
+        assert np.allclose(data.candela_values, expected.candela_values)
+        assert data.distance == 5.0
+        with open(ies_path, 'r', encoding='utf-8') as f:
+            assert f.read() == generate_ies_file(expected)
+        assert read_ies_file(ies_path).lumens == 3000.0
+        
+        recalibrate_archive(archive_path, 3000.0, ies_path, fixture_name="吊灯", overwrite=True,
+                            export_formats=("IES2002", "LDT"))
+        assert os.path.exists(os.path.join(directory, "fixture_3000lm.ldt"))
+    print("✓ 存档重新校准测试通过")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试测量存档模块")
+    print("=" * 60)
+    
+    test_save_and_load()
+    test_save_without_variance()
+    test_archive_errors()
+    test_recalibrate_archive()
+    
+    print("=" * 60)
+    print("所有测试通过！")
+    print("=" * 60)
@@ -0,0 +1,132 @@
+"""
+测试测量配置模块
+
+验证配置查询、光源树选择、设置应用与恢复。
+"""
+
+import sys
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from kiro_ies_generator.measurement_profiles import (
+    DEFAULT_MEASUREMENT_PROFILE,
+    LIGHT_TREE_EMITTER_THRESHOLD,
+    REFERENCE_MEASUREMENT_PROFILE,
+    MeasurementProfileError,
+    apply_measurement_profile,
+    capture_scene_settings,
+    get_measurement_profile,
+    list_measurement_profiles,
+    resolve_profile_settings,
+    restore_scene_settings,
+)
+
+
+def make_scene(with_light_tree=True):
+    """创建带有常用属性的场景对象（代替 bpy.types.Scene）"""
+    cycles = SimpleNamespace(
+        max_bounces=12, diffuse_bounces=4, glossy_bounces=4, transmission_bounces=12,
+        transparent_max_bounces=8, volume_bounces=0, caustics_reflective=True,
+        caustics_refractive=True, blur_glossy=1.0, volume_step_rate=1.0,
+        volume_max_steps=1024, texture_limit_render='2048'
+    )
+    if with_light_tree:
+        cycles.use_light_tree = True
+    render = SimpleNamespace(use_motion_blur=True, use_simplify=True, simplify_subdivision_render=2)
+    return SimpleNamespace(cycles=cycles, render=render)
+
+
+def test_profile_lookup():
+    """测试配置查询"""
+    names = list_measurement_profiles()
+    assert DEFAULT_MEASUREMENT_PROFILE in names
+    assert REFERENCE_MEASUREMENT_PROFILE in names
+    
+    for name in names:
+        profile = get_measurement_profile(name)
+        assert profile.name == name
+        assert profile.accuracy_impact
+        assert profile.to_dict()['settings'] == profile.settings
+        # 几何简化和纹理限制改变光强分布，任何配置都不得开启
+        assert profile.settings['render.use_simplify'] is False
+        assert profile.settings['cycles.texture_limit_render'] == 'OFF'
+    
+    try:
+        get_measurement_profile("unknown")
+        assert False, "未知配置应该抛出 MeasurementProfileError"
+    except MeasurementProfileError:
+        pass
+    print("✓ 配置查询测试通过")
+
+
+def test_light_tree_selection():
+    """测试按发光体数量启用光源树"""
+    profile = get_measurement_profile('bare_emitter')
+    assert resolve_profile_settings(profile, 1)['cycles.use_light_tree'] is False
+    assert resolve_profile_settings(profile, LIGHT_TREE_EMITTER_THRESHOLD + 1)['cycles.use_light_tree'] is True
+    
+    # reference 配置固定启用
+    reference = get_measurement_profile(REFERENCE_MEASUREMENT_PROFILE)
+    assert resolve_profile_settings(reference, 1)['cycles.use_light_tree'] is True
+    print("✓ 光源树选择测试通过")
+
+
+def test_apply_and_restore():
+    """测试应用配置后恢复用户设置"""
+    scene = make_scene()
+    original = (vars(scene.cycles).copy(), vars(scene.render).copy())
+    
+    previous = apply_measurement_profile(scene, get_measurement_profile('reflector'), emitter_count=20)
+    assert scene.cycles.max_bounces == 8
+    assert scene.cycles.caustics_reflective is False
+    assert scene.cycles.use_light_tree is True
+    assert scene.render.use_motion_blur is False
+    assert scene.render.use_simplify is False
+    assert scene.cycles.texture_limit_render == 'OFF'
+    
+    restore_scene_settings(scene, previous)
+    assert (vars(scene.cycles), vars(scene.render)) == original
+    
+    # 旧版本没有的属性被跳过
+    old_scene = make_scene(with_light_tree=False)
+    previous = apply_measurement_profile(old_scene, get_measurement_profile('standard'), emitter_count=20)
+    assert 'cycles.use_light_tree' not in previous
+    assert not hasattr(old_scene.cycles, 'use_light_tree')
+    print("✓ 应用与恢复测试通过")
+
+
+def test_capture_and_restore():
+    """测试记录并恢复任意场景设置（传感器渲染修改的相机、分辨率等）"""
+    scene = make_scene()
+    scene.camera = "UserCamera"
+    scene.render.resolution_x = 1920
+    
+    previous = capture_scene_settings(scene, ('camera', 'render.resolution_x', 'cycles.denoising_use_gpu'))
+    assert previous == {'camera': "UserCamera", 'render.resolution_x': 1920}
+    
+    scene.camera = "VirtualSensor"
+    scene.render.resolution_x = 64
+    restore_scene_settings(scene, previous)
+    assert scene.camera == "UserCamera"
+    assert scene.render.resolution_x == 1920
+    print("✓ 设置记录与恢复测试通过")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试测量配置模块")
+    print("=" * 60)
+    
+    test_profile_lookup()
+    test_light_tree_selection()
+    test_apply_and_restore()
+    test_capture_and_restore()
+    
+    print("=" * 60)
+    print("所有测试通过！")
+    print("=" * 60)
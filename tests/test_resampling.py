@@ -0,0 +1,192 @@
+"""
+测试光度学重采样模块
+
+验证网格重采样（双线性/球面插值）、对称展开、极点处理和方向查询。
+"""
+
+import sys
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from kiro_ies_generator.data_structures import PhotometricData
+from kiro_ies_generator.photometry import integrate_flux
+from kiro_ies_generator.resampling import (
+    IntensityInterpolator,
+    ResamplingError,
+    directions_to_angles,
+    evaluate_directions,
+    evaluate_intensity,
+    expand_horizontal_symmetry,
+    resample_photometric_data,
+)
+
+
+def make_photometric_data(vertical_angles, horizontal_angles, function) -> PhotometricData:
+    """用解析函数 I(θ, φ) 创建光度学数据"""
+    vertical_angles = np.asarray(vertical_angles, dtype=float)
+    horizontal_angles = np.asarray(horizontal_angles, dtype=float)
+    theta, phi = np.meshgrid(vertical_angles, horizontal_angles, indexing='ij')
+    return PhotometricData(
+        vertical_angles=vertical_angles,
+        horizontal_angles=horizontal_angles,
+        candela_values=function(theta, phi),
+        lumens=1000.0,
+        distance=5.0,
+        fixture_name="Resampling Test"
+    )
+
+
+def smooth_distribution(theta, phi):
+    """平滑的非对称光强分布"""
+    return (200.0 + 100.0 * np.cos(np.radians(theta)) +
+            20.0 * np.sin(np.radians(theta)) * np.cos(np.radians(phi)))
+
+
+def test_identity_resampling():
+    """测试重采样到相同网格时数据不变"""
+    data = make_photometric_data(np.arange(0, 181, 10.0), np.arange(0, 360, 15.0), smooth_distribution)
+    
+    for method in ("bilinear", "spherical"):
+        result = resample_photometric_data(data, data.vertical_angles, data.horizontal_angles, method)
+        assert np.allclose(result.candela_values, data.candela_values)
+        assert result.lumens == data.lumens
+    print("✓ 相同网格重采样测试通过")
+
+
+def test_fine_to_coarse_and_back():
+    """测试细网格与粗网格之间的转换精度"""
+    data = make_photometric_data(np.arange(0, 181, 5.0), np.arange(0, 360, 5.0), smooth_distribution)
+    
+    for method in ("bilinear", "spherical"):
+        coarse = resample_photometric_data(data, np.arange(0, 181, 2.5), np.arange(0, 360, 7.5), method)
+        theta, phi = np.meshgrid(coarse.vertical_angles, coarse.horizontal_angles, indexing='ij')
+        error = np.abs(coarse.candela_values - smooth_distribution(theta, phi)).max()
+        assert error < 1.0, f"{method} 插值误差过大：{error}"
+        
+        flux = integrate_flux(coarse.vertical_angles, coarse.horizontal_angles, coarse.candela_values)
+        expected = integrate_flux(data.vertical_angles, data.horizontal_angles, data.candela_values)
+        assert abs(flux - expected) / expected < 1e-3
+    print("✓ 网格转换精度测试通过")
+
+
+def test_symmetry_expansion():
+    """测试对称数据展开到完整圆周"""
+    vertical = np.arange(0, 181, 10.0)
+    quadrant = make_photometric_data(vertical, np.arange(0, 91, 15.0),
+                                     lambda t, p: 100.0 + np.cos(np.radians(2 * p)) * np.sin(np.radians(t)))
+    
+    angles, values = expand_horizontal_symmetry(quadrant.horizontal_angles, quadrant.candela_values)
+    assert np.allclose(angles, np.arange(0, 361, 15.0))
+    assert np.allclose(values[:, 0], values[:, -1])
+    
+    # 四象限对称：I(φ) = I(180° - φ) = I(180° + φ) = I(360° - φ)
+    for phi in (30.0, 150.0, 210.0, 330.0):
+        assert np.allclose(evaluate_intensity(quadrant, vertical, phi),
+                           quadrant.candela_values[:, 2])
+    
+    bilateral = make_photometric_data(vertical, np.arange(90, 271, 30.0),
+                                      lambda t, p: 100.0 + p / 10.0)
+    assert np.allclose(evaluate_intensity(bilateral, 45.0, 60.0),
+                       evaluate_intensity(bilateral, 45.0, 120.0))
+    
+    rotational = make_photometric_data(vertical, [0.0], lambda t, p: 100.0 + t)
+    assert np.allclose(evaluate_intensity(rotational, 45.0, np.arange(0, 360, 45.0)), 145.0)
+    print("✓ 对称展开测试通过")
+
+
+def test_poles_and_range():
+    """测试极点单值和测量范围外为 0"""
+    data = make_photometric_data(np.arange(0, 91, 10.0), np.arange(0, 360, 30.0),
+                                 lambda t, p: 100.0 + p)
+    values = evaluate_intensity(data, 0.0, np.arange(0, 360, 10.0))
+    assert np.allclose(values, values[0])
+    
+    assert np.all(evaluate_intensity(data, [120.0, 180.0], 0.0) == 0.0)
+    
+    # 水平角度按圆周取模
+    assert np.allclose(evaluate_intensity(data, 45.0, -30.0), evaluate_intensity(data, 45.0, 330.0))
+    print("✓ 极点与测量范围测试通过")
+
+
+def test_direction_queries():
+    """测试方向向量查询"""
+    data = make_photometric_data(np.arange(0, 181, 5.0), np.arange(0, 360, 5.0), smooth_distribution)
+    
+    theta, phi = directions_to_angles([[0, 0, -1], [0, 0, 2], [1, 0, 0], [0, 3, 0]])
+    assert np.allclose(theta, [0, 180, 90, 90])
+    assert np.allclose(phi[2:], [0, 90])
+    
+    rng = np.random.default_rng(1)
+    directions = rng.normal(size=(200, 100, 3))
+    values = evaluate_directions(data, directions, "spherical")
+    assert values.shape == (200, 100)
+    
+    theta, phi = directions_to_angles(directions)
+    assert np.abs(values - smooth_distribution(theta, phi)).max() < 1.0
+    
+    try:
+        directions_to_angles([[0, 0, 0]])
+        assert False, "零向量应该抛出 ResamplingError"
+    except ResamplingError:
+        pass
+    print("✓ 方向查询测试通过")
+
+
+def test_query_speed():
+    """测试大批量查询为向量化运算"""
+    data = make_photometric_data(np.arange(0, 180.25, 0.5), np.arange(0, 360, 0.5), smooth_distribution)
+    interpolator = IntensityInterpolator(data, "bilinear")
+    
+    rng = np.random.default_rng(2)
+    theta = rng.uniform(0, 180, 1_000_000)
+    phi = rng.uniform(0, 360, 1_000_000)
+    
+    start = time.perf_counter()
+    values = interpolator(theta, phi)
+    elapsed = time.perf_counter() - start
+    
+    assert values.shape == (1_000_000,)
+    assert elapsed < 5.0
+    print(f"✓ 查询速度测试通过（100 万个方向 {elapsed:.3f} 秒）")
+
+
+def test_invalid_arguments():
+    """测试参数错误"""
+    data = make_photometric_data(np.arange(0, 181, 10.0), np.arange(0, 360, 30.0), smooth_distribution)
+    
+    for vertical, horizontal, method in (
+        (np.arange(0, 181, 10.0), np.arange(0, 360, 30.0), "cubic"),
+        ([10.0, 5.0], [0.0], "bilinear"),
+        ([0.0, 190.0], [0.0], "bilinear"),
+    ):
+        try:
+            resample_photometric_data(data, vertical, horizontal, method)
+            assert False, "无效参数应该抛出 ResamplingError"
+        except ResamplingError:
+            pass
+    print("✓ 参数错误测试通过")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试光度学重采样模块")
+    print("=" * 60)
+    
+    test_identity_resampling()
+    test_fine_to_coarse_and_back()
+    test_symmetry_expansion()
+    test_poles_and_range()
+    test_direction_queries()
+    test_query_speed()
+    test_invalid_arguments()
+    
+    print("=" * 60)
+    print("所有测试通过！")
+    print("=" * 60)
@@ -0,0 +1,108 @@
+"""
+测试结果导出模块
+
+验证存档、IES 和元数据的写出（光源信息以属性字典传入，不需要 Blender）。
+"""
+
+import sys
+import os
+import json
+import tempfile
+import pytest
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from kiro_ies_generator.data_structures import SamplingConfig, SamplingResult
+from kiro_ies_generator.exporters import ExportError
+from kiro_ies_generator.ies_generator import calibrate_to_candela
+from kiro_ies_generator.ies_parser import read_ies_file
+from kiro_ies_generator.measurement_archive import load_sampling_result
+from kiro_ies_generator.result_export import export_sampling_result
+
+
+def make_sampling_result(render_settings) -> SamplingResult:
+    """创建测试用的采样结果"""
+    rng = np.random.default_rng(0)
+    return SamplingResult(
+        vertical_angles=np.arange(0, 181, 10.0),
+        horizontal_angles=np.arange(0, 360, 10.0),
+        luminance_data=rng.uniform(0.5, 1.5, (19, 36)),
+        light_position=(0.0, 0.0, 1.0),
+        total_samples=19 * 36,
+        elapsed_time=10.0,
+        render_settings=render_settings
+    )
+
+
+def test_export_sampling_result():
+    """测试导出存档、IES 和元数据"""
+    result = make_sampling_result({'distance': 5.0, 'samples': 64, 'frame': 12, 'light_group': None})
+    config = SamplingConfig(angular_interval=10.0, distance=5.0, samples=64)
+    light_sources = [{'name': 'Spot', 'type': 'SPOT', 'power': 100.0}]
+    
+    with tempfile.TemporaryDirectory() as directory:
+        ies_path = os.path.join(directory, "lamp.ies")
+        exported = export_sampling_result(
+            result, config, 1200.0, ies_path, "lamp", False, light_sources,
+            (0.0, 0.0, 1.0), (0.0, 0.0, 0.1), spherical_harmonics_band=2,
+            extra_metadata={'note': 'test'}
+        )
+        
+        expected = calibrate_to_candela(result, 1200.0, 5.0, "lamp")
+        assert np.allclose(exported['photometric_data'].candela_values, expected.candela_values)
+        assert exported['denoise_report'] is None
+        assert read_ies_file(ies_path).lumens == pytest.approx(1200.0)
+        assert np.array_equal(load_sampling_result(exported['archive_path']).luminance_data, result.luminance_data)
+        
+        with open(exported['metadata_path'], encoding='utf-8') as f:
+            metadata = json.load(f)
+        assert metadata['light_sources'] == light_sources
+        assert metadata['measurement_archive'] == "lamp_measurement.kma"
+        assert metadata['spherical_harmonics']['band'] == 2
+        assert metadata['frame'] == 12
+        assert 'light_group' not in metadata
+        assert metadata['note'] == 'test'
+        
+        assert exported['export_paths'] == {'IES2002': ies_path}
+        assert 'exports' not in metadata
+        
+        denoised = export_sampling_result(
+            result, config, 1200.0, ies_path, "lamp", True, light_sources,
+            (0.0, 0.0, 1.0), (0.0, 0.0, 0.1), denoise=True,
+            export_formats=("IES2002", "IES2019", "LDT")
+        )
+        assert denoised['denoise_report'] is not None
+        assert os.path.exists(os.path.join(directory, "lamp.ldt"))
+        assert read_ies_file(denoised['export_paths']['IES2019']).lumens == pytest.approx(1200.0)
+        with open(denoised['metadata_path'], encoding='utf-8') as f:
+            metadata = json.load(f)
+        assert 'denoising' in metadata
+        assert metadata['exports'] == {
+            'IES2002': "lamp.ies", 'IES2019': "lamp_LM-63-2019.ies", 'LDT': "lamp.ldt"
+        }
+        
+        # 格式无效时不写出任何文件
+        with pytest.raises(ExportError):
+            export_sampling_result(
+                result, config, 1200.0, os.path.join(directory, "other.ies"), "other", False,
+                light_sources, (0.0, 0.0, 1.0), (0.0, 0.0, 0.1), export_formats=("XML",)
+            )
+        assert not any(name.startswith("other") for name in os.listdir(directory))
+    print("✓ 结果导出测试通过")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试结果导出模块")
+    print("=" * 60)
+    
+    test_export_sampling_result()
+    
+    print("=" * 60)
+    print("所有测试通过！")
+    print("=" * 60)
@@ -0,0 +1,168 @@
+"""
+测试传感器几何模块
+
+验证包围球、自动分辨率、测量距离、像素积分和渲染区域。
+"""
+
+import sys
+import os
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from kiro_ies_generator.sensor_geometry import (
+    MAX_SENSOR_RESOLUTION,
+    MIN_BOUNDING_RADIUS,
+    MIN_SENSOR_RESOLUTION,
+    SensorGeometryError,
+    calculate_bounding_radius,
+    calculate_center_border,
+    calculate_render_border,
+    calculate_sensor_distance,
+    calculate_sensor_frame,
+    estimate_intensity_variance,
+    integrate_pixel_intensity,
+    project_points_to_sensor,
+)
+
+
+def test_bounding_radius():
+    """测试包围球半径以光度中心为球心"""
+    corners = [(x, y, z) for x in (-0.1, 0.1) for y in (-0.2, 0.2) for z in (0.0, 0.05)]
+    radius = calculate_bounding_radius(corners, (0.0, 0.0, 0.0))
+    assert abs(radius - np.sqrt(0.1 ** 2 + 0.2 ** 2 + 0.05 ** 2)) < 1e-12
+    
+    # 光度中心偏离几何中心时半径变大
+    assert calculate_bounding_radius(corners, (0.1, 0.0, 0.0)) > radius
+    
+    # 只有点光源
+    assert calculate_bounding_radius([(1.0, 2.0, 3.0)], (1.0, 2.0, 3.0)) == MIN_BOUNDING_RADIUS
+    assert calculate_bounding_radius([], (0.0, 0.0, 0.0)) == MIN_BOUNDING_RADIUS
+    print("✓ 包围球测试通过")
+
+
+def test_sensor_frame():
+    """测试取景范围和自动分辨率"""
+    frame = calculate_sensor_frame(0.25)
+    assert frame.ortho_scale > 0.5
+    assert frame.resolution == int(np.ceil(frame.ortho_scale / 0.005))
+    assert abs(frame.pixel_area - (frame.ortho_scale / frame.resolution) ** 2) < 1e-15
+    assert frame.to_dict()['resolution'] == frame.resolution
+    
+    # 分辨率随灯具尺寸变化并受上下限约束
+    assert calculate_sensor_frame(0.01).resolution == MIN_SENSOR_RESOLUTION
+    assert calculate_sensor_frame(5.0).resolution == MAX_SENSOR_RESOLUTION
+    assert calculate_sensor_frame(0.1).resolution < calculate_sensor_frame(0.3).resolution
+    
+    try:
+        calculate_sensor_frame(0.0)
+        assert False, "半径为 0 应该抛出 SensorGeometryError"
+    except SensorGeometryError:
+        pass
+    
+    assert calculate_sensor_distance(5.0, 0.5) == 5.0
+    assert calculate_sensor_distance(0.5, 0.5) == 1.0
+    print("✓ 取景范围测试通过")
+
+
+def test_pixel_integration():
+    """测试像素积分与分辨率无关"""
+    # 半径 0.1 米、亮度 1 的均匀圆盘，光强 = π r²
+    radius = 0.1
+    for sphere_radius in (0.12, 0.3):
+        frame = calculate_sensor_frame(sphere_radius)
+        coordinates = (np.arange(frame.resolution) + 0.5) * frame.pixel_size - frame.ortho_scale / 2
+        x, y = np.meshgrid(coordinates, coordinates)
+        luminance = (x ** 2 + y ** 2 <= radius ** 2).astype(np.float32)
+        intensity = integrate_pixel_intensity(luminance, frame.pixel_area)
+        assert abs(intensity - np.pi * radius ** 2) / (np.pi * radius ** 2) < 0.03
+    print("✓ 像素积分测试通过")
+
+
+def test_intensity_variance():
+    """测试由相邻像素之差估计测量方差"""
+    frame = calculate_sensor_frame(0.3)
+    coordinates = (np.arange(frame.resolution) + 0.5) * frame.pixel_size - frame.ortho_scale / 2
+    x, y = np.meshgrid(coordinates, coordinates)
+    disk = x ** 2 + y ** 2 <= 0.2 ** 2
+    
+    # 无噪声时方差为 0
+    assert estimate_intensity_variance(disk.astype(float), frame.pixel_area) == 0.0
+    
+    # 每个发光像素加标准差 0.1 的独立噪声（背景保持为 0，轮廓不影响估计）
+    rng = np.random.default_rng(0)
+    noisy = np.where(disk, 1.0 + rng.normal(0.0, 0.1, disk.shape), 0.0)
+    expected = np.count_nonzero(disk) * 0.1 ** 2 * frame.pixel_area ** 2
+    estimated = estimate_intensity_variance(noisy, frame.pixel_area)
+    assert abs(estimated - expected) / expected < 0.1
+    
+    # 重复渲染的测量值方差与估计一致
+    samples = [integrate_pixel_intensity(np.where(disk, 1.0 + rng.normal(0.0, 0.1, disk.shape), 0.0),
+                                         frame.pixel_area) for _ in range(400)]
+    assert abs(np.var(samples) - expected) / expected < 0.2
+    
+    assert estimate_intensity_variance(np.zeros((4, 4)), frame.pixel_area) == 0.0
+    print("✓ 测量方差估计测试通过")
+
+
+def test_render_border():
+    """测试渲染区域覆盖灯具投影且不改变积分结果"""
+    frame = calculate_sensor_frame(0.5)
+    resolution = frame.resolution
+    
+    # 相机在 +X 方向看向原点：相机 X 轴 = 世界 Y，相机 Y 轴 = 世界 Z，相机 Z 轴 = 世界 X
+    rotation = np.array([[0.0, 0.0, 1.0],
+                         [1.0, 0.0, 0.0],
+                         [0.0, 1.0, 0.0]])
+    corners = np.array([(x, y, z) for x in (-0.05, 0.05) for y in (-0.1, 0.1) for z in (0.0, 0.02)])
+    projected = project_points_to_sensor(corners, (5.0, 0.0, 0.0), rotation)
+    assert np.allclose(projected[:, 0].min(), -0.1) and np.allclose(projected[:, 1].max(), 0.02)
+    
+    border = calculate_render_border(projected, frame)
+    min_x, max_x, min_y, max_y = border
+    assert 0.0 <= min_x < max_x <= 1.0 and 0.0 <= min_y < max_y <= 1.0
+    # 边界对齐到整像素
+    for value in border:
+        assert abs(value * resolution - round(value * resolution)) < 1e-9
+    
+    # 区域外没有灯具像素：裁剪前后积分相同
+    coordinates = (np.arange(resolution) + 0.5) * frame.pixel_size - frame.ortho_scale / 2
+    x, y = np.meshgrid(coordinates, coordinates)
+    luminance = ((np.abs(x) <= 0.1) & (y >= 0.0) & (y <= 0.02)).astype(float)
+    columns = slice(round(min_x * resolution), round(max_x * resolution))
+    rows = slice(round(min_y * resolution), round(max_y * resolution))
+    assert integrate_pixel_intensity(luminance[rows, columns], frame.pixel_area) == \
+        integrate_pixel_intensity(luminance, frame.pixel_area)
+    assert (max_x - min_x) * (max_y - min_y) < 0.1
+    
+    # 点光源：至少 1 个像素
+    min_x, max_x, min_y, max_y = calculate_render_border(np.zeros((1, 2)), frame)
+    assert round((max_x - min_x) * resolution) == 1 and round((max_y - min_y) * resolution) == 1
+    
+    # 超出画面的点被裁到画面内
+    assert calculate_render_border(np.array([[-10.0, -10.0], [10.0, 10.0]]), frame) == (0.0, 1.0, 0.0, 1.0)
+    
+    # 中心像素
+    assert calculate_center_border(64) == (31 / 64, 33 / 64, 31 / 64, 33 / 64)
+    assert calculate_center_border(65) == (32 / 65, 33 / 65, 32 / 65, 33 / 65)
+    print("✓ 渲染区域测试通过")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试传感器几何模块")
+    print("=" * 60)
+    
+    test_bounding_radius()
+    test_sensor_frame()
+    test_pixel_integration()
+    test_intensity_variance()
+    test_render_border()
+    
+    print("=" * 60)
+    print("所有测试通过！")
+    print("=" * 60)
@@ -0,0 +1,154 @@
+"""
+测试传感器降噪验证模块
+
+验证分布比较、采样数选择、验证报告生成和测量配置对照。
+"""
+
+import sys
+import os
+import json
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from kiro_ies_generator.data_structures import SamplingResult
+from kiro_ies_generator.sensor_validation import (
+    SampleCountResult,
+    ValidationError,
+    build_validation_report,
+    compare_intensity_distributions,
+    compare_profiles,
+    select_sample_count,
+)
+
+
+def make_result(luminance, samples=64, elapsed_time=1.0) -> SamplingResult:
+    """创建 10° 网格上的采样结果"""
+    vertical_angles = np.arange(0.0, 181.0, 10.0)
+    horizontal_angles = np.arange(0.0, 360.0, 10.0)
+    return SamplingResult(
+        vertical_angles=vertical_angles,
+        horizontal_angles=horizontal_angles,
+        luminance_data=np.asarray(luminance, dtype=float),
+        light_position=(0.0, 0.0, 0.0),
+        total_samples=luminance.size,
+        elapsed_time=elapsed_time,
+        render_settings={'samples': samples}
+    )
+
+
+def cosine_distribution() -> np.ndarray:
+    """向下的余弦分布"""
+    theta = np.radians(np.arange(0.0, 181.0, 10.0))
+    return np.outer(np.maximum(np.cos(theta), 0.0) + 0.05, np.ones(36))
+
+
+def test_compare_distributions():
+    """测试分布比较只比较形状"""
+    reference = make_result(cosine_distribution() * 100.0, samples=1024)
+    
+    # 整体缩放不影响误差
+    scaled = make_result(cosine_distribution() * 3.0)
+    rms_error, max_error = compare_intensity_distributions(scaled, reference)
+    assert rms_error < 1e-12 and max_error < 1e-12
+    
+    # 噪声越大误差越大
+    rng = np.random.default_rng(0)
+    noise = rng.standard_normal((19, 36))
+    small = make_result(cosine_distribution() * (1.0 + 0.01 * noise))
+    large = make_result(cosine_distribution() * (1.0 + 0.1 * noise))
+    small_errors = compare_intensity_distributions(small, reference)
+    large_errors = compare_intensity_distributions(large, reference)
+    assert 0 < small_errors[0] < large_errors[0]
+    assert 0 < small_errors[1] < large_errors[1]
+    
+    # 候选结果全为 0 时误差为无穷大
+    dark = make_result(np.zeros((19, 36)))
+    assert compare_intensity_distributions(dark, reference) == (float('inf'), float('inf'))
+    
+    # 网格不一致
+    mismatched = make_result(cosine_distribution())
+    mismatched.horizontal_angles = mismatched.horizontal_angles + 5.0
+    try:
+        compare_intensity_distributions(mismatched, reference)
+        assert False, "网格不一致应该抛出 ValidationError"
+    except ValidationError:
+        pass
+    print("✓ 分布比较测试通过")
+
+
+def test_select_sample_count():
+    """测试采样数选择"""
+    results = [
+        SampleCountResult(16, False, 0.08, 0.20, 1.0),
+        SampleCountResult(16, True, 0.015, 0.04, 1.5),
+        SampleCountResult(32, False, 0.03, 0.06, 2.0),
+        SampleCountResult(32, True, 0.01, 0.02, 2.5),
+        SampleCountResult(64, False, 0.018, 0.04, 4.0),
+    ]
+    best = select_sample_count(results, rms_tolerance=0.02, max_tolerance=0.05)
+    assert best.samples == 16 and best.denoise
+    
+    best = select_sample_count(results, rms_tolerance=0.02, max_tolerance=0.03)
+    assert best.samples == 32 and best.denoise
+    
+    assert select_sample_count(results, rms_tolerance=0.001, max_tolerance=0.001) is None
+    print("✓ 采样数选择测试通过")
+
+
+def test_build_validation_report():
+    """测试验证报告"""
+    rng = np.random.default_rng(1)
+    reference = make_result(cosine_distribution(), samples=1024, elapsed_time=60.0)
+    candidates = []
+    for samples, denoise, level in [(8, False, 0.2), (8, True, 0.05), (32, False, 0.01), (32, True, 0.003)]:
+        noisy = cosine_distribution() * (1.0 + level * rng.standard_normal((19, 36)))
+        candidates.append((samples, denoise, make_result(noisy, samples=samples, elapsed_time=samples / 8.0)))
+    
+    report = build_validation_report(reference, candidates, fixture_class="downlight")
+    assert report.reference_samples == 1024
+    assert len(report.results) == 4
+    assert report.recommended_samples == 32
+    assert report.recommended_denoise is not None
+    
+    data = json.loads(json.dumps(report.to_dict()))
+    assert data['fixture_class'] == "downlight"
+    assert data['results'][0]['samples'] == 8
+    assert "downlight" in str(report)
+    print("✓ 验证报告测试通过")
+
+
+def test_compare_profiles():
+    """测试测量配置对照"""
+    reference = make_result(cosine_distribution(), elapsed_time=120.0)
+    rng = np.random.default_rng(2)
+    results = {
+        'standard': make_result(cosine_distribution(), elapsed_time=60.0),
+        'bare_emitter': make_result(cosine_distribution() * (1.0 + 0.05 * rng.standard_normal((19, 36))),
+                                    elapsed_time=20.0),
+    }
+    accuracies = compare_profiles(reference, results)
+    assert [accuracy.profile for accuracy in accuracies] == ['standard', 'bare_emitter']
+    assert accuracies[0].rms_error < 1e-12 and accuracies[0].speedup == 2.0
+    assert accuracies[1].rms_error > 0 and accuracies[1].speedup == 6.0
+    assert accuracies[1].to_dict()['profile'] == 'bare_emitter'
+    print("✓ 测量配置对照测试通过")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试传感器降噪验证模块")
+    print("=" * 60)
+    
+    test_compare_distributions()
+    test_select_sample_count()
+    test_build_validation_report()
+    test_compare_profiles()
+    
+    print("=" * 60)
+    print("所有测试通过！")
+    print("=" * 60)
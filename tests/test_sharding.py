@@ -0,0 +1,251 @@
+"""
+测试分布式分片模块
+
+验证分片规划、部分结果合并、锁文件认领、超时回收和协调器导出
+（部分结果直接构造，不需要 Blender）。
+"""
+
+import sys
+import os
+import json
+import tempfile
+import pytest
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from kiro_ies_generator.cli import CliError
+from kiro_ies_generator.data_structures import SamplingResult
+from kiro_ies_generator.ies_parser import read_ies_file
+from kiro_ies_generator.measurement_archive import load_sampling_result
+from kiro_ies_generator.sharding import (
+    SHARD_SCENE_KEY,
+    ShardDirectory,
+    ShardJob,
+    ShardingError,
+    count_vertical_angles,
+    main,
+    merge_shard_results,
+    plan_cli_jobs,
+    plan_shards,
+    run_coordinator,
+    split_theta_indices,
+)
+
+
+# 完整的测量网格（10° 间隔：19 × 36）
+FULL_GRID = np.random.default_rng(0).uniform(0.5, 1.5, (19, 36))
+
+
+def make_job(directory: str, job_id: str = "lamp", total_lumens=1200.0) -> ShardJob:
+    """创建测试用的分片任务"""
+    return ShardJob(job_id=job_id, blend=f"/shared/{job_id}.blend",
+                    output_path=os.path.join(directory, "out", f"{job_id}.ies"),
+                    angular_interval=10.0, distance=5.0, samples=64, total_lumens=total_lumens)
+
+
+def make_partial(theta_indices) -> SamplingResult:
+    """模拟工作进程测得的部分结果（只有分片中的行有值）"""
+    luminance_data = np.zeros_like(FULL_GRID)
+    luminance_data[theta_indices] = FULL_GRID[theta_indices]
+    return SamplingResult(
+        vertical_angles=np.arange(0, 181, 10.0),
+        horizontal_angles=np.arange(0, 360, 10.0),
+        luminance_data=luminance_data,
+        light_position=(0.0, 0.0, 1.0),
+        total_samples=len(theta_indices) * 36,
+        elapsed_time=5.0,
+        render_settings={'distance': 5.0, 'samples': 64, 'theta_indices': list(theta_indices),
+                         SHARD_SCENE_KEY: {'center_relative': [0.0, 0.0, 0.1], 'light_sources': [],
+                                           'total_lumens': 900.0}}
+    )
+
+
+def test_split_theta_indices():
+    """测试行交错分配"""
+    assert count_vertical_angles(10.0) == 19
+    assert count_vertical_angles(5.0) == 37
+    assert split_theta_indices(7, 3) == [[0, 3, 6], [1, 4], [2, 5]]
+    assert split_theta_indices(2, 5) == [[0], [1]]
+    with pytest.raises(ShardingError):
+        split_theta_indices(7, 0)
+    print("✓ 行分配测试通过")
+
+
+def test_plan_shards():
+    """测试分片规划"""
+    with tempfile.TemporaryDirectory() as directory:
+        jobs = [make_job(directory, "a"), make_job(directory, "b")]
+        shards = plan_shards(jobs, 4)
+        assert [shard.shard_id for shard in shards[:4]] == ["a-000", "a-001", "a-002", "a-003"]
+        assert sorted(sum((shard.theta_indices for shard in shards if shard.job_id == "b"), [])) == list(range(19))
+        
+        with pytest.raises(ShardingError):
+            plan_shards([jobs[0], jobs[0]], 4)
+        with pytest.raises(ShardingError):
+            plan_shards([replace(jobs[0], job_id="../a")], 4)
+        with pytest.raises(ShardingError):
+            plan_shards([replace(jobs[0], samples=0)], 4)
+    print("✓ 分片规划测试通过")
+
+
+def test_merge_shard_results():
+    """测试合并部分结果"""
+    with tempfile.TemporaryDirectory() as directory:
+        shards = plan_shards([make_job(directory)], 3)
+        partials = [make_partial(shard.theta_indices) for shard in shards]
+        
+        merged = merge_shard_results(shards, partials)
+        assert np.array_equal(merged.luminance_data, FULL_GRID)
+        assert merged.total_samples == 19 * 36
+        assert merged.elapsed_time == 15.0
+        assert merged.render_settings['shards'] == 3
+        assert 'theta_indices' not in merged.render_settings
+        assert SHARD_SCENE_KEY not in merged.render_settings
+        assert merged.variance is None
+        
+        # 缺少分片
+        with pytest.raises(ShardingError):
+            merge_shard_results(shards[:2], partials[:2])
+        
+        # 光度中心不一致
+        moved = replace(partials[1], light_position=(0.0, 0.0, 2.0))
+        with pytest.raises(ShardingError):
+            merge_shard_results(shards, [partials[0], moved, partials[2]])
+    print("✓ 部分结果合并测试通过")
+
+
+def test_claim_and_reclaim():
+    """测试锁文件认领、结果写入和超时回收"""
+    with tempfile.TemporaryDirectory() as directory:
+        shared = ShardDirectory(os.path.join(directory, "run"))
+        shards = shared.create([make_job(directory)], 2)
+        with pytest.raises(ShardingError):
+            shared.create([make_job(directory)], 2)
+        
+        # 另一个节点打开同一目录
+        other = ShardDirectory(shared.root)
+        first = shared.claim("node-1")
+        second = other.claim("node-2")
+        assert {first.shard_id, second.shard_id} == {shard.shard_id for shard in shards}
+        assert shared.claim("node-3") is None
+        
+        shared.write_result(first, make_partial(first.theta_indices))
+        assert [shard.shard_id for shard in shared.unfinished_shards()] == [second.shard_id]
+        assert np.array_equal(shared.read_result(first).luminance_data, make_partial(first.theta_indices).luminance_data)
+        
+        # 心跳未超时时不回收，超时后回收并可被重新认领
+        other.heartbeat(second)
+        assert shared.reclaim_stale(60.0) == []
+        assert shared.reclaim_stale(60.0, now=os.path.getmtime(shared.claim_path(second)) + 61.0) == [second.shard_id]
+        assert shared.claim("node-3").shard_id == second.shard_id
+    print("✓ 认领与回收测试通过")
+
+
+def test_coordinator():
+    """测试协调器回收超时分片、合并并导出"""
+    with tempfile.TemporaryDirectory() as directory:
+        shared = ShardDirectory(os.path.join(directory, "run"))
+        jobs = [replace(make_job(directory, "lamp"), spherical_harmonics_band=2),
+                make_job(directory, "spot", total_lumens=None), make_job(directory, "broken")]
+        shards = shared.create(jobs, 3)
+        
+        for shard in shards:
+            if shard.shard_id == "lamp-002":
+                # 停止心跳的节点
+                shared.claim("stalled")
+                os.utime(shared.claim_path(shard), (0, 0))
+            elif shard.job_id == "broken":
+                shared.write_failure(shard, "node-1", "场景验证失败")
+            else:
+                shared.write_result(shard, make_partial(shard.theta_indices))
+        
+        def reassign(shard_ids):
+            # 另一个节点接手被回收的分片
+            for shard in shards:
+                if shard.shard_id in shard_ids:
+                    assert shared.claim("node-2").shard_id == shard.shard_id
+                    shared.write_result(shard, make_partial(shard.theta_indices))
+        
+        progress = []
+        report = run_coordinator(shared, shard_timeout=60.0, poll_interval=0.01, timeout=5.0,
+                                 progress_callback=lambda current, total: progress.append((current, total)),
+                                 reassign_callback=reassign)
+        
+        assert report.succeeded == ["lamp", "spot"]
+        assert report.failed == ["broken"]
+        assert report.jobs[0].reassigned == ["lamp-002"]
+        assert progress[-1] == (9, 9)
+        
+        lamp = report.jobs[0]
+        assert read_ies_file(lamp.ies_path).lumens == pytest.approx(1200.0)
+        assert np.array_equal(load_sampling_result(lamp.archive_path).luminance_data, FULL_GRID)
+        with open(lamp.metadata_path, encoding='utf-8') as f:
+            metadata = json.load(f)
+        assert metadata['shards'] == 3
+        assert metadata['spherical_harmonics']['band'] == 2
+        assert metadata['photometric_center']['relative_to_fixture_origin']['z'] == pytest.approx(0.1)
+        
+        # 未指定流明时使用工作进程记录的场景流明
+        assert report.jobs[1].total_lumens == pytest.approx(900.0)
+        
+        with open(os.path.join(shared.root, "report.json"), encoding='utf-8') as f:
+            assert json.load(f)['failed'] == ["broken"]
+    print("✓ 协调器测试通过")
+
+
+def test_coordinator_timeout():
+    """测试协调器总超时"""
+    with tempfile.TemporaryDirectory() as directory:
+        shared = ShardDirectory(os.path.join(directory, "run"))
+        shared.create([make_job(directory)], 2)
+        with pytest.raises(ShardingError):
+            run_coordinator(shared, poll_interval=0.01, timeout=0.05)
+    print("✓ 协调器超时测试通过")
+
+
+def test_plan_command():
+    """测试由 cli 参数规划分片"""
+    with tempfile.TemporaryDirectory() as directory:
+        jobs = plan_cli_jobs(["a.blend", "b.blend", "--output-dir", directory, "--lumens", "800"])
+        assert [job.job_id for job in jobs] == ["a", "b"]
+        assert jobs[0].output_path == os.path.join(os.path.abspath(directory), "a.ies")
+        assert jobs[0].total_lumens == 800.0
+        assert jobs[0].export_formats == ("IES2002",)
+        
+        jobs = plan_cli_jobs(["a.blend", "--output-dir", directory, "--formats", "IES2002", "LDT"])
+        assert list(ShardJob.from_dict(jobs[0].to_dict()).export_formats) == ["IES2002", "LDT"]
+        
+        with pytest.raises(CliError):
+            plan_cli_jobs(["--output-dir", directory])
+        with pytest.raises(CliError):
+            plan_cli_jobs(["a.blend", "--output-dir", directory, "--mode", "fixtures"])
+        
+        root = os.path.join(directory, "run")
+        assert main(["plan", "--root", root, "--shards", "4", "a.blend", "--output-dir", directory]) == 0
+        assert len(ShardDirectory(root).load()[1]) == 4
+        assert main(["plan", "--root", root, "--shards", "4", "a.blend", "--output-dir", directory]) == 2
+    print("✓ 规划命令测试通过")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试分布式分片模块")
+    print("=" * 60)
+    
+    test_split_theta_indices()
+    test_plan_shards()
+    test_merge_shard_results()
+    test_claim_and_reclaim()
+    test_coordinator()
+    test_coordinator_timeout()
+    test_plan_command()
+    
+    print("=" * 60)
+    print("所有测试通过！")
+    print("=" * 60)
@@ -0,0 +1,151 @@
+"""
+测试球谐函数模块
+
+验证球谐基的正交归一性、加权最小二乘拟合、重建和元数据输出。
+"""
+
+import sys
+import os
+import json
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from kiro_ies_generator.data_structures import PhotometricData
+from kiro_ies_generator.output_manager import generate_metadata
+from kiro_ies_generator.photometry import get_solid_angle_weights, integrate_flux
+from kiro_ies_generator.spherical_harmonics import (
+    SphericalHarmonicFit,
+    SphericalHarmonicsError,
+    evaluate_spherical_harmonics,
+    evaluate_spherical_harmonics_grid,
+    fit_spherical_harmonics,
+    reconstruct_photometric_data,
+)
+
+
+def make_photometric_data(vertical_angles, horizontal_angles, function) -> PhotometricData:
+    """用解析函数 I(θ, φ) 创建光度学数据"""
+    vertical_angles = np.asarray(vertical_angles, dtype=float)
+    horizontal_angles = np.asarray(horizontal_angles, dtype=float)
+    theta, phi = np.meshgrid(vertical_angles, horizontal_angles, indexing='ij')
+    return PhotometricData(
+        vertical_angles=vertical_angles,
+        horizontal_angles=horizontal_angles,
+        candela_values=function(theta, phi),
+        lumens=1000.0,
+        distance=5.0,
+        fixture_name="SH Test"
+    )
+
+
+def test_basis_orthonormal():
+    """测试实球谐基在细网格上正交归一"""
+    band = 4
+    vertical = np.arange(0, 180.1, 1.0)
+    horizontal = np.arange(0, 360, 1.0)
+    weights = get_solid_angle_weights(vertical, horizontal)
+    
+    count = (band + 1) ** 2
+    basis = np.stack([
+        evaluate_spherical_harmonics_grid(np.eye(count)[k], vertical, horizontal)
+        for k in range(count)
+    ])
+    gram = np.einsum('aij,bij,ij->ab', basis, basis, weights)
+    assert np.allclose(gram, np.eye(count), atol=1e-3)
+    print("✓ 球谐基正交归一测试通过")
+
+
+def test_exact_fit():
+    """测试带限分布被精确拟合"""
+    coefficients = np.zeros(16)
+    coefficients[[0, 2, 5, 8, 13]] = [50.0, 20.0, -5.0, 3.0, 1.5]
+    vertical = np.arange(0, 181, 5.0)
+    horizontal = np.arange(0, 360, 5.0)
+    data = make_photometric_data(
+        vertical, horizontal,
+        lambda t, p: evaluate_spherical_harmonics(coefficients, t, p)
+    )
+    
+    fit = fit_spherical_harmonics(data, band=3)
+    assert np.allclose(fit.coefficients, coefficients, atol=1e-6)
+    assert fit.residual < 1e-8
+    
+    flux = integrate_flux(vertical, horizontal, data.candela_values)
+    assert abs(fit.get_total_flux() - flux) / flux < 1e-6
+    print("✓ 带限分布拟合测试通过")
+
+
+def test_smoothing_noisy_data():
+    """测试拟合平滑噪声（重建误差低于噪声）"""
+    rng = np.random.default_rng(3)
+    function = lambda t, p: 300.0 + 200.0 * np.cos(np.radians(t)) + 30.0 * np.sin(np.radians(t)) * np.cos(np.radians(p))
+    clean = make_photometric_data(np.arange(0, 181, 5.0), np.arange(0, 360, 5.0), function)
+    noisy = make_photometric_data(clean.vertical_angles, clean.horizontal_angles, function)
+    noisy.candela_values = clean.candela_values + rng.normal(0, 10.0, clean.candela_values.shape)
+    
+    fit = fit_spherical_harmonics(noisy, band=4)
+    smooth = reconstruct_photometric_data(fit, noisy)
+    
+    error_before = np.abs(noisy.candela_values - clean.candela_values).mean()
+    error_after = np.abs(smooth.candela_values - clean.candela_values).mean()
+    assert error_after < error_before / 3
+    assert 0.0 < fit.residual < 0.1
+    
+    # 在任意网格上重建
+    fine = reconstruct_photometric_data(fit, noisy, np.arange(0, 181, 1.0), np.arange(0, 360, 1.0))
+    assert fine.get_data_shape() == (181, 360)
+    print(f"✓ 噪声平滑测试通过（平均误差 {error_before:.2f} → {error_after:.2f} cd）")
+
+
+def test_symmetric_and_hemisphere_input():
+    """测试对称水平角度和只覆盖下半球的数据"""
+    function = lambda t, p: np.clip(np.cos(np.radians(t)), 0, None) * 1000.0
+    full = make_photometric_data(np.arange(0, 181, 5.0), np.arange(0, 360, 10.0), function)
+    quadrant = make_photometric_data(np.arange(0, 91, 5.0), np.arange(0, 91, 10.0), function)
+    
+    fit_full = fit_spherical_harmonics(full, band=6)
+    fit_quadrant = fit_spherical_harmonics(quadrant, band=6)
+    assert np.allclose(fit_full.coefficients, fit_quadrant.coefficients, atol=1.0)
+    print("✓ 对称与半球数据拟合测试通过")
+
+
+def test_metadata_round_trip():
+    """测试拟合结果写入元数据并恢复"""
+    data = make_photometric_data(np.arange(0, 181, 10.0), np.arange(0, 360, 15.0),
+                                 lambda t, p: 100.0 + 50.0 * np.cos(np.radians(t)))
+    fit = fit_spherical_harmonics(data, band=2)
+    
+    metadata = generate_metadata("SH Test", (0, 0, 0), (0, 0, 0), [], 1000.0, fit.to_dict())
+    restored = SphericalHarmonicFit.from_dict(json.loads(json.dumps(metadata))["spherical_harmonics"])
+    
+    assert restored.band == 2
+    assert np.allclose(restored.coefficients, fit.coefficients)
+    assert "spherical_harmonics" not in generate_metadata("SH Test", (0, 0, 0), (0, 0, 0), [], 1000.0)
+    
+    try:
+        fit_spherical_harmonics(data, band=40)
+        assert False, "阶数过高应该抛出 SphericalHarmonicsError"
+    except SphericalHarmonicsError:
+        pass
+    print("✓ 元数据往返测试通过")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试球谐函数模块")
+    print("=" * 60)
+    
+    test_basis_orthonormal()
+    test_exact_fit()
+    test_smoothing_noisy_data()
+    test_symmetric_and_hemisphere_input()
+    test_metadata_round_trip()
+    
+    print("=" * 60)
+    print("所有测试通过！")
+    print("=" * 60)
@@ -0,0 +1,208 @@
+"""
+测试叠加合成模块
+
+验证基网格建立、加权合成、预设导出和基存档读写。
+"""
+
+import sys
+import os
+import tempfile
+import pytest
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from kiro_ies_generator.data_structures import SamplingResult
+from kiro_ies_generator.ies_generator import calibrate_to_candela
+from kiro_ies_generator.ies_parser import read_ies_file
+from kiro_ies_generator.measurement_archive import ArchiveError, save_sampling_result, write_archive
+from kiro_ies_generator.photometry import integrate_flux
+from kiro_ies_generator.superposition import (
+    LightingPreset,
+    SuperpositionError,
+    build_light_basis,
+    calculate_group_lumens,
+    export_preset,
+    export_presets,
+    load_light_basis,
+    save_light_basis,
+    synthesize,
+)
+
+
+def make_group_result(group_name: str, seed: int) -> SamplingResult:
+    """创建测试用的光源组采样结果"""
+    rng = np.random.default_rng(seed)
+    return SamplingResult(
+        vertical_angles=np.arange(0, 181, 10.0),
+        horizontal_angles=np.arange(0, 360, 10.0),
+        luminance_data=rng.uniform(0.5, 1.5, (19, 36)),
+        light_position=(0.0, 0.0, 1.0),
+        total_samples=19 * 36,
+        elapsed_time=10.0,
+        render_settings={'distance': 5.0, 'samples': 64, 'light_group': group_name}
+    )
+
+
+def make_basis():
+    """创建上照/下照两组的基网格"""
+    results = {'down': make_group_result('down', 0), 'up': make_group_result('up', 1)}
+    return build_light_basis(results, {'down': 2000.0, 'up': 1000.0}), results
+
+
+def test_build_light_basis():
+    """测试建立基网格"""
+    basis, results = make_basis()
+    
+    assert basis.group_names == ['down', 'up']
+    assert basis.grids.shape == (2, 19, 36)
+    # 各组按共同因子校准，总量等于标称流明之和
+    assert np.allclose(basis.lumens, list(calculate_group_lumens(results, {'down': 2000.0, 'up': 1000.0}).values()))
+    assert basis.lumens.sum() == pytest.approx(3000.0)
+    assert basis.calibration_factor == pytest.approx(
+        3000.0 / sum(integrate_flux(r.vertical_angles, r.horizontal_angles, r.luminance_data)
+                     for r in results.values())
+    )
+    assert basis.distance == 5.0
+    assert 'light_group' not in basis.render_settings
+    
+    with pytest.raises(SuperpositionError):
+        build_light_basis({}, {})
+    with pytest.raises(SuperpositionError):
+        build_light_basis(results, {'down': 2000.0})
+    
+    mismatched = make_group_result('up', 1)
+    mismatched.render_settings['distance'] = 3.0
+    with pytest.raises(SuperpositionError):
+        build_light_basis({'down': results['down'], 'up': mismatched}, {'down': 1.0, 'up': 1.0})
+    print("✓ 基网格建立测试通过")
+
+
+def test_synthesize_is_linear():
+    """测试加权合成"""
+    basis, results = make_basis()
+    
+    result = synthesize(basis, {'up': 0.3})
+    expected = results['down'].luminance_data + 0.3 * results['up'].luminance_data
+    assert np.allclose(result.luminance_data, expected)
+    assert result.render_settings['total_lumens'] == pytest.approx(basis.lumens[0] + 0.3 * basis.lumens[1])
+    assert result.render_settings['superposition'] == {'down': 1.0, 'up': 0.3}
+    
+    # 序列形式与字典形式等价
+    assert np.allclose(synthesize(basis, [1.0, 0.3]).luminance_data, expected)
+    
+    with pytest.raises(SuperpositionError):
+        synthesize(basis, {'side': 1.0})
+    with pytest.raises(SuperpositionError):
+        synthesize(basis, [1.0])
+    with pytest.raises(SuperpositionError):
+        synthesize(basis, {'up': -0.5})
+    with pytest.raises(SuperpositionError):
+        synthesize(basis, [0.0, 0.0])
+    print("✓ 加权合成测试通过")
+
+
+def test_presets_match_group_ies():
+    """测试任意预设都等于各组 IES（按共同因子校准）的加权和"""
+    basis, results = make_basis()
+    
+    calibrated = calculate_group_lumens(results, {'down': 2000.0, 'up': 1000.0})
+    assert sum(calibrated.values()) == pytest.approx(3000.0)
+    group_candela = {
+        name: calibrate_to_candela(results[name], calibrated[name], 5.0).candela_values
+        for name in ('down', 'up')
+    }
+    
+    # 满功率、非均匀权重和关闭一组
+    for scalings in ({}, {'up': 0.3}, {'down': 0.25, 'up': 1.7}, {'down': 0.0}):
+        weights = {'down': 1.0, 'up': 1.0, **scalings}
+        data = export_preset(basis, LightingPreset('mix', scalings))
+        expected = sum(weights[name] * group_candela[name] for name in group_candela)
+        assert np.allclose(data.candela_values, expected)
+        assert data.lumens == pytest.approx(sum(weights[name] * calibrated[name] for name in calibrated))
+    
+    with pytest.raises(SuperpositionError):
+        calculate_group_lumens(results, {'down': 2000.0})
+    print("✓ 预设线性测试通过")
+
+
+def test_export_presets():
+    """测试预设导出"""
+    basis, results = make_basis()
+    preset = LightingPreset('evening', {'down': 1.0, 'up': 0.3})
+    assert "up 30%" in str(preset)
+    
+    data = export_preset(basis, preset)
+    combined = results['down'].luminance_data + 0.3 * results['up'].luminance_data
+    assert np.allclose(data.candela_values, combined * basis.calibration_factor)
+    evening_lumens = basis.lumens[0] + 0.3 * basis.lumens[1]
+    
+    with tempfile.TemporaryDirectory() as directory:
+        presets = [preset, LightingPreset('full')]
+        paths = export_presets(basis, presets, directory, fixture_name="pendant")
+        
+        assert paths['evening'] == os.path.join(directory, "pendant_evening.ies")
+        assert read_ies_file(paths['evening']).lumens == pytest.approx(evening_lumens, abs=1.0)
+        assert read_ies_file(paths['full']).lumens == pytest.approx(3000.0)
+        
+        with pytest.raises(SuperpositionError):
+            export_presets(basis, [preset, preset], directory, overwrite=True)
+    print("✓ 预设导出测试通过")
+
+
+def test_basis_archive():
+    """测试基存档读写"""
+    basis, results = make_basis()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        archive_path = os.path.join(directory, "fixture_basis.kma")
+        save_light_basis(basis, archive_path)
+        loaded = load_light_basis(archive_path)
+        
+        assert loaded.group_names == basis.group_names
+        assert np.array_equal(loaded.grids, basis.grids)
+        assert np.array_equal(loaded.lumens, basis.lumens)
+        assert loaded.calibration_factor == basis.calibration_factor
+        assert loaded.distance == 5.0
+        assert np.allclose(synthesize(loaded, {'up': 0.3}).luminance_data,
+                           synthesize(basis, {'up': 0.3}).luminance_data)
+        
+        # 旧存档：没有共同因子，lumens 为标称流明
+        legacy_path = os.path.join(directory, "legacy_basis.kma")
+        write_archive(legacy_path, {
+            'type': 'LightBasis', 'group_names': basis.group_names, 'distance': 5.0,
+            'light_position': list(basis.light_position), 'render_settings': {}
+        }, {
+            'vertical_angles': basis.vertical_angles, 'horizontal_angles': basis.horizontal_angles,
+            'grids': basis.grids, 'lumens': np.array([2000.0, 1000.0])
+        })
+        legacy = load_light_basis(legacy_path)
+        assert legacy.calibration_factor == pytest.approx(basis.calibration_factor)
+        assert np.allclose(legacy.lumens, basis.lumens)
+        
+        # 采样结果存档不是基存档
+        measurement_path = os.path.join(directory, "fixture_measurement.kma")
+        save_sampling_result(results['down'], measurement_path)
+        with pytest.raises(ArchiveError):
+            load_light_basis(measurement_path)
+    print("✓ 基存档读写测试通过")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试叠加合成模块")
+    print("=" * 60)
+    
+    test_build_light_basis()
+    test_synthesize_is_linear()
+    test_presets_match_group_ies()
+    test_export_presets()
+    test_basis_archive()
+    
+    print("=" * 60)
+    print("所有测试通过！")
+    print("=" * 60)